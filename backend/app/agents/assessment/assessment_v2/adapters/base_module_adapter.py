@@ -10,8 +10,13 @@ enabling seamless integration between the new SCID module structure and the exis
 moderator system.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional, Set, List
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional, Set, List, Tuple
 from datetime import datetime
 
 # Import base types
@@ -32,13 +37,22 @@ except ImportError:
 try:
     from ..core.question_router import QuestionRouter
     from ..core.response_processor import GlobalResponseProcessor
+    from ..core.dsm_criteria_engine import CriteriaEvaluator, criteria_changes
     ROUTER_AVAILABLE = True
 except ImportError:
     QuestionRouter = None
     GlobalResponseProcessor = None
+    CriteriaEvaluator = None
     ROUTER_AVAILABLE = False
     logger.warning("QuestionRouter not available - using simple sequential routing")
 
+# Shared pool that routes candidate answers while the user is typing
+_speculation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="scid-speculate")
+
+# Speculations held per adapter, and how long an unclaimed one stays usable
+MAX_SPECULATIONS = 1024
+SPECULATION_TTL_SECONDS = 600
+
 
 class SCIDModuleAdapter(BaseAssessmentModule):
     """
@@ -67,9 +81,12 @@ class SCIDModuleAdapter(BaseAssessmentModule):
         # Store the wrapped SCID module
         self.scid_module = scid_module
         self.deployer = deployer
+        self._disorder_id = (scid_module.dsm_criteria or {}).get('disorder_id')
         
-        # Session state tracking
-        self._session_states: Dict[str, Dict[str, Any]] = {}
+        # Precomputed next-question branches per session (see _speculate), LRU-bounded:
+        # session_id -> (expires_at, (question_id, response_count, future))
+        self._speculations: "OrderedDict[str, Tuple[float, Tuple[str, int, Future]]]" = OrderedDict()
+        self._speculation_lock = threading.Lock()
         
         # Initialize question router and response processor if available
         if ROUTER_AVAILABLE:
@@ -143,14 +160,14 @@ class SCIDModuleAdapter(BaseAssessmentModule):
                 'responses': [],
                 'conversation_history': [],
                 'dsm_criteria_status': {},
+                'dsm_criteria_bits': {},
                 'is_complete': False
             })
             
             # Get first required question (or first question if no required questions)
-            required_questions = [q for q in self.scid_module.questions if q.required]
+            required_questions = self.scid_module.get_routing_order(required=True)
             if required_questions:
-                # Sort by priority and sequence
-                required_questions.sort(key=lambda q: (q.priority, q.sequence_number))
+                # Already in priority and sequence order
                 first_question = required_questions[0]
             elif self.scid_module.questions:
                 first_question = self.scid_module.questions[0]
@@ -165,6 +182,7 @@ class SCIDModuleAdapter(BaseAssessmentModule):
                 )
             
             session_state['current_question_id'] = first_question.id
+            self._speculate(session_id, first_question)
             
             # Format and return first question
             greeting = f"Let's begin the {self.scid_module.name} assessment."
@@ -208,94 +226,170 @@ class SCIDModuleAdapter(BaseAssessmentModule):
             ModuleResponse with the reply and status
         """
         try:
-            self._ensure_session_exists(session_id)
-            session_state = self._sessions[session_id]
-            
-            # Check if module is complete
-            if session_state.get('is_complete', False) or self.is_complete(session_id):
-                return ModuleResponse(
-                    message="This assessment module has already been completed.",
-                    is_complete=True,
-                    requires_input=False
-                )
-            
-            # Get current question
-            current_question_id = session_state.get('current_question_id')
-            if not current_question_id:
-                # Get first unanswered required question
-                answered_questions = set(session_state.get('answered_questions', []))
-                required_questions = [q for q in self.scid_module.questions if q.required]
-                unanswered_required = [q for q in required_questions if q.id not in answered_questions]
-                if unanswered_required:
-                    current_question = unanswered_required[0]
-                    current_question_id = current_question.id
-                elif self.scid_module.questions:
-                    # Fallback to first question
-                    current_question = self.scid_module.questions[0]
-                    current_question_id = current_question.id
-                else:
-                    return self._complete_module(session_id)
-            else:
-                current_question = self.scid_module.get_question_by_id(current_question_id)
-                if not current_question:
-                    # Question not found, get next unanswered question
-                    answered_questions = set(session_state.get('answered_questions', []))
-                    unanswered = [q for q in self.scid_module.questions if q.id not in answered_questions]
-                    if unanswered:
-                        current_question = unanswered[0]
-                        current_question_id = current_question.id
-                    else:
-                        return self._complete_module(session_id)
+            speculation = self._pop_speculation(session_id)
+            current_question = self._current_question(session_id)
+            if isinstance(current_question, ModuleResponse):
+                return current_question
             
             # Process response using response processor if available
             processed_response = None
             if self.response_processor:
                 try:
-                    conversation_history = session_state.get('conversation_history', [])
                     processed_response = self.response_processor.process_response(
                         user_response=message,
                         question=current_question,
-                        conversation_history=conversation_history,
+                        conversation_history=self._sessions[session_id].get('conversation_history', []),
                         session_id=session_id
                     )
                 except Exception as e:
                     logger.warning(f"Error processing response with response processor: {e}")
             
-            # Store response
-            answered_questions = set(session_state.get('answered_questions', []))
-            answered_questions.add(current_question_id)
-            session_state['answered_questions'] = list(answered_questions)
+            return self._advance(session_id, message, current_question, processed_response, speculation)
             
-            session_state['responses'].append({
-                'question_id': current_question_id,
-                'response': message,
-                'processed': processed_response.__dict__ if processed_response else None
-            })
-            
-            # Update conversation history
-            if 'conversation_history' not in session_state:
-                session_state['conversation_history'] = []
-            session_state['conversation_history'].append({
-                'role': 'user',
-                'content': message
-            })
+        except Exception as e:
+            logger.error(f"Error processing message for session {session_id}: {e}", exc_info=True)
+            return self.on_error(session_id, e, **kwargs)
+    
+    async def start_session_async(self, user_id: str, session_id: str, **kwargs) -> ModuleResponse:
+        """Runs inline unless the session's state has to be reloaded from its checkpoint"""
+        if self._sessions.is_cached(session_id):
+            return self.start_session(user_id=user_id, session_id=session_id, **kwargs)
+        return await asyncio.to_thread(self.start_session, user_id=user_id, session_id=session_id, **kwargs)
+    
+    async def process_message_async(self, message: str, session_id: str, **kwargs) -> ModuleResponse:
+        """Async counterpart of process_message; the LLM parse and SRA extraction are awaited"""
+        try:
+            speculation = self._pop_speculation(session_id)
+            if self._sessions.is_cached(session_id):
+                current_question = self._current_question(session_id)
+            else:
+                current_question = await asyncio.to_thread(self._current_question, session_id)
+            if isinstance(current_question, ModuleResponse):
+                return current_question
             
-            # Get next question using QuestionRouter if available
-            next_question = None
-            if self.question_router and processed_response:
+            processed_response = None
+            if self.response_processor:
                 try:
-                    dsm_criteria_status = session_state.get('dsm_criteria_status', {})
-                    if processed_response.dsm_criteria_mapping:
-                        dsm_criteria_status.update(processed_response.dsm_criteria_mapping)
-                        session_state['dsm_criteria_status'] = dsm_criteria_status
-                    
-                    # Build session responses dict for router optimization
-                    session_responses_dict = {}
-                    for resp in session_state.get('responses', []):
-                        qid = resp.get('question_id')
-                        if qid:
-                            session_responses_dict[qid] = resp
-                    
+                    processed_response = await self.response_processor.process_response_async(
+                        user_response=message,
+                        question=current_question,
+                        conversation_history=self._sessions[session_id].get('conversation_history', []),
+                        session_id=session_id
+                    )
+                except Exception as e:
+                    logger.warning(f"Error processing response with response processor: {e}")
+            
+            return self._advance(session_id, message, current_question, processed_response, speculation)
+            
+        except Exception as e:
+            logger.error(f"Error processing message for session {session_id}: {e}", exc_info=True)
+            return self.on_error(session_id, e, **kwargs)
+    
+    def _current_question(self, session_id: str):
+        """The question being answered, or a ModuleResponse if the module is done"""
+        self._ensure_session_exists(session_id)
+        session_state = self._sessions[session_id]
+        
+        # Check if module is complete
+        if session_state.get('is_complete', False) or self.is_complete(session_id):
+            return ModuleResponse(
+                message="This assessment module has already been completed.",
+                is_complete=True,
+                requires_input=False
+            )
+        
+        # Get current question
+        current_question_id = session_state.get('current_question_id')
+        if not current_question_id:
+            # Get first unanswered required question, falling back to the first question
+            answered_questions = set(session_state.get('answered_questions', []))
+            current_question = next(
+                (q for q in self.scid_module.questions if q.required and q.id not in answered_questions),
+                None
+            )
+            if not current_question and self.scid_module.questions:
+                current_question = self.scid_module.questions[0]
+        else:
+            current_question = self.scid_module.get_question_by_id(current_question_id)
+            if not current_question:
+                # Question not found, get next unanswered question
+                answered_questions = set(session_state.get('answered_questions', []))
+                current_question = next(
+                    (q for q in self.scid_module.questions if q.id not in answered_questions),
+                    None
+                )
+        
+        if not current_question:
+            return self._complete_module(session_id)
+        
+        return current_question
+    
+    def _advance(
+        self,
+        session_id: str,
+        message: str,
+        current_question: SCIDQuestion,
+        processed_response: Optional[ProcessedResponse],
+        speculation: Optional[Tuple[str, int, Future]]
+    ) -> ModuleResponse:
+        """Record the answer and move to the next question (or complete the module)"""
+        session_state = self._sessions[session_id]
+        current_question_id = current_question.id
+        
+        # Store response
+        answered_questions = set(session_state.get('answered_questions', []))
+        response_count = len(session_state.get('responses', []))
+        answered_questions.add(current_question_id)
+        session_state['answered_questions'] = list(answered_questions)
+        
+        session_state['responses'].append({
+            'question_id': current_question_id,
+            'response': message,
+            'processed': processed_response.__dict__ if processed_response else None
+        })
+        
+        # Update conversation history
+        if 'conversation_history' not in session_state:
+            session_state['conversation_history'] = []
+        session_state['conversation_history'].append({
+            'role': 'user',
+            'content': message
+        })
+        
+        # Get next question using QuestionRouter if available
+        next_question = None
+        next_message = None
+        if self.question_router and processed_response:
+            try:
+                dsm_criteria_status = session_state.get('dsm_criteria_status', {})
+                evaluator = self._criteria_evaluator(session_state)
+                if processed_response.dsm_criteria_mapping:
+                    changes = criteria_changes(dsm_criteria_status, processed_response.dsm_criteria_mapping)
+                    dsm_criteria_status.update(changes)
+                    session_state['dsm_criteria_status'] = dsm_criteria_status
+                    evaluator.update(changes)
+                
+                # Stop as soon as no answer can change the outcome (safety questions still get asked)
+                criteria_bounds = evaluator.bounds(self._disorder_id) if self._disorder_id else None
+                if criteria_bounds is not None and criteria_bounds.decided and not any(
+                    q.priority == 1 and q.id not in answered_questions for q in self.scid_module.questions
+                ):
+                    session_state['early_stop_reason'] = (
+                        "criteria_met" if criteria_bounds.satisfied else "criteria_not_reachable"
+                    )
+                    return self._complete_module(session_id)
+                
+                # Build session responses dict for router optimization
+                session_responses_dict = {}
+                for resp in session_state.get('responses', []):
+                    qid = resp.get('question_id')
+                    if qid:
+                        session_responses_dict[qid] = resp
+                
+                next_question, next_message = self._take_speculation(
+                    speculation, current_question_id, response_count, processed_response
+                )
+                if next_question is None:
                     next_question = self.question_router.get_next_question(
                         current_question=current_question,
                         processed_response=processed_response,
@@ -303,58 +397,57 @@ class SCIDModuleAdapter(BaseAssessmentModule):
                         answered_questions=answered_questions,
                         dsm_criteria_status=dsm_criteria_status,
                         conversation_history=session_state.get('conversation_history', []),
-                        session_responses=session_responses_dict
+                        session_responses=session_responses_dict,
+                        criteria_bounds=criteria_bounds
                     )
-                except Exception as e:
-                    logger.warning(f"Error routing to next question: {e}")
+            except Exception as e:
+                logger.warning(f"Error routing to next question: {e}")
+        
+        # Fallback: Get next sequential question if router didn't provide one
+        if not next_question:
+            answered_questions = set(session_state.get('answered_questions', []))
             
-            # Fallback: Get next sequential question if router didn't provide one
+            # Prioritize required questions (precomputed priority and sequence order)
+            next_question = next(
+                (q for q in self.scid_module.get_routing_order(required=True) if q.id not in answered_questions),
+                None
+            )
             if not next_question:
-                answered_questions = set(session_state.get('answered_questions', []))
-                unanswered = [q for q in self.scid_module.questions if q.id not in answered_questions]
-                
-                # Prioritize required questions
-                required_unanswered = [q for q in unanswered if q.required]
-                if required_unanswered:
-                    # Sort by priority and sequence
-                    required_unanswered.sort(key=lambda q: (q.priority, q.sequence_number))
-                    next_question = required_unanswered[0]
-                elif unanswered:
+                next_optional = next(
+                    (q for q in self.scid_module.get_routing_order(required=False) if q.id not in answered_questions),
+                    None
+                )
+                if next_optional:
                     # If all required are answered, check if we've met min_questions
                     min_questions = self.scid_module.min_questions or 1
                     if len(answered_questions) >= min_questions:
                         # We've answered enough, complete the module
                         return self._complete_module(session_id)
-                    else:
-                        # Still need more questions, get next by priority
-                        unanswered.sort(key=lambda q: (q.priority, q.sequence_number))
-                        next_question = unanswered[0]
-            
-            # Check if module is complete
-            if not next_question or self.is_complete(session_id):
-                return self._complete_module(session_id)
-            
-            # Update current question
-            session_state['current_question_id'] = next_question.id
-            
-            # Format and return next question
-            return ModuleResponse(
-                message=self._format_question(next_question),
-                is_complete=False,
-                requires_input=True,
-                metadata={
-                    'module_id': self.scid_module.id,
-                    'module_name': self.scid_module.name,
-                    'question_id': next_question.id,
-                    'answered_count': len(answered_questions),
-                    'total_questions': len(self.scid_module.questions)
-                },
-                progress=self.get_progress(session_id)
-            )
-            
-        except Exception as e:
-            logger.error(f"Error processing message for session {session_id}: {e}", exc_info=True)
-            return self.on_error(session_id, e, **kwargs)
+                    # Still need more questions, get next by priority
+                    next_question = next_optional
+        
+        # Check if module is complete
+        if not next_question or self.is_complete(session_id):
+            return self._complete_module(session_id)
+        
+        # Update current question
+        session_state['current_question_id'] = next_question.id
+        self._speculate(session_id, next_question)
+        
+        # Format and return next question
+        return ModuleResponse(
+            message=next_message or self._format_question(next_question),
+            is_complete=False,
+            requires_input=True,
+            metadata={
+                'module_id': self.scid_module.id,
+                'module_name': self.scid_module.name,
+                'question_id': next_question.id,
+                'answered_count': len(answered_questions),
+                'total_questions': len(self.scid_module.questions)
+            },
+            progress=self.get_progress(session_id)
+        )
     
     def is_complete(self, session_id: str) -> bool:
         """
@@ -378,11 +471,8 @@ class SCIDModuleAdapter(BaseAssessmentModule):
         answered_questions = set(session_state.get('answered_questions', []))
         
         # Count required questions that have been answered
-        required_questions = [
-            q for q in self.scid_module.questions 
-            if q.required
-        ]
-        answered_required = sum(1 for q in required_questions if q.id in answered_questions)
+        required_questions = self.scid_module.get_required_question_ids()
+        answered_required = len(required_questions & answered_questions)
         
         # Module is complete if:
         # 1. All required questions are answered, OR
@@ -434,6 +524,7 @@ class SCIDModuleAdapter(BaseAssessmentModule):
             'started_at': session_state.get('started_at'),
             'completed_at': session_state.get('completed_at'),
             'is_complete': session_state.get('is_complete', False),
+            'early_stop_reason': session_state.get('early_stop_reason'),
             'module_metadata': {
                 'category': self.scid_module.category,
                 'estimated_time_mins': self.scid_module.estimated_time_mins
@@ -484,6 +575,120 @@ class SCIDModuleAdapter(BaseAssessmentModule):
     # HELPER METHODS
     # ========================================================================
     
+    def _speculate(self, session_id: str, question: SCIDQuestion):
+        """
+        Route each bare option answer to ``question`` in the background.
+        
+        YES_NO and MCQ questions branch to one of a few next questions. The
+        branches and their phrasing are computed while the user is typing;
+        process_message commits the one matching the parsed answer.
+        """
+        if not self.question_router or not self.response_processor:
+            return
+        candidates = self.response_processor.candidate_responses(question)
+        if not candidates:
+            return
+        
+        session_state = self._sessions[session_id]
+        # Snapshot what routing reads, so the worker never sees later mutations
+        responses = list(session_state.get('responses', []))
+        snapshot = {
+            'answered_questions': set(session_state.get('answered_questions', [])),
+            'dsm_criteria_status': dict(session_state.get('dsm_criteria_status', {})),
+            'conversation_history': list(session_state.get('conversation_history', [])),
+            'session_responses': {r['question_id']: r for r in responses if r.get('question_id')},
+        }
+        
+        def route() -> Dict[Tuple, Tuple[Optional[SCIDQuestion], Optional[str]]]:
+            branches = self.question_router.speculate_next_questions(
+                current_question=question,
+                candidates=candidates,
+                module=self.scid_module,
+                **snapshot
+            )
+            return {
+                key: (next_q, self._format_question(next_q) if next_q else None)
+                for key, next_q in branches.items()
+            }
+        
+        try:
+            future = _speculation_executor.submit(route)
+        except RuntimeError:  # executor shut down at interpreter exit
+            return
+        self._hold_speculation(session_id, (question.id, len(responses), future))
+    
+    def _hold_speculation(self, session_id: str, speculation: Tuple[str, int, Future]) -> None:
+        """Keep a session's speculation, evicting expired and least recently used ones"""
+        now = time.monotonic()
+        evicted = []
+        with self._speculation_lock:
+            previous = self._speculations.pop(session_id, None)
+            if previous is not None:
+                evicted.append(previous[1])
+            self._speculations[session_id] = (now + SPECULATION_TTL_SECONDS, speculation)
+            while self._speculations:
+                oldest_id, (expires_at, oldest) = next(iter(self._speculations.items()))
+                if expires_at > now and len(self._speculations) <= MAX_SPECULATIONS:
+                    break
+                del self._speculations[oldest_id]
+                evicted.append(oldest)
+        for _, _, future in evicted:
+            future.cancel()
+    
+    def _pop_speculation(self, session_id: str) -> Optional[Tuple[str, int, Future]]:
+        """Claim a session's speculation unless it has expired"""
+        with self._speculation_lock:
+            entry = self._speculations.pop(session_id, None)
+        if entry is None:
+            return None
+        expires_at, speculation = entry
+        if expires_at <= time.monotonic():
+            speculation[2].cancel()
+            return None
+        return speculation
+    
+    def _criteria_evaluator(self, session_state: Dict[str, Any]) -> "CriteriaEvaluator":
+        """Incremental criteria evaluator over the bitsets kept in session state"""
+        if 'dsm_criteria_bits' not in session_state:
+            evaluator = CriteriaEvaluator(session_state.setdefault('dsm_criteria_bits', {}))
+            # Sessions checkpointed before bitsets existed: seed from the status dict
+            evaluator.update(session_state.get('dsm_criteria_status', {}))
+            return evaluator
+        return CriteriaEvaluator(session_state['dsm_criteria_bits'])
+    
+    def _take_speculation(
+        self,
+        speculation: Optional[Tuple[str, int, Future]],
+        question_id: str,
+        response_count: int,
+        processed_response: ProcessedResponse
+    ) -> Tuple[Optional[SCIDQuestion], Optional[str]]:
+        """Next question and its message from a finished speculation, if it still applies"""
+        if speculation is None:
+            return None, None
+        spec_question_id, spec_response_count, future = speculation
+        # Still running: routing inline is as fast as waiting for it
+        if not future.done():
+            future.cancel()
+            return None, None
+        if spec_question_id != question_id or spec_response_count != response_count:
+            return None, None
+        try:
+            branches = future.result()
+        except Exception as e:
+            logger.debug(f"Speculative routing failed: {e}")
+            return None, None
+        
+        next_question, message = branches.get(self.question_router.routing_key(processed_response), (None, None))
+        if next_question is not None:
+            logger.debug(f"Committed speculative branch {question_id} -> {next_question.id}")
+        return next_question, message
+    
+    def cleanup_session(self, session_id: str) -> None:
+        """Clean up a session, dropping any pending speculation"""
+        self._pop_speculation(session_id)
+        super().cleanup_session(session_id)
+    
     def _format_question(self, question: SCIDQuestion) -> str:
         """Format a SCID question for display to user"""
         formatted = question.simple_text
@@ -502,6 +707,7 @@ class SCIDModuleAdapter(BaseAssessmentModule):
         
         session_state['is_complete'] = True
         session_state['completed_at'] = datetime.now()
+        self._pop_speculation(session_id)
         
         # Create module-specific completion messages
         module_id = self.scid_module.id.upper()
@@ -534,7 +740,7 @@ class SCIDModuleAdapter(BaseAssessmentModule):
                 'module_name': self.scid_module.name,
                 'total_questions': len(self.scid_module.questions),
                 'answered_questions': answered_count,
-                'completion_type': 'normal'
+                'completion_type': 'early_stop' if session_state.get('early_stop_reason') else 'normal'
             }
         )
 
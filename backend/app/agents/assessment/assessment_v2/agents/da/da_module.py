@@ -103,9 +103,6 @@ class DiagnosticAnalysisModule(BaseAssessmentModule):
         else:
             self.dsm_engine = None
         
-        # Session state tracking
-        self._sessions: Dict[str, Dict[str, Any]] = {}
-        
         logger.debug("DiagnosticAnalysisModule (V2) initialized")
     
     # ========================================================================
@@ -91,9 +91,6 @@ class TreatmentPlanningModule(BaseAssessmentModule):
         else:
             self.sra_service = None
         
-        # Session state tracking
-        self._sessions: Dict[str, Dict[str, Any]] = {}
-        
         logger.debug("TreatmentPlanningModule (V2) initialized")
     
     # ========================================================================
@@ -872,42 +869,6 @@ Include lifestyle recommendations that support treatment."""
         logger.info(f"TPA module completed for session {session_id}")
         # Results are saved in start_session
     
-    def checkpoint_state(self, session_id: str) -> bool:
-        """Save module state to database for resume capability"""
-        try:
-            if session_id not in self._sessions:
-                return False
-            
-            session_state = self._sessions[session_id]
-            return self.db.save_module_state(
-                session_id=session_id,
-                module_name=self.module_name,
-                state_data=session_state,
-                checkpoint_metadata={
-                    "status": session_state.get("status"),
-                    "checkpointed_at": datetime.now().isoformat()
-                }
-            ) if self.db else False
-        except Exception as e:
-            logger.error(f"Failed to checkpoint TPA state for session {session_id}: {e}")
-            return False
-    
-    def resume_from_checkpoint(self, session_id: str) -> bool:
-        """Restore module state from database checkpoint"""
-        try:
-            if self.db:
-                state_data = self.db.get_module_state(session_id, self.module_name)
-                if not state_data:
-                    return False
-                
-                self._sessions[session_id] = state_data.get("state_data", {})
-                logger.info(f"TPA module resumed from checkpoint for session {session_id}")
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"Failed to resume TPA from checkpoint for session {session_id}: {e}")
-            return False
-    
     def compile_results(self, session_id: str) -> Dict[str, Any]:
         """Compile final results - same as get_results for consistency"""
         return self.get_results(session_id)
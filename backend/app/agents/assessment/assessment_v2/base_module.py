@@ -11,8 +11,11 @@ Version: 2.0.0
 
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
+import asyncio
 import logging
 
+from .core.module_state import ModuleSessionStore
+
 # Import types - handle import errors gracefully
 try:
     from .assessment_v2.types import ModuleResponse
@@ -48,6 +51,14 @@ class BaseAssessmentModule(ABC):
     - process_message(): Process user messages
     - is_complete(): Check if module is complete
     
+    Async counterparts (start_session_async, process_message_async) run the
+    sync methods in a worker thread by default; modules with non-blocking
+    I/O override them.
+    
+    Session state lives in self._sessions, a ModuleSessionStore: LRU/TTL
+    bounded, checkpointed by the moderator after every turn and reloaded
+    from the last checkpoint when a session is no longer held locally.
+    
     Optional properties:
     - module_version: Module version string
     - module_description: Module description string
@@ -55,7 +66,7 @@ class BaseAssessmentModule(ABC):
     
     def __init__(self):
         """Initialize the base module"""
-        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._sessions = ModuleSessionStore(self.module_name)
         logger.debug(f"{self.__class__.__name__} initialized")
     
     # ========================================================================
@@ -159,6 +170,28 @@ class BaseAssessmentModule(ABC):
         """
         pass
     
+    # ========================================================================
+    # ASYNC METHODS (can be overridden by subclasses)
+    # ========================================================================
+    
+    async def start_session_async(self, user_id: str, session_id: str, **kwargs) -> ModuleResponse:
+        """
+        Async counterpart of start_session.
+        
+        The default runs start_session in a worker thread so blocking LLM and
+        database calls stay off the event loop.
+        """
+        return await asyncio.to_thread(self.start_session, user_id=user_id, session_id=session_id, **kwargs)
+    
+    async def process_message_async(self, message: str, session_id: str, **kwargs) -> ModuleResponse:
+        """
+        Async counterpart of process_message.
+        
+        The default runs process_message in a worker thread so blocking LLM and
+        database calls stay off the event loop.
+        """
+        return await asyncio.to_thread(self.process_message, message=message, session_id=session_id, **kwargs)
+    
     # ========================================================================
     # OPTIONAL HELPER METHODS (can be overridden by subclasses)
     # ========================================================================
@@ -215,4 +248,36 @@ class BaseAssessmentModule(ABC):
         if session_id in self._sessions:
             del self._sessions[session_id]
             logger.debug(f"Cleaned up session {session_id} for {self.module_name}")
+    
+    def checkpoint_state(self, session_id: str) -> bool:
+        """
+        Persist the session's state for resume (skipped when unchanged).
+        
+        Args:
+            session_id: Unique identifier for the assessment session
+            
+        Returns:
+            True if the state is checkpointed, False if there is none
+        """
+        try:
+            return self._sessions.checkpoint(session_id)
+        except Exception as e:
+            logger.error(f"Failed to checkpoint {self.module_name} state for session {session_id}: {e}")
+            return False
+    
+    def resume_from_checkpoint(self, session_id: str) -> bool:
+        """
+        Restore the session's state from its last checkpoint.
+        
+        Args:
+            session_id: Unique identifier for the assessment session
+            
+        Returns:
+            True if a checkpoint was found and loaded
+        """
+        try:
+            return self._sessions.restore(session_id)
+        except Exception as e:
+            logger.error(f"Failed to resume {self.module_name} for session {session_id}: {e}")
+            return False
 
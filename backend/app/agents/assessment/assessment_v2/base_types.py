@@ -6,7 +6,7 @@ Refactored with minimal questions, intelligent routing, and LLM-based response p
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, FrozenSet
 
 
 class ResponseType(Enum):
@@ -172,17 +172,49 @@ class SCIDModule:
         sequence_numbers = [q.sequence_number for q in self.questions]
         if len(sequence_numbers) != len(set(sequence_numbers)):
             raise ValueError(f"Duplicate sequence numbers found in module {self.id}")
+        
+        self._build_indexes()
+    
+    def _build_indexes(self):
+        """
+        Index questions once at load so routing never scans the question list.
+        
+        Modules are shared read-only across sessions; call this again if the
+        question list is ever changed after construction.
+        """
+        self._by_id: Dict[str, SCIDQuestion] = {q.id: q for q in self.questions}
+        
+        by_priority: Dict[int, List[SCIDQuestion]] = {}
+        for question in self.questions:
+            by_priority.setdefault(question.priority, []).append(question)
+        self._by_priority: Dict[int, Tuple[SCIDQuestion, ...]] = {
+            priority: tuple(questions) for priority, questions in by_priority.items()
+        }
+        
+        self._follow_ups: Dict[str, Tuple[SCIDQuestion, ...]] = {
+            q.id: tuple(self._by_id[f] for f in q.follow_up_questions if f in self._by_id)
+            for q in self.questions
+        }
+        
+        self._required: Tuple[SCIDQuestion, ...] = tuple(q for q in self.questions if q.required)
+        self._required_ids: FrozenSet[str] = frozenset(q.id for q in self._required)
+        
+        routing_key = lambda q: (q.priority, q.sequence_number)
+        self._routing_order: Dict[bool, Tuple[SCIDQuestion, ...]] = {
+            True: tuple(sorted(self._required, key=routing_key)),
+            False: tuple(sorted((q for q in self.questions if not q.required), key=routing_key)),
+        }
+        self._sequential_order: Tuple[SCIDQuestion, ...] = tuple(
+            sorted(self.questions, key=lambda q: q.sequence_number)
+        )
     
     def get_question_by_id(self, question_id: str) -> Optional[SCIDQuestion]:
         """Get a specific question by ID"""
-        for question in self.questions:
-            if question.id == question_id:
-                return question
-        return None
+        return self._by_id.get(question_id)
     
     def get_questions_by_priority(self, priority: int) -> List[SCIDQuestion]:
         """Get all questions with a specific priority"""
-        return [q for q in self.questions if q.priority == priority]
+        return list(self._by_priority.get(priority, ()))
     
     def get_critical_questions(self) -> List[SCIDQuestion]:
         """Get all critical questions (Priority 1 - safety questions)"""
@@ -190,21 +222,23 @@ class SCIDModule:
     
     def get_required_questions(self) -> List[SCIDQuestion]:
         """Get all required questions"""
-        return [q for q in self.questions if q.required]
+        return list(self._required)
+    
+    def get_required_question_ids(self) -> FrozenSet[str]:
+        """Get the IDs of all required questions"""
+        return self._required_ids
     
     def get_follow_up_questions(self, parent_question_id: str) -> List[SCIDQuestion]:
         """Get follow-up questions for a parent question"""
-        parent_question = self.get_question_by_id(parent_question_id)
-        if not parent_question:
-            return []
-        
-        follow_up_questions = []
-        for follow_up_id in parent_question.follow_up_questions:
-            follow_up = self.get_question_by_id(follow_up_id)
-            if follow_up:
-                follow_up_questions.append(follow_up)
-        
-        return follow_up_questions
+        return list(self._follow_ups.get(parent_question_id, ()))
+    
+    def get_routing_order(self, required: bool = True) -> Tuple[SCIDQuestion, ...]:
+        """Required (or optional) questions in (priority, sequence_number) order"""
+        return self._routing_order[required]
+    
+    def get_sequential_order(self) -> Tuple[SCIDQuestion, ...]:
+        """All questions in sequence_number order"""
+        return self._sequential_order
 
 
 @dataclass
@@ -3,18 +3,26 @@ Core components for SCID-CV V2 system
 """
 
 from .response_processor import GlobalResponseProcessor
+from .answer_classifier import AnswerClassifier, get_answer_classifier
+from .module_catalog import ModuleCatalog, get_module_catalog
 from .question_router import QuestionRouter
 from .question_prioritizer import QuestionPrioritizer
-from .dsm_criteria_engine import DSMCriteriaEngine
+from .dsm_criteria_engine import CriteriaEvaluator, DisorderBounds, DSMCriteriaEngine
 from .llm_response_parser import LLMResponseParser
 from .sra_service import SRAService, get_sra_service
 from .symptom_database import SymptomDatabase, Symptom, get_symptom_database
 
 __all__ = [
     "GlobalResponseProcessor",
+    "AnswerClassifier",
+    "get_answer_classifier",
+    "ModuleCatalog",
+    "get_module_catalog",
     "QuestionRouter",
     "QuestionPrioritizer",
     "DSMCriteriaEngine",
+    "CriteriaEvaluator",
+    "DisorderBounds",
     "LLMResponseParser",
     "SRAService",
     "get_sra_service",
@@ -0,0 +1,181 @@
+"""
+Tiered answer classifier for SCID-CV V2
+Resolves unambiguous YES_NO / MCQ answers locally before any LLM parse
+"""
+
+import re
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from ..base_types import SCIDQuestion, ResponseType
+from ..utils.question_utils import ResponseParser
+
+
+# Tiers, in the order they are tried
+TIER_EXACT = "exact"        # bare option label, option number or yes/no word
+TIER_PREFIX = "prefix"      # short answer led by an option label or yes/no word
+TIER_LLM = "llm"            # escalated to the LLM parser
+TIER_FALLBACK = "fallback"  # LLM unusable, rule-based fallback answered
+TIER_FAILED = "failed"      # nothing produced an answer
+
+TIERS = (TIER_EXACT, TIER_PREFIX, TIER_LLM, TIER_FALLBACK, TIER_FAILED)
+
+# Confidence per local tier. A prefix hit matches the confidence the rule-based
+# fallback already assigns to a clear option match.
+TIER_CONFIDENCE = {
+    TIER_EXACT: 0.95,
+    TIER_PREFIX: 0.85,
+}
+
+# Answers longer than this carry detail (duration, severity) the LLM should read
+MAX_PREFIX_WORDS = 8
+
+_YES_WORDS = frozenset(ResponseParser.YES_WORDS) | {"yup", "certainly", "of course"}
+_NO_WORDS = frozenset(ResponseParser.NO_WORDS) - {"wrong"} | {"not at all", "no never", "never ever"}
+_SOMETIMES_WORDS = frozenset({"sometimes", "occasionally"})
+# Leading words strong enough to carry a longer answer ("right" and "sure" are not)
+_LEAD_WORDS = frozenset({"yes", "yeah", "yep", "yup", "yea", "no", "nope", "nah", "never"})
+
+# Words that make a short answer qualified rather than a clean yes/no
+_HEDGE_RE = re.compile(
+    r"\b(?:but|although|though|however|except|unless|maybe|perhaps|possibly|might|"
+    r"sometimes|occasionally|used to|not sure|unsure|don'?t know|kind of|sort of|"
+    r"depends|a little|a bit)\b"
+)
+_OPTION_NUMBER_RE = re.compile(r"^(?:option\s*)?#?(\d{1,2})$")
+_LEAD_RE = re.compile(r"^([a-z']+)\b")
+_TRAILING_PUNCT = " \t.!?,;:"
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().replace("’", "'").split()).strip(_TRAILING_PUNCT)
+
+
+class AnswerClassifier:
+    """
+    Cheap local classifier for structured SCID answers.
+
+    ``classify`` returns ``(option, confidence, tier)`` for answers it can
+    resolve without the LLM, or ``None`` to escalate. The processor reports
+    every outcome through ``record`` so per-tier hit rates are available from
+    ``get_stats``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {tier: 0 for tier in TIERS}
+
+    def classify(self, user_response: str, question: SCIDQuestion) -> Optional[Tuple[str, float, str]]:
+        """Resolve an answer locally, or return None to escalate it"""
+        if question.response_type not in (ResponseType.YES_NO, ResponseType.MULTIPLE_CHOICE):
+            return None
+
+        text = _normalize(user_response or "")
+        if not text:
+            return None
+
+        option = self._match_exact(text, question)
+        if option is not None:
+            return option, TIER_CONFIDENCE[TIER_EXACT], TIER_EXACT
+
+        option = self._match_prefix(text, question)
+        if option is not None:
+            return option, TIER_CONFIDENCE[TIER_PREFIX], TIER_PREFIX
+
+        return None
+
+    def _match_exact(self, text: str, question: SCIDQuestion) -> Optional[str]:
+        options = question.options or []
+        option = None
+
+        for candidate in options:
+            if _normalize(candidate) == text:
+                option = candidate
+                break
+
+        if option is None:
+            number = _OPTION_NUMBER_RE.match(text)
+            if number and options:
+                index = int(number.group(1))
+                if 1 <= index <= len(options):
+                    option = options[index - 1]
+
+        if question.response_type != ResponseType.YES_NO:
+            return option
+        # YES_NO answers are stored as yes/no/sometimes; "Not sure" goes to the LLM
+        return self._polarity(_normalize(option) if option is not None else text)
+
+    def _match_prefix(self, text: str, question: SCIDQuestion) -> Optional[str]:
+        words = text.split()
+        if len(words) > MAX_PREFIX_WORDS or _HEDGE_RE.search(text):
+            return None
+
+        # Longest option label the answer starts with, e.g. "several days, mostly evenings"
+        best = None
+        for option in question.options or []:
+            label = _normalize(option)
+            if label and text.startswith(label) and text[len(label):len(label) + 1] in (",", " "):
+                if best is None or len(label) > len(_normalize(best)):
+                    best = option
+        if question.response_type != ResponseType.YES_NO:
+            return best
+
+        lead = _LEAD_RE.match(text)
+        if not lead or lead.group(1) not in _LEAD_WORDS:
+            return None
+        polarity = self._polarity(lead.group(1))
+        if polarity is None:
+            return None
+
+        # The rest of the answer must not flip the leading word ("yes... not really")
+        parsed, is_valid = ResponseParser.parse_yes_no(text)
+        if not is_valid or parsed != polarity:
+            return None
+        return polarity
+
+    @staticmethod
+    def _polarity(text: str) -> Optional[str]:
+        if text in _YES_WORDS:
+            return "yes"
+        if text in _NO_WORDS:
+            return "no"
+        if text in _SOMETIMES_WORDS:
+            return "sometimes"
+        return None
+
+    def record(self, tier: str):
+        """Count one processed answer against the tier that produced it"""
+        with self._lock:
+            self._counts[tier] = self._counts.get(tier, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-tier hit counts and rates"""
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        local = counts[TIER_EXACT] + counts[TIER_PREFIX]
+        return {
+            "total": total,
+            "counts": counts,
+            "hit_rates": {tier: (count / total if total else 0.0) for tier, count in counts.items()},
+            "local_rate": local / total if total else 0.0,
+        }
+
+    def reset_stats(self):
+        """Reset the per-tier counters"""
+        with self._lock:
+            self._counts = {tier: 0 for tier in TIERS}
+
+
+_classifier: Optional[AnswerClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_answer_classifier() -> AnswerClassifier:
+    """Get the process-wide answer classifier"""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = AnswerClassifier()
+    return _classifier
@@ -1,14 +1,267 @@
 """
 DSM Criteria Engine for SCID-CV V2
 Tracks DSM-5 criteria fulfillment (backend only)
+
+Each disorder in dsm_criteria.json is compiled once into a rule over
+criterion bits. A session keeps a met and an unmet bitmask per disorder
+(everything else is unknown), so an answer only touches the disorders of the
+criteria it changed, and the "already satisfied / still reachable" bounds are
+a few popcounts.
 """
 
+import json
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Mapping, NamedTuple, Optional, Tuple
 from ..base_types import SCIDQuestion, ProcessedResponse, SCIDModule
 
 logger = logging.getLogger(__name__)
 
+_DSM_CRITERIA_FILE = Path(__file__).resolve().parent.parent / "resources" / "dsm_criteria.json"
+
+_COUNT_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6}
+
+
+class DisorderBounds(NamedTuple):
+    """Where a disorder's criteria stand for one session"""
+    disorder_id: str
+    satisfied: bool   # Criteria already met, whatever the unknown criteria turn out to be
+    reachable: bool   # Criteria can still be met if the unknown criteria turn out met
+    met: int
+    unmet: int
+    unknown: int
+    needed: int       # Lower bound on further criteria that must be met (0 once satisfied)
+
+    @property
+    def decided(self) -> bool:
+        """No further answer can change the outcome"""
+        return self.satisfied or not self.reachable
+
+
+class DisorderRule:
+    """
+    A disorder's diagnostic rule over criterion bits.
+
+    The rule is a list of clauses that must all hold; a clause holds when any
+    of its alternatives does, and an alternative (mask, k) holds when at least
+    k of the criteria in mask are met. E.g. MDD is [(all 9, 5)] and
+    [(A1|A2, 1)]; GAD is [(A|B, 2)] and [(C1..C6, 3)]; ADHD is
+    [(IN1..IN9, 6) or (HI1..HI9, 6)].
+    """
+
+    def __init__(self, disorder_id: str, criterion_ids: List[str], clauses: List[Tuple[Tuple[int, int], ...]]):
+        self.disorder_id = disorder_id
+        self.bits: Dict[str, int] = {cid: 1 << i for i, cid in enumerate(criterion_ids)}
+        self.clauses = clauses
+
+    @classmethod
+    def from_criteria(cls, dsm_criteria: Dict[str, Any]) -> "DisorderRule":
+        """Compile a disorder entry of dsm_criteria.json"""
+        disorder_id = dsm_criteria.get("disorder_id", "")
+        criteria = list(dsm_criteria.get("criteria", []))
+        criteria.extend(dsm_criteria.get("additional_criteria", []))
+
+        # PTSD-style clusters: "criterion_b_intrusion": {"requirement": "One or more ...", "symptoms": [...]}
+        clusters = []
+        for key, value in dsm_criteria.items():
+            if key.startswith("criterion_") and isinstance(value, dict) and value.get("symptoms"):
+                clusters.append(([s["criterion_id"] for s in value["symptoms"]], _min_count(value.get("requirement", ""))))
+                criteria.extend(value["symptoms"])
+
+        criterion_ids = list(dict.fromkeys(c["criterion_id"] for c in criteria if c.get("criterion_id")))
+        rule = cls(disorder_id, criterion_ids, [])
+
+        required = [c["criterion_id"] for c in criteria if c.get("required")]
+        optional = [c["criterion_id"] for c in dsm_criteria.get("criteria", []) if not c.get("required")]
+        either = [c["criterion_id"] for c in criteria if c.get("note", "").lower().startswith("must have either")]
+        criteria_type = dsm_criteria.get("criteria_type", "symptom_count")
+        minimum = dsm_criteria.get("minimum_criteria_count")
+
+        if required:
+            rule.clauses.append(((rule.mask(required), len(required)),))
+        if either:
+            rule.clauses.append(((rule.mask(either), 1),))
+        if criteria_type == "symptom_count" and minimum:
+            symptoms = [c["criterion_id"] for c in dsm_criteria.get("criteria", [])]
+            rule.clauses.append(((rule.mask(symptoms), minimum),))
+        elif criteria_type == "hybrid" and minimum and optional:
+            rule.clauses.append(((rule.mask(optional), minimum),))
+        elif criteria_type == "cluster":
+            for ids, count in clusters:
+                rule.clauses.append(((rule.mask(ids), count),))
+            if minimum and optional and not clusters:
+                # ADHD: the minimum from either symptom list (ADHD_IN*, ADHD_HI*)
+                groups: Dict[str, List[str]] = {}
+                for cid in optional:
+                    groups.setdefault(cid.rstrip("0123456789"), []).append(cid)
+                rule.clauses.append(tuple((rule.mask(ids), minimum) for ids in groups.values()))
+        return rule
+
+    def mask(self, criterion_ids: List[str]) -> int:
+        """Bitmask of the given criteria"""
+        mask = 0
+        for cid in criterion_ids:
+            mask |= self.bits.get(cid, 0)
+        return mask
+
+    def bounds(self, met: int, unmet: int) -> Optional[DisorderBounds]:
+        """Evaluate the rule; None if it has no clauses (nothing to decide)"""
+        if not self.clauses:
+            return None
+        satisfied = True
+        reachable = True
+        # Clauses over shared criteria can be met by the same answers, so
+        # overlapping clauses count their largest need once: [(mask, needed)]
+        groups: List[List[int]] = []
+        for clause in self.clauses:
+            clause_met = False
+            clause_needed = None
+            for mask, count in clause:
+                have = (met & mask).bit_count()
+                if have >= count:
+                    clause_met = True
+                if (mask & ~unmet).bit_count() >= count:
+                    missing = max(0, count - have)
+                    clause_needed = missing if clause_needed is None else min(clause_needed, missing)
+            satisfied = satisfied and clause_met
+            if clause_needed is None:
+                reachable = False
+                continue
+            clause_mask = 0
+            for mask, _ in clause:
+                clause_mask |= mask
+            group = [clause_mask, clause_needed]
+            for other in [g for g in groups if g[0] & clause_mask]:
+                groups.remove(other)
+                group = [group[0] | other[0], max(group[1], other[1])]
+            groups.append(group)
+        needed = sum(group_needed for _, group_needed in groups)
+        met_count = met.bit_count()
+        unmet_count = unmet.bit_count()
+        return DisorderBounds(
+            disorder_id=self.disorder_id,
+            satisfied=satisfied,
+            reachable=reachable,
+            met=met_count,
+            unmet=unmet_count,
+            unknown=len(self.bits) - met_count - unmet_count,
+            needed=0 if satisfied else needed,
+        )
+
+    def evaluate(self, criteria_status: Mapping[str, Optional[bool]]) -> Optional[DisorderBounds]:
+        """Bounds for a full criteria status dict (one pass, for callers without an evaluator)"""
+        met = unmet = 0
+        for cid, value in criteria_status.items():
+            bit = self.bits.get(cid)
+            if bit is None:
+                continue
+            if value is True:
+                met |= bit
+            elif value is False:
+                unmet |= bit
+        return self.bounds(met, unmet)
+
+
+def _min_count(requirement: str) -> int:
+    """'One or more of ...' -> 1, '... as evidenced by two (or more)' -> 2"""
+    for word in re.findall(r"[a-z]+", requirement.lower()):
+        if word in _COUNT_WORDS:
+            return _COUNT_WORDS[word]
+    return 1
+
+
+_rules: Optional[Dict[str, DisorderRule]] = None
+_criterion_index: Dict[str, List[Tuple[str, int]]] = {}
+_rules_lock = threading.Lock()
+
+
+def get_disorder_rules() -> Dict[str, DisorderRule]:
+    """Compiled rules for every disorder in dsm_criteria.json (loaded once)"""
+    global _rules
+    if _rules is None:
+        with _rules_lock:
+            if _rules is None:
+                rules: Dict[str, DisorderRule] = {}
+                try:
+                    with open(_DSM_CRITERIA_FILE, "r", encoding="utf-8") as f:
+                        disorders = json.load(f).get("disorders", {})
+                    for disorder_id, dsm_criteria in disorders.items():
+                        rules[disorder_id] = DisorderRule.from_criteria({"disorder_id": disorder_id, **dsm_criteria})
+                except Exception as e:
+                    logger.error(f"Error loading DSM criteria rules: {e}")
+                for rule in rules.values():
+                    for cid, bit in rule.bits.items():
+                        _criterion_index.setdefault(cid, []).append((rule.disorder_id, bit))
+                _rules = rules
+    return _rules
+
+
+def get_disorder_rule(dsm_criteria: Dict[str, Any]) -> Optional[DisorderRule]:
+    """Rule for a module's DSM criteria entry"""
+    disorder_id = (dsm_criteria or {}).get("disorder_id")
+    if not disorder_id:
+        return None
+    rule = get_disorder_rules().get(disorder_id)
+    if rule is None and dsm_criteria.get("criteria"):
+        rule = DisorderRule.from_criteria(dsm_criteria)
+    return rule
+
+
+class CriteriaEvaluator:
+    """
+    Incremental per-session criteria evaluation.
+
+    ``bits`` maps disorder_id -> [met_mask, unmet_mask]; it is plain data so
+    it can live in (and be checkpointed with) module session state.
+    """
+
+    def __init__(self, bits: Optional[Dict[str, List[int]]] = None):
+        self.rules = get_disorder_rules()
+        self.bits = bits if bits is not None else {}
+
+    def update(self, changes: Mapping[str, Optional[bool]]) -> List[str]:
+        """Apply changed criteria (True met, False unmet, None unknown); returns disorders touched"""
+        touched = []
+        for cid, value in changes.items():
+            for disorder_id, bit in _criterion_index.get(cid, ()):
+                masks = self.bits.setdefault(disorder_id, [0, 0])
+                masks[0] &= ~bit
+                masks[1] &= ~bit
+                if value is True:
+                    masks[0] |= bit
+                elif value is False:
+                    masks[1] |= bit
+                if disorder_id not in touched:
+                    touched.append(disorder_id)
+        return touched
+
+    def bounds(self, disorder_id: str) -> Optional[DisorderBounds]:
+        """Current bounds for a disorder, or None if it has no rule"""
+        rule = self.rules.get(disorder_id)
+        if rule is None:
+            return None
+        met, unmet = self.bits.get(disorder_id, (0, 0))
+        return rule.bounds(met, unmet)
+
+    def decided(self) -> List[DisorderBounds]:
+        """Bounds of every disorder whose outcome is already fixed"""
+        decided = []
+        for disorder_id in self.bits:
+            bounds = self.bounds(disorder_id)
+            if bounds is not None and bounds.decided:
+                decided.append(bounds)
+        return decided
+
+
+def criteria_changes(criteria_status: Dict[str, Any], mapping: Mapping[str, Any]) -> Dict[str, Any]:
+    """The entries of mapping that differ from criteria_status"""
+    return {
+        cid: value for cid, value in mapping.items()
+        if cid not in criteria_status or criteria_status[cid] != value
+    }
+
 
 class DSMCriteriaEngine:
     """DSM-5 criteria tracking engine (backend only)"""
@@ -16,6 +269,12 @@ class DSMCriteriaEngine:
     def __init__(self):
         """Initialize DSM criteria engine"""
         self.criteria_status: Dict[str, bool] = {}
+        self.evaluator = CriteriaEvaluator()
+    
+    def reset(self):
+        """Forget all criteria (new assessment)"""
+        self.criteria_status = {}
+        self.evaluator = CriteriaEvaluator()
     
     def update_criteria_status(
         self,
@@ -26,6 +285,7 @@ class DSMCriteriaEngine:
     ) -> Dict[str, bool]:
         """
         Update DSM criteria status based on response.
+        Only the criteria the response changed are re-evaluated.
         
         Args:
             question_id: Question ID that was answered
@@ -34,12 +294,14 @@ class DSMCriteriaEngine:
             dsm_criteria: DSM criteria information from module
         
         Returns:
-            Updated criteria status dict
+            The engine's criteria status dict (treat as read-only)
         """
         try:
             # Update criteria from processed response
             if processed_response.dsm_criteria_mapping:
-                self.criteria_status.update(processed_response.dsm_criteria_mapping)
+                changes = criteria_changes(self.criteria_status, processed_response.dsm_criteria_mapping)
+                self.criteria_status.update(changes)
+                self.evaluator.update(changes)
             
             # Also update based on extracted fields if available
             extracted_fields = processed_response.extracted_fields
@@ -48,11 +310,31 @@ class DSMCriteriaEngine:
                 # This is module-specific and can be extended
                 pass
             
-            return self.criteria_status.copy()
+            return self.criteria_status
             
         except Exception as e:
             logger.error(f"Error updating criteria status: {e}")
-            return self.criteria_status.copy()
+            return self.criteria_status
+    
+    def get_bounds(
+        self,
+        dsm_criteria: Dict[str, Any],
+        criteria_status: Optional[Dict[str, bool]] = None
+    ) -> Optional[DisorderBounds]:
+        """
+        Satisfied / reachable bounds for a module's disorder.
+        
+        Uses the incremental state when criteria_status is the engine's own
+        (or omitted); any other status dict is evaluated in one pass.
+        """
+        rule = get_disorder_rule(dsm_criteria)
+        if rule is None:
+            return None
+        if criteria_status is None or criteria_status is self.criteria_status:
+            if rule.disorder_id in self.evaluator.rules:
+                return self.evaluator.bounds(rule.disorder_id)
+            criteria_status = self.criteria_status
+        return rule.evaluate(criteria_status)
     
     def can_stop_early(
         self,
@@ -74,7 +356,15 @@ class DSMCriteriaEngine:
             Tuple of (can_stop, reason)
         """
         try:
-            # Get criteria type and minimum count
+            bounds = self.get_bounds(dsm_criteria, criteria_status)
+            if bounds is not None:
+                if bounds.satisfied:
+                    return True, f"Diagnostic criteria met ({bounds.met} criteria met)"
+                if not bounds.reachable:
+                    return True, f"Diagnostic criteria can no longer be met ({bounds.unmet} criteria not met)"
+                return False, "Continue assessment"
+            
+            # No compiled rule: fall back to the symptom count
             criteria_type = dsm_criteria.get("criteria_type", "symptom_count")
             minimum_criteria_count = dsm_criteria.get("minimum_criteria_count", 5)
             
@@ -82,36 +372,11 @@ class DSMCriteriaEngine:
             met_criteria = [k for k, v in criteria_status.items() if v is True]
             met_count = len(met_criteria)
             
-            # Count unmet criteria (explicitly False)
-            unmet_criteria = [k for k, v in criteria_status.items() if v is False]
-            unmet_count = len(unmet_criteria)
-            
             # Check if diagnosis is possible (enough criteria met)
             if criteria_type == "symptom_count":
                 if met_count >= minimum_criteria_count:
                     return True, f"Diagnostic criteria met ({met_count}/{minimum_criteria_count}+ criteria)"
             
-            # Check if diagnosis is not possible
-            # This is more complex and depends on required criteria
-            required_criteria = [
-                c for c in dsm_criteria.get("criteria", [])
-                if c.get("required", False)
-            ]
-            
-            if required_criteria:
-                # Check if any required criteria are unmet
-                required_criterion_ids = [c.get("criterion_id") for c in required_criteria]
-                unmet_required = [
-                    cid for cid in required_criterion_ids
-                    if criteria_status.get(cid) is False
-                ]
-                
-                if unmet_required:
-                    # Check if diagnosis is still possible
-                    # For now, we don't stop early if required criteria are unmet
-                    # (might be answered in future questions)
-                    pass
-            
             return False, "Continue assessment"
             
         except Exception as e:
@@ -144,13 +409,23 @@ class DSMCriteriaEngine:
             minimum_criteria_count = dsm_criteria.get("minimum_criteria_count", 5)
             met_count = len(met_criteria)
             
+            bounds = self.get_bounds(dsm_criteria, criteria_status)
+            if bounds is not None:
+                criteria_met = bounds.satisfied
+                still_needed = bounds.needed
+            else:
+                criteria_met = met_count >= minimum_criteria_count
+                still_needed = max(0, minimum_criteria_count - met_count)
+            
             return {
                 "met_criteria": met_criteria,
                 "unmet_criteria": unmet_criteria,
                 "unknown_criteria": [c.get("criterion_id") for c in unknown_criteria],
                 "met_count": met_count,
                 "minimum_required": minimum_criteria_count,
-                "criteria_met": met_count >= minimum_criteria_count,
+                "criteria_met": criteria_met,
+                "criteria_reachable": bounds.reachable if bounds is not None else True,
+                "criteria_still_needed": still_needed,
                 "progress_percentage": (met_count / minimum_criteria_count * 100) if minimum_criteria_count > 0 else 0
             }
             
@@ -163,6 +438,8 @@ class DSMCriteriaEngine:
                 "met_count": 0,
                 "minimum_required": 0,
                 "criteria_met": False,
+                "criteria_reachable": True,
+                "criteria_still_needed": 0,
                 "progress_percentage": 0
             }
     
@@ -182,6 +459,14 @@ class DSMCriteriaEngine:
             Tuple of (diagnosis_possible, reason)
         """
         try:
+            bounds = self.get_bounds(dsm_criteria, criteria_status)
+            if bounds is not None:
+                if bounds.satisfied:
+                    return True, f"Diagnosis possible: {bounds.met} criteria met"
+                if not bounds.reachable:
+                    return False, f"Diagnosis not possible: {bounds.unmet} criteria not met"
+                return False, f"Diagnosis not yet possible: at least {bounds.needed} more criteria needed"
+            
             criteria_type = dsm_criteria.get("criteria_type", "symptom_count")
             minimum_criteria_count = dsm_criteria.get("minimum_criteria_count", 5)
             
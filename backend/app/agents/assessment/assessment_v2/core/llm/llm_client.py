@@ -13,15 +13,15 @@ A clean, robust LLM wrapper that provides:
 Usage:
     llm = LLMWrapper()
     response = llm.generate_response(prompt, system_prompt)
+    response = await llm.generate_response_async(prompt, system_prompt)
     data = llm.extract_structured_data(text, schema)
 """
 
 import os
 import time
+import asyncio
 import json
 import logging
-import hashlib
-import requests
 from typing import Dict, Any, Optional, List, Union
 from dataclasses import dataclass
 from datetime import datetime
@@ -29,6 +29,10 @@ import re
 from pathlib import Path
 from dotenv import load_dotenv
 
+from app.core.llm_cache import get_response_cache
+from app.core.llm_client import LLMClient, get_shared_client
+from app.core.llm_provider import DEFAULT_BASE_URL, LLMProvider, get_endpoint_provider
+
 # Load environment variables
 env_path = Path(__file__).parent.parent.parent.parent.parent.parent / ".env"
 load_dotenv(env_path)
@@ -63,112 +67,14 @@ class LLMResponse:
     cached: bool = False
 
 
-class ResponseCache:
-    """Simple in-memory response cache with TTL"""
-    
-    def __init__(self, max_size: int = 100, ttl_seconds: int = 1800):
-        self.max_size = max_size
-        self.ttl_seconds = ttl_seconds
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self.access_times: Dict[str, float] = {}
-    
-    def _generate_key(self, prompt: str, system_prompt: str, **kwargs) -> str:
-        """Generate cache key from prompt and parameters"""
-        key_data = f"{prompt}:{system_prompt}:{json.dumps(kwargs, sort_keys=True)}"
-        return hashlib.md5(key_data.encode()).hexdigest()
-    
-    def get(self, key: str) -> Optional[str]:
-        """Get cached response if valid"""
-        if key not in self.cache:
-            return None
-        
-        if time.time() - self.access_times[key] > self.ttl_seconds:
-            del self.cache[key]
-            del self.access_times[key]
-            return None
-        
-        return self.cache[key]["content"]
-    
-    def set(self, key: str, content: str, metadata: Dict[str, Any] = None):
-        """Cache response with metadata"""
-        if len(self.cache) >= self.max_size:
-            # Remove oldest entry
-            oldest_key = min(self.access_times, key=self.access_times.get)
-            del self.cache[oldest_key]
-            del self.access_times[oldest_key]
-        
-        self.cache[key] = {
-            "content": content,
-            "metadata": metadata or {},
-            "cached_at": time.time()
-        }
-        self.access_times[key] = time.time()
-
-
-class CircuitBreaker:
-    """Circuit breaker for API calls"""
-    
-    def __init__(self, failure_threshold: int = 5, recovery_timeout: int = 60):
-        self.failure_threshold = failure_threshold
-        self.recovery_timeout = recovery_timeout
-        self.failure_count = 0
-        self.last_failure_time = None
-        self.state = "CLOSED"  # CLOSED, OPEN, HALF_OPEN
-    
-    def call(self, func, *args, **kwargs):
-        """Execute function with circuit breaker protection"""
-        if self.state == "OPEN":
-            if time.time() - self.last_failure_time > self.recovery_timeout:
-                self.state = "HALF_OPEN"
-            else:
-                raise Exception("Circuit breaker is OPEN - API temporarily unavailable")
-        
-        try:
-            result = func(*args, **kwargs)
-            if self.state == "HALF_OPEN":
-                self.state = "CLOSED"
-                self.failure_count = 0
-            return result
-        except Exception as e:
-            self.failure_count += 1
-            self.last_failure_time = time.time()
-            if self.failure_count >= self.failure_threshold:
-                self.state = "OPEN"
-            raise e
-
-
-class RateLimiter:
-    """Simple rate limiter"""
-    
-    def __init__(self, max_requests_per_minute: int = 20):
-        self.max_requests = max_requests_per_minute
-        self.requests = []
-    
-    def acquire(self):
-        """Acquire rate limit slot"""
-        now = time.time()
-        # Remove requests older than 1 minute
-        self.requests = [req_time for req_time in self.requests if now - req_time < 60]
-        
-        if len(self.requests) >= self.max_requests:
-            # Wait until we can make a request
-            sleep_time = 60 - (now - self.requests[0]) + 0.1
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-                self.requests = []
-        
-        self.requests.append(now)
-
-
 class LLMWrapper:
     """
     General LLM wrapper providing clean, robust API access
     
     Features:
     - Automatic retry with exponential backoff
-    - Circuit breaker for fault tolerance
-    - Response caching for efficiency
-    - Rate limiting to respect API limits
+    - Circuit breaker, rate limiting and caching shared with every other
+      LLM caller through the core LLMClient and provider layer
     - Clean response parsing
     - Comprehensive error handling
     """
@@ -176,9 +82,8 @@ class LLMWrapper:
     def __init__(self, config: Optional[LLMConfig] = None):
         """Initialize LLM wrapper with configuration"""
         self.config = config or self._load_config()
-        self.cache = ResponseCache(ttl_seconds=self.config.cache_ttl) if self.config.enable_cache else None
-        self.circuit_breaker = CircuitBreaker()
-        self.rate_limiter = RateLimiter(self.config.rate_limit_per_minute)
+        self.cache = get_response_cache() if self.config.enable_cache else None
+        self._client: Optional[LLMClient] = None
         
         # Metrics
         self.request_count = 0
@@ -202,49 +107,38 @@ class LLMWrapper:
             rate_limit_per_minute=int(os.getenv("GROQ_RATE_LIMIT", "20"))
         )
     
-    def _make_api_call(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
-        """Make API call to LLM service with improved error handling"""
-        if not self.config.api_key:
-            raise ValueError("API key not configured - set GROQ_API_KEY environment variable")
-        
-        headers = {
-            "Authorization": f"Bearer {self.config.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": self.config.model,
-            "messages": messages,
-            "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
-            "temperature": kwargs.get("temperature", self.config.temperature),
-            **{k: v for k, v in kwargs.items() if k not in ["max_tokens", "temperature"]}
-        }
+    def _provider(self) -> Optional[LLMProvider]:
+        """
+        Backend for the configured endpoint.
         
-        try:
-            response = requests.post(
-                f"{self.config.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=self.config.timeout
-            )
-            
-            if response.status_code == 401:
-                raise ValueError("Invalid API key - check GROQ_API_KEY environment variable")
-            elif response.status_code == 429:
-                raise Exception("Rate limit exceeded - too many requests")
-            elif response.status_code == 500:
-                raise Exception("Server error - Groq API is experiencing issues")
-            elif response.status_code != 200:
-                raise Exception(f"API error {response.status_code}: {response.text}")
-            
-            return response.json()
-            
-        except requests.exceptions.Timeout:
-            raise Exception(f"Request timeout after {self.config.timeout} seconds")
-        except requests.exceptions.ConnectionError:
-            raise Exception("Network connection error - check internet connection")
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Request failed: {str(e)}")
+        The endpoint from the environment (GROQ_BASE_URL / GROQ_API_KEY) is the
+        process-wide LLM_PROVIDER backend; a config naming another base_url or
+        api_key gets its own OpenAI-compatible provider for that endpoint.
+        """
+        env_base_url = os.getenv("GROQ_BASE_URL", DEFAULT_BASE_URL).rstrip("/")
+        env_api_key = os.getenv("GROQ_API_KEY", "")
+        base_url = (self.config.base_url or env_base_url).rstrip("/")
+        api_key = self.config.api_key or env_api_key
+        if base_url == env_base_url and api_key == env_api_key:
+            return None
+        return get_endpoint_provider(base_url, api_key)
+    
+    @property
+    def client(self) -> LLMClient:
+        """Shared core client (created on first use so construction stays offline)"""
+        if self._client is None:
+            self._client = get_shared_client(model=self.config.model, provider=self._provider())
+        return self._client
+    
+    def _make_api_call(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+        """Run one completion through the shared client's budget and circuit breaker"""
+        return self.client.complete(
+            messages,
+            max_tokens=kwargs.pop("max_tokens", self.config.max_tokens),
+            temperature=kwargs.pop("temperature", self.config.temperature),
+            timeout=self.config.timeout,
+            **kwargs
+        )
     
     def _clean_response(self, content: str) -> str:
         """Clean and normalize LLM response"""
@@ -290,6 +184,69 @@ class LLMWrapper:
         
         return content
     
+    def _prepare_request(
+        self,
+        prompt: str,
+        system_prompt: str,
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        use_cache: bool,
+        start_time: float
+    ):
+        """Build messages and check the shared cache; returns (messages, max_tokens, temperature, cache_key, cached)"""
+        self.request_count += 1
+        
+        if max_tokens is None:
+            max_tokens = self.config.max_tokens
+        if temperature is None:
+            temperature = self.config.temperature
+        
+        # Prepare messages
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        # Check the shared cache first (deterministic calls only)
+        cache_key = None
+        if use_cache and self.cache and self.cache.is_cacheable(temperature):
+            cache_key = self.cache.make_key(
+                self.config.model, messages,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            cached_response = self.cache.get(cache_key)
+            if cached_response:
+                self.cache_hits += 1
+                return messages, max_tokens, temperature, cache_key, LLMResponse(
+                    content=cached_response,
+                    success=True,
+                    response_time=time.time() - start_time,
+                    cached=True
+                )
+        
+        return messages, max_tokens, temperature, cache_key, None
+    
+    def _success_response(self, result: Dict[str, Any], cache_key: Optional[str], start_time: float) -> LLMResponse:
+        """Clean, cache and record a successful completion"""
+        content = result["choices"][0]["message"]["content"]
+        content = self._clean_response(content)
+        
+        # Cache successful response
+        if cache_key:
+            self.cache.set(cache_key, content)
+        
+        self.success_count += 1
+        response_time = time.time() - start_time
+        self.total_response_time += response_time
+        
+        return LLMResponse(
+            content=content,
+            success=True,
+            tokens_used=result.get("usage", {}).get("total_tokens"),
+            response_time=response_time
+        )
+    
     def generate_response(
         self,
         prompt: str,
@@ -312,71 +269,21 @@ class LLMWrapper:
             LLMResponse with content and metadata
         """
         start_time = time.time()
-        self.request_count += 1
-        
-        # Check cache first
-        if use_cache and self.cache:
-            cache_key = self.cache._generate_key(
-                prompt, system_prompt,
-                max_tokens=max_tokens or self.config.max_tokens,
-                temperature=temperature or self.config.temperature
-            )
-            cached_response = self.cache.get(cache_key)
-            if cached_response:
-                self.cache_hits += 1
-                return LLMResponse(
-                    content=cached_response,
-                    success=True,
-                    response_time=time.time() - start_time,
-                    cached=True
-                )
-        
-        # Prepare messages
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
+        messages, max_tokens, temperature, cache_key, cached = self._prepare_request(
+            prompt, system_prompt, max_tokens, temperature, use_cache, start_time
+        )
+        if cached:
+            return cached
         
         # Make API call with retries
         for attempt in range(self.config.max_retries):
             try:
-                # Rate limiting
-                self.rate_limiter.acquire()
-                
-                # Circuit breaker protection
-                result = self.circuit_breaker.call(
-                    self._make_api_call,
+                result = self._make_api_call(
                     messages,
                     max_tokens=max_tokens,
                     temperature=temperature
                 )
-                
-                # Extract content
-                content = result["choices"][0]["message"]["content"]
-                content = self._clean_response(content)
-                
-                # Cache successful response
-                if use_cache and self.cache:
-                    cache_key = self.cache._generate_key(
-                        prompt, system_prompt,
-                        max_tokens=max_tokens or self.config.max_tokens,
-                        temperature=temperature or self.config.temperature
-                    )
-                    self.cache.set(cache_key, content, {
-                        "tokens_used": result.get("usage", {}).get("total_tokens"),
-                        "model": self.config.model
-                    })
-                
-                self.success_count += 1
-                response_time = time.time() - start_time
-                self.total_response_time += response_time
-                
-                return LLMResponse(
-                    content=content,
-                    success=True,
-                    tokens_used=result.get("usage", {}).get("total_tokens"),
-                    response_time=response_time
-                )
+                return self._success_response(result, cache_key, start_time)
                 
             except Exception as e:
                 logger.warning(f"LLM API call attempt {attempt + 1} failed: {e}")
@@ -400,6 +307,52 @@ class LLMWrapper:
             response_time=time.time() - start_time
         )
     
+    async def generate_response_async(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        use_cache: bool = True
+    ) -> LLMResponse:
+        """Async counterpart of generate_response (does not block the event loop)"""
+        start_time = time.time()
+        messages, max_tokens, temperature, cache_key, cached = self._prepare_request(
+            prompt, system_prompt, max_tokens, temperature, use_cache, start_time
+        )
+        if cached:
+            return cached
+        
+        for attempt in range(self.config.max_retries):
+            try:
+                result = await self.client.complete_async(
+                    messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=self.config.timeout
+                )
+                return self._success_response(result, cache_key, start_time)
+                
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"LLM API call attempt {attempt + 1} failed: {e}")
+                if attempt == self.config.max_retries - 1:
+                    return LLMResponse(
+                        content="",
+                        success=False,
+                        error=str(e),
+                        response_time=time.time() - start_time
+                    )
+                await asyncio.sleep(self.config.retry_delay)
+        
+        return LLMResponse(
+            content="",
+            success=False,
+            error="All retry attempts failed",
+            response_time=time.time() - start_time
+        )
+    
     def extract_structured_data(
         self,
         text: str,
@@ -513,7 +466,7 @@ Extract the {field_name} and return ONLY the JSON object:"""
             "cache_hits": self.cache_hits,
             "cache_hit_rate": (self.cache_hits / self.request_count) if self.request_count > 0 else 0,
             "avg_response_time": (self.total_response_time / self.success_count) if self.success_count > 0 else 0,
-            "circuit_breaker_state": self.circuit_breaker.state,
+            "circuit_breaker_state": self._client.circuit_breaker.state if self._client else "CLOSED",
             "cache_enabled": self.cache is not None
         }
     
@@ -12,7 +12,7 @@ from ..base_types import SCIDQuestion, ProcessedResponse, ResponseType
 # Path: assessment_v2/core/llm_response_parser.py -> app/agents/llm_client.py
 try:
     # Try direct import first (if running from backend directory)
-    from app.agents.llm_client import LLMClient
+    from app.agents.llm_client import LLMClient, get_shared_client
 except ImportError:
     # Fallback: Add parent directory to path and import
     import sys
@@ -22,7 +22,7 @@ except ImportError:
     agents_path = Path(__file__).parent.parent.parent.parent
     if str(agents_path) not in sys.path:
         sys.path.insert(0, str(agents_path))
-    from app.agents.llm_client import LLMClient
+    from app.agents.llm_client import LLMClient, get_shared_client
 
 logger = logging.getLogger(__name__)
 
@@ -35,9 +35,9 @@ class LLMResponseParser:
         Initialize LLM response parser.
         
         Args:
-            llm_client: LLM client instance (if None, creates new one)
+            llm_client: LLM client instance (if None, uses the shared client)
         """
-        self.llm_client = llm_client or LLMClient(enable_cache=True)
+        self.llm_client = llm_client or get_shared_client()
         self.system_prompt = self._get_system_prompt()
     
     def _get_system_prompt(self) -> str:
@@ -81,18 +81,53 @@ Return ONLY valid JSON - no additional text, no markdown code blocks, just the J
             ProcessedResponse with extracted information
         """
         try:
-            # Build comprehensive, data-driven prompt for LLM
-            prompt = self._build_parsing_prompt(
-                user_response=user_response,
-                question=question,
-                conversation_history=conversation_history,
-                dsm_criteria_context=dsm_criteria_context,
-                module=module
+            response_text = self.llm_client.generate(
+                **self._build_parse_request(user_response, question, conversation_history, dsm_criteria_context, module)
             )
-            
-            # Call LLM with lower temperature for more consistent results
-            # Use a more focused system prompt for this specific task
-            focused_system_prompt = """You are a data extraction assistant for psychiatric assessments.
+            return self._to_processed_response(response_text, user_response, question)
+        except Exception as e:
+            logger.error(f"Error parsing response with LLM: {e}")
+            return self._llm_error_response(e, user_response, question)
+    
+    async def parse_response_async(
+        self,
+        user_response: str,
+        question: SCIDQuestion,
+        conversation_history: List[Dict[str, str]],
+        dsm_criteria_context: Optional[Dict[str, Any]] = None,
+        module: Optional[Any] = None  # SCIDModule type
+    ) -> ProcessedResponse:
+        """Async counterpart of parse_response (does not block the event loop)"""
+        try:
+            response_text = await self.llm_client.generate_async(
+                **self._build_parse_request(user_response, question, conversation_history, dsm_criteria_context, module)
+            )
+            return self._to_processed_response(response_text, user_response, question)
+        except Exception as e:
+            logger.error(f"Error parsing response with LLM: {e}")
+            return self._llm_error_response(e, user_response, question)
+    
+    def _build_parse_request(
+        self,
+        user_response: str,
+        question: SCIDQuestion,
+        conversation_history: List[Dict[str, str]],
+        dsm_criteria_context: Optional[Dict[str, Any]],
+        module: Optional[Any]
+    ) -> Dict[str, Any]:
+        """Keyword arguments for the parsing LLM call"""
+        # Build comprehensive, data-driven prompt for LLM
+        prompt = self._build_parsing_prompt(
+            user_response=user_response,
+            question=question,
+            conversation_history=conversation_history,
+            dsm_criteria_context=dsm_criteria_context,
+            module=module
+        )
+        
+        # Call LLM with lower temperature for more consistent results
+        # Use a more focused system prompt for this specific task
+        focused_system_prompt = """You are a data extraction assistant for psychiatric assessments.
 Your task is to extract structured information from user responses.
 - Return ONLY valid JSON
 - Match responses to the exact options provided
@@ -100,166 +135,168 @@ Your task is to extract structured information from user responses.
 - For multiple choice: return the EXACT option text
 - Do NOT return values from previous questions
 - Be precise and conservative"""
-            
-            response_text = self.llm_client.generate(
-                prompt=prompt,
-                system_prompt=focused_system_prompt,
-                max_tokens=500,  # Reduced for faster, more focused responses
-                temperature=0.1  # Very low temperature for consistent parsing
-            )
-            
-            # Parse JSON response
-            parsed_data = self._parse_json_response(response_text)
-            parsed_data = self._normalize_parsed_strings(parsed_data)
-            
-            # Validate against schema (optional but recommended)
-            try:
-                from .response_schemas import get_yes_no_schema, validate_response_schema
-                if question.response_type == ResponseType.YES_NO:
-                    schema = get_yes_no_schema()
-                    is_valid, error_msg = validate_response_schema(parsed_data, schema)
-                    if not is_valid:
-                        logger.warning(f"Schema validation failed: {error_msg}, but continuing with parsed data")
-            except ImportError:
-                # Schema validation optional
-                pass
-            except Exception as e:
-                logger.debug(f"Schema validation error (non-critical): {e}")
-            
-            # Get selected_option from parsed data
-            selected_option = parsed_data.get("selected_option")
-            
-            # Normalize to lowercase for all text responses (for consistent storage and comparison)
-            if selected_option is not None:
-                if isinstance(selected_option, str):
-                    selected_option = selected_option.strip()
-                else:
-                    selected_option = str(selected_option).strip().lower()
-            
-            if selected_option is not None:
-                # For yes/no questions: normalize to lowercase and validate
-                if question.response_type == ResponseType.YES_NO:
-                    # Direct matches
-                    if selected_option in ["yes", "no", "sometimes"]:
-                        pass
-                    # Short forms
-                    elif selected_option in ["y", "yeah", "yep", "sure", "true", "1"]:
-                        selected_option = "yes"
-                    elif selected_option in ["n", "nope", "nah", "never", "false", "0"]:
-                        selected_option = "no"
-                    # Keyword matching
-                    elif isinstance(selected_option, str) and ("no" in selected_option or "not" in selected_option):
-                        selected_option = "no"
-                    elif isinstance(selected_option, str) and "yes" in selected_option:
-                        selected_option = "yes"
-                    else:
-                        # Try to infer from extracted fields if None
-                        extracted_fields = parsed_data.get("extracted_fields", {})
-                        if extracted_fields.get("negation_detected") is True:
-                            selected_option = "no"
-                        else:
-                            selected_option = None
-                
-                # For MCQ: normalize option text to lowercase for comparison (but keep original for display)
-                elif question.response_type == ResponseType.MULTIPLE_CHOICE:
-                    # Keep original case for MCQ options (they should match exactly)
-                    # But normalize for internal comparison
-                    if question.options:
-                        matched_option = False
-                        if isinstance(selected_option, str) and selected_option.isdigit():
-                            option_index = int(selected_option) - 1
-                            if 0 <= option_index < len(question.options):
-                                selected_option = question.options[option_index]
-                                matched_option = True
-                        if not matched_option:
-                            selected_lower = str(selected_option).lower()
-                            # Try to find case-insensitive match
-                            for opt in question.options:
-                                if opt.lower() == selected_lower:
-                                    selected_option = opt  # Use exact option text
-                                    matched_option = True
-                                    break
-                        if not matched_option:
-                            # No match found, keep as-is (will be validated later)
-                            pass
-                
-                # For TEXT: normalize to lowercase for consistent storage
-                elif question.response_type == ResponseType.TEXT:
-                    selected_option = selected_option.lower()
-            
-            # Handle None for yes/no - try to infer from user response
-            elif question.response_type == ResponseType.YES_NO:
-                extracted_fields = parsed_data.get("extracted_fields", {})
-                reasoning = parsed_data.get("reasoning", "").lower()
-                user_lower = user_response.lower().strip() if user_response else ""
-                
-                if extracted_fields.get("negation_detected") is True:
-                    selected_option = "no"
-                elif "no" in reasoning or "negative" in reasoning or "not" in reasoning:
-                    selected_option = "no"
-                elif "yes" in reasoning or "positive" in reasoning:
+        
+        return {
+            "prompt": prompt,
+            "system_prompt": focused_system_prompt,
+            "max_tokens": 500,  # Reduced for faster, more focused responses
+            "temperature": 0.1  # Very low temperature for consistent parsing
+        }
+    
+    def _to_processed_response(self, response_text: str, user_response: str, question: SCIDQuestion) -> ProcessedResponse:
+        """Turn the raw LLM output into a normalized ProcessedResponse"""
+        # Parse JSON response
+        parsed_data = self._parse_json_response(response_text)
+        parsed_data = self._normalize_parsed_strings(parsed_data)
+        
+        # Validate against schema (optional but recommended)
+        try:
+            from .response_schemas import get_yes_no_schema, validate_response_schema
+            if question.response_type == ResponseType.YES_NO:
+                schema = get_yes_no_schema()
+                is_valid, error_msg = validate_response_schema(parsed_data, schema)
+                if not is_valid:
+                    logger.warning(f"Schema validation failed: {error_msg}, but continuing with parsed data")
+        except ImportError:
+            # Schema validation optional
+            pass
+        except Exception as e:
+            logger.debug(f"Schema validation error (non-critical): {e}")
+        
+        # Get selected_option from parsed data
+        selected_option = parsed_data.get("selected_option")
+        
+        # Normalize to lowercase for all text responses (for consistent storage and comparison)
+        if selected_option is not None:
+            if isinstance(selected_option, str):
+                selected_option = selected_option.strip()
+            else:
+                selected_option = str(selected_option).strip().lower()
+        
+        if selected_option is not None:
+            # For yes/no questions: normalize to lowercase and validate
+            if question.response_type == ResponseType.YES_NO:
+                # Direct matches
+                if selected_option in ["yes", "no", "sometimes"]:
+                    pass
+                # Short forms
+                elif selected_option in ["y", "yeah", "yep", "sure", "true", "1"]:
                     selected_option = "yes"
-                elif user_lower in ["no", "nope", "never", "not", "n"] or user_lower.startswith("no "):
+                elif selected_option in ["n", "nope", "nah", "never", "false", "0"]:
                     selected_option = "no"
-                elif user_lower in ["yes", "yeah", "yep", "y"] or user_lower.startswith("yes "):
+                # Keyword matching
+                elif isinstance(selected_option, str) and ("no" in selected_option or "not" in selected_option):
+                    selected_option = "no"
+                elif isinstance(selected_option, str) and "yes" in selected_option:
                     selected_option = "yes"
+                else:
+                    # Try to infer from extracted fields if None
+                    extracted_fields = parsed_data.get("extracted_fields", {})
+                    if extracted_fields.get("negation_detected") is True:
+                        selected_option = "no"
+                    else:
+                        selected_option = None
             
-            # Final normalization: ensure lowercase for yes/no and text (for consistent storage/comparison)
-            if selected_option is not None:
-                if question.response_type == ResponseType.YES_NO:
-                    selected_option = str(selected_option).lower().strip()
-                    # Ensure it's a valid yes/no value
-                    if selected_option not in ["yes", "no", "sometimes"]:
-                        if "no" in selected_option or "not" in selected_option:
-                            selected_option = "no"
-                        elif "yes" in selected_option:
-                            selected_option = "yes"
-                        else:
-                            selected_option = None
-                elif question.response_type == ResponseType.TEXT:
-                    selected_option = str(selected_option).lower().strip()
-            
-            # Create ProcessedResponse
-            processed_response = ProcessedResponse(
-                selected_option=selected_option,  # Already normalized to lowercase
-                extracted_fields=parsed_data.get("extracted_fields", {}),
-                confidence=parsed_data.get("confidence", 1.0),
-                dsm_criteria_mapping=parsed_data.get("dsm_criteria_mapping", {}),
-                next_question_hint=parsed_data.get("next_question_hint"),
-                free_text_analysis=parsed_data.get("free_text_analysis", {}),
-                validation=parsed_data.get("validation", {}),
-                raw_response=user_response
-            )
-            
-            return processed_response
+            # For MCQ: normalize option text to lowercase for comparison (but keep original for display)
+            elif question.response_type == ResponseType.MULTIPLE_CHOICE:
+                # Keep original case for MCQ options (they should match exactly)
+                # But normalize for internal comparison
+                if question.options:
+                    matched_option = False
+                    if isinstance(selected_option, str) and selected_option.isdigit():
+                        option_index = int(selected_option) - 1
+                        if 0 <= option_index < len(question.options):
+                            selected_option = question.options[option_index]
+                            matched_option = True
+                    if not matched_option:
+                        selected_lower = str(selected_option).lower()
+                        # Try to find case-insensitive match
+                        for opt in question.options:
+                            if opt.lower() == selected_lower:
+                                selected_option = opt  # Use exact option text
+                                matched_option = True
+                                break
+                    if not matched_option:
+                        # No match found, keep as-is (will be validated later)
+                        pass
             
-        except Exception as e:
-            logger.error(f"Error parsing response with LLM: {e}")
-            # Try to infer from user response as fallback
-            selected_option = None
-            if question.response_type == ResponseType.YES_NO and user_response:
-                user_lower = user_response.lower().strip()
-                if user_lower in ["no", "nope", "never", "not", "n"] or user_lower.startswith("no "):
-                    selected_option = "no"
-                elif user_lower in ["yes", "yeah", "yep", "y"] or user_lower.startswith("yes "):
-                    selected_option = "yes"
+            # For TEXT: normalize to lowercase for consistent storage
+            elif question.response_type == ResponseType.TEXT:
+                selected_option = selected_option.lower()
+        
+        # Handle None for yes/no - try to infer from user response
+        elif question.response_type == ResponseType.YES_NO:
+            extracted_fields = parsed_data.get("extracted_fields", {})
+            reasoning = parsed_data.get("reasoning", "").lower()
+            user_lower = user_response.lower().strip() if user_response else ""
             
-            # Return fallback response (already normalized)
-            fallback_free_text = self._normalize_parsed_strings({"error": str(e)})
-            fallback_validation = self._normalize_parsed_strings({
-                "is_valid": True,
-                "needs_clarification": True,
-                "suggested_clarification": "could you provide more details?"
-            })
-            return ProcessedResponse(
-                selected_option=selected_option,  # Already lowercase if set
-                extracted_fields={},
-                confidence=0.5,
-                dsm_criteria_mapping={},
-                free_text_analysis=fallback_free_text,
-                validation=fallback_validation,
-                raw_response=user_response
-            )
+            if extracted_fields.get("negation_detected") is True:
+                selected_option = "no"
+            elif "no" in reasoning or "negative" in reasoning or "not" in reasoning:
+                selected_option = "no"
+            elif "yes" in reasoning or "positive" in reasoning:
+                selected_option = "yes"
+            elif user_lower in ["no", "nope", "never", "not", "n"] or user_lower.startswith("no "):
+                selected_option = "no"
+            elif user_lower in ["yes", "yeah", "yep", "y"] or user_lower.startswith("yes "):
+                selected_option = "yes"
+        
+        # Final normalization: ensure lowercase for yes/no and text (for consistent storage/comparison)
+        if selected_option is not None:
+            if question.response_type == ResponseType.YES_NO:
+                selected_option = str(selected_option).lower().strip()
+                # Ensure it's a valid yes/no value
+                if selected_option not in ["yes", "no", "sometimes"]:
+                    if "no" in selected_option or "not" in selected_option:
+                        selected_option = "no"
+                    elif "yes" in selected_option:
+                        selected_option = "yes"
+                    else:
+                        selected_option = None
+            elif question.response_type == ResponseType.TEXT:
+                selected_option = str(selected_option).lower().strip()
+        
+        # Create ProcessedResponse
+        processed_response = ProcessedResponse(
+            selected_option=selected_option,  # Already normalized to lowercase
+            extracted_fields=parsed_data.get("extracted_fields", {}),
+            confidence=parsed_data.get("confidence", 1.0),
+            dsm_criteria_mapping=parsed_data.get("dsm_criteria_mapping", {}),
+            next_question_hint=parsed_data.get("next_question_hint"),
+            free_text_analysis=parsed_data.get("free_text_analysis", {}),
+            validation=parsed_data.get("validation", {}),
+            raw_response=user_response
+        )
+        
+        return processed_response
+    
+    def _llm_error_response(self, error: Exception, user_response: str, question: SCIDQuestion) -> ProcessedResponse:
+        """Fallback ProcessedResponse when the LLM call or its output fails"""
+        # Try to infer from user response as fallback
+        selected_option = None
+        if question.response_type == ResponseType.YES_NO and user_response:
+            user_lower = user_response.lower().strip()
+            if user_lower in ["no", "nope", "never", "not", "n"] or user_lower.startswith("no "):
+                selected_option = "no"
+            elif user_lower in ["yes", "yeah", "yep", "y"] or user_lower.startswith("yes "):
+                selected_option = "yes"
+        
+        # Return fallback response (already normalized)
+        fallback_free_text = self._normalize_parsed_strings({"error": str(error)})
+        fallback_validation = self._normalize_parsed_strings({
+            "is_valid": True,
+            "needs_clarification": True,
+            "suggested_clarification": "could you provide more details?"
+        })
+        return ProcessedResponse(
+            selected_option=selected_option,  # Already lowercase if set
+            extracted_fields={},
+            confidence=0.5,
+            dsm_criteria_mapping={},
+            free_text_analysis=fallback_free_text,
+            validation=fallback_validation,
+            raw_response=user_response
+        )
     
     def _build_parsing_prompt(
         self,
@@ -0,0 +1,418 @@
+"""
+Shared SCID module catalog for SCID-CV V2
+Module definitions are built once, serialized to a versioned, signed file
+and unpickled per module on first use
+"""
+
+import hashlib
+import hmac
+import logging
+import mmap
+import os
+import pickle
+import secrets
+import stat
+import struct
+import threading
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ..base_types import SCIDModule
+
+logger = logging.getLogger(__name__)
+
+# Bump when the file layout or SCIDModule pickling changes incompatibly
+CATALOG_FORMAT = 2
+
+_MAGIC = b"SCIDCAT\x00"
+_HEADER = struct.Struct("<8sQ32s")  # magic, index length, index HMAC
+_ASSESSMENT_V2_DIR = Path(__file__).resolve().parent.parent
+
+
+def _source_files() -> List[Path]:
+    """Files whose content defines the catalog"""
+    files = [_ASSESSMENT_V2_DIR / "base_types.py", _ASSESSMENT_V2_DIR / "resources" / "dsm_criteria.json"]
+    files.extend(sorted((_ASSESSMENT_V2_DIR / "modules").rglob("*.py")))
+    return [f for f in files if f.exists()]
+
+
+def catalog_version() -> str:
+    """Content hash of the module definitions (changes whenever a module does)"""
+    digest = hashlib.sha256(f"format={CATALOG_FORMAT}".encode())
+    for path in _source_files():
+        digest.update(str(path.relative_to(_ASSESSMENT_V2_DIR)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _signing_key() -> bytes:
+    """
+    Key the catalog file is signed with, derived from SECRET_KEY.
+
+    Nothing is unpickled from the file unless its signature checks out. Without
+    settings the key is random, so the file is only trusted by its own process.
+    """
+    try:
+        from app.core.config import settings
+        secret = settings.SECRET_KEY.encode()
+    except Exception as e:
+        logger.warning(f"SCID catalog signed with a per-process key, settings unavailable: {e}")
+        secret = secrets.token_bytes(32)
+    return hmac.new(secret, b"mindmate-scid-module-catalog", hashlib.sha256).digest()
+
+
+def _sign(key: bytes, data) -> bytes:
+    return hmac.new(key, data, hashlib.sha256).digest()
+
+
+def _default_dir() -> Path:
+    """App-owned cache directory (never a shared temp directory)"""
+    base = os.environ.get("SCID_CATALOG_DIR")
+    if base:
+        return Path(base)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "mindmate"
+
+
+def _default_path(version: str) -> Path:
+    return _default_dir() / f"scid_catalog_{version}.bin"
+
+
+def _is_private(path: Path) -> bool:
+    """Whether a path is owned by this user and not writable by anyone else"""
+    info = path.stat()
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        return False
+    return not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+class ModuleCatalog:
+    """
+    Versioned, lazily materialized catalog of SCID module definitions.
+
+    Once a catalog file exists, every process (and worker) maps it and
+    unpickles a module only when it is first requested. Before that, a
+    request builds just the module asked for, and the full catalog is written
+    to ``scid_catalog_<version>.bin`` in the background for later processes.
+    Materialized modules are shared read-only by all moderators and adapters
+    in the process.
+
+    The file lives in an app-owned directory that must belong to this user,
+    and its index and every module are HMAC-signed with a key derived from
+    SECRET_KEY; a file that fails either check is ignored and rebuilt.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        version: Optional[str] = None,
+        key: Optional[bytes] = None,
+        publish: bool = True,
+    ):
+        self.version = version or catalog_version()
+        self.path = Path(path) if path else _default_path(self.version)
+        self.publish = publish
+        self._key = key or _signing_key()
+        self._lock = threading.Lock()
+        self._buffer: Optional[Any] = None  # mmap of the catalog file, or bytes if it could not be written
+        self._index: Dict[str, Any] = {}
+        self._data_start = 0
+        self._checked_file = False
+        self._factories: Optional[Dict[str, str]] = None
+        self._modules: Dict[str, SCIDModule] = {}
+        self._publisher: Optional[threading.Thread] = None
+        self.builds = 0
+        self.materialized = 0
+        self.open_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # File handling
+    # ------------------------------------------------------------------
+
+    def _ensure_open(self) -> bool:
+        """Map the catalog file if a valid one exists (checked once)"""
+        if self._buffer is not None or self._checked_file:
+            return self._buffer is not None
+        with self._lock:
+            if self._buffer is None and not self._checked_file:
+                start = time.perf_counter()
+                self._open_file()
+                self._checked_file = True
+                self.open_seconds = time.perf_counter() - start
+        return self._buffer is not None
+
+    def _open_file(self) -> bool:
+        try:
+            if not _is_private(self.path.parent) or not _is_private(self.path):
+                logger.warning(f"Ignoring SCID catalog {self.path}: not private to this user")
+                return False
+            with open(self.path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        try:
+            self._load_buffer(buffer)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable SCID catalog {self.path}: {e}")
+            buffer.close()
+            return False
+        return True
+
+    def _load_buffer(self, buffer):
+        magic, index_len, mac = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC:
+            raise ValueError("bad magic")
+        raw_index = buffer[_HEADER.size:_HEADER.size + index_len]  # a copy, so the mmap can be closed
+        if not hmac.compare_digest(mac, _sign(self._key, raw_index)):
+            raise ValueError("bad signature")
+        index = pickle.loads(raw_index)
+        if index.get("version") != self.version:
+            raise ValueError(f"version {index.get('version')} != {self.version}")
+        self._index = index
+        self._data_start = _HEADER.size + index_len
+        self._buffer = buffer
+
+    def _build(self) -> bytes:
+        """Run every module factory once and serialize the results"""
+        from ..modules import MODULE_REGISTRY
+
+        self.builds += 1
+        blobs: List[bytes] = []
+        offsets: Dict[str, tuple] = {}
+        for module_id, factory in MODULE_REGISTRY.items():
+            module = self._modules.get(module_id)
+            try:
+                module = module or factory()
+            except Exception as e:
+                logger.error(f"Could not build SCID module {module_id} for catalog: {e}", exc_info=True)
+                continue
+            blob = pickle.dumps(module, protocol=pickle.HIGHEST_PROTOCOL)
+            offsets[module_id] = (sum(len(b) for b in blobs), len(blob), _sign(self._key, blob))
+            blobs.append(blob)
+
+        # Module offsets are relative to the end of the index
+        index = pickle.dumps({
+            "version": self.version,
+            "format": CATALOG_FORMAT,
+            "built_at": time.time(),
+            "modules": offsets,
+            "factories": self._factory_ids(),
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+
+        logger.info(f"Built SCID module catalog {self.version}: {len(offsets)} modules")
+        return b"".join([_HEADER.pack(_MAGIC, len(index), _sign(self._key, index)), index, *blobs])
+
+    def _write(self, data: bytes) -> bool:
+        """Atomically publish the catalog file; concurrent builders are harmless"""
+        try:
+            self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if not _is_private(self.path.parent):
+                logger.warning(f"Not writing SCID catalog: {self.path.parent} is not private to this user")
+                return False
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not write SCID catalog to {self.path}: {e}")
+            return False
+
+    def build(self):
+        """Build and write the full catalog file, then serve modules from it"""
+        data = self._build()
+        with self._lock:
+            if self._buffer is not None:
+                return
+            if not self._write(data) or not self._open_file():
+                # Read-only filesystem etc.: keep the serialized catalog in memory
+                self._load_buffer(data)
+
+    def _start_publishing(self):
+        """Write the catalog file in the background after a cold miss"""
+        if not self.publish or self._publisher is not None:
+            return
+        with self._lock:
+            if self._publisher is None:
+                self._publisher = threading.Thread(target=self._publish, name="scid-catalog-build", daemon=True)
+                self._publisher.start()
+
+    def _publish(self):
+        try:
+            self.build()
+        except Exception as e:
+            logger.error(f"Could not publish SCID catalog: {e}", exc_info=True)
+
+    def wait_published(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a background catalog build; True once the catalog is mapped or in memory"""
+        if self._publisher is not None:
+            self._publisher.join(timeout)
+        return self._buffer is not None
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def _factory_ids(self) -> Dict[str, str]:
+        """Factory path -> module ID, from the registry (builds no module)"""
+        if self._factories is None:
+            from ..modules import MODULE_REGISTRY
+
+            self._factories = {
+                f"{factory.__module__}.{factory.__name__}": module_id
+                for module_id, factory in MODULE_REGISTRY.items()
+            }
+        return self._factories
+
+    def module_ids(self) -> List[str]:
+        """IDs of all modules in the catalog (does not materialize any)"""
+        if self._ensure_open():
+            return list(self._index["modules"])
+        return list(self._factory_ids().values())
+
+    def __contains__(self, module_id: str) -> bool:
+        return module_id in self.module_ids()
+
+    def resolve(self, factory_path: str) -> Optional[str]:
+        """Module ID built by a factory path such as ``...mdd.create_mdd_module``"""
+        if self._ensure_open():
+            return self._index["factories"].get(factory_path)
+        return self._factory_ids().get(factory_path)
+
+    def get(self, module_id: str) -> Optional[SCIDModule]:
+        """The shared SCIDModule for an ID, unpickled (or, before the file exists, built) on first use"""
+        module = self._modules.get(module_id)
+        if module is not None:
+            return module
+        if not self._ensure_open():
+            return self._build_one(module_id)
+        entry = self._index["modules"].get(module_id)
+        if entry is None:
+            return None
+        with self._lock:
+            module = self._modules.get(module_id)
+            if module is None:
+                offset, length, mac = entry
+                start = self._data_start + offset
+                blob = memoryview(self._buffer)[start:start + length]
+                if not hmac.compare_digest(mac, _sign(self._key, blob)):
+                    raise ValueError(f"SCID catalog entry {module_id} failed its signature check")
+                module = pickle.loads(blob)
+                self._modules[module_id] = module
+                self.materialized += 1
+        return module
+
+    def _build_one(self, module_id: str) -> Optional[SCIDModule]:
+        """Cold miss: build only the requested module and publish the catalog in the background"""
+        from ..modules import MODULE_REGISTRY
+
+        factory = MODULE_REGISTRY.get(module_id)
+        if factory is None:
+            return None
+        with self._lock:
+            module = self._modules.get(module_id)
+            if module is None:
+                module = factory()
+                self._modules[module_id] = module
+                self.materialized += 1
+        self._start_publishing()
+        return module
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get catalog statistics"""
+        return {
+            "version": self.version,
+            "path": str(self.path),
+            "mapped": isinstance(self._buffer, mmap.mmap),
+            "modules": len(self._index.get("modules", {})),
+            "materialized": self.materialized,
+            "builds": self.builds,
+            "open_seconds": self.open_seconds,
+        }
+
+
+class LazyModules(MutableMapping):
+    """
+    Name -> module mapping whose values are created on first access.
+
+    ``len`` and iteration cover every registered name without loading any.
+    ``name in modules`` loads that one module, so a module that fails to load
+    looks absent, as it did when all modules were loaded eagerly. A loader
+    that fails is logged once and the name is dropped.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._loaded: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Register a loader for a module name"""
+        with self._lock:
+            self._loaders[name] = loader
+            self._loaded.pop(name, None)
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether a module has already been created"""
+        return name in self._loaded
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._loaded:
+            return self._loaded[name]
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            loader = self._loaders[name]
+            try:
+                module = loader()
+            except Exception as e:
+                logger.error(f"Error loading module {name}: {e}", exc_info=True)
+                module = None
+            if module is None:
+                logger.warning(f"Failed to load module: {name}")
+                del self._loaders[name]
+                raise KeyError(name)
+            self._loaded[name] = module
+            return module
+
+    def __setitem__(self, name: str, module: Any):
+        with self._lock:
+            self._loaders[name] = lambda: module
+            self._loaded[name] = module
+
+    def __delitem__(self, name: str):
+        with self._lock:
+            del self._loaders[name]
+            self._loaded.pop(name, None)
+
+    def __contains__(self, name: object) -> bool:
+        if name not in self._loaders:
+            return False
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._loaders))
+
+    def __len__(self) -> int:
+        return len(self._loaders)
+
+
+_catalog: Optional[ModuleCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_module_catalog() -> ModuleCatalog:
+    """Get the process-wide SCID module catalog"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = ModuleCatalog()
+    return _catalog
@@ -0,0 +1,280 @@
+"""
+Module session state store for SCID-CV V2
+Per-module session dicts backed by the shared state store, with compact
+checkpoints into the write-behind session snapshot
+"""
+
+import dataclasses
+import hashlib
+import importlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterator, Optional
+
+from app.agents.core.persistence import get_state_writer, load_state_snapshot
+from app.agents.core.state_store import StateVersionConflict, create_state_store
+
+logger = logging.getLogger(__name__)
+
+
+_V2 = "app.agents.assessment.assessment_v2"
+
+# The only classes rebuilt from a snapshot; anything else decodes to its fields
+_RESTORABLE_TYPES = {
+    f"{_V2}.base_types.ResponseType",
+    f"{_V2}.base_types.Severity",
+    f"{_V2}.base_types.ProcessedResponse",
+    f"{_V2}.base_types.SCIDQuestion",
+    f"{_V2}.base_types.SCIDResponse",
+    f"{_V2}.base_types.ModuleResult",
+    f"{_V2}.types.ModuleStatus",
+    f"{_V2}.types.ModuleResponse",
+    f"{_V2}.types.ModuleProgress",
+    f"{_V2}.core.symptom_database.Symptom",
+}
+
+
+def _class_path(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def register_state_type(cls: type) -> type:
+    """Allow instances of cls to be restored from module state; usable as a class decorator"""
+    _RESTORABLE_TYPES.add(_class_path(cls))
+    return cls
+
+
+def _load_class(path: str) -> Optional[type]:
+    if path not in _RESTORABLE_TYPES:
+        return None
+    module_name, _, name = path.rpartition(".")
+    try:
+        cls = getattr(importlib.import_module(module_name), name)
+    except (ImportError, AttributeError, ValueError):
+        return None
+    return cls if isinstance(cls, type) else None
+
+
+def encode_state(value: Any) -> Any:
+    """
+    JSON-safe copy of module state.
+
+    Datetimes, dates, sets, enums and objects (dataclasses, classes with
+    from_dict/to_dict or plain attributes) survive decode_state with their types.
+    Dicts with "$" keys are wrapped so they never read back as one of these tags.
+    """
+    if isinstance(value, dict):
+        encoded = {str(k): encode_state(v) for k, v in value.items()}
+        if any(k.startswith("$") for k in encoded):
+            return {"$dict": encoded}
+        return encoded
+    if isinstance(value, (list, tuple)):
+        return [encode_state(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, (set, frozenset)):
+        return {"$set": [encode_state(v) for v in value]}
+    if isinstance(value, Enum):
+        return {"$enum": _class_path(type(value)), "$v": encode_state(value.value)}
+    if hasattr(value, "to_dict") and hasattr(type(value), "from_dict"):
+        return {"$obj": _class_path(type(value)), "$v": encode_state(value.to_dict())}
+    if dataclasses.is_dataclass(value):
+        fields = {f.name: getattr(value, f.name) for f in dataclasses.fields(value)}
+        return {"$obj": _class_path(type(value)), "$v": encode_state(fields)}
+    if hasattr(value, "__dict__"):
+        return {"$obj": _class_path(type(value)), "$v": encode_state(vars(value))}
+    return str(value)
+
+
+def _decode_object(path: str, data: Any) -> Any:
+    """Rebuild an object encoded by encode_state; unknown classes stay plain dicts"""
+    fields = decode_state(data)
+    cls = _load_class(path)
+    if cls is None:
+        logger.warning(f"Cannot restore {path} from module state; keeping a dict")
+        return fields
+    if hasattr(cls, "from_dict"):
+        return cls.from_dict(fields)
+    if dataclasses.is_dataclass(cls):
+        init = {f.name: fields[f.name] for f in dataclasses.fields(cls) if f.init and f.name in fields}
+        obj = cls(**init)
+        for name, field_value in fields.items():
+            if name not in init:
+                setattr(obj, name, field_value)
+        return obj
+    obj = cls.__new__(cls)
+    obj.__dict__.update(fields)
+    return obj
+
+
+def decode_state(value: Any) -> Any:
+    """Inverse of encode_state"""
+    if isinstance(value, dict):
+        if len(value) == 2 and "$v" in value:
+            if "$obj" in value:
+                return _decode_object(value["$obj"], value["$v"])
+            if "$enum" in value:
+                cls = _load_class(value["$enum"])
+                enum_value = decode_state(value["$v"])
+                return cls(enum_value) if cls is not None else enum_value
+        if len(value) == 1:
+            if "$dict" in value:
+                return {k: decode_state(v) for k, v in value["$dict"].items()}
+            if "$dt" in value:
+                return datetime.fromisoformat(value["$dt"])
+            if "$date" in value:
+                return date.fromisoformat(value["$date"])
+            if "$set" in value:
+                return {decode_state(v) for v in value["$set"]}
+        return {k: decode_state(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_state(v) for v in value]
+    return value
+
+
+def _digest(data: Any) -> str:
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class ModuleSessionStore(MutableMapping):
+    """
+    session_id -> state dict for one assessment module.
+
+    Live dicts stay in the local LRU/TTL tier of a SessionStateStore (shared
+    through Redis when STATE_STORE_REDIS_URL is set). checkpoint() publishes
+    the current state and queues it for AssessmentSession.state_snapshot
+    under ``module:<name>``; unchanged states are skipped. A session that is
+    not held locally (evicted, restarted, another worker) is reloaded from
+    that snapshot on first access, and entries dropped by LRU/TTL are
+    checkpointed on the way out.
+    """
+
+    def __init__(self, module_name: str):
+        self.module_name = module_name
+        self.field = f"module:{module_name}"
+        self._store = create_state_store(
+            self.field,
+            serialize=encode_state,
+            deserialize=decode_state,
+            on_evict=self._snapshot,
+        )
+        # session_id -> digest of the last checkpointed payload
+        self._digests: "OrderedDict[str, str]" = OrderedDict()
+        self._digest_lock = threading.Lock()
+
+        self.checkpoints = 0
+        self.unchanged = 0
+        self.restores = 0
+
+    # ------------------------------------------------------------------
+    # Mapping API (what modules used on their plain dicts)
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        state = self._store.get(session_id)
+        if state is None:
+            state = self._restore(session_id)
+            if state is None:
+                raise KeyError(session_id)
+        return state
+
+    def __setitem__(self, session_id: str, state: Dict[str, Any]):
+        self._store[session_id] = state
+
+    def __delitem__(self, session_id: str):
+        self._store.delete(session_id)
+        with self._digest_lock:
+            self._digests.pop(session_id, None)
+
+    def __contains__(self, session_id: object) -> bool:
+        try:
+            self[session_id]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.keys())
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def is_cached(self, session_id: str) -> bool:
+        """Whether the session is held locally (no DB round trip needed)"""
+        return self._store.is_cached(session_id)
+
+    # ------------------------------------------------------------------
+    # Checkpoint / resume
+    # ------------------------------------------------------------------
+
+    def checkpoint(self, session_id: str) -> bool:
+        """Persist the session's state if it changed since the last checkpoint"""
+        state = self._store.get(session_id)
+        if state is None:
+            return False
+        data = encode_state(state)
+        digest = _digest(data)
+        with self._digest_lock:
+            if self._digests.get(session_id) == digest:
+                self.unchanged += 1
+                return True
+
+        try:
+            self._store.put(session_id, state)
+        except StateVersionConflict:
+            logger.warning(f"{self.field} state for {session_id} changed on another worker; not checkpointing")
+            return False
+        get_state_writer().schedule(session_id, self.field, data)
+
+        with self._digest_lock:
+            self._digests[session_id] = digest
+            self._digests.move_to_end(session_id)
+            while len(self._digests) > self._store.max_entries:
+                self._digests.popitem(last=False)
+            self.checkpoints += 1
+        return True
+
+    def restore(self, session_id: str) -> bool:
+        """Load the last checkpoint into the local tier"""
+        return self._restore(session_id) is not None
+
+    def _restore(self, session_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = load_state_snapshot(session_id, self.field)
+        except Exception as e:
+            logger.debug(f"No {self.field} checkpoint for {session_id}: {e}")
+            return None
+        if not data:
+            return None
+        state = decode_state(data)
+        self._store[session_id] = state
+        self.restores += 1
+        return state
+
+    def _snapshot(self, session_id: str, state: Dict[str, Any]):
+        """Eviction hook: queue the dropped state so it can be restored later"""
+        data = encode_state(state)
+        with self._digest_lock:
+            unchanged = self._digests.pop(session_id, None) == _digest(data)
+        if not unchanged:
+            get_state_writer().schedule(session_id, self.field, data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        stats = self._store.get_stats()
+        stats.update({
+            "checkpoints": self.checkpoints,
+            "unchanged_checkpoints": self.unchanged,
+            "restores": self.restores,
+        })
+        return stats
@@ -4,15 +4,111 @@ Intelligently routes to next question based on responses and DSM criteria
 """
 
 import logging
-from typing import Dict, List, Any, Optional, Set
+from typing import Dict, List, Any, Optional, Set, Tuple
 from ..base_types import SCIDQuestion, SCIDModule, ProcessedResponse
+from .dsm_criteria_engine import DisorderBounds, get_disorder_rule
 
 logger = logging.getLogger(__name__)
 
+# Options that trigger follow-up questions
+POSITIVE_OPTIONS = ("yes", "sometimes", "option 1", "option 2", "y", "true", "1")
+POSITIVE_KEYWORDS = ("yes", "have", "do", "did", "sometimes", "occasionally", "often")
+NEGATIVE_KEYWORDS = ("no", "never", "none", "not", "don't", "didn't", "haven't")
+LOW_RISK_INDICATORS = ("no", "none", "never", "n", "false", "0", "not")
+
 
 class QuestionRouter:
     """Intelligent question routing system"""
     
+    @staticmethod
+    def is_positive_response(processed_response: ProcessedResponse) -> bool:
+        """Whether a response triggers the question's follow-ups"""
+        selected_option = processed_response.selected_option
+        if selected_option and selected_option.lower() in POSITIVE_OPTIONS:
+            return True
+        
+        # Also check raw response for natural language
+        raw_response = processed_response.raw_response.lower() if processed_response.raw_response else ""
+        if raw_response:
+            # Check for positive keywords without negative keywords
+            has_positive = any(keyword in raw_response for keyword in POSITIVE_KEYWORDS)
+            has_negative = any(keyword in raw_response for keyword in NEGATIVE_KEYWORDS)
+            return has_positive and not has_negative
+        return False
+    
+    @staticmethod
+    def indicates_low_risk(response_data: Dict[str, Any]) -> bool:
+        """Whether a stored RISK response indicates low risk"""
+        response_value = str(response_data.get('response', '')).lower()
+        selected_option = str((response_data.get('processed') or {}).get('selected_option', '')).lower()
+        return (selected_option in LOW_RISK_INDICATORS or
+                any(indicator in response_value for indicator in LOW_RISK_INDICATORS))
+    
+    def routing_key(self, processed_response: ProcessedResponse) -> Tuple:
+        """
+        Everything routing reads from a response to the current question.
+        
+        Two responses with the same key route to the same next question,
+        given the same session state.
+        """
+        selected_option = (processed_response.selected_option or "").lower().strip()
+        low_risk = self.indicates_low_risk({
+            'response': processed_response.raw_response,
+            'processed': {'selected_option': processed_response.selected_option}
+        })
+        return (
+            selected_option,
+            tuple(sorted(processed_response.dsm_criteria_mapping.items())),
+            self.is_positive_response(processed_response),
+            low_risk,
+        )
+    
+    def speculate_next_questions(
+        self,
+        current_question: SCIDQuestion,
+        candidates: List[ProcessedResponse],
+        module: SCIDModule,
+        answered_questions: Set[str],
+        dsm_criteria_status: Dict[str, bool],
+        conversation_history: List[Dict[str, str]],
+        session_responses: Dict[str, Any]
+    ) -> Dict[Tuple, Optional[SCIDQuestion]]:
+        """
+        Route every candidate answer to the current question ahead of time.
+        
+        Args:
+            candidates: Plausible responses (e.g. one per option)
+            answered_questions: Answered IDs, not including the current question
+            dsm_criteria_status: DSM status before the current answer
+            session_responses: Stored responses, not including the current answer
+        
+        Returns:
+            routing_key -> next question for each candidate
+        """
+        branches = {}
+        for candidate in candidates:
+            key = self.routing_key(candidate)
+            if key in branches:
+                continue
+            dsm_status = dict(dsm_criteria_status)
+            dsm_status.update(candidate.dsm_criteria_mapping)
+            responses = dict(session_responses)
+            responses[current_question.id] = {
+                'question_id': current_question.id,
+                'response': candidate.raw_response,
+                'processed': candidate.__dict__
+            }
+            branches[key] = self.get_next_question(
+                current_question=current_question,
+                processed_response=candidate,
+                module=module,
+                answered_questions=set(answered_questions) | {current_question.id},
+                dsm_criteria_status=dsm_status,
+                conversation_history=conversation_history,
+                session_responses=responses
+            )
+        return branches
+    
     def get_next_question(
         self,
         current_question: SCIDQuestion,
@@ -21,7 +117,8 @@ class QuestionRouter:
         answered_questions: Set[str],
         dsm_criteria_status: Dict[str, bool],
         conversation_history: List[Dict[str, str]],
-        session_responses: Optional[Dict[str, Any]] = None
+        session_responses: Optional[Dict[str, Any]] = None,
+        criteria_bounds: Optional[DisorderBounds] = None
     ) -> Optional[SCIDQuestion]:
         """
         Get next question based on routing logic.
@@ -40,11 +137,16 @@ class QuestionRouter:
             answered_questions: Set of question IDs that have been answered
             dsm_criteria_status: Current DSM criteria status
             conversation_history: Conversation history
+            criteria_bounds: Bounds of the module's disorder from an incremental
+                evaluator; computed from dsm_criteria_status when omitted
         
         Returns:
             Next question to ask, or None if assessment is complete
         """
         try:
+            if criteria_bounds is None:
+                criteria_bounds = self.criteria_bounds(module, dsm_criteria_status)
+            
             # 1. Check skip logic
             skip_question = self._apply_skip_logic(
                 current_question=current_question,
@@ -74,7 +176,8 @@ class QuestionRouter:
                 answered_questions=answered_questions,
                 dsm_criteria_status=dsm_criteria_status,
                 current_question=current_question,
-                session_responses=session_responses
+                session_responses=session_responses,
+                criteria_bounds=criteria_bounds
             )
             
             return next_question
@@ -126,29 +229,7 @@ class QuestionRouter:
             return []
         
         # Check if response is positive (triggers follow-ups)
-        selected_option = processed_response.selected_option
-        raw_response = processed_response.raw_response.lower() if processed_response.raw_response else ""
-        
-        # Enhanced positive response detection
-        positive_responses = ["yes", "sometimes", "option 1", "option 2", "y", "true", "1"]
-        is_positive = False
-        
-        if selected_option:
-            is_positive = selected_option.lower() in [r.lower() for r in positive_responses]
-        
-        # Also check raw response for natural language
-        if not is_positive and raw_response:
-            positive_keywords = ["yes", "have", "do", "did", "sometimes", "occasionally", "often"]
-            negative_keywords = ["no", "never", "none", "not", "don't", "didn't", "haven't"]
-            
-            # Check for positive keywords without negative keywords
-            has_positive = any(keyword in raw_response for keyword in positive_keywords)
-            has_negative = any(keyword in raw_response for keyword in negative_keywords)
-            
-            if has_positive and not has_negative:
-                is_positive = True
-        
-        if not is_positive:
+        if not self.is_positive_response(processed_response):
             return []
         
         # Get follow-up questions
@@ -166,64 +247,44 @@ class QuestionRouter:
         answered_questions: Set[str],
         dsm_criteria_status: Dict[str, bool],
         current_question: SCIDQuestion,
-        session_responses: Optional[Dict[str, Any]] = None
+        session_responses: Optional[Dict[str, Any]] = None,
+        criteria_bounds: Optional[DisorderBounds] = None
     ) -> Optional[SCIDQuestion]:
         """Get next question based on priority and DSM criteria optimization"""
         
-        # Get unanswered questions
-        unanswered_questions = [
-            q for q in module.questions
-            if q.id not in answered_questions
-        ]
-        
-        if not unanswered_questions:
-            return None
-        
-        # Module-specific optimizations
-        module_id = module.id.upper()
-        
-        # Separate required and optional questions
-        required_unanswered = [q for q in unanswered_questions if q.required]
-        optional_unanswered = [q for q in unanswered_questions if not q.required]
-        
-        # Always prioritize required questions
-        if required_unanswered:
-            # Sort required by priority and sequence
-            required_unanswered.sort(key=lambda q: (q.priority, q.sequence_number))
-            
-            # Check if we should ask any required question
-            for question in required_unanswered:
-                if self._should_ask_question(question, dsm_criteria_status, module, session_responses):
-                    return question
+        # Always prioritize required questions (precomputed priority/sequence order)
+        first_required = None
+        for question in module.get_routing_order(required=True):
+            if question.id in answered_questions:
+                continue
+            if first_required is None:
+                first_required = question
+            if self._should_ask_question(question, dsm_criteria_status, module, session_responses, criteria_bounds):
+                return question
         
         # If all required answered, check optional questions
         # But only if we haven't met min_questions threshold
         min_questions = module.min_questions or 1
-        total_answered = len(answered_questions)
-        
-        if total_answered < min_questions and optional_unanswered:
-            # Sort optional by priority and sequence
-            optional_unanswered.sort(key=lambda q: (q.priority, q.sequence_number))
-            
-            # Check if we should ask optional questions
-            for question in optional_unanswered:
-                if self._should_ask_question(question, dsm_criteria_status, module, session_responses):
+        first_optional = None
+        if len(answered_questions) < min_questions:
+            for question in module.get_routing_order(required=False):
+                if question.id in answered_questions:
+                    continue
+                if first_optional is None:
+                    first_optional = question
+                if self._should_ask_question(question, dsm_criteria_status, module, session_responses, criteria_bounds):
                     return question
         
         # Fallback: return first unanswered required question, or first optional if no required
-        if required_unanswered:
-            return required_unanswered[0]
-        elif optional_unanswered and total_answered < min_questions:
-            return optional_unanswered[0]
-        
-        return None
+        return first_required or first_optional
     
     def _should_ask_question(
         self,
         question: SCIDQuestion,
         dsm_criteria_status: Dict[str, bool],
         module: SCIDModule,
-        session_responses: Optional[Dict[str, Any]] = None
+        session_responses: Optional[Dict[str, Any]] = None,
+        criteria_bounds: Optional[DisorderBounds] = None
     ) -> bool:
         """Determine if question should be asked based on DSM criteria status and module-specific logic"""
         
@@ -240,7 +301,6 @@ class QuestionRouter:
             if question.priority > 1 and not question.required:
                 # Get critical questions (RISK_01 through RISK_05)
                 critical_question_ids = ["RISK_01", "RISK_02", "RISK_03", "RISK_04", "RISK_05"]
-                critical_questions = [q for q in module.questions if q.id in critical_question_ids]
                 
                 # Check if we have responses for critical questions
                 if session_responses:
@@ -250,16 +310,8 @@ class QuestionRouter:
                     for crit_q_id in critical_question_ids:
                         if crit_q_id in session_responses:
                             answered_critical_count += 1
-                            response_data = session_responses.get(crit_q_id, {})
-                            
-                            # Check response value
-                            response_value = str(response_data.get('response', '')).lower()
-                            selected_option = str(response_data.get('processed', {}).get('selected_option', '')).lower()
-                            
                             # Check if response indicates low risk
-                            low_risk_indicators = ["no", "none", "never", "n", "false", "0", "not"]
-                            if (selected_option in low_risk_indicators or 
-                                any(indicator in response_value for indicator in low_risk_indicators)):
+                            if self.indicates_low_risk(session_responses.get(crit_q_id, {})):
                                 low_risk_count += 1
                     
                     # If all answered critical questions indicate low risk, skip optional questions
@@ -269,13 +321,7 @@ class QuestionRouter:
             
             # Skip RISK_02 and RISK_03 if RISK_01 is "no" (no suicidal ideation)
             if question.id in ["RISK_02", "RISK_03"] and session_responses:
-                risk_01_response = session_responses.get("RISK_01", {})
-                response_value = str(risk_01_response.get('response', '')).lower()
-                selected_option = str(risk_01_response.get('processed', {}).get('selected_option', '')).lower()
-                
-                low_risk_indicators = ["no", "none", "never", "n", "false", "0", "not"]
-                if (selected_option in low_risk_indicators or 
-                    any(indicator in response_value for indicator in low_risk_indicators)):
+                if self.indicates_low_risk(session_responses.get("RISK_01", {})):
                     # RISK_01 is "no", so skip RISK_02 and RISK_03 (plan and intent)
                     logger.info(f"Skipping {question.id} - RISK_01 indicates no suicidal ideation")
                     return False
@@ -300,6 +346,12 @@ class QuestionRouter:
                     # Skip optional questions if core info is sufficient
                     return False
         
+        # Once the disorder's outcome is decided, optional criteria questions cannot change it
+        if question.dsm_criterion_id and criteria_bounds is not None:
+            if criteria_bounds.decided and question.dsm_criteria_optional and not question.dsm_criteria_required:
+                return False
+            return True
+        
         # Check if criterion is already determined
         if question.dsm_criterion_id:
             criterion_status = dsm_criteria_status.get(question.dsm_criterion_id)
@@ -315,6 +367,12 @@ class QuestionRouter:
         
         return True
     
+    @staticmethod
+    def criteria_bounds(module: SCIDModule, dsm_criteria_status: Dict[str, bool]) -> Optional[DisorderBounds]:
+        """Bounds of the module's disorder for a full criteria status dict"""
+        rule = get_disorder_rule(module.dsm_criteria)
+        return rule.evaluate(dsm_criteria_status) if rule is not None else None
+    
     def _get_next_sequential_question(
         self,
         module: SCIDModule,
@@ -322,16 +380,8 @@ class QuestionRouter:
         current_question: SCIDQuestion
     ) -> Optional[SCIDQuestion]:
         """Get next question in sequence order (fallback)"""
-        unanswered_questions = [
-            q for q in module.questions
-            if q.id not in answered_questions
-        ]
-        
-        if not unanswered_questions:
-            return None
-        
-        # Sort by sequence number
-        unanswered_questions.sort(key=lambda q: q.sequence_number)
-        
-        return unanswered_questions[0]
+        for question in module.get_sequential_order():
+            if question.id not in answered_questions:
+                return question
+        return None
 
@@ -2,13 +2,22 @@
 Global Response Processor Node for SCID-CV V2
 Centralized response processing for all SCID-CV modules
 Integrated with continuous SRA service for symptom extraction
+Unambiguous YES_NO / MCQ answers are resolved locally before any LLM parse
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from ..base_types import SCIDQuestion, ProcessedResponse, ResponseType
 from .llm_response_parser import LLMResponseParser
 from .sra_service import get_sra_service, SRAService
+from .answer_classifier import (
+    AnswerClassifier,
+    get_answer_classifier,
+    TIER_LLM,
+    TIER_FALLBACK,
+    TIER_FAILED,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +25,26 @@ logger = logging.getLogger(__name__)
 class GlobalResponseProcessor:
     """Global node for processing all SCID-CV responses"""
     
-    def __init__(self, llm_parser: Optional[LLMResponseParser] = None, sra_service: Optional[SRAService] = None):
+    def __init__(
+        self,
+        llm_parser: Optional[LLMResponseParser] = None,
+        sra_service: Optional[SRAService] = None,
+        classifier: Optional[AnswerClassifier] = None,
+        enable_fast_path: bool = True
+    ):
         """
         Initialize global response processor.
         
         Args:
             llm_parser: LLM response parser instance (if None, creates new one)
             sra_service: SRA service instance (if None, creates new one)
+            classifier: Local answer classifier (if None, uses the shared one)
+            enable_fast_path: Resolve unambiguous structured answers without the LLM
         """
         self.llm_parser = llm_parser or LLMResponseParser()
         self.sra_service = sra_service or get_sra_service()
+        self.classifier = classifier or get_answer_classifier()
+        self.enable_fast_path = enable_fast_path
     
     def process_response(
         self,
@@ -56,173 +75,345 @@ class GlobalResponseProcessor:
         try:
             # Handle empty or whitespace-only responses
             if not user_response or not user_response.strip():
-                return ProcessedResponse(
-                    selected_option=None,
-                    extracted_fields={},
-                    confidence=0.0,
-                    dsm_criteria_mapping={},
-                    validation={
-                        "is_valid": False,
-                        "needs_clarification": True,
-                        "suggested_clarification": "Please provide a response to continue."
-                    },
-                    raw_response=user_response or ""
-                )
+                return self._empty_response(user_response)
             
             # Normalize response
             user_response = user_response.strip()
             
-            # LLM-FIRST APPROACH: Try LLM extraction first for all responses
-            # This provides better accuracy and handles edge cases naturally
-            try:
-                # Get module context if available (for comprehensive prompts)
-                module = kwargs.get("module") if "module" in kwargs else None
-                
-                processed = self.llm_parser.parse_response(
-                    user_response=user_response,
-                    question=question,
-                    conversation_history=conversation_history,
-                    dsm_criteria_context=dsm_criteria_context,
-                    module=module
-                )
-                
-                # Normalize selected_option BEFORE validation (for consistent storage/comparison)
-                if processed.selected_option is not None:
-                    if question.response_type == ResponseType.YES_NO:
-                        processed.selected_option = str(processed.selected_option).lower().strip()
-                    elif question.response_type == ResponseType.TEXT:
-                        processed.selected_option = str(processed.selected_option).lower().strip()
-                
-                # Validate and enhance the processed response
-                processed = self._validate_processed_response(processed, question)
-                
-                # Check if LLM extraction was successful (high confidence or valid option)
-                llm_success = (
-                    processed.confidence >= 0.6 and processed.selected_option is not None  # Good confidence with option
-                ) or (
-                    processed.selected_option is not None and 
-                    processed.selected_option in (question.options or [])  # Valid option matched
-                ) or (
-                    processed.confidence >= 0.8  # Very high confidence even if None (for ambiguous)
+            # FAST PATH: "yes", "2" or an exact option label never needs the LLM
+            processed = self._classify_locally(user_response, question)
+            resolved = processed is not None
+            
+            # LLM APPROACH: Ambiguous free text goes to the LLM parser
+            if not resolved:
+                parsed = self._parse_with_llm(
+                    user_response, question, conversation_history, dsm_criteria_context, kwargs.get("module")
                 )
-                
-                if llm_success:
-                    logger.debug(f"LLM extraction successful: {processed.selected_option} (confidence: {processed.confidence:.2f})")
-                    # Process through SRA service for symptom extraction
-                    self._process_sra_if_needed(session_id, user_response, question, processed, conversation_history)
-                    return processed
-                else:
-                    logger.debug(f"LLM extraction had low confidence or no option (confidence: {processed.confidence:.2f}, option: {processed.selected_option}), trying rule-based fallback")
-                    # Fall through to rule-based fallback
-                    
-            except Exception as e:
-                logger.warning(f"LLM parsing error: {e}, falling back to rule-based")
-                processed = None  # Ensure processed is defined
-                # Fall through to rule-based fallback
+                processed, resolved = self._resolve_parsed(user_response, question, parsed)
             
-            # RULE-BASED FALLBACK: More aggressive - try for any response if LLM failed
-            # Check if response can be parsed with rule-based logic
-            option_selection = self._extract_option_selection(user_response, question)
+            # Process through SRA service for symptom extraction
+            if resolved:
+                self._process_sra_if_needed(session_id, user_response, question, processed, conversation_history)
+            return processed
             
-            # Try rule-based if:
-            # 1. We have an option selection, OR
-            # 2. It's a simple response (short, clear), OR
-            # 3. LLM returned None with low confidence (if processed exists)
-            should_try_rule_based = (
-                option_selection is not None or
-                self._is_simple_option_response(user_response, question) or
-                ('processed' in locals() and processed and processed.selected_option is None and processed.confidence < 0.6)
-            )
+        except Exception as e:
+            logger.error(f"Error processing response: {e}", exc_info=True)
+            self.classifier.record(TIER_FAILED)
+            return self._error_response(e, user_response)
+    
+    async def process_response_async(
+        self,
+        user_response: str,
+        question: SCIDQuestion,
+        conversation_history: List[Dict[str, str]],
+        dsm_criteria_context: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+        **kwargs
+    ) -> ProcessedResponse:
+        """
+        Async counterpart of process_response.
+        
+        Symptom extraction only needs the raw answer, so its LLM call runs
+        alongside the parsing LLM call instead of after it.
+        """
+        symptoms = None
+        try:
+            if not user_response or not user_response.strip():
+                return self._empty_response(user_response)
             
-            if should_try_rule_based:
-                if option_selection:
-                    logger.debug(f"Using rule-based parsing: {option_selection}")
-                    processed = self._process_option_response(
-                        user_response=user_response,
-                        question=question,
-                        selected_option=option_selection
-                    )
-                    # Mark as rule-based with good confidence if it's a clear match
-                    if option_selection in (question.options or []):
-                        processed.confidence = 0.85  # Good confidence for clear rule-based match
-                    else:
-                        processed.confidence = min(processed.confidence or 0.7, 0.75)  # Moderate confidence
-                    processed = self._validate_processed_response(processed, question)
-                    # Process through SRA service
-                    self._process_sra_if_needed(session_id, user_response, question, processed, conversation_history)
-                    return processed
-                elif question.response_type == ResponseType.YES_NO:
-                    # Try yes/no parsing for yes/no questions
-                    from ..utils.question_utils import ResponseParser
-                    parser = ResponseParser()
-                    yes_no_result, confidence = parser.parse_yes_no(user_response)
-                    if yes_no_result is not None:
-                        # Normalize to lowercase
-                        yes_no_result = str(yes_no_result).lower().strip()
-                        if yes_no_result not in ["yes", "no", "sometimes"]:
-                            # Try to infer
-                            if "no" in yes_no_result or "not" in yes_no_result:
-                                yes_no_result = "no"
-                            elif "yes" in yes_no_result:
-                                yes_no_result = "yes"
-                            else:
-                                yes_no_result = None
-                        
-                        if yes_no_result:
-                            logger.debug(f"Using rule-based yes/no parsing: {yes_no_result}")
-                            processed = ProcessedResponse(
-                                selected_option=yes_no_result,  # Already lowercase
-                                extracted_fields={},
-                                confidence=confidence or 0.8,
-                                dsm_criteria_mapping={},
-                                validation={"is_valid": True, "needs_clarification": False},
-                                raw_response=user_response
-                            )
-                            processed = self._validate_processed_response(processed, question)
-                            self._process_sra_if_needed(session_id, user_response, question, processed, conversation_history)
-                            return processed
+            user_response = user_response.strip()
             
-            # If we get here, both LLM and rule-based failed
-            # Return the LLM result even if low confidence (better than nothing)
-            if 'processed' in locals() and processed:
-                logger.debug("Returning LLM result despite low confidence")
-                # Process through SRA service
-                self._process_sra_if_needed(session_id, user_response, question, processed, conversation_history)
-                return processed
+            processed = self._classify_locally(user_response, question)
+            resolved = processed is not None
             
-            # Final fallback: return error response
-            logger.error("Both LLM and rule-based parsing failed")
-            fallback_response = ProcessedResponse(
-                selected_option=None,
-                extracted_fields={},
-                confidence=0.0,
-                dsm_criteria_mapping={},
-                validation={
-                    "is_valid": False,
-                    "needs_clarification": True,
-                    "suggested_clarification": "Could you please rephrase your response?"
-                },
-                free_text_analysis={"error": "Parsing failed", "processing_failed": True},
-                raw_response=user_response
-            )
-            return fallback_response
+            if not resolved:
+                if session_id and self.sra_service:
+                    symptoms = asyncio.create_task(
+                        self._extract_symptoms_async(user_response, question, conversation_history)
+                    )
+                parsed = await self._parse_with_llm_async(
+                    user_response, question, conversation_history, dsm_criteria_context, kwargs.get("module")
+                )
+                processed, resolved = self._resolve_parsed(user_response, question, parsed)
+            
+            if resolved and session_id and self.sra_service:
+                if symptoms is None:
+                    symptoms = asyncio.create_task(
+                        self._extract_symptoms_async(user_response, question, conversation_history)
+                    )
+                await self._process_sra_async(session_id, question, processed, symptoms)
+            return processed
             
         except Exception as e:
             logger.error(f"Error processing response: {e}", exc_info=True)
-            # Return fallback response
-            return ProcessedResponse(
-                selected_option=None,
-                extracted_fields={},
-                confidence=0.3,
-                dsm_criteria_mapping={},
-                validation={
-                    "is_valid": False,
-                    "needs_clarification": True,
-                    "error": str(e)
-                },
-                free_text_analysis={"error": str(e), "processing_failed": True},
-                raw_response=user_response or ""
+            self.classifier.record(TIER_FAILED)
+            return self._error_response(e, user_response)
+        finally:
+            if symptoms is not None and not symptoms.done():
+                symptoms.cancel()
+    
+    def _classify_locally(self, user_response: str, question: SCIDQuestion) -> Optional[ProcessedResponse]:
+        """Resolve an unambiguous structured answer without the LLM"""
+        if not self.enable_fast_path:
+            return None
+        fast = self.classifier.classify(user_response, question)
+        if fast is None:
+            return None
+        option, confidence, tier = fast
+        processed = self.option_response(question, option, confidence, tier, raw_response=user_response)
+        self.classifier.record(tier)
+        logger.debug(f"Fast path ({tier}) resolved: {processed.selected_option} (confidence: {confidence:.2f})")
+        return processed
+    
+    def _parse_with_llm(
+        self,
+        user_response: str,
+        question: SCIDQuestion,
+        conversation_history: List[Dict[str, str]],
+        dsm_criteria_context: Optional[Dict[str, Any]],
+        module: Optional[Any]
+    ) -> Optional[ProcessedResponse]:
+        """LLM parse, normalized and validated; None if the parser failed"""
+        try:
+            processed = self.llm_parser.parse_response(
+                user_response=user_response,
+                question=question,
+                conversation_history=conversation_history,
+                dsm_criteria_context=dsm_criteria_context,
+                module=module
+            )
+            return self._normalize_parsed(processed, question)
+        except Exception as e:
+            logger.warning(f"LLM parsing error: {e}, falling back to rule-based")
+            return None
+    
+    async def _parse_with_llm_async(
+        self,
+        user_response: str,
+        question: SCIDQuestion,
+        conversation_history: List[Dict[str, str]],
+        dsm_criteria_context: Optional[Dict[str, Any]],
+        module: Optional[Any]
+    ) -> Optional[ProcessedResponse]:
+        """Async counterpart of _parse_with_llm"""
+        parse_async = getattr(self.llm_parser, "parse_response_async", None)
+        if not asyncio.iscoroutinefunction(parse_async):
+            # Parsers without a native async path run off the event loop
+            return await asyncio.to_thread(
+                self._parse_with_llm, user_response, question, conversation_history, dsm_criteria_context, module
+            )
+        try:
+            processed = await parse_async(
+                user_response=user_response,
+                question=question,
+                conversation_history=conversation_history,
+                dsm_criteria_context=dsm_criteria_context,
+                module=module
+            )
+            return self._normalize_parsed(processed, question)
+        except Exception as e:
+            logger.warning(f"LLM parsing error: {e}, falling back to rule-based")
+            return None
+    
+    def _normalize_parsed(self, processed: ProcessedResponse, question: SCIDQuestion) -> ProcessedResponse:
+        """Normalize and validate an LLM-parsed response"""
+        # Normalize selected_option BEFORE validation (for consistent storage/comparison)
+        if processed.selected_option is not None:
+            if question.response_type == ResponseType.YES_NO:
+                processed.selected_option = str(processed.selected_option).lower().strip()
+            elif question.response_type == ResponseType.TEXT:
+                processed.selected_option = str(processed.selected_option).lower().strip()
+        
+        # Validate and enhance the processed response
+        return self._validate_processed_response(processed, question)
+    
+    def _resolve_parsed(
+        self,
+        user_response: str,
+        question: SCIDQuestion,
+        processed: Optional[ProcessedResponse]
+    ) -> Tuple[ProcessedResponse, bool]:
+        """
+        Accept the LLM parse or fall back to rule-based parsing.
+        
+        Returns:
+            (processed_response, resolved); unresolved responses ask for a
+            rephrase and are not sent to SRA
+        """
+        if processed is not None:
+            # Check if LLM extraction was successful (high confidence or valid option)
+            llm_success = (
+                processed.confidence >= 0.6 and processed.selected_option is not None  # Good confidence with option
+            ) or (
+                processed.selected_option is not None and 
+                processed.selected_option in (question.options or [])  # Valid option matched
+            ) or (
+                processed.confidence >= 0.8  # Very high confidence even if None (for ambiguous)
             )
+            
+            if llm_success:
+                logger.debug(f"LLM extraction successful: {processed.selected_option} (confidence: {processed.confidence:.2f})")
+                self.classifier.record(TIER_LLM)
+                return processed, True
+            logger.debug(f"LLM extraction had low confidence or no option (confidence: {processed.confidence:.2f}, option: {processed.selected_option}), trying rule-based fallback")
+        
+        # RULE-BASED FALLBACK: More aggressive - try for any response if LLM failed
+        # Check if response can be parsed with rule-based logic
+        option_selection = self._extract_option_selection(user_response, question)
+        
+        # Try rule-based if:
+        # 1. We have an option selection, OR
+        # 2. It's a simple response (short, clear), OR
+        # 3. LLM returned None with low confidence
+        should_try_rule_based = (
+            option_selection is not None or
+            self._is_simple_option_response(user_response, question) or
+            (processed is not None and processed.selected_option is None and processed.confidence < 0.6)
+        )
+        
+        if should_try_rule_based:
+            if option_selection:
+                logger.debug(f"Using rule-based parsing: {option_selection}")
+                rule_based = self._process_option_response(
+                    user_response=user_response,
+                    question=question,
+                    selected_option=option_selection
+                )
+                # Mark as rule-based with good confidence if it's a clear match
+                if option_selection in (question.options or []):
+                    rule_based.confidence = 0.85  # Good confidence for clear rule-based match
+                else:
+                    rule_based.confidence = min(rule_based.confidence or 0.7, 0.75)  # Moderate confidence
+                self.classifier.record(TIER_FALLBACK)
+                return self._validate_processed_response(rule_based, question), True
+            elif question.response_type == ResponseType.YES_NO:
+                # Try yes/no parsing for yes/no questions
+                from ..utils.question_utils import ResponseParser
+                parser = ResponseParser()
+                yes_no_result, confidence = parser.parse_yes_no(user_response)
+                if yes_no_result is not None:
+                    # Normalize to lowercase
+                    yes_no_result = str(yes_no_result).lower().strip()
+                    if yes_no_result not in ["yes", "no", "sometimes"]:
+                        # Try to infer
+                        if "no" in yes_no_result or "not" in yes_no_result:
+                            yes_no_result = "no"
+                        elif "yes" in yes_no_result:
+                            yes_no_result = "yes"
+                        else:
+                            yes_no_result = None
+                    
+                    if yes_no_result:
+                        logger.debug(f"Using rule-based yes/no parsing: {yes_no_result}")
+                        rule_based = ProcessedResponse(
+                            selected_option=yes_no_result,  # Already lowercase
+                            extracted_fields={},
+                            confidence=confidence or 0.8,
+                            dsm_criteria_mapping={},
+                            validation={"is_valid": True, "needs_clarification": False},
+                            raw_response=user_response
+                        )
+                        self.classifier.record(TIER_FALLBACK)
+                        return self._validate_processed_response(rule_based, question), True
+        
+        # If we get here, both LLM and rule-based failed
+        # Return the LLM result even if low confidence (better than nothing)
+        if processed is not None:
+            logger.debug("Returning LLM result despite low confidence")
+            self.classifier.record(TIER_LLM)
+            return processed, True
+        
+        # Final fallback: return error response
+        logger.error("Both LLM and rule-based parsing failed")
+        self.classifier.record(TIER_FAILED)
+        fallback_response = ProcessedResponse(
+            selected_option=None,
+            extracted_fields={},
+            confidence=0.0,
+            dsm_criteria_mapping={},
+            validation={
+                "is_valid": False,
+                "needs_clarification": True,
+                "suggested_clarification": "Could you please rephrase your response?"
+            },
+            free_text_analysis={"error": "Parsing failed", "processing_failed": True},
+            raw_response=user_response
+        )
+        return fallback_response, False
+    
+    def _empty_response(self, user_response: Optional[str]) -> ProcessedResponse:
+        """Response asking the user to answer at all"""
+        return ProcessedResponse(
+            selected_option=None,
+            extracted_fields={},
+            confidence=0.0,
+            dsm_criteria_mapping={},
+            validation={
+                "is_valid": False,
+                "needs_clarification": True,
+                "suggested_clarification": "Please provide a response to continue."
+            },
+            raw_response=user_response or ""
+        )
+    
+    def _error_response(self, error: Exception, user_response: Optional[str]) -> ProcessedResponse:
+        """Fallback response when processing raised"""
+        return ProcessedResponse(
+            selected_option=None,
+            extracted_fields={},
+            confidence=0.3,
+            dsm_criteria_mapping={},
+            validation={
+                "is_valid": False,
+                "needs_clarification": True,
+                "error": str(error)
+            },
+            free_text_analysis={"error": str(error), "processing_failed": True},
+            raw_response=user_response or ""
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-tier answer resolution statistics"""
+        return self.classifier.get_stats()
+    
+    def option_response(
+        self,
+        question: SCIDQuestion,
+        option: str,
+        confidence: float,
+        tier: str,
+        raw_response: Optional[str] = None
+    ) -> ProcessedResponse:
+        """
+        Build the ProcessedResponse for a locally resolved option.
+        
+        Also used to predict the response to a bare option answer (e.g. for
+        speculative routing), so it must not have side effects.
+        """
+        processed = self._process_option_response(
+            user_response=raw_response if raw_response is not None else option,
+            question=question,
+            selected_option=option
+        )
+        processed.confidence = confidence
+        processed.free_text_analysis["resolved_by"] = tier
+        return self._validate_processed_response(processed, question)
+    
+    def candidate_responses(self, question: SCIDQuestion) -> List[ProcessedResponse]:
+        """Responses to each bare option answer of a YES_NO / MCQ question"""
+        if question.response_type == ResponseType.YES_NO:
+            options = ["yes", "no", "sometimes"]
+        elif question.response_type == ResponseType.MULTIPLE_CHOICE:
+            options = list(question.options or [])
+        else:
+            return []
+        
+        candidates = []
+        for option in options:
+            fast = self.classifier.classify(option, question)
+            if fast is not None:
+                candidates.append(self.option_response(question, fast[0], fast[1], fast[2], raw_response=option))
+        return candidates
     
     def _extract_option_selection(self, user_response: str, question: SCIDQuestion) -> Optional[str]:
         """Extract option selection from user response with improved matching"""
@@ -369,6 +560,30 @@ class GlobalResponseProcessor:
             except Exception as e:
                 logger.warning(f"SRA service error (non-critical): {e}")
     
+    async def _extract_symptoms_async(
+        self,
+        user_response: str,
+        question: SCIDQuestion,
+        conversation_history: List[Dict[str, str]]
+    ):
+        """SRA symptom extraction for one response (nothing is stored yet)"""
+        return await self.sra_service.extract_symptoms_async(user_response, question, conversation_history)
+    
+    async def _process_sra_async(
+        self,
+        session_id: Optional[str],
+        question: SCIDQuestion,
+        processed_response: ProcessedResponse,
+        symptoms: asyncio.Task
+    ):
+        """Store the symptoms of an already running extraction once the response is resolved"""
+        try:
+            extracted, method = await symptoms
+            sra_result = self.sra_service.record_symptoms(session_id, question, processed_response, extracted, method)
+            logger.debug(f"SRA processed response: {sra_result.get('symptoms_extracted', 0)} symptoms extracted")
+        except Exception as e:
+            logger.warning(f"SRA service error (non-critical): {e}")
+    
     def _process_option_response(
         self,
         user_response: str,
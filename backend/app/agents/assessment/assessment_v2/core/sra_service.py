@@ -4,11 +4,14 @@ Processes all responses in real-time to extract symptoms and attributes
 Works silently in the background throughout the entire workflow
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import re
 
+from app.agents.core.lexicon import Lexicon, LexiconScan
+
 from .symptom_database import get_symptom_database, SymptomDatabase
 from ..base_types import SCIDQuestion, ProcessedResponse
 
@@ -25,6 +28,63 @@ except ImportError:
         logger.warning("LLMWrapper not available - SRA service will use rule-based extraction only")
 
 
+# Symptom keywords for rule-based extraction
+SYMPTOM_KEYWORDS = {
+    "mood": ["sad", "depressed", "down", "hopeless", "empty", "guilty", "worthless", 
+            "irritable", "angry", "moody", "euphoric", "manic", "high", "elated"],
+    "anxiety": ["anxious", "worried", "nervous", "fear", "panic", "afraid", "scared",
+               "restless", "on edge", "tense", "apprehensive"],
+    "sleep": ["insomnia", "sleep", "trouble sleeping", "can't sleep", "wake up",
+             "sleeping too much", "hypersomnia", "nightmare", "nightmare"],
+    "appetite": ["appetite", "eating", "weight", "hungry", "not hungry", "food",
+                "lost weight", "gained weight"],
+    "energy": ["tired", "fatigue", "fatigued", "exhausted", "low energy", "lethargic", "sluggish",
+              "no energy", "energetic", "hyperactive", "constantly tired", "feel tired"],
+    "concentration": ["concentrate", "focus", "attention", "distracted", "forgetful",
+                    "memory", "remember", "brain fog"],
+    "suicidal": ["suicide", "kill myself", "end my life", "want to die", "not worth living"],
+    "self_harm": ["hurt myself", "cut", "burn", "self harm", "self-harm"],
+    "panic": ["panic attack", "panic", "heart racing", "chest pain", "short of breath",
+             "dizzy", "sweating", "trembling"],
+    "ocd": ["obsession", "compulsion", "ritual", "repetitive", "checking", "cleaning",
+           "counting", "intrusive thought"],
+    "trauma": ["flashback", "nightmare", "trauma", "ptsd", "triggered", "reliving",
+              "avoid", "numb", "hypervigilant"],
+    "adhd": ["attention", "hyperactive", "impulsive", "distracted", "can't focus",
+            "fidget", "restless"]
+}
+
+SEVERITY_WORDS = {
+    "severe": ["extreme", "severe", "very bad", "terrible", "awful"],
+    "moderate": ["moderate", "somewhat", "quite", "pretty"],
+    "mild": ["mild", "slight", "a little", "some"],
+}
+
+FREQUENCY_WORDS = {
+    "daily": ["daily", "every day", "always", "constantly"],
+    "weekly": ["weekly", "few times", "several times"],
+    "occasional": ["occasional", "sometimes", "once in a while"],
+    "rare": ["rare", "rarely", "seldom"],
+}
+
+# Symptom, severity and frequency words compiled into one matcher; the group
+# order above is the precedence when several words of a kind appear
+_SRA_LEXICON = Lexicon(
+    "sra_service",
+    Lexicon.from_groups(SYMPTOM_KEYWORDS, kind="symptom")
+    + Lexicon.from_groups(SEVERITY_WORDS, kind="severity", as_weight=True, negatable=False)
+    + Lexicon.from_groups(FREQUENCY_WORDS, kind="frequency", as_weight=True, negatable=False)
+)
+
+
+def _first_by_precedence(scan: LexiconScan, kind: str, order) -> str:
+    found = {hit.weight for hit in scan.of_kind(kind)}
+    for label in order:
+        if label in found:
+            return label
+    return ""
+
+
 class SRAService:
     """
     Continuous Symptom Recognition and Analysis Service
@@ -50,31 +110,7 @@ class SRAService:
                 logger.warning(f"Could not initialize LLM client: {e}")
                 self.llm_client = None
         
-        # Symptom keywords for rule-based extraction
-        self.symptom_keywords = {
-            "mood": ["sad", "depressed", "down", "hopeless", "empty", "guilty", "worthless", 
-                    "irritable", "angry", "moody", "euphoric", "manic", "high", "elated"],
-            "anxiety": ["anxious", "worried", "nervous", "fear", "panic", "afraid", "scared",
-                       "restless", "on edge", "tense", "apprehensive"],
-            "sleep": ["insomnia", "sleep", "trouble sleeping", "can't sleep", "wake up",
-                     "sleeping too much", "hypersomnia", "nightmare", "nightmare"],
-            "appetite": ["appetite", "eating", "weight", "hungry", "not hungry", "food",
-                        "lost weight", "gained weight"],
-            "energy": ["tired", "fatigue", "fatigued", "exhausted", "low energy", "lethargic", "sluggish",
-                      "no energy", "energetic", "hyperactive", "constantly tired", "feel tired"],
-            "concentration": ["concentrate", "focus", "attention", "distracted", "forgetful",
-                            "memory", "remember", "brain fog"],
-            "suicidal": ["suicide", "kill myself", "end my life", "want to die", "not worth living"],
-            "self_harm": ["hurt myself", "cut", "burn", "self harm", "self-harm"],
-            "panic": ["panic attack", "panic", "heart racing", "chest pain", "short of breath",
-                     "dizzy", "sweating", "trembling"],
-            "ocd": ["obsession", "compulsion", "ritual", "repetitive", "checking", "cleaning",
-                   "counting", "intrusive thought"],
-            "trauma": ["flashback", "nightmare", "trauma", "ptsd", "triggered", "reliving",
-                      "avoid", "numb", "hypervigilant"],
-            "adhd": ["attention", "hyperactive", "impulsive", "distracted", "can't focus",
-                    "fidget", "restless"]
-        }
+        self.symptom_keywords = SYMPTOM_KEYWORDS
         
         logger.debug("SRAService initialized")
     
@@ -99,31 +135,95 @@ class SRAService:
             processed_response: Processed response from response processor
             conversation_history: Previous conversation history
             
+        Returns:
+            Dictionary with extracted symptoms and attributes
+        """
+        try:
+            symptoms, method = self.extract_symptoms(user_response, question, conversation_history)
+            return self.record_symptoms(session_id, question, processed_response, symptoms, method)
+        except Exception as e:
+            logger.error(f"Error processing response for symptom extraction: {e}", exc_info=True)
+            return self._error_result(e)
+    
+    def extract_symptoms(
+        self,
+        user_response: str,
+        question: SCIDQuestion,
+        conversation_history: List[Dict[str, str]] = None
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Extract symptoms from a response without storing them.
+        
+        Only needs the raw answer, so it can run while the response itself is
+        still being parsed.
+        
+        Returns:
+            (symptoms, method) where method is "llm" or "rule_based"
+        """
+        # Extract symptoms using rule-based method
+        rule_based_symptoms = self._extract_symptoms_rule_based(user_response, question)
+        
+        # Extract symptoms using LLM if available
+        llm_symptoms = []
+        if self.llm_client:
+            try:
+                llm_symptoms = self._extract_symptoms_llm(user_response, question, conversation_history)
+            except Exception as e:
+                logger.warning(f"LLM symptom extraction failed: {e}")
+        
+        # Merge symptoms (prioritize LLM if available)
+        if llm_symptoms:
+            return llm_symptoms, "llm"
+        return rule_based_symptoms, "rule_based"
+    
+    async def extract_symptoms_async(
+        self,
+        user_response: str,
+        question: SCIDQuestion,
+        conversation_history: List[Dict[str, str]] = None
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """Async counterpart of extract_symptoms (does not block the event loop)"""
+        rule_based_symptoms = self._extract_symptoms_rule_based(user_response, question)
+        
+        llm_symptoms = []
+        if self.llm_client:
+            try:
+                generate_async = getattr(self.llm_client, "generate_response_async", None)
+                if asyncio.iscoroutinefunction(generate_async):
+                    llm_symptoms = await self._extract_symptoms_llm_async(user_response, question)
+                else:
+                    llm_symptoms = await asyncio.to_thread(
+                        self._extract_symptoms_llm, user_response, question, conversation_history
+                    )
+            except Exception as e:
+                logger.warning(f"LLM symptom extraction failed: {e}")
+        
+        if llm_symptoms:
+            return llm_symptoms, "llm"
+        return rule_based_symptoms, "rule_based"
+    
+    def record_symptoms(
+        self,
+        session_id: str,
+        question: SCIDQuestion,
+        processed_response: ProcessedResponse,
+        symptoms: List[Dict[str, Any]],
+        method: str
+    ) -> Dict[str, Any]:
+        """
+        Store extracted symptoms, taking attributes from the processed response.
+        
         Returns:
             Dictionary with extracted symptoms and attributes
         """
         try:
             extracted_symptoms = []
             
-            # Extract symptoms using rule-based method
-            rule_based_symptoms = self._extract_symptoms_rule_based(user_response, question)
-            
-            # Extract symptoms using LLM if available
-            llm_symptoms = []
-            if self.llm_client:
-                try:
-                    llm_symptoms = self._extract_symptoms_llm(user_response, question, conversation_history)
-                except Exception as e:
-                    logger.warning(f"LLM symptom extraction failed: {e}")
-            
-            # Merge symptoms (prioritize LLM if available)
-            all_symptoms = llm_symptoms if llm_symptoms else rule_based_symptoms
-            
             # Extract attributes from processed response
             extracted_fields = processed_response.extracted_fields or {}
             
             # Add symptoms to database
-            for symptom_data in all_symptoms:
+            for symptom_data in symptoms:
                 # Ensure symptom_data is a dictionary
                 if not isinstance(symptom_data, dict):
                     logger.warning(f"Invalid symptom data format: {type(symptom_data)} - {symptom_data}")
@@ -148,16 +248,20 @@ class SRAService:
             return {
                 "symptoms_extracted": len(extracted_symptoms),
                 "symptoms": extracted_symptoms,
-                "method": "llm" if llm_symptoms else "rule_based"
+                "method": method
             }
             
         except Exception as e:
-            logger.error(f"Error processing response for symptom extraction: {e}", exc_info=True)
-            return {
-                "symptoms_extracted": 0,
-                "symptoms": [],
-                "error": str(e)
-            }
+            logger.error(f"Error storing extracted symptoms: {e}", exc_info=True)
+            return self._error_result(e)
+    
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """Result dict for a response whose symptoms could not be extracted"""
+        return {
+            "symptoms_extracted": 0,
+            "symptoms": [],
+            "error": str(error)
+        }
     
     def _extract_symptoms_rule_based(self, user_response: str, question: SCIDQuestion) -> List[Dict[str, Any]]:
         """
@@ -171,24 +275,29 @@ class SRAService:
             List of symptom dictionaries
         """
         symptoms = []
-        user_response_lower = user_response.lower()
+        scan = _SRA_LEXICON.scan(user_response)
         
-        # Check for symptom keywords
-        for category, keywords in self.symptom_keywords.items():
-            for keyword in keywords:
-                if keyword in user_response_lower:
-                    # Extract symptom name and context
-                    symptom_name = self._extract_symptom_name(user_response, keyword, category)
-                    
-                    symptoms.append({
-                        "name": symptom_name,
-                        "category": category,
-                        "severity": self._extract_severity(user_response),
-                        "frequency": self._extract_frequency(user_response),
-                        "duration": self._extract_duration(user_response),
-                        "confidence": 0.7  # Rule-based confidence
-                    })
-                    break  # Only add each category once per response
+        # Only add each category once per response (negated mentions skipped)
+        hits = {}
+        for hit in scan.of_kind("symptom"):
+            hits.setdefault(hit.category, hit)
+        if not hits:
+            return symptoms
+        
+        # Attributes are read from the same scan, once per response
+        severity = self._extract_severity(user_response, scan)
+        frequency = self._extract_frequency(user_response, scan)
+        duration = self._extract_duration(user_response)
+        
+        for hit in hits.values():
+            symptoms.append({
+                "name": self._extract_symptom_name(user_response, hit.term, hit.category),
+                "category": hit.category,
+                "severity": severity,
+                "frequency": frequency,
+                "duration": duration,
+                "confidence": 0.7  # Rule-based confidence
+            })
         
         return symptoms
     
@@ -213,7 +322,25 @@ class SRAService:
             return []
         
         try:
-            system_prompt = """You are a symptom extraction specialist. Extract symptoms and their attributes from user responses.
+            response = self.llm_client.generate_response(**self._symptom_request(user_response, question))
+            return self._symptoms_from_response(response)
+            
+        except Exception as e:
+            logger.warning(f"LLM symptom extraction error: {e}")
+            return []
+    
+    async def _extract_symptoms_llm_async(self, user_response: str, question: SCIDQuestion) -> List[Dict[str, Any]]:
+        """Async counterpart of _extract_symptoms_llm"""
+        try:
+            response = await self.llm_client.generate_response_async(**self._symptom_request(user_response, question))
+            return self._symptoms_from_response(response)
+        except Exception as e:
+            logger.warning(f"LLM symptom extraction error: {e}")
+            return []
+    
+    def _symptom_request(self, user_response: str, question: SCIDQuestion) -> Dict[str, Any]:
+        """Keyword arguments for the symptom extraction LLM call"""
+        system_prompt = """You are a symptom extraction specialist. Extract symptoms and their attributes from user responses.
 
 Return JSON array with symptoms:
 [
@@ -231,77 +358,75 @@ Return JSON array with symptoms:
 
 Only extract symptoms that are clearly mentioned. Return empty array if no symptoms found.
 Return only valid JSON, no additional text."""
-            
-            prompt = f"""
+        
+        prompt = f"""
 USER RESPONSE: {user_response}
 
 QUESTION: {question.simple_text}
 
 Extract symptoms and their attributes. Return JSON array:"""
-            
-            response = self.llm_client.generate_response(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=0.1,
-                max_tokens=500
-            )
-            
-            if not response.success:
-                logger.warning(f"LLM symptom extraction failed: {response.error}")
-                return []
-            
-            # Parse JSON response
-            import json
-            content = response.content.strip()
-            
-            # Remove code block markers if present
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            
-            # Find JSON array
-            if "[" in content:
-                start_idx = content.find("[")
-                end_idx = content.rfind("]") + 1
-                content = content[start_idx:end_idx]
-            
-            # Use improved JSON parsing
-            symptoms = self._parse_json_array(content)
-            
-            # Ensure symptoms is a list of dictionaries
-            if not isinstance(symptoms, list):
-                if isinstance(symptoms, dict):
-                    symptoms = [symptoms]
-                elif symptoms:
-                    symptoms = [symptoms] if isinstance(symptoms, dict) else []
-                else:
-                    symptoms = []
-            
-            # Validate each symptom is a dict
-            validated_symptoms = []
-            for symptom in symptoms:
-                if isinstance(symptom, dict):
-                    validated_symptoms.append(symptom)
-                elif isinstance(symptom, str):
-                    # If symptom is a string, try to parse it
-                    logger.warning(f"Unexpected symptom format (string): {symptom}")
-                    # Skip string symptoms
-                    continue
-                else:
-                    logger.warning(f"Unexpected symptom format: {type(symptom)}")
-                    continue
-            
-            symptoms = validated_symptoms
-            
-            logger.debug(f"LLM extracted {len(symptoms)} symptoms")
-            return symptoms
-            
-        except Exception as e:
-            logger.warning(f"LLM symptom extraction error: {e}")
+        
+        return {
+            "prompt": prompt,
+            "system_prompt": system_prompt,
+            "temperature": 0.1,
+            "max_tokens": 500
+        }
+    
+    def _symptoms_from_response(self, response) -> List[Dict[str, Any]]:
+        """Parse and validate the symptom list from an LLM response"""
+        if not response.success:
+            logger.warning(f"LLM symptom extraction failed: {response.error}")
             return []
+        
+        # Parse JSON response
+        import json
+        content = response.content.strip()
+        
+        # Remove code block markers if present
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.startswith("```"):
+            content = content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+        
+        # Find JSON array
+        if "[" in content:
+            start_idx = content.find("[")
+            end_idx = content.rfind("]") + 1
+            content = content[start_idx:end_idx]
+        
+        # Use improved JSON parsing
+        symptoms = self._parse_json_array(content)
+        
+        # Ensure symptoms is a list of dictionaries
+        if not isinstance(symptoms, list):
+            if isinstance(symptoms, dict):
+                symptoms = [symptoms]
+            elif symptoms:
+                symptoms = [symptoms] if isinstance(symptoms, dict) else []
+            else:
+                symptoms = []
+        
+        # Validate each symptom is a dict
+        validated_symptoms = []
+        for symptom in symptoms:
+            if isinstance(symptom, dict):
+                validated_symptoms.append(symptom)
+            elif isinstance(symptom, str):
+                # If symptom is a string, try to parse it
+                logger.warning(f"Unexpected symptom format (string): {symptom}")
+                # Skip string symptoms
+                continue
+            else:
+                logger.warning(f"Unexpected symptom format: {type(symptom)}")
+                continue
+        
+        symptoms = validated_symptoms
+        
+        logger.debug(f"LLM extracted {len(symptoms)} symptoms")
+        return symptoms
     
     def _parse_json_array(self, response_text: str) -> List[Dict[str, Any]]:
         """
@@ -415,33 +540,17 @@ Extract symptoms and their attributes. Return JSON array:"""
         
         return category_names.get(category, keyword.title())
     
-    def _extract_severity(self, user_response: str) -> str:
+    def _extract_severity(self, user_response: str, scan: Optional[LexiconScan] = None) -> str:
         """Extract severity from user response"""
-        user_response_lower = user_response.lower()
-        
-        if any(word in user_response_lower for word in ["extreme", "severe", "very bad", "terrible", "awful"]):
-            return "severe"
-        elif any(word in user_response_lower for word in ["moderate", "somewhat", "quite", "pretty"]):
-            return "moderate"
-        elif any(word in user_response_lower for word in ["mild", "slight", "a little", "some"]):
-            return "mild"
-        
-        return ""
+        if scan is None:
+            scan = _SRA_LEXICON.scan(user_response)
+        return _first_by_precedence(scan, "severity", SEVERITY_WORDS)
     
-    def _extract_frequency(self, user_response: str) -> str:
+    def _extract_frequency(self, user_response: str, scan: Optional[LexiconScan] = None) -> str:
         """Extract frequency from user response"""
-        user_response_lower = user_response.lower()
-        
-        if any(word in user_response_lower for word in ["daily", "every day", "always", "constantly"]):
-            return "daily"
-        elif any(word in user_response_lower for word in ["weekly", "few times", "several times"]):
-            return "weekly"
-        elif any(word in user_response_lower for word in ["occasional", "sometimes", "once in a while"]):
-            return "occasional"
-        elif any(word in user_response_lower for word in ["rare", "rarely", "seldom"]):
-            return "rare"
-        
-        return ""
+        if scan is None:
+            scan = _SRA_LEXICON.scan(user_response)
+        return _first_by_precedence(scan, "frequency", FREQUENCY_WORDS)
     
     def _extract_duration(self, user_response: str) -> str:
         """Extract duration from user response"""
@@ -5,11 +5,14 @@ Migrated from assessment/database.py
 
 import json
 import logging
+import os
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.agents.core.state_store import SessionStateStore
+
 # Initialize logger first
 logger = logging.getLogger(__name__)
 
@@ -50,6 +53,7 @@ try:
         AssessmentConversationEnhanced as AssessmentConversationEnhancedModel
     )
     from app.models.patient import Patient
+    from .session_repository import get_session_repository
     DATABASE_AVAILABLE = True
 except ImportError as e:
     logger.warning(f"Database models not available: {e}. Running in test mode.")
@@ -64,6 +68,7 @@ except ImportError as e:
     AssessmentModuleDataModel = None
     AssessmentConversationEnhancedModel = None
     Patient = None
+    get_session_repository = None
 
 
 class ModeratorDatabase:
@@ -79,9 +84,18 @@ class ModeratorDatabase:
         else:
             logger.debug("ModeratorDatabase initialized in test mode (no database)")
 
-        # In-memory cache for performance (backed by PostgreSQL)
-        self._session_cache: Dict[str, SessionState] = {}
+        # Session graph loads, cached session keys and in-place updates
+        self._repository = get_session_repository() if DATABASE_AVAILABLE else None
+
+        # In-memory LRU/TTL cache for performance (backed by PostgreSQL)
         self._cache_ttl = 300  # 5 minutes cache TTL
+        self._session_cache: SessionStateStore[SessionState] = SessionStateStore(
+            "moderator_db_sessions",
+            serialize=lambda state: state.to_dict(),
+            deserialize=SessionState.from_dict,
+            max_entries=int(os.getenv("STATE_STORE_MAX_ENTRIES", "1000")),
+            ttl_seconds=self._cache_ttl,
+        )
     
     def _get_db_session(self) -> Session:
         """Get a database session"""
@@ -120,17 +134,15 @@ class ModeratorDatabase:
                     logger.error("Cannot get database session")
                     return None
             
-            # Get session model
-            session_model = db_session.query(AssessmentSessionModel).filter(
-                AssessmentSessionModel.session_id == session_id
-            ).first()
+            # Session keys (cached after the first lookup)
+            keys = self._repository.session_keys(db_session, session_id)
             
-            if not session_model:
+            if not keys:
                 logger.error(f"Session not found: {session_id}")
                 return None
             
             # Extract patient_id
-            patient_id = session_model.patient_id
+            patient_id = keys.patient_id
             
             if patient_id is None:
                 logger.error(f"Session {session_id} has no patient_id")
@@ -236,6 +248,7 @@ class ModeratorDatabase:
                 
                 if existing:
                     logger.debug(f"Session {session_state.session_id} already exists in database")
+                    self._repository.remember(session_state.session_id, existing.id, existing.patient_id)
                     if db:
                         db.close()
                     # Update cache and return success
@@ -256,6 +269,8 @@ class ModeratorDatabase:
                 )
 
                 db.add(session_model)
+                db.flush()
+                self._repository.remember(session_state.session_id, session_model.id, patient_id)
                 db.commit()
                 db.close()
 
@@ -269,6 +284,7 @@ class ModeratorDatabase:
                 if 'db' in locals() and db:
                     db.rollback()
                     db.close()
+                self._repository.forget(session_state.session_id)
                 
                 if attempt < max_retries:
                     logger.warning(f"Error creating session (attempt {attempt + 1}/{max_retries + 1}): {e}. Retrying...")
@@ -291,8 +307,9 @@ class ModeratorDatabase:
             SessionState object or None if not found
         """
         # Check cache first
-        if session_id in self._session_cache:
-            return self._session_cache[session_id]
+        cached = self._session_cache.get(session_id)
+        if cached is not None:
+            return cached
 
         try:
             db = self._get_db_session()
@@ -300,70 +317,14 @@ class ModeratorDatabase:
                 logger.warning("Database not available - cannot get session")
                 return None
 
-            # Get session model
-            session_model = db.query(AssessmentSessionModel).filter(
-                AssessmentSessionModel.session_id == session_id
-            ).first()
+            # Session row, module states and module results in one query
+            session_state = self._repository.load_session(db, session_id)
+            db.close()
 
-            if not session_model:
+            if not session_state:
                 logger.debug(f"Session not found: {session_id}")
-                db.close()
                 return None
 
-            # Convert to SessionState
-            session_state = SessionState(
-                session_id=session_model.session_id,
-                user_id=session_model.user_id,
-                current_module=session_model.current_module,
-                module_history=session_model.module_history or [],
-                module_states={},  # Load from AssessmentModuleState
-                module_results={},  # Load from AssessmentModuleResult
-                started_at=session_model.started_at,
-                updated_at=session_model.updated_at,
-                completed_at=session_model.completed_at,
-                is_complete=session_model.is_complete,
-                metadata=session_model.metadata or {}
-            )
-
-            # Load module states
-            module_states = db.query(AssessmentModuleStateModel).filter(
-                AssessmentModuleStateModel.session_id == session_id
-            ).all()
-
-            for state in module_states:
-                session_state.module_states[state.module_name] = state.state_data
-
-            # Load module results - handle missing parsing_method column gracefully
-            try:
-                module_results = db.query(AssessmentModuleResultModel).filter(
-                    AssessmentModuleResultModel.session_id == session_model.id
-                ).all()
-
-                for result in module_results:
-                    # Access result_data safely (may be results_data or result_data depending on model)
-                    result_data = getattr(result, 'results_data', None) or getattr(result, 'result_data', None)
-                    if result_data:
-                        session_state.module_results[result.module_name] = result_data
-            except Exception as e:
-                # If there's an error (e.g., missing column), log and continue
-                logger.warning(f"Could not load module results (may have schema mismatch): {e}")
-                # Try to load without the problematic column by using raw SQL or skipping
-                try:
-                    # Try alternative query that doesn't select parsing_method
-                    from sqlalchemy import text
-                    query_text = text("""
-                        SELECT module_name, results_data 
-                        FROM assessment_module_results 
-                        WHERE session_id = :session_id
-                    """)
-                    raw_results = db.execute(query_text, {"session_id": str(session_model.id)}).fetchall()
-                    for row in raw_results:
-                        session_state.module_results[row[0]] = row[1]
-                except Exception as e2:
-                    logger.debug(f"Could not load module results with alternative method: {e2}")
-
-            db.close()
-
             # Update cache
             self._session_cache[session_id] = session_state
 
@@ -393,12 +354,10 @@ class ModeratorDatabase:
                     logger.warning("Database not available - cannot update session")
                     return False
 
-                # Get session model
-                session_model = db.query(AssessmentSessionModel).filter(
-                    AssessmentSessionModel.session_id == session_state.session_id
-                ).first()
+                # UPDATE in place (no prior SELECT)
+                updated = self._repository.update_session(db, session_state)
 
-                if not session_model:
+                if not updated:
                     # Session doesn't exist - try to create it
                     logger.debug(f"Session not found in database, attempting to create: {session_state.session_id}")
                     if db:
@@ -414,15 +373,6 @@ class ModeratorDatabase:
                     # Create session (with retry logic)
                     return self.create_session(session_state, patient_id, max_retries=max_retries)
 
-                # Update session model
-                session_model.current_module = session_state.current_module
-                session_model.module_history = session_state.module_history
-                session_model.updated_at = datetime.now()
-                session_model.completed_at = session_state.completed_at
-                session_model.is_complete = session_state.is_complete
-                session_model.metadata = session_state.metadata
-
-                db.commit()
                 db.close()
 
                 # Update cache
@@ -513,19 +463,17 @@ class ModeratorDatabase:
                 logger.warning("Database not available - cannot save module result")
                 return False
 
-            # Get session model first to get the UUID
-            session_model = db.query(AssessmentSessionModel).filter(
-                AssessmentSessionModel.session_id == session_id
-            ).first()
+            # Session UUID (cached after the first lookup)
+            keys = self._repository.session_keys(db, session_id)
             
-            if not session_model:
+            if not keys:
                 logger.warning(f"Session not found: {session_id}")
                 db.close()
                 return False
             
             # Get or create module result using session model ID
             module_result = db.query(AssessmentModuleResultModel).filter(
-                AssessmentModuleResultModel.session_id == session_model.id,
+                AssessmentModuleResultModel.session_id == keys.id,
                 AssessmentModuleResultModel.module_name == module_name
             ).first()
 
@@ -534,7 +482,7 @@ class ModeratorDatabase:
                 module_result.updated_at = datetime.now()
             else:
                 module_result = AssessmentModuleResultModel(
-                    session_id=session_model.id,  # Use session model ID (UUID)
+                    session_id=keys.id,  # Use session model ID (UUID)
                     module_name=module_name,
                     result_data=result,
                     updated_at=datetime.now()
@@ -624,8 +572,8 @@ class ModeratorDatabase:
             db.close()
 
             # Remove from cache
-            if session_id in self._session_cache:
-                del self._session_cache[session_id]
+            self._session_cache.delete(session_id)
+            self._repository.forget(session_id)
 
             logger.info(f"Deleted session {session_id}")
             return True
@@ -754,15 +702,9 @@ class ModeratorDatabase:
                 logger.warning("Database not available - cannot store conversation message")
                 return False
             
-            # Ensure patient_id is available and in UUID format
+            # Ensure patient_id is in UUID format (None: the session's patient)
             from uuid import UUID
-            if patient_id is None:
-                patient_id_uuid = self.get_patient_id_from_session(session_id, db_session=db)
-                if not patient_id_uuid:
-                    logger.error(f"Unable to determine patient_id for session {session_id} - aborting store_module_data")
-                    db.close()
-                    return False
-            elif isinstance(patient_id, str):
+            if isinstance(patient_id, str):
                 try:
                     patient_id_uuid = UUID(patient_id)
                 except ValueError:
@@ -772,38 +714,26 @@ class ModeratorDatabase:
             else:
                 patient_id_uuid = patient_id
             
-            # Get session model to get the UUID
-            session_model = db.query(AssessmentSessionModel).filter(
-                AssessmentSessionModel.session_id == session_id
-            ).first()
-            
-            if not session_model:
-                logger.error(f"Session not found: {session_id}")
-                db.close()
-                return False
-            
             # Prepare metadata
             message_metadata = metadata or {}
             if message_type:
                 message_metadata["message_type"] = message_type
             
-            # Create conversation record
-            conversation = AssessmentConversationModel(
-                session_id=session_model.id,  # Use UUID, not session_id string
-                patient_id=patient_id_uuid,
-                module_name=module_name,
+            # Journaled against the cached session UUID (batched INSERT)
+            stored = self._repository.add_message(
+                db,
+                session_id,
                 role=role,
                 message=message,
-                message_metadata=message_metadata,
-                timestamp=datetime.now()
+                patient_id=patient_id_uuid,
+                module_name=module_name,
+                metadata=message_metadata
             )
-            
-            db.add(conversation)
-            db.commit()
             db.close()
             
-            logger.debug(f"Stored conversation message for session {session_id}, role: {role}")
-            return True
+            if stored:
+                logger.debug(f"Stored conversation message for session {session_id}, role: {role}")
+            return stored
             
         except Exception as e:
             logger.error(f"Error storing conversation message: {e}", exc_info=True)
@@ -829,19 +759,20 @@ class ModeratorDatabase:
                 logger.warning("Database not available - cannot get conversation history")
                 return []
             
-            # Get session model to get the UUID
-            session_model = db.query(AssessmentSessionModel).filter(
-                AssessmentSessionModel.session_id == session_id
-            ).first()
+            # Write journaled messages first so none are missed
+            self._repository.flush_messages(session_id)
             
-            if not session_model:
+            # Session UUID (cached after the first lookup)
+            keys = self._repository.session_keys(db, session_id)
+            
+            if not keys:
                 logger.debug(f"Session not found: {session_id}")
                 db.close()
                 return []
             
             # Get conversations
             query = db.query(AssessmentConversationModel).filter(
-                AssessmentConversationModel.session_id == session_model.id
+                AssessmentConversationModel.session_id == keys.id
             ).order_by(AssessmentConversationModel.timestamp.asc())
             
             # Apply limit if provided
@@ -1058,8 +989,8 @@ class ModeratorDatabase:
             db.close()
 
             # Remove from cache
-            if session_id in self._session_cache:
-                del self._session_cache[session_id]
+            self._session_cache.delete(session_id)
+            self._repository.forget(session_id)
 
             logger.info(f"Deleted session {session_id}")
             return True
@@ -1109,17 +1040,15 @@ class ModeratorDatabase:
                 logger.error(f"Missing required parameters: session_id={session_id}, module_name={module_name}, data_content={data_content is not None}")
                 return False
             
-            # Get session model
-            session_model = db.query(AssessmentSessionModel).filter(
-                AssessmentSessionModel.session_id == session_id
-            ).first()
+            # Session keys (cached after the first lookup)
+            keys = self._repository.session_keys(db, session_id)
             
-            if not session_model:
+            if not keys:
                 logger.error(f"Session not found: {session_id}")
                 db.close()
                 return False
             
-            # Ensure patient_id is UUID format
+            # Ensure patient_id is UUID format (None: the session's patient)
             from uuid import UUID
             if isinstance(patient_id, str):
                 try:
@@ -1129,11 +1058,11 @@ class ModeratorDatabase:
                     db.close()
                     return False
             else:
-                patient_id_uuid = patient_id
+                patient_id_uuid = patient_id or keys.patient_id
             
             # Create module data record
             module_data = AssessmentModuleDataModel(
-                session_id=session_model.id,  # Use UUID, not session_id string
+                session_id=keys.id,  # Use UUID, not session_id string
                 patient_id=patient_id_uuid,
                 module_name=module_name,
                 module_version=module_version,
@@ -1180,19 +1109,17 @@ class ModeratorDatabase:
                 logger.warning("Database not available - cannot get module data")
                 return []
             
-            # Get session model
-            session_model = db.query(AssessmentSessionModel).filter(
-                AssessmentSessionModel.session_id == session_id
-            ).first()
+            # Session UUID (cached after the first lookup)
+            keys = self._repository.session_keys(db, session_id)
             
-            if not session_model:
+            if not keys:
                 logger.debug(f"Session not found: {session_id}")
                 db.close()
                 return []
             
             # Build query
             query = db.query(AssessmentModuleDataModel).filter(
-                AssessmentModuleDataModel.session_id == session_model.id
+                AssessmentModuleDataModel.session_id == keys.id
             )
             
             if module_name:
@@ -1256,19 +1183,17 @@ class ModeratorDatabase:
                 logger.warning("Database not available - cannot get module results")
                 return None
             
-            # Get session model first to get the UUID
-            session_model = db.query(AssessmentSessionModel).filter(
-                AssessmentSessionModel.session_id == session_id
-            ).first()
+            # Session UUID (cached after the first lookup)
+            keys = self._repository.session_keys(db, session_id)
             
-            if not session_model:
+            if not keys:
                 logger.debug(f"Session not found: {session_id}")
                 db.close()
                 return None
             
             # Query module results using session model ID
             query = db.query(AssessmentModuleResultModel).filter(
-                AssessmentModuleResultModel.session_id == session_model.id
+                AssessmentModuleResultModel.session_id == keys.id
             )
             
             if module_name:
@@ -1308,19 +1233,17 @@ class ModeratorDatabase:
                 logger.warning("Database not available - cannot get all module results")
                 return {}
             
-            # Get session model first to get the UUID
-            session_model = db.query(AssessmentSessionModel).filter(
-                AssessmentSessionModel.session_id == session_id
-            ).first()
+            # Session UUID (cached after the first lookup)
+            keys = self._repository.session_keys(db, session_id)
             
-            if not session_model:
+            if not keys:
                 logger.debug(f"Session not found: {session_id}")
                 db.close()
                 return {}
             
             # Query all module results using session model ID
             module_results = db.query(AssessmentModuleResultModel).filter(
-                AssessmentModuleResultModel.session_id == session_model.id
+                AssessmentModuleResultModel.session_id == keys.id
             ).all()
             
             # Build dictionary mapping module names to results
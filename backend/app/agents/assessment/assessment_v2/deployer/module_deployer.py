@@ -75,7 +75,8 @@ class SCIDCV2ModuleDeployer:
         self.answered_questions = set()
         self.conversation_history = []
         self.responses = []
-        self.dsm_criteria_status = {}
+        self.dsm_criteria_engine.reset()
+        self.dsm_criteria_status = self.dsm_criteria_engine.criteria_status
         self.start_time = datetime.now()
         self.safety_alert_triggered = False
         
@@ -197,7 +198,8 @@ class SCIDCV2ModuleDeployer:
                 module=self.module,
                 answered_questions=self.answered_questions,
                 dsm_criteria_status=self.dsm_criteria_status,
-                conversation_history=self.conversation_history
+                conversation_history=self.conversation_history,
+                criteria_bounds=self.dsm_criteria_engine.get_bounds(self.module.dsm_criteria)
             )
             
             if not next_question:
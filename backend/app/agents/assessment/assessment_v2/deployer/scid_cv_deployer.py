@@ -55,6 +55,8 @@ except ImportError as e:
         logger.error(f"Could not import module registry from either location: {e2}")
         CV_MODULE_REGISTRY = {}
 
+from ..core.module_catalog import get_module_catalog
+
 # Import selector types (will be migrated next)
 try:
     from ..selector.module_selector import ModuleSelection
@@ -252,9 +254,14 @@ class SCID_CV_ModuleDeployer(BaseAssessmentModule):
                 logger.error(f"Module {module_id} not found in registry. Available modules: {list(CV_MODULE_REGISTRY.keys())[:10]}")
                 return False
             
-            # Create module instance
-            module_creator = CV_MODULE_REGISTRY[module_id]
-            self.scid_module = module_creator()
+            # Shared definition from the catalog; build directly if it is unavailable
+            try:
+                self.scid_module = get_module_catalog().get(module_id)
+            except Exception as e:
+                logger.warning(f"SCID module catalog unavailable: {e}")
+                self.scid_module = None
+            if self.scid_module is None:
+                self.scid_module = CV_MODULE_REGISTRY[module_id]()
             
             logger.info(f"Loaded SCID-CV module: {self.scid_module.name} ({module_id})")
             return True
@@ -916,10 +923,7 @@ class SCID_CV_ModuleDeployer(BaseAssessmentModule):
         
         for response in self.responses:
             # Find the question
-            question = next(
-                (q for q in self.scid_module.questions if q.id == response.question_id),
-                None
-            )
+            question = self.scid_module.get_question_by_id(response.question_id)
             
             if not question:
                 continue
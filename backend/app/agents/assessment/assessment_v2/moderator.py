@@ -4,9 +4,12 @@ Uses assessment_v2 structure with continuous SRA service integration
 NOTE: SRA is a continuous background service, not a module in the flow
 """
 
+import asyncio
 import logging
 import importlib
-from typing import Dict, Any, Optional, List
+import threading
+from functools import partial
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, TypeVar
 from datetime import datetime 
 import uuid
 
@@ -47,6 +50,8 @@ try:
 except ImportError:
     from app.agents.assessment.assessment_v2.database import ModeratorDatabase
 
+from app.agents.core.state_store import StateVersionConflict, create_state_store
+
 from app.core.logging_config import get_logger
 logger = get_logger(__name__)
 
@@ -61,6 +66,8 @@ except ImportError:
     ADAPTER_AVAILABLE = False
     logger.warning("SCIDModuleAdapter not available - SCID modules may not work")
 
+from .core.module_catalog import LazyModules, get_module_catalog
+
 # Import SRA service for integration (optional - modules using response_processor will automatically use SRA)
 try:
     from .core.sra_service import get_sra_service
@@ -70,6 +77,37 @@ except ImportError:
     get_sra_service = None
     logger.warning("SRA service not available - symptom extraction will be limited")
 
+T = TypeVar("T")
+
+# Event loop that runs the async moderator for synchronous callers. One
+# long-lived loop keeps the LLM transport's connection pool warm across calls.
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    global _sync_loop
+    if _sync_loop is None:
+        with _sync_loop_lock:
+            if _sync_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="assessment-sync-loop", daemon=True).start()
+                _sync_loop = loop
+    return _sync_loop
+
+
+def _run_sync(coro: Awaitable[T]) -> T:
+    """Run a moderator coroutine to completion for a synchronous caller"""
+    loop = _get_sync_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("Synchronous AssessmentModerator API called from its own event loop; await the *_async method instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
 
 class AssessmentModerator:
     """
@@ -82,6 +120,8 @@ class AssessmentModerator:
     - DA runs after ALL diagnostic modules complete
     - TPA runs after DA completes
     - All responses are automatically processed through SRA service
+    - Async-native API (start_assessment_async, process_message_async,
+      deploy_module_async) that never blocks the event loop
     
     The moderator is responsible for:
     - Loading and registering assessment modules from assessment_v2
@@ -103,6 +143,14 @@ class AssessmentModerator:
             session_id="abc",
             message="I'm 25 years old"
         )
+        
+        # From async code (e.g. FastAPI routes) use the *_async variants;
+        # the sync methods above are thin wrappers around them
+        response = await moderator.process_message_async(
+            user_id="123",
+            session_id="abc",
+            message="I'm 25 years old"
+        )
     """
     
     def __init__(self, db_path: Optional[str] = None):
@@ -112,8 +160,14 @@ class AssessmentModerator:
         Args:
             db_path: Path to database file. If None, uses config default.
         """
-        self.modules: Dict[str, BaseAssessmentModule] = {}
-        self.sessions: Dict[str, SessionState] = {}  # In-memory cache
+        # Modules are created on first use; SCID definitions come from the shared catalog
+        self.modules: Dict[str, BaseAssessmentModule] = LazyModules()
+        # Bounded LRU/TTL session cache, optionally shared across workers through Redis
+        self.sessions = create_state_store(
+            "assessment",
+            serialize=lambda state: {**state.to_dict(), "current_metadata": state.current_metadata},
+            deserialize=SessionState.from_dict,
+        )
         
         # Initialize database (with error handling)
         try:
@@ -201,25 +255,15 @@ class AssessmentModerator:
     # ========================================================================
     
     def _register_modules(self):
-        """Load and register all enabled modules from the registry"""
+        """Register all enabled modules from the registry; each loads on first use"""
         for module_name, module_config in MODULE_REGISTRY.items():
             if not module_config.enabled:
                 logger.debug(f"Skipping disabled module: {module_name}")
                 continue
             
-            try:
-                # Load module from class_path
-                module_instance = self._load_module(module_config.class_path)
-                
-                if module_instance:
-                    self.modules[module_name] = module_instance
-                    logger.debug(f"Registered module: {module_name} v{getattr(module_instance, 'module_version', '1.0.0')}")
-                else:
-                    logger.warning(f"Failed to load module: {module_name}")
-                    
-            except Exception as e:
-                logger.error(f"Error registering module {module_name}: {e}", exc_info=True)
-                # Continue with other modules even if one fails
+            # Loading (import + construction) is deferred until the module is first reached
+            self.modules.register(module_name, partial(self._load_module, module_config.class_path))
+            logger.debug(f"Registered module: {module_name}")
     
     def _load_module(self, class_path: str) -> Optional[BaseAssessmentModule]:
         """
@@ -233,6 +277,16 @@ class AssessmentModerator:
             Module instance or None if loading fails
         """
         try:
+            # SCID module factories are served from the shared catalog without importing them
+            if ADAPTER_AVAILABLE:
+                catalog = get_module_catalog()
+                module_id = catalog.resolve(class_path)
+                if module_id:
+                    scid_module = catalog.get(module_id)
+                    if scid_module is not None:
+                        logger.debug(f"Wrapping catalog module {scid_module.id} in SCIDModuleAdapter")
+                        return SCIDModuleAdapter(scid_module)
+            
             # Split the path into module path and class/function name
             parts = class_path.rsplit('.', 1)
             if len(parts) != 2:
@@ -306,101 +360,155 @@ class AssessmentModerator:
         Returns:
             Greeting message string
         """
-        try:
-            # Check if we have any modules loaded
-            if len(self.modules) == 0:
-                logger.warning(f"No modules available for session {session_id} - using fallback greeting")
-                # Create a minimal session state
-                session_state = SessionState(
-                    session_id=session_id,
-                    user_id=user_id,
-                    current_module=None,
-                    metadata={"patient_id": user_id, "degraded_mode": True}
-                )
-                self.sessions[session_id] = session_state
-                return "Welcome! I'm ready to help you with your assessment. However, some assessment modules are currently unavailable. Please contact support if you need assistance."
-            
-            # Get starting module
-            try:
-                starting_module_name = get_starting_module()
-            except Exception as e:
-                logger.warning(f"Could not get starting module: {e} - using first available module")
-                # Use first available module as fallback
-                starting_module_name = list(self.modules.keys())[0] if self.modules else None
-            
-            if not starting_module_name:
-                return "Welcome! Let's begin your assessment."
-            
-            # Create session state
-            session_state = SessionState(
-                session_id=session_id,
-                user_id=user_id,
-                current_module=starting_module_name,
-                metadata={
-                    "patient_id": user_id,
-                    "module_sequence": self.module_sequence,
-                    "flow_info": self.flow_info,
-                    "background_services": self.background_services,
-                    "total_estimated_duration": self.total_estimated_duration,
-                    "module_timeline": self._initialize_module_timeline(starting_module_name),
-                }
-            )
+        return _run_sync(self.start_assessment_async(user_id, session_id))
+    
+    async def start_assessment_async(self, user_id: str, session_id: str) -> str:
+        """
+        Start a new assessment session without blocking the event loop.
+        
+        The session is written to the database while the first module starts.
+        
+        Args:
+            user_id: User identifier
+            session_id: Session identifier
             
-            self.sessions[session_id] = session_state
+        Returns:
+            Greeting message string
+        """
+        try:
+            session_state, greeting = await asyncio.to_thread(self._open_session, user_id, session_id)
+            if greeting is not None:
+                return greeting
             
-            # Persist session to database if available
-            if hasattr(self, 'db') and self.db:
-                try:
-                    # Try to get patient_id from metadata or use user_id
-                    patient_id = session_state.metadata.get("patient_id", user_id) if session_state.metadata else user_id
-                    # Check if session already exists in database
-                    existing_session = self.db.get_session(session_id)
-                    if not existing_session:
-                        # Create session in database
-                        success = self.db.create_session(session_state, patient_id)
-                        if success:
-                            logger.debug(f"Session {session_id} persisted to database")
-                        else:
-                            logger.warning(f"Failed to persist session {session_id} to database")
-                    else:
-                        logger.debug(f"Session {session_id} already exists in database")
-                except Exception as e:
-                    logger.warning(f"Could not persist session to database: {e}")
-                    # Continue even if database persistence fails
+            starting_module_name = session_state.current_module
+            module = await self._get_module_async(starting_module_name)
+            if module is not None:
+                self._mark_module_started(session_state, starting_module_name)
             
-            # Start the first module
-            if starting_module_name in self.modules:
-                module = self.modules[starting_module_name]
+            # Persist session to database alongside the module start
+            persisted = asyncio.create_task(asyncio.to_thread(self._persist_new_session, session_state, user_id))
+            try:
+                if module is None:
+                    logger.warning(f"Starting module '{starting_module_name}' not found in loaded modules")
+                    return "Welcome! Let's begin your assessment."
                 try:
-                    self._mark_module_started(session_state, starting_module_name)
-                    response = module.start_session(user_id=user_id, session_id=session_id)
+                    response = await module.start_session_async(user_id=user_id, session_id=session_id)
+                    await asyncio.to_thread(self._checkpoint_module, module, session_id)
                     return response.message if hasattr(response, 'message') else str(response)
                 except Exception as e:
                     logger.error(f"Error starting module {starting_module_name}: {e}", exc_info=True)
                     return f"Welcome! Let's begin your assessment. I'm ready to help you."
-            else:
-                logger.warning(f"Starting module '{starting_module_name}' not found in loaded modules")
-                return "Welcome! Let's begin your assessment."
+            finally:
+                await persisted
                 
         except Exception as e:
             logger.error(f"Error starting assessment: {e}", exc_info=True)
             # Create minimal session state even on error
             try:
-                session_state = SessionState(
+                self.sessions[session_id] = SessionState(
                     session_id=session_id,
                     user_id=user_id,
                     current_module=None,
                     metadata={"patient_id": user_id, "error": str(e)}
                 )
-                self.sessions[session_id] = session_state
             except:
                 pass
             return "Welcome! Let's begin your assessment."
     
+    def _open_session(self, user_id: str, session_id: str) -> Tuple[Optional[SessionState], Optional[str]]:
+        """
+        Create and store the state of a new session.
+        
+        Returns:
+            (session_state, None), or (session_state or None, greeting) when
+            there is no module to start
+        """
+        # Check if we have any modules loaded
+        if len(self.modules) == 0:
+            logger.warning(f"No modules available for session {session_id} - using fallback greeting")
+            # Create a minimal session state
+            session_state = SessionState(
+                session_id=session_id,
+                user_id=user_id,
+                current_module=None,
+                metadata={"patient_id": user_id, "degraded_mode": True}
+            )
+            self.sessions[session_id] = session_state
+            return session_state, "Welcome! I'm ready to help you with your assessment. However, some assessment modules are currently unavailable. Please contact support if you need assistance."
+        
+        # Get starting module
+        try:
+            starting_module_name = get_starting_module()
+        except Exception as e:
+            logger.warning(f"Could not get starting module: {e} - using first available module")
+            # Use first available module as fallback
+            starting_module_name = list(self.modules.keys())[0] if self.modules else None
+        
+        if not starting_module_name:
+            return None, "Welcome! Let's begin your assessment."
+        
+        # Create session state
+        session_state = SessionState(
+            session_id=session_id,
+            user_id=user_id,
+            current_module=starting_module_name,
+            metadata={
+                "patient_id": user_id,
+                "module_sequence": self.module_sequence,
+                "flow_info": self.flow_info,
+                "background_services": self.background_services,
+                "total_estimated_duration": self.total_estimated_duration,
+                "module_timeline": self._initialize_module_timeline(starting_module_name),
+            }
+        )
+        
+        self.sessions[session_id] = session_state
+        return session_state, None
+    
+    def _persist_new_session(self, session_state: SessionState, user_id: str) -> None:
+        """Create the session in the database unless it already exists there"""
+        if not (hasattr(self, 'db') and self.db):
+            return
+        try:
+            # Try to get patient_id from metadata or use user_id
+            patient_id = session_state.metadata.get("patient_id", user_id) if session_state.metadata else user_id
+            # Check if session already exists in database
+            existing_session = self.db.get_session(session_state.session_id)
+            if not existing_session:
+                # Create session in database
+                success = self.db.create_session(session_state, patient_id)
+                if success:
+                    logger.debug(f"Session {session_state.session_id} persisted to database")
+                else:
+                    logger.warning(f"Failed to persist session {session_state.session_id} to database")
+            else:
+                logger.debug(f"Session {session_state.session_id} already exists in database")
+        except Exception as e:
+            logger.warning(f"Could not persist session to database: {e}")
+            # Continue even if database persistence fails
+    
     def process_message(self, user_id: str, session_id: str, message: str) -> str:
         """
         Process a user message in the assessment session.
         
+        Args:
+            user_id: User identifier
+            session_id: Session identifier
+            message: User message
+            
+        Returns:
+            Response message string
+        """
+        return _run_sync(self.process_message_async(user_id, session_id, message))
+    
+    async def process_message_async(self, user_id: str, session_id: str, message: str) -> str:
+        """
+        Process a user message without blocking the event loop.
+        
+        LLM calls are awaited natively by SCID modules; blocking modules,
+        database and state store calls run in worker threads. On a module
+        transition the session is saved while the next module starts.
+        
         Args:
             user_id: User identifier
             session_id: Session identifier
@@ -411,32 +519,24 @@ class AssessmentModerator:
         """
         try:
             # Get session state
-            session_state = self.get_session_state(session_id)
+            session_state = await asyncio.to_thread(self.get_session_state, session_id)
             if not session_state:
                 # Create new session if doesn't exist
-                return self.start_assessment(user_id, session_id)
+                return await self.start_assessment_async(user_id, session_id)
             
             # Get current module
             current_module_name = session_state.current_module
-            if not current_module_name or current_module_name not in self.modules:
+            module = await self._get_module_async(current_module_name)
+            if module is None:
                 logger.error(f"Invalid current module: {current_module_name}")
                 return "I'm sorry, there was an error. Please try starting a new assessment."
             
             # Process message through current module
-            module = self.modules[current_module_name]
-            response = module.process_message(message=message, session_id=session_id, user_id=user_id)
+            response = await module.process_message_async(message=message, session_id=session_id, user_id=user_id)
             
             # Update session state
             session_state.updated_at = datetime.now()
             
-            # Persist session update to database
-            if hasattr(self, 'db') and self.db:
-                try:
-                    self.db.update_session(session_state)
-                except Exception as e:
-                    logger.debug(f"Could not update session in database: {e}")
-                    # Continue even if database update fails
-            
             # Check if module is complete
             # Priority: response.is_complete (from ModuleResponse) takes precedence
             # Then check module.is_complete() as fallback
@@ -448,88 +548,140 @@ class AssessmentModerator:
                     logger.debug(f"Error checking module completion: {e}")
                     module_complete = False
             
-            if module_complete:
-                # Store module results before transitioning
-                try:
-                    if hasattr(module, 'get_results'):
-                        module_results = module.get_results(session_id)
-                        if module_results:
-                            if not session_state.module_results:
-                                session_state.module_results = {}
-                            session_state.module_results[current_module_name] = module_results
-                except Exception as e:
-                    logger.debug(f"Could not store module results: {e}")
-                
-                self._mark_module_completed(session_state, current_module_name)
-                if current_module_name not in session_state.module_history:
-                    session_state.module_history.append(current_module_name)
-                
-                # Determine next module with special handling for DA/TPA
-                next_module = self._determine_next_module(current_module_name, session_state)
+            if not module_complete:
+                await asyncio.to_thread(self._save_session, session_state, module)
+                return response.message
+            
+            # Store module results and determine next module with special handling for DA/TPA
+            next_module = await asyncio.to_thread(
+                self._finish_module, session_state, current_module_name, module
+            )
+            
+            if next_module is None:
+                # No next module - assessment complete
+                session_state.is_complete = True
+                session_state.completed_at = datetime.now()
+                self._mark_assessment_completed(session_state)
                 
-                if next_module and next_module in self.modules:
-                    session_state.current_module = next_module
-                    self._mark_module_started(session_state, next_module)
-                    
-                    # Create smooth transition message
-                    transition_message = self._create_transition_message(current_module_name, next_module)
-                    
-                    # Start next module (this will trigger selector activation for SCID modules)
-                    next_module_instance = self.modules[next_module]
-                    
-                    # Pass previous module results for selector context
-                    previous_results = session_state.module_results if hasattr(session_state, 'module_results') else {}
-                    next_response = next_module_instance.start_session(
-                        user_id=user_id, 
-                        session_id=session_id,
-                        previous_module_results=previous_results
-                    )
-                    
-                    # Combine transition message with next module greeting
-                    # For SCID modules, the greeting already includes context, so we can be more concise
-                    if next_module in ["scid_screening", "scid_cv_diagnostic"]:
-                        # SCID modules have their own intro, so transition message is sufficient
-                        combined_message = f"{transition_message}\n\n{next_response.message}"
-                    else:
-                        combined_message = f"{transition_message}\n\n{next_response.message}"
-                    
-                    # Persist module transition to database
-                    if hasattr(self, 'db') and self.db:
-                        try:
-                            self.db.update_session(session_state)
-                        except Exception as e:
-                            logger.debug(f"Could not update session after module transition: {e}")
-                    
-                    return combined_message
-                else:
-                    # No next module - assessment complete
-                    session_state.is_complete = True
-                    session_state.completed_at = datetime.now()
-                    self._mark_assessment_completed(session_state)
-                    
-                    # Persist completion to database
-                    if hasattr(self, 'db') and self.db:
-                        try:
-                            self.db.update_session(session_state)
-                        except Exception as e:
-                            logger.debug(f"Could not update session after completion: {e}")
-                    
-                    return response.message + "\n\nYou have completed the assessment. Thank you!"
+                # Persist completion to database
+                await asyncio.to_thread(self._save_session, session_state, module)
+                return response.message + "\n\nYou have completed the assessment. Thank you!"
             
-            return response.message
+            session_state.current_module = next_module
+            self._mark_module_started(session_state, next_module)
+            
+            # Create smooth transition message
+            transition_message = self._create_transition_message(current_module_name, next_module)
+            
+            # Persist module transition to database while the next module starts
+            persisted = asyncio.create_task(asyncio.to_thread(self._save_session, session_state, module))
+            try:
+                # Start next module (this will trigger selector activation for SCID modules)
+                # Pass previous module results for selector context
+                next_module_instance = await self._get_module_async(next_module)
+                previous_results = session_state.module_results if hasattr(session_state, 'module_results') else {}
+                next_response = await next_module_instance.start_session_async(
+                    user_id=user_id,
+                    session_id=session_id,
+                    previous_module_results=previous_results
+                )
+                await asyncio.to_thread(self._checkpoint_module, next_module_instance, session_id)
+            finally:
+                await persisted
+            
+            # Combine transition message with next module greeting
+            return f"{transition_message}\n\n{next_response.message}"
             
         except Exception as e:
             logger.error(f"Error processing message: {e}", exc_info=True)
             return "I'm sorry, I encountered an error processing your message. Please try again."
     
+    def _finish_module(
+        self,
+        session_state: SessionState,
+        module_name: str,
+        module: BaseAssessmentModule
+    ) -> Optional[str]:
+        """Record a completed module and return the next available module, if any"""
+        # Store module results before transitioning
+        try:
+            if hasattr(module, 'get_results'):
+                module_results = module.get_results(session_state.session_id)
+                if module_results:
+                    if not session_state.module_results:
+                        session_state.module_results = {}
+                    session_state.module_results[module_name] = module_results
+        except Exception as e:
+            logger.debug(f"Could not store module results: {e}")
+        
+        self._mark_module_completed(session_state, module_name)
+        if module_name not in session_state.module_history:
+            session_state.module_history.append(module_name)
+        
+        next_module = self._determine_next_module(module_name, session_state)
+        if next_module and next_module in self.modules:
+            return next_module
+        return None
+    
+    def _get_module(self, module_name: Optional[str]) -> Optional[BaseAssessmentModule]:
+        """Module by name, loading it on first use; None if unavailable"""
+        if not module_name or module_name not in self.modules:
+            return None
+        return self.modules[module_name]
+    
+    async def _get_module_async(self, module_name: Optional[str]) -> Optional[BaseAssessmentModule]:
+        """Like _get_module; a first load (import or unpickle) runs off the event loop"""
+        is_loaded = getattr(self.modules, 'is_loaded', None)
+        if module_name and is_loaded is not None and not is_loaded(module_name):
+            return await asyncio.to_thread(self._get_module, module_name)
+        return self._get_module(module_name)
+    
+    def _save_session(self, session_state: SessionState, module: Optional[BaseAssessmentModule] = None) -> None:
+        """Publish a session update to the state store and the database, checkpointing the module's state"""
+        self._publish_session(session_state)
+        if hasattr(self, 'db') and self.db:
+            try:
+                self.db.update_session(session_state)
+            except Exception as e:
+                logger.debug(f"Could not update session in database: {e}")
+                # Continue even if database update fails
+        if module is not None:
+            self._checkpoint_module(module, session_state.session_id)
+    
+    def _checkpoint_module(self, module: BaseAssessmentModule, session_id: str) -> None:
+        """Checkpoint a module's session state after a turn (no-op when unchanged)"""
+        checkpoint = getattr(module, 'checkpoint_state', None)
+        if checkpoint is None:
+            return
+        try:
+            checkpoint(session_id)
+        except Exception as e:
+            logger.debug(f"Could not checkpoint {module.module_name} for session {session_id}: {e}")
+    
     def get_current_module(self, session_id: str) -> Optional[str]:
         """Get the current active module for a session"""
         session_state = self.get_session_state(session_id)
         return session_state.current_module if session_state else None
     
     def get_session_state(self, session_id: str) -> Optional[SessionState]:
-        """Get session state for a session"""
-        return self.sessions.get(session_id)
+        """Get session state for a session (reloading evicted sessions from the database)"""
+        session_state = self.sessions.get(session_id)
+        if session_state is None and getattr(self, 'db', None):
+            try:
+                session_state = self.db.get_session(session_id)
+            except Exception as e:
+                logger.debug(f"Could not reload session {session_id} from database: {e}")
+                session_state = None
+            if session_state is not None:
+                self.sessions[session_id] = session_state
+        return session_state
+    
+    def _publish_session(self, session_state: SessionState) -> None:
+        """Push an updated session to the state store so other workers see it"""
+        try:
+            self.sessions.put(session_state.session_id, session_state)
+        except StateVersionConflict:
+            logger.warning(f"Session {session_state.session_id} was updated concurrently; keeping newer version")
     
     def get_session_progress(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get progress information for a session"""
@@ -540,8 +692,7 @@ class AssessmentModerator:
     
     def cleanup_session(self, session_id: str) -> None:
         """Clean up a session from memory"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        self.sessions.delete(session_id)
 
     def get_session_analytics(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed analytics for a session"""
@@ -621,11 +772,16 @@ class AssessmentModerator:
 
     def switch_module(self, session_id: str, module_name: str, user_id: str) -> bool:
         """Switch to a different module in the current session"""
-        session_state = self.get_session_state(session_id)
+        return _run_sync(self.switch_module_async(session_id, module_name, user_id))
+    
+    async def switch_module_async(self, session_id: str, module_name: str, user_id: str) -> bool:
+        """Async counterpart of switch_module"""
+        session_state = await asyncio.to_thread(self.get_session_state, session_id)
         if not session_state:
             return False
         
-        if module_name not in self.modules:
+        module = await self._get_module_async(module_name)
+        if module is None:
             logger.error(f"Module {module_name} not found")
             return False
         
@@ -637,8 +793,8 @@ class AssessmentModerator:
         
         # Start the new module
         try:
-            module = self.modules[module_name]
-            module.start_session(user_id=user_id, session_id=session_id)
+            await module.start_session_async(user_id=user_id, session_id=session_id)
+            await asyncio.to_thread(self._checkpoint_module, module, session_id)
             return True
         except Exception as e:
             logger.error(f"Error switching to module {module_name}: {e}")
@@ -981,15 +1137,19 @@ class AssessmentModerator:
 
     def deploy_module(self, module_name: str, session_id: str, user_id: str, force: bool = False) -> bool:
         """Deploy a module for a session"""
-        if module_name not in self.modules:
+        return _run_sync(self.deploy_module_async(module_name, session_id, user_id, force))
+    
+    async def deploy_module_async(self, module_name: str, session_id: str, user_id: str, force: bool = False) -> bool:
+        """Async counterpart of deploy_module"""
+        if await self._get_module_async(module_name) is None:
             logger.error(f"Module {module_name} not found")
             return False
         
-        session_state = self.get_session_state(session_id)
+        session_state = await asyncio.to_thread(self.get_session_state, session_id)
         if not session_state:
             # Create new session
-            self.start_assessment(user_id, session_id)
-            session_state = self.get_session_state(session_id)
+            await self.start_assessment_async(user_id, session_id)
+            session_state = await asyncio.to_thread(self.get_session_state, session_id)
         
         if not session_state:
             return False
@@ -999,5 +1159,4 @@ class AssessmentModerator:
             return True
         
         # Switch to the module
-        return self.switch_module(session_id, module_name, user_id)
-
+        return await self.switch_module_async(session_id, module_name, user_id)
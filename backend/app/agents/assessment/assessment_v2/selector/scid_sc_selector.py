@@ -14,14 +14,16 @@ from datetime import datetime
 
 try:
     # Try assessment/scid first (copied location)
-    from app.agents.assessment.scid.scid_sc import SCID_SC_Bank, SCIDItem
+    from app.agents.assessment.scid.scid_sc import SCID_SC_Bank, SCIDItem, get_scid_bank
 except ImportError:
     try:
         # Fallback to original pima location
         from app.agents.pima.scid.scid_sc import SCID_SC_Bank, SCIDItem
+        get_scid_bank = SCID_SC_Bank
     except ImportError:
         SCID_SC_Bank = None
         SCIDItem = None
+        get_scid_bank = None
 
 try:
     # Try assessment_v2/core/llm first (preferred location)
@@ -97,7 +99,7 @@ class SCID_SC_ItemsSelector:
     def __init__(self):
         if SCID_SC_Bank:
             try:
-                self.scid_bank = SCID_SC_Bank()
+                self.scid_bank = get_scid_bank()
                 logger.info(f"SCID bank loaded successfully: {len(self.scid_bank.sc_items)} items, {len(self.scid_bank.modules)} modules")
             except Exception as e:
                 logger.error(f"Failed to initialize SCID bank: {e}")
@@ -0,0 +1,228 @@
+"""
+Session repository for the SCID-CV V2 moderator database
+Loads a session with its module states and results in one query, caches the
+session_id -> row key mapping, writes with targeted UPDATEs and journals
+conversation messages
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.agents.core.message_journal import create_message_journal
+from app.models.assessment import (
+    AssessmentConversation,
+    AssessmentModuleResult,
+    AssessmentModuleState,
+    AssessmentSession,
+)
+
+from .types import SessionState
+
+logger = logging.getLogger(__name__)
+
+
+class SessionKeys(NamedTuple):
+    """Primary key and patient of an assessment_sessions row"""
+    id: UUID
+    patient_id: Optional[UUID]
+
+
+class ModeratorSessionRepository:
+    """
+    Data access for moderator sessions.
+
+    The string session_id is resolved to the row's UUID (and patient) once and
+    cached, so per-turn writes go straight to an INSERT or UPDATE. The cache is
+    process-wide (ModeratorDatabase instances are short-lived in some callers)
+    and bounded LRU; session rows are never re-keyed, so entries only leave it
+    on eviction or deletion. An evicted session's journaled messages are
+    written out first, since flush_messages can no longer find them by key.
+    """
+
+    KEY_CACHE_SIZE = 4096
+
+    def __init__(self, key_cache_size: int = KEY_CACHE_SIZE):
+        self.key_cache_size = key_cache_size
+        self._keys: "OrderedDict[str, SessionKeys]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.key_hits = 0
+        self.key_misses = 0
+        self.messages = create_message_journal(AssessmentConversation, timestamp_field="timestamp")
+
+    # ------------------------------------------------------------------
+    # session_id -> UUID
+    # ------------------------------------------------------------------
+
+    def remember(self, session_id: str, row_id: UUID, patient_id: Optional[UUID]) -> SessionKeys:
+        """Cache the keys of a session row"""
+        keys = SessionKeys(row_id, patient_id)
+        evicted = []
+        with self._lock:
+            self._keys[session_id] = keys
+            self._keys.move_to_end(session_id)
+            while len(self._keys) > self.key_cache_size:
+                evicted.append(self._keys.popitem(last=False)[1].id)
+        for row_id in evicted:
+            if self.messages.pending(row_id):
+                self.messages.flush(row_id)
+        return keys
+
+    def forget(self, session_id: str):
+        """Drop a session's cached keys (after deleting it)"""
+        with self._lock:
+            self._keys.pop(session_id, None)
+
+    def session_keys(self, db: Session, session_id: str) -> Optional[SessionKeys]:
+        """Row UUID and patient of a session, querying only on a cache miss"""
+        with self._lock:
+            keys = self._keys.get(session_id)
+            if keys is not None:
+                self._keys.move_to_end(session_id)
+                self.key_hits += 1
+                return keys
+            self.key_misses += 1
+
+        row = db.query(AssessmentSession.id, AssessmentSession.patient_id).filter(
+            AssessmentSession.session_id == session_id
+        ).first()
+        if row is None:
+            return None
+        return self.remember(session_id, row.id, row.patient_id)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def load_session(self, db: Session, session_id: str) -> Optional[SessionState]:
+        """
+        The session with its module states and results, in one round trip.
+
+        Module states and results are aggregated into JSON objects by
+        correlated subqueries, selecting only module_name and the data column
+        (so optional columns missing from older schemas are never touched).
+        """
+        states = select(
+            func.jsonb_object_agg(AssessmentModuleState.module_name, AssessmentModuleState.state_data)
+        ).where(AssessmentModuleState.session_id == AssessmentSession.id).scalar_subquery()
+        results = select(
+            func.jsonb_object_agg(AssessmentModuleResult.module_name, AssessmentModuleResult.results_data)
+        ).where(AssessmentModuleResult.session_id == AssessmentSession.id).scalar_subquery()
+
+        row = db.query(
+            AssessmentSession.id,
+            AssessmentSession.session_id,
+            AssessmentSession.patient_id,
+            AssessmentSession.user_id,
+            AssessmentSession.current_module,
+            AssessmentSession.module_history,
+            AssessmentSession.started_at,
+            AssessmentSession.updated_at,
+            AssessmentSession.completed_at,
+            AssessmentSession.is_complete,
+            AssessmentSession.session_metadata,
+            states.label("module_states"),
+            results.label("module_results"),
+        ).filter(AssessmentSession.session_id == session_id).first()
+
+        if row is None:
+            return None
+
+        self.remember(row.session_id, row.id, row.patient_id)
+        return SessionState(
+            session_id=row.session_id,
+            user_id=row.user_id,
+            current_module=row.current_module,
+            module_history=list(row.module_history or []),
+            module_states=row.module_states or {},
+            module_results=row.module_results or {},
+            started_at=row.started_at,
+            updated_at=row.updated_at,
+            completed_at=row.completed_at,
+            is_complete=row.is_complete,
+            metadata=row.session_metadata or {},
+        )
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def update_session(self, db: Session, session_state: SessionState) -> bool:
+        """UPDATE the session row in place; False if there is no such row"""
+        updated = db.query(AssessmentSession).filter(
+            AssessmentSession.session_id == session_state.session_id
+        ).update({
+            AssessmentSession.current_module: session_state.current_module,
+            AssessmentSession.module_history: session_state.module_history,
+            AssessmentSession.updated_at: datetime.now(),
+            AssessmentSession.completed_at: session_state.completed_at,
+            AssessmentSession.is_complete: session_state.is_complete,
+            AssessmentSession.session_metadata: session_state.metadata,
+        }, synchronize_session=False)
+        db.commit()
+        return updated > 0
+
+    def add_message(
+        self,
+        db: Session,
+        session_id: str,
+        role: str,
+        message: str,
+        patient_id: Optional[UUID] = None,
+        module_name: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Journal a conversation message (batched INSERT); patient defaults to the session's"""
+        keys = self.session_keys(db, session_id)
+        if keys is None:
+            logger.error(f"Session not found: {session_id}")
+            return False
+        patient_id = patient_id or keys.patient_id
+        if patient_id is None:
+            logger.error(f"Session {session_id} has no patient_id")
+            return False
+
+        self.messages.append(keys.id, {
+            "patient_id": patient_id,
+            "module_name": module_name,
+            "role": role,
+            "message": message,
+            "message_metadata": metadata or {},
+            "timestamp": datetime.now(),
+        }, end_turn=role == "assistant")
+        return True
+
+    def flush_messages(self, session_id: str) -> int:
+        """Write a session's journaled messages before reading them back"""
+        with self._lock:
+            keys = self._keys.get(session_id)
+        return self.messages.flush(keys.id) if keys is not None else 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get key cache and message journal statistics"""
+        return {
+            "cached_keys": len(self._keys),
+            "key_hits": self.key_hits,
+            "key_misses": self.key_misses,
+            "messages": self.messages.get_stats(),
+        }
+
+
+_repository: Optional[ModeratorSessionRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_session_repository() -> ModeratorSessionRepository:
+    """Get the process-wide moderator session repository"""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = ModeratorSessionRepository()
+    return _repository
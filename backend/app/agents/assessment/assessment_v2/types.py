@@ -102,6 +102,27 @@ class SessionState:
             "is_complete": self.is_complete,
             "metadata": self.metadata
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SessionState":
+        """Rebuild from to_dict() output (plus optional current_metadata)"""
+        def _parse(value: Optional[str]) -> Optional[datetime]:
+            return datetime.fromisoformat(value) if value else None
+        
+        return cls(
+            session_id=data["session_id"],
+            user_id=data.get("user_id", ""),
+            current_module=data.get("current_module"),
+            module_history=data.get("module_history", []),
+            module_states=data.get("module_states", {}),
+            module_results=data.get("module_results", {}),
+            started_at=_parse(data.get("started_at")) or datetime.now(),
+            updated_at=_parse(data.get("updated_at")) or datetime.now(),
+            completed_at=_parse(data.get("completed_at")),
+            is_complete=data.get("is_complete", False),
+            metadata=data.get("metadata", {}),
+            current_metadata=data.get("current_metadata", {})
+        )
 
 
 @dataclass
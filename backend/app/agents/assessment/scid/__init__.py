@@ -2,11 +2,12 @@
 SCID-5-SC (Screening) and SCID-CV (Clinical Version) Resources
 """
 
-from .scid_sc import SCID_SC_Bank, SCIDItem, SCIDModule
+from .scid_sc import SCID_SC_Bank, SCIDItem, SCIDModule, get_scid_bank
 
 __all__ = [
     "SCID_SC_Bank",
     "SCIDItem",
     "SCIDModule",
+    "get_scid_bank",
 ]
 
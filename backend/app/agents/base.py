@@ -8,7 +8,7 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional
 import logging
 
-from app.core.llm_client import LLMClient
+from app.core.llm_client import LLMClient, get_shared_client
 
 
 class AgentOutput:
@@ -51,7 +51,7 @@ class BaseAgent(ABC):
         agent_name: Optional[str] = None
     ):
         self.name = agent_name or self.__class__.__name__
-        self.llm = llm_client or LLMClient()
+        self.llm = llm_client or get_shared_client()
         self.logger = logging.getLogger(f"agents.{self.name}")
     
     @abstractmethod
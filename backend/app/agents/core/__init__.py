@@ -10,7 +10,9 @@ from app.agents.core.types import (
     AgentOutput, TherapistOutput, SRAOutput, DiagnosisOutput
 )
 from app.agents.core.state import StateManager, get_state_manager
+from app.agents.core.state_store import SessionStateStore, StateVersionConflict, create_state_store
 from app.agents.core.mcp_registry import MCPToolRegistry, get_registry, register_tool
+from app.agents.core.lexicon import Lexicon, LexiconEngine, get_lexicon_engine
 
 __all__ = [
     # Types
@@ -19,6 +21,9 @@ __all__ = [
     "AgentOutput", "TherapistOutput", "SRAOutput", "DiagnosisOutput",
     # State
     "StateManager", "get_state_manager",
+    "SessionStateStore", "StateVersionConflict", "create_state_store",
     # MCP
-    "MCPToolRegistry", "get_registry", "register_tool"
+    "MCPToolRegistry", "get_registry", "register_tool",
+    # Lexicon
+    "Lexicon", "LexiconEngine", "get_lexicon_engine"
 ]
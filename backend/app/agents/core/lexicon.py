@@ -0,0 +1,488 @@
+"""
+Lexicon Matcher
+===============
+One compiled multi-pattern keyword engine shared by every symptom/risk extractor.
+
+Extractors register their vocabularies (symptoms, severity modifiers, risk
+phrases, ...) as named lexicons at import. All terms are compiled together
+into a single prefix-factored regex, so a message is scanned once for every
+extractor, and scans are memoized per text: the therapist's risk check, the
+SRA extractors and the symptom database all read the same pass over a turn.
+
+Matches respect word boundaries ("down" does not match "download", "gun" does
+not match "begun") while still accepting inflections and the derived forms
+people write: "flashbacks", "overdosed", "hopelessness", "tiredness",
+"guilty". "-less" only extends domain terms ("sleepless"); on a symptom it
+would invert the meaning ("fearless").
+
+Every hit carries its span, kind (symptom, severity, risk, ...), category,
+criteria and weight, plus whether it sits in a negated clause ("I'm not sad").
+A negator only governs a term it is directly attached to, through filler
+words at most ("not really sad", "don't feel anxious"); "never this worried"
+is not a negation. Callers decide what negation means for them: symptom
+extractors drop negated hits, risk detection deliberately keeps them.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+
+# Inflections and derived forms accepted after a term (longest first)
+_SUFFIX = r"(lessness|less|ness|ing|es|ed|s|d|y)?"
+_SUFFIX_THEN_BREAK = re.compile(_SUFFIX + r"(?:\s|$)")
+# Suffixes that negate the stem; only accepted after domain terms
+_PRIVATIVE_SUFFIXES = frozenset({"less", "lessness"})
+
+# Words that negate a term appearing shortly after them in the same clause.
+# "can't"/"cannot" are deliberately absent: "can't sleep" reports a symptom.
+NEGATORS = (
+    "not", "no", "never", "nor", "neither", "without", "hardly",
+    "don't", "dont", "doesn't", "didn't", "isn't", "aren't",
+    "wasn't", "weren't", "haven't", "hasn't", "won't", "denies", "deny",
+)
+_NEGATOR_SET = frozenset(NEGATORS)
+
+# A negator governs a term when it is one of the 3 words before it, in the
+# same clause, within this many characters, and only filler words sit
+# between them
+_NEGATION_WINDOW = 40
+_NEGATION_WORDS = 3
+_CLAUSE_BREAKS = ".,;:!?"
+NEGATION_FILLERS = frozenset({
+    "a", "an", "any", "all", "at", "really", "very", "too", "quite", "overly",
+    "particularly", "especially", "much", "more", "longer", "even", "ever",
+    "actually", "always", "i", "i'm", "im", "be", "being", "been", "am", "is",
+    "are", "was", "were", "feel", "feels", "feeling", "felt", "have", "has",
+    "had", "having", "get", "gets", "getting", "got", "experience",
+    "experiencing", "experienced",
+})
+
+# Terms naming a domain rather than a symptom: negating them usually reports
+# a problem ("no appetite", "don't sleep"), so they are never marked negated.
+DOMAIN_TERMS = frozenset({
+    "sleep", "appetite", "eating", "food", "energy", "concentration",
+    "concentrate", "focus", "attention", "memory", "remember", "motivation",
+    "interest", "weight", "hungry",
+})
+
+# Texts longer than this are scanned but not memoized
+_MAX_CACHED_TEXT = 4096
+
+
+@dataclass(frozen=True)
+class LexiconEntry:
+    """One term of a lexicon and what it means"""
+    term: str
+    kind: str = "symptom"
+    category: Optional[str] = None
+    criteria: Tuple[str, ...] = ()
+    weight: Any = None
+    negatable: bool = True
+
+
+class LexiconHit(NamedTuple):
+    """A term found in a text"""
+    entry: LexiconEntry
+    start: int
+    end: int
+    negated: bool = False
+
+    @property
+    def term(self) -> str:
+        return self.entry.term
+
+    @property
+    def kind(self) -> str:
+        return self.entry.kind
+
+    @property
+    def category(self) -> Optional[str]:
+        return self.entry.category
+
+    @property
+    def criteria(self) -> Tuple[str, ...]:
+        return self.entry.criteria
+
+    @property
+    def weight(self) -> Any:
+        return self.entry.weight
+
+
+@dataclass(frozen=True)
+class LexiconScan:
+    """All hits of one lexicon in a text, in text order (shared, so immutable)"""
+    hits: Tuple[LexiconHit, ...] = ()
+
+    def of_kind(self, kind: str, include_negated: bool = False) -> List[LexiconHit]:
+        """Hits of one kind, skipping negated ones unless asked"""
+        return [
+            h for h in self.hits
+            if h.entry.kind == kind and (include_negated or not h.negated)
+        ]
+
+    def unique(self, kind: str, include_negated: bool = False) -> List[LexiconHit]:
+        """First hit per term"""
+        seen = set()
+        result = []
+        for hit in self.of_kind(kind, include_negated):
+            if hit.entry.term not in seen:
+                seen.add(hit.entry.term)
+                result.append(hit)
+        return result
+
+    def max_weight(self, kind: str, default: Any = None, include_negated: bool = False) -> Any:
+        """Largest weight among hits of a kind (e.g. the strongest severity modifier)"""
+        weights = [h.entry.weight for h in self.of_kind(kind, include_negated)]
+        return max(weights) if weights else default
+
+    def __bool__(self) -> bool:
+        return bool(self.hits)
+
+
+_EMPTY_SCAN = LexiconScan()
+
+
+def _char_pattern(char: str) -> str:
+    if char == " ":
+        return r"\s+"
+    if char == "'":
+        return "['’]"
+    return re.escape(char)
+
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    """Regex for a character trie; longer continuations are tried first"""
+    ends_here = "" in node
+    branches = [
+        _char_pattern(char) + _trie_pattern(child)
+        for char, child in sorted(node.items()) if char != ""
+    ]
+    if not branches:
+        return ""
+    if len(branches) == 1 and not ends_here:
+        return branches[0]
+    body = "(?:" + "|".join(branches) + ")"
+    return body + "?" if ends_here else body
+
+
+def _normalize(term: str) -> str:
+    return " ".join(term.lower().replace("’", "'").split())
+
+
+def _accepts_suffix(term: str, suffix: Optional[str]) -> bool:
+    """Whether `term` + `suffix` still names the term (not "fearless")"""
+    return suffix not in _PRIVATIVE_SUFFIXES or term in DOMAIN_TERMS
+
+
+def is_negated(text: str, start: int) -> bool:
+    """Whether a negator governs the term starting at `start` (text lowercased)"""
+    preceding = text[max(0, start - _NEGATION_WINDOW):start]
+    if preceding[-1:] in _CLAUSE_BREAKS and preceding:
+        return False
+    for word in reversed(preceding.split()[-_NEGATION_WORDS:]):
+        if word[-1] in _CLAUSE_BREAKS:
+            return False  # the clause ended after this word
+        word = word.replace("’", "'").strip("\"()")
+        if word in _NEGATOR_SET:
+            return True
+        if word not in NEGATION_FILLERS:
+            return False  # the negator, if any, governs another word
+    return False
+
+
+class _TextScan:
+    """Term occurrences in one text, with per-lexicon views built on demand"""
+
+    __slots__ = ("text", "matches", "expansions", "negated", "views")
+
+    def __init__(self, text: str, matches: Tuple[Tuple[str, int, int], ...], expansions: Dict[str, Any]):
+        self.text = text
+        self.matches = matches
+        self.expansions = expansions
+        # Negation is only worked out for lexicons that care about it
+        self.negated: List[Optional[bool]] = [None] * len(matches)
+        self.views: Dict[str, LexiconScan] = {}
+
+    def view(self, name: str) -> LexiconScan:
+        view = self.views.get(name)
+        if view is None:
+            hits = []
+            for index, (term, start, end) in enumerate(self.matches):
+                for entry, offset, length in self.expansions[term].get(name, ()):
+                    negated = False
+                    if entry.negatable:
+                        if offset:
+                            negated = is_negated(self.text, start + offset)
+                        else:
+                            negated = self.negated[index]
+                            if negated is None:
+                                negated = self.negated[index] = is_negated(self.text, start)
+                    if length:
+                        hits.append(LexiconHit(entry, start + offset, start + offset + length, negated))
+                    else:
+                        hits.append(LexiconHit(entry, start, end, negated))
+            view = LexiconScan(tuple(hits)) if hits else _EMPTY_SCAN
+            self.views[name] = view
+        return view
+
+
+class LexiconEngine:
+    """
+    Every registered lexicon compiled into one word-boundary-aware regex.
+
+    Several lexicons may register overlapping terms; a match of the longest
+    one also reports the registered terms contained in it, so each lexicon
+    sees its own vocabulary as if it had been scanned alone.
+    """
+
+    def __init__(self, cache_size: int = 512):
+        self.cache_size = cache_size
+        # lexicon name -> term -> entries
+        self._sources: Dict[str, Dict[str, List[LexiconEntry]]] = {}
+        # term -> lexicon name -> (entry, offset, length); length 0 is the term itself
+        self._expansions: Dict[str, Dict[str, Tuple[Tuple[LexiconEntry, int, int], ...]]] = {}
+        self._pattern: Optional["re.Pattern"] = None
+        self._pattern_ci: Optional["re.Pattern"] = None
+        self._cache: "OrderedDict[str, _TextScan]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.scans = 0
+        self.cache_hits = 0
+
+    def register(self, name: str, entries: Iterable[LexiconEntry]):
+        """Add (or replace) a named lexicon; the engine recompiles on next use"""
+        terms: Dict[str, List[LexiconEntry]] = {}
+        for entry in entries:
+            term = _normalize(entry.term)
+            if not term:
+                continue
+            negatable = entry.negatable and term not in DOMAIN_TERMS
+            if term != entry.term or negatable != entry.negatable or not isinstance(entry.criteria, tuple):
+                entry = LexiconEntry(
+                    term=term,
+                    kind=entry.kind,
+                    category=entry.category,
+                    criteria=tuple(entry.criteria),
+                    weight=entry.weight,
+                    negatable=negatable,
+                )
+            bucket = terms.setdefault(term, [])
+            if entry not in bucket:
+                bucket.append(entry)
+
+        with self._lock:
+            self._sources[name] = terms
+            self._pattern = None
+            self._cache.clear()
+
+    def entries(self, name: str) -> Dict[str, List[LexiconEntry]]:
+        """Terms and entries of one lexicon"""
+        return self._sources.get(name, {})
+
+    def _compile(self):
+        all_terms = sorted({term for terms in self._sources.values() for term in terms})
+
+        # A match of `term` also stands for every registered term found at a
+        # word start inside it ("panic attack" -> "panic", "on edge" -> "edge"),
+        # so one non-overlapping pass still reports terms of every lexicon
+        expansions: Dict[str, Dict[str, Tuple[Tuple[LexiconEntry, int, int], ...]]] = {}
+        for term in all_terms:
+            word_starts = [0] + [i + 1 for i, char in enumerate(term) if char == " "]
+            by_source: Dict[str, List[Tuple[LexiconEntry, int, int]]] = {}
+            for offset in word_starts:
+                for other in all_terms:
+                    if other == term:
+                        if offset:
+                            continue
+                        span = (0, 0)
+                    elif term.startswith(other, offset):
+                        suffix = _SUFFIX_THEN_BREAK.match(term, offset + len(other))
+                        if not suffix or not _accepts_suffix(other, suffix.group(1)):
+                            continue
+                        span = (offset, len(other))
+                    else:
+                        continue
+                    for name, terms in self._sources.items():
+                        for entry in terms.get(other, ()):
+                            by_source.setdefault(name, []).append((entry,) + span)
+            expansions[term] = {name: tuple(found) for name, found in by_source.items()}
+
+        trie: Dict[str, Any] = {}
+        for term in all_terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        # Matched against lowercased text: case-insensitive matching is
+        # markedly slower than one str.lower() copy
+        body = r"(?<![\w'’])(" + _trie_pattern(trie) + ")" + _SUFFIX + r"(?!\w)"
+        self._expansions = expansions
+        self._pattern_ci = re.compile(body, re.IGNORECASE)
+        self._pattern = re.compile(body)
+
+    def _match(self, text: str) -> "_TextScan":
+        """The single pass over a text (memoized): every term occurrence"""
+        cacheable = len(text) <= _MAX_CACHED_TEXT
+        with self._lock:
+            if cacheable:
+                cached = self._cache.get(text)
+                if cached is not None:
+                    self._cache.move_to_end(text)
+                    self.cache_hits += 1
+                    return cached
+            if self._pattern is None:
+                self._compile()
+            pattern, pattern_ci, expansions = self._pattern, self._pattern_ci, self._expansions
+            self.scans += 1
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Case folding changed offsets; match the original text instead
+            pattern, lowered = pattern_ci, text
+
+        matches = []
+        for match in pattern.finditer(lowered):
+            term = match.group(1)
+            if term not in expansions:
+                term = _normalize(term)
+            if not _accepts_suffix(term, match.group(2)):
+                continue
+            matches.append((term,) + match.span())
+
+        result = _TextScan(lowered, tuple(matches), expansions)
+        if cacheable:
+            with self._lock:
+                self._cache[text] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def scan(self, text: str, name: str) -> LexiconScan:
+        """Hits of one lexicon in the text; all lexicons share one pass per text"""
+        if not text:
+            return _EMPTY_SCAN
+        return self._match(text).view(name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get engine statistics"""
+        lookups = self.scans + self.cache_hits
+        return {
+            "lexicons": len(self._sources),
+            "terms": len({term for terms in self._sources.values() for term in terms}),
+            "scans": self.scans,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": self.cache_hits / lookups if lookups else 0.0,
+        }
+
+
+_engine: Optional[LexiconEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_lexicon_engine() -> LexiconEngine:
+    """Get the process-wide lexicon engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = LexiconEngine()
+    return _engine
+
+
+class Lexicon:
+    """
+    A named vocabulary registered with the shared engine.
+
+    Several entries may share a term (e.g. a word that is both a symptom and
+    a severity cue); a match then yields one hit per entry.
+    """
+
+    def __init__(self, name: str, entries: Iterable[LexiconEntry], engine: Optional[LexiconEngine] = None):
+        self.name = name
+        self.engine = engine or get_lexicon_engine()
+        self.engine.register(name, entries)
+
+    def __len__(self) -> int:
+        return len(self.engine.entries(self.name))
+
+    def __contains__(self, term: str) -> bool:
+        return _normalize(term) in self.engine.entries(self.name)
+
+    def entries(self, term: str) -> List[LexiconEntry]:
+        """Entries registered for a term"""
+        return list(self.engine.entries(self.name).get(_normalize(term), ()))
+
+    def scan(self, text: str) -> LexiconScan:
+        """Hits of this lexicon in the text (one shared pass per text)"""
+        return self.engine.scan(text, self.name)
+
+    def search(self, text: str, kind: Optional[str] = None) -> Optional[LexiconHit]:
+        """First non-negated hit (optionally of one kind), or None"""
+        for hit in self.scan(text).hits:
+            if not hit.negated and (kind is None or hit.entry.kind == kind):
+                return hit
+        return None
+
+    # ------------------------------------------------------------------
+    # Builders for the dict shapes the extractors already use
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def from_mapping(mapping: Mapping[str, Mapping[str, Any]], kind: str = "symptom") -> List[LexiconEntry]:
+        """{term: {"category": ..., "criteria": [...]}} -> entries"""
+        entries = []
+        for term, info in mapping.items():
+            category = info.get("category")
+            entries.append(LexiconEntry(
+                term=term,
+                kind=kind,
+                category=getattr(category, "value", category),
+                criteria=tuple(info.get("criteria", ())),
+            ))
+        return entries
+
+    @staticmethod
+    def from_weights(weights: Mapping[str, Any], kind: str, negatable: bool = False) -> List[LexiconEntry]:
+        """{term: weight} -> entries (modifiers, so not negatable by default)"""
+        return [
+            LexiconEntry(term=term, kind=kind, weight=weight, negatable=negatable)
+            for term, weight in weights.items()
+        ]
+
+    @staticmethod
+    def from_groups(
+        groups: Mapping[Any, Sequence[str]],
+        kind: str,
+        as_weight: bool = False,
+        negatable: bool = True,
+    ) -> List[LexiconEntry]:
+        """{group: [terms]} -> entries, the group becoming the category (or weight)"""
+        entries = []
+        for group, terms in groups.items():
+            for term in terms:
+                entries.append(LexiconEntry(
+                    term=term,
+                    kind=kind,
+                    category=None if as_weight else getattr(group, "value", group),
+                    weight=group if as_weight else None,
+                    negatable=negatable,
+                ))
+        return entries
+
+
+__all__ = [
+    "Lexicon",
+    "LexiconEngine",
+    "LexiconEntry",
+    "LexiconHit",
+    "LexiconScan",
+    "NEGATORS",
+    "NEGATION_FILLERS",
+    "DOMAIN_TERMS",
+    "get_lexicon_engine",
+    "is_negated",
+]
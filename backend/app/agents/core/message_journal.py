@@ -0,0 +1,282 @@
+"""
+Message Journal
+===============
+Buffered, batched inserts of conversation messages.
+
+Callers append a message row and return immediately. Rows are buffered per
+session and a background thread writes everything pending in one
+transaction: a single multi-row INSERT plus one executemany counter UPDATE
+for the sessions touched. A batch goes out when the flush window elapses,
+when max_batch rows are buffered, or right after a turn ends (the assistant's
+reply). Readers flush a session before querying its history, so they never
+miss buffered rows. When a batch fails, each of its sessions is retried on
+its own so one bad session cannot hold back the others. Pending rows are
+flushed on application shutdown (and at interpreter exit for scripts).
+"""
+
+import os
+import uuid
+import atexit
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import bindparam, func, insert, update
+
+logger = logging.getLogger(__name__)
+
+
+class SessionCounter(NamedTuple):
+    """Session columns bumped when messages are written"""
+    model: Any
+    count: str = "message_count"
+    last_active: Optional[str] = "last_active_at"
+
+
+class MessageJournal:
+    """
+    Per-session buffer of message rows for one table.
+
+    Rows are dicts of model attributes. session_field names the row's session
+    FK and timestamp_field is stamped at append time, so ordering survives
+    batching.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        counter: Optional[SessionCounter] = None,
+        session_field: str = "session_id",
+        timestamp_field: str = "created_at",
+        delay_seconds: float = 1.0,
+        max_batch: int = 500,
+        max_attempts: int = 3,
+        session_factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.model = model
+        self.counter = counter
+        self.session_field = session_field
+        self.timestamp_field = timestamp_field
+        self.delay_seconds = delay_seconds
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self._session_factory = session_factory
+
+        # session UUID -> (rows, first_appended_at, attempts)
+        self._pending: "OrderedDict[uuid.UUID, tuple]" = OrderedDict()
+        self._buffered = 0
+        self._turn_ended = False
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.appended = 0
+        self.rows_written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def append(self, session_id: Any, row: Dict[str, Any], end_turn: bool = False):
+        """Buffer one message row; end_turn asks for a flush without waiting for the window"""
+        key = session_id if isinstance(session_id, uuid.UUID) else uuid.UUID(str(session_id))
+        row = {**row, self.session_field: key}
+        row.setdefault(self.timestamp_field, datetime.now(timezone.utc))
+        with self._cond:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = ([row], time.time(), 0)
+            else:
+                entry[0].append(row)
+            self._buffered += 1
+            self.appended += 1
+            self._turn_ended = self._turn_ended or end_turn
+            self._ensure_thread()
+            if end_turn or self._buffered >= self.max_batch:
+                self._cond.notify()
+
+    def pending(self, session_id: Any) -> List[Dict[str, Any]]:
+        """Rows buffered for a session"""
+        key = session_id if isinstance(session_id, uuid.UUID) else uuid.UUID(str(session_id))
+        with self._cond:
+            entry = self._pending.get(key)
+            return list(entry[0]) if entry is not None else []
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="message-journal", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                if not self._turn_ended and self._buffered < self.max_batch:
+                    oldest = min(entry[1] for entry in self._pending.values())
+                    remaining = oldest + self.delay_seconds - time.time()
+                    if remaining > 0:
+                        self._cond.wait(remaining)
+                        continue
+            self.flush()
+
+    def flush(self, session_id: Any = None) -> int:
+        """Write pending rows now (all sessions, or just one); returns rows written"""
+        with self._flush_lock:
+            with self._cond:
+                if session_id is None:
+                    batch = self._pending
+                    self._pending = OrderedDict()
+                    self._turn_ended = False
+                else:
+                    key = session_id if isinstance(session_id, uuid.UUID) else uuid.UUID(str(session_id))
+                    entry = self._pending.pop(key, None)
+                    batch = OrderedDict([(key, entry)] if entry is not None else [])
+                self._buffered -= sum(len(entry[0]) for entry in batch.values())
+            if not batch:
+                return 0
+
+            try:
+                written = self._write_batch({key: entry[0] for key, entry in batch.items()})
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Message journal batch failed ({len(batch)} sessions): {e}")
+                if len(batch) == 1:
+                    self._requeue(batch)
+                    return 0
+                return self._write_each(batch)
+
+            self.batches += 1
+            self.rows_written += written
+            return written
+
+    def _write_each(self, batch: "OrderedDict[uuid.UUID, tuple]") -> int:
+        """Retry a failed batch one session at a time; only the sessions that fail again are requeued"""
+        written = 0
+        failed = OrderedDict()
+        for key, entry in batch.items():
+            try:
+                session_written = self._write_batch({key: entry[0]})
+            except Exception as e:
+                logger.warning(f"Message journal write failed for session {key}: {e}")
+                failed[key] = entry
+                continue
+            self.batches += 1
+            self.rows_written += session_written
+            written += session_written
+        if failed:
+            self._requeue(failed)
+        return written
+
+    def _requeue(self, batch: "OrderedDict[uuid.UUID, tuple]"):
+        with self._cond:
+            for key, (rows, first_at, attempts) in batch.items():
+                if attempts + 1 >= self.max_attempts:
+                    self.dropped += len(rows)
+                    logger.error(f"Dropping {len(rows)} messages for session {key} after {attempts + 1} failed writes")
+                    continue
+                newer = self._pending.pop(key, None)
+                # Failed rows go back in front of anything appended meanwhile; the window restarts
+                self._pending[key] = (rows + (newer[0] if newer else []), time.time(), attempts + 1)
+                self._buffered += len(rows)
+
+    def _write_batch(self, batch: Dict[uuid.UUID, List[Dict[str, Any]]]) -> int:
+        """One multi-row INSERT and one counter UPDATE, in a single transaction"""
+        if self._session_factory is None:
+            from app.db.session import SessionLocal
+            self._session_factory = SessionLocal
+
+        rows = [row for session_rows in batch.values() for row in session_rows]
+        db = self._session_factory()
+        try:
+            db.execute(insert(self.model), rows)
+            if self.counter is not None:
+                table = self.counter.model.__table__
+                values = {self.counter.count: func.coalesce(table.c[self.counter.count], 0) + bindparam("b_added")}
+                if self.counter.last_active:
+                    values[self.counter.last_active] = bindparam("b_last_active")
+                db.execute(
+                    update(table).where(table.c.id == bindparam("b_session")).values(values),
+                    [
+                        {
+                            "b_session": key,
+                            "b_added": len(session_rows),
+                            "b_last_active": max(row[self.timestamp_field] for row in session_rows),
+                        }
+                        for key, session_rows in batch.items()
+                    ]
+                )
+            db.commit()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def close(self):
+        """Stop the background thread and flush until nothing is pending"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        # Every failed pass spends one attempt, so rows still failing are dropped (and logged) by the last one
+        for _ in range(self.max_attempts):
+            if not self._pending:
+                return
+            self.flush()
+        if self._pending:
+            logger.error(f"Message journal closed with {self._buffered} unwritten messages")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get journal statistics"""
+        return {
+            "table": getattr(self.model, "__tablename__", str(self.model)),
+            "buffered": self._buffered,
+            "sessions_pending": len(self._pending),
+            "appended": self.appended,
+            "rows_written": self.rows_written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+
+_journals: List[MessageJournal] = []
+_journals_lock = threading.Lock()
+
+
+def create_message_journal(model: Any, **kwargs) -> MessageJournal:
+    """
+    Build a journal configured from the environment and register it for shutdown.
+
+    MESSAGE_JOURNAL_DELAY_MS (default 1000) is the flush window and
+    MESSAGE_JOURNAL_MAX_BATCH (default 500) the buffered-row limit.
+    """
+    kwargs.setdefault("delay_seconds", float(os.getenv("MESSAGE_JOURNAL_DELAY_MS", "1000")) / 1000)
+    kwargs.setdefault("max_batch", int(os.getenv("MESSAGE_JOURNAL_MAX_BATCH", "500")))
+    journal = MessageJournal(model, **kwargs)
+    with _journals_lock:
+        if not _journals:
+            atexit.register(close_all_journals)
+        _journals.append(journal)
+    return journal
+
+
+def close_all_journals():
+    """Flush and stop every journal (call on application shutdown)"""
+    with _journals_lock:
+        journals = list(_journals)
+    for journal in journals:
+        journal.close()
+
+
+__all__ = ["MessageJournal", "SessionCounter", "create_message_journal", "close_all_journals"]
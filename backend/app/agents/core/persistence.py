@@ -0,0 +1,221 @@
+"""
+State Write-Behind
+==================
+Coalescing, batched persistence for per-session agent state.
+
+Managers hand over a serialized snapshot and return immediately. Snapshots
+are keyed by (session_id, field), so repeated saves of the same session within
+the flush window collapse into the latest one. A background thread writes all
+pending sessions in one transaction, so a chat turn costs at most one DB write
+and none on the request path. Pending work is flushed on application shutdown
+(and at interpreter exit for scripts).
+"""
+
+import os
+import json
+import uuid
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StateWriteBehind:
+    """
+    Write-behind queue that persists snapshots into AssessmentSession.state_snapshot.
+
+    Each field (e.g. "conversation_state", "interview_state") is stored as a
+    key of the session's state_snapshot JSON, leaving other keys untouched.
+    """
+
+    def __init__(self, delay_seconds: float = 0.5, max_attempts: int = 3):
+        self.delay_seconds = delay_seconds
+        self.max_attempts = max_attempts
+
+        # (session_id, field) -> (snapshot, first_scheduled_at, attempts)
+        self._pending: Dict[Tuple[str, str], Tuple[Dict[str, Any], float, int]] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.scheduled = 0
+        self.coalesced = 0
+        self.rows_written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def schedule(self, session_id: str, field: str, snapshot: Dict[str, Any]):
+        """Queue a snapshot; a newer snapshot for the same key replaces the old one"""
+        # Detach from the live state (the writer thread must not see later mutations)
+        snapshot = json.loads(json.dumps(snapshot, default=str))
+        key = (str(session_id), field)
+        with self._cond:
+            self.scheduled += 1
+            previous = self._pending.get(key)
+            if previous is not None:
+                self.coalesced += 1
+                self._pending[key] = (snapshot, previous[1], 0)
+            else:
+                self._pending[key] = (snapshot, time.time(), 0)
+            self._ensure_thread()
+            self._cond.notify()
+
+    def pending(self, session_id: str, field: str) -> Optional[Dict[str, Any]]:
+        """Latest not-yet-written snapshot, so reads never go behind a queued write"""
+        with self._cond:
+            entry = self._pending.get((str(session_id), field))
+            return entry[0] if entry is not None else None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="state-write-behind", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                oldest = min(entry[1] for entry in self._pending.values())
+                remaining = oldest + self.delay_seconds - time.time()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every pending snapshot now; returns the number of sessions written"""
+        with self._flush_lock:
+            with self._cond:
+                batch = self._pending
+                self._pending = {}
+            if not batch:
+                return 0
+
+            try:
+                written = self._write_batch(batch)
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"State write-behind batch failed ({len(batch)} snapshots): {e}")
+                self._requeue(batch)
+                return 0
+
+            self.batches += 1
+            self.rows_written += written
+            return written
+
+    def _requeue(self, batch: Dict[Tuple[str, str], Tuple[Dict[str, Any], float, int]]):
+        with self._cond:
+            for key, (snapshot, scheduled_at, attempts) in batch.items():
+                if key in self._pending:
+                    continue  # a newer snapshot arrived meanwhile
+                if attempts + 1 >= self.max_attempts:
+                    self.dropped += 1
+                    logger.error(f"Dropping state snapshot {key} after {attempts + 1} failed writes")
+                    continue
+                # Back off by restarting the window
+                self._pending[key] = (snapshot, time.time(), attempts + 1)
+
+    def _write_batch(self, batch: Dict[Tuple[str, str], Tuple[Dict[str, Any], float, int]]) -> int:
+        """Apply all snapshots in a single transaction"""
+        from app.db.session import SessionLocal
+        from app.models_new.assessment import AssessmentSession
+
+        updates: Dict[uuid.UUID, Dict[str, Any]] = {}
+        for (session_id, field), (snapshot, _, _) in batch.items():
+            try:
+                updates.setdefault(uuid.UUID(session_id), {})[field] = snapshot
+            except ValueError:
+                logger.debug(f"Skipping state snapshot for non-persistent session {session_id}")
+
+        if not updates:
+            return 0
+
+        db = SessionLocal()
+        try:
+            rows = db.query(AssessmentSession).filter(AssessmentSession.id.in_(list(updates))).all()
+            for row in rows:
+                snapshot = dict(row.state_snapshot or {})
+                snapshot.update(updates[row.id])
+                row.state_snapshot = snapshot
+            db.commit()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def close(self):
+        """Stop the background thread and flush whatever is pending"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write-behind statistics"""
+        return {
+            "pending": len(self._pending),
+            "scheduled": self.scheduled,
+            "coalesced": self.coalesced,
+            "rows_written": self.rows_written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+
+def load_state_snapshot(session_id: str, field: str) -> Optional[Dict[str, Any]]:
+    """Read one field of a session's state_snapshot, preferring a queued write"""
+    pending = get_state_writer().pending(session_id, field)
+    if pending is not None:
+        return pending
+
+    from app.db.session import SessionLocal
+    from app.models_new.assessment import AssessmentSession
+
+    try:
+        key = uuid.UUID(str(session_id))
+    except ValueError:
+        return None
+
+    db = SessionLocal()
+    try:
+        row = db.query(AssessmentSession.state_snapshot).filter(AssessmentSession.id == key).first()
+        if row and row[0]:
+            return row[0].get(field)
+        return None
+    finally:
+        db.close()
+
+
+_state_writer: Optional[StateWriteBehind] = None
+_state_writer_lock = threading.Lock()
+
+
+def get_state_writer() -> StateWriteBehind:
+    """Get the process-wide write-behind queue (STATE_WRITE_DELAY_MS, default 500)"""
+    global _state_writer
+    if _state_writer is None:
+        with _state_writer_lock:
+            if _state_writer is None:
+                _state_writer = StateWriteBehind(
+                    delay_seconds=float(os.getenv("STATE_WRITE_DELAY_MS", "500")) / 1000
+                )
+                atexit.register(_state_writer.close)
+    return _state_writer
+
+
+__all__ = ["StateWriteBehind", "get_state_writer", "load_state_snapshot"]
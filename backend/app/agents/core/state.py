@@ -9,6 +9,8 @@ from datetime import datetime
 import logging
 
 from app.agents.core.types import ConversationState
+from app.agents.core.state_store import StateVersionConflict, create_state_store
+from app.agents.core.persistence import get_state_writer, load_state_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -16,17 +18,23 @@ logger = logging.getLogger(__name__)
 class StateManager:
     """
     Manages conversation state across agents.
-    Provides in-memory caching with optional DB persistence.
+    Provides a bounded LRU/TTL cache (optionally shared through Redis)
+    with write-behind DB persistence.
     """
     
     def __init__(self):
-        self._states: Dict[str, ConversationState] = {}
+        self._states = create_state_store(
+            "conversation",
+            serialize=lambda state: self._state_to_dict(state, message_limit=None),
+            deserialize=self._dict_to_state,
+        )
     
     def get(self, session_id: str) -> Optional[ConversationState]:
         """Get state for a session"""
         # Try cache first
-        if session_id in self._states:
-            return self._states[session_id]
+        state = self._states.get(session_id)
+        if state is not None:
+            return state
         
         # Try loading from DB
         state = self._load_from_db(session_id)
@@ -45,75 +53,82 @@ class StateManager:
             self._states[session_id] = state
         return state
     
-    def save(self, state: ConversationState):
-        """Save state to cache and DB"""
-        self._states[state.session_id] = state
+    def save(self, state: ConversationState) -> bool:
+        """
+        Save state to cache and queue it for the DB.
+        
+        The DB write happens off the request path; repeated saves of the same
+        session within the write-behind window are coalesced.
+        
+        Returns False (and keeps the newer copy) if another worker updated the
+        session since this worker read it.
+        """
+        try:
+            self._states.put(state.session_id, state)
+        except StateVersionConflict:
+            logger.warning(f"Conversation state for {state.session_id} was updated concurrently; keeping newer version")
+            return False
         self._save_to_db(state)
+        return True
     
     def delete(self, session_id: str):
         """Delete a session state"""
-        if session_id in self._states:
-            del self._states[session_id]
+        self._states.delete(session_id)
     
     def _load_from_db(self, session_id: str) -> Optional[ConversationState]:
-        """Load state from database"""
+        """Load state from database (or a snapshot still queued for it)"""
         try:
-            from app.db.session import SessionLocal
-            from app.db.repositories_new import assessment_repo
-            
-            db = SessionLocal()
-            try:
-                session = assessment_repo.get_session(db, session_id)
-                if session and session.metadata:
-                    data = session.metadata.get("conversation_state")
-                    if data:
-                        # Reconstruct ConversationState from dict
-                        return self._dict_to_state(data)
-            finally:
-                db.close()
+            data = load_state_snapshot(session_id, "conversation_state")
+            if data:
+                # Reconstruct ConversationState from dict
+                return self._dict_to_state(data)
         except Exception as e:
             logger.debug(f"Could not load state from DB: {e}")
         return None
     
     def _save_to_db(self, state: ConversationState):
-        """Save state to database"""
-        try:
-            from app.db.session import SessionLocal
-            from app.db.repositories_new import assessment_repo
-            
-            db = SessionLocal()
-            try:
-                session = assessment_repo.get_session(db, state.session_id)
-                if session:
-                    metadata = session.metadata or {}
-                    metadata["conversation_state"] = self._state_to_dict(state)
-                    session.metadata = metadata
-                    db.commit()
-            finally:
-                db.close()
-        except Exception as e:
-            logger.debug(f"Could not save state to DB: {e}")
+        """Queue state for the write-behind DB writer"""
+        get_state_writer().schedule(state.session_id, "conversation_state", self._state_to_dict(state))
     
-    def _state_to_dict(self, state: ConversationState) -> Dict:
-        """Convert state to serializable dict"""
+    def _state_to_dict(self, state: ConversationState, message_limit: Optional[int] = 20) -> Dict:
+        """
+        Convert state to serializable dict.
+        
+        The DB copy keeps the last 20 messages; the shared state store passes
+        message_limit=None so another worker resumes with the full history.
+        """
+        messages = state.messages if message_limit is None else state.messages[-message_limit:]
         return {
             "session_id": state.session_id,
             "patient_id": state.patient_id,
+            "started_at": state.started_at.isoformat() if state.started_at else None,
             "phase": state.phase.value,
-            "messages": state.messages[-20:],  # Keep last 20 messages
+            "messages": messages,
             "active_topics": state.active_topics,
+            "emotional_tone": state.emotional_tone,
             "symptoms": [
                 {
                     "name": s.name,
                     "severity": s.severity,
+                    "confidence": s.confidence,
                     "category": s.category,
-                    "dsm_criteria_id": s.dsm_criteria_id
+                    "dsm_criteria_id": s.dsm_criteria_id,
+                    "frequency": s.frequency,
+                    "duration": s.duration,
+                    "source_message": s.source_message
                 }
                 for s in state.symptoms
             ],
+            "dsm_criteria_met": state.dsm_criteria_met,
+            "interview_module": state.interview_module,
             "questions_asked": state.questions_asked,
+            "screening_scores": state.screening_scores,
             "modules_triggered": state.modules_triggered,
+            "primary_diagnosis": state.primary_diagnosis,
+            "differential_diagnoses": state.differential_diagnoses,
             "risk_level": state.risk_level.value,
+            "requires_escalation": state.requires_escalation,
+            "session_complete": state.session_complete,
             "diagnosis_ready": state.diagnosis_ready
         }
     
@@ -125,21 +140,35 @@ class StateManager:
             session_id=data.get("session_id", ""),
             patient_id=data.get("patient_id", "")
         )
+        if data.get("started_at"):
+            state.started_at = datetime.fromisoformat(data["started_at"])
         state.phase = ConversationPhase(data.get("phase", "exploration"))
         state.messages = data.get("messages", [])
         state.active_topics = data.get("active_topics", [])
+        state.emotional_tone = data.get("emotional_tone", "neutral")
         state.symptoms = [
             Symptom(
                 name=s.get("name", ""),
                 severity=s.get("severity", 0.5),
+                confidence=s.get("confidence", 1.0),
                 category=s.get("category", ""),
-                dsm_criteria_id=s.get("dsm_criteria_id")
+                dsm_criteria_id=s.get("dsm_criteria_id"),
+                frequency=s.get("frequency"),
+                duration=s.get("duration"),
+                source_message=s.get("source_message")
             )
             for s in data.get("symptoms", [])
         ]
+        state.dsm_criteria_met = data.get("dsm_criteria_met", {})
+        state.interview_module = data.get("interview_module")
         state.questions_asked = data.get("questions_asked", [])
+        state.screening_scores = data.get("screening_scores", {})
         state.modules_triggered = data.get("modules_triggered", [])
+        state.primary_diagnosis = data.get("primary_diagnosis")
+        state.differential_diagnoses = data.get("differential_diagnoses", [])
         state.risk_level = RiskLevel(data.get("risk_level", "none"))
+        state.requires_escalation = data.get("requires_escalation", False)
+        state.session_complete = data.get("session_complete", False)
         state.diagnosis_ready = data.get("diagnosis_ready", False)
         return state
 
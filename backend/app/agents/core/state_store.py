@@ -0,0 +1,349 @@
+"""
+Session State Store
+===================
+Bounded, evicting store for per-session agent state.
+
+The in-process tier is an LRU with idle TTL, so a worker's memory is bounded
+no matter how many sessions it has served. An optional Redis tier
+(STATE_STORE_REDIS_URL) makes state visible to every worker, so any worker can
+serve any session without sticky routing.
+
+Every write bumps a per-session version. Reads revalidate the local copy
+against the shared version, and writes are compare-and-set against the
+version the writer last saw; a concurrent update from another worker raises
+StateVersionConflict instead of being silently overwritten.
+"""
+
+import os
+import json
+import time
+import zlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Payloads above this size are zlib-compressed before going to Redis
+COMPRESS_THRESHOLD = 1024
+
+# Compare-and-set: bump the version only if nobody else wrote since `expected`
+_CAS_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'v')
+if ARGV[1] ~= '' and current and current ~= ARGV[1] then
+    return -1
+end
+local version = (tonumber(current) or 0) + 1
+redis.call('HSET', KEYS[1], 'v', version, 'd', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return version
+"""
+
+
+class StateVersionConflict(Exception):
+    """Raised when a session was updated elsewhere since it was last read"""
+
+    def __init__(self, key: str, expected: Optional[int], current: Optional[int] = None):
+        self.key = key
+        self.expected = expected
+        self.current = current
+        super().__init__(f"State for '{key}' changed concurrently (expected version {expected})")
+
+
+def encode_payload(data: Dict[str, Any]) -> bytes:
+    """Compact JSON, zlib-compressed when large"""
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+    if len(raw) > COMPRESS_THRESHOLD:
+        return b"z" + zlib.compress(raw)
+    return b"j" + raw
+
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    """Inverse of encode_payload"""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    body = zlib.decompress(payload[1:]) if payload[:1] == b"z" else payload[1:]
+    return json.loads(body.decode("utf-8"))
+
+
+class SessionStateStore(Generic[T]):
+    """
+    LRU/TTL state store with an optional shared Redis tier.
+
+    Live objects are kept locally (no serialization on the hot path); the
+    serializer pair is only used for the Redis tier. The store also supports
+    the dict-style access the managers previously used on their plain dicts.
+    on_evict(key, state) is called for entries dropped by LRU or TTL, so
+    owners of mutable state can persist it first.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        serialize: Callable[[T], Dict[str, Any]],
+        deserialize: Callable[[Dict[str, Any]], T],
+        max_entries: int = 1000,
+        ttl_seconds: int = 3600,
+        redis_client: Any = None,
+        on_evict: Optional[Callable[[str, T], None]] = None,
+    ):
+        self.namespace = namespace
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis_client
+        self.on_evict = on_evict
+
+        # key -> (state, version, last_access)
+        self._entries: "OrderedDict[str, Tuple[T, int, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._cas = redis_client.register_script(_CAS_SCRIPT) if redis_client is not None else None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.conflicts = 0
+
+    def _redis_key(self, key: str) -> str:
+        return f"state:{self.namespace}:{key}"
+
+    # ------------------------------------------------------------------
+    # Core API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, default: Optional[T] = None) -> Optional[T]:
+        """Return the current state, revalidating the local copy against Redis"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[2] > self.ttl_seconds:
+                del self._entries[key]
+                self._evicted(key, entry[0])
+                entry = None
+
+        if self.redis is None:
+            with self._lock:
+                if entry is None:
+                    self.misses += 1
+                    return default
+                self._entries[key] = (entry[0], entry[1], now)
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        try:
+            if entry is not None:
+                shared_version = self.redis.hget(self._redis_key(key), "v")
+                if shared_version is None or int(shared_version) == entry[1]:
+                    with self._lock:
+                        self._store(key, entry[0], entry[1], now)
+                        self.hits += 1
+                    return entry[0]
+
+            payload = self.redis.hmget(self._redis_key(key), "v", "d")
+        except Exception as e:
+            logger.warning(f"State store Redis tier unavailable: {e}")
+            if entry is not None:
+                return entry[0]
+            self.misses += 1
+            return default
+
+        version, data = payload
+        if data is None:
+            with self._lock:
+                self.misses += 1
+            return default
+
+        state = self.deserialize(decode_payload(data))
+        with self._lock:
+            self._store(key, state, int(version), now)
+            self.misses += 1
+        return state
+
+    def put(self, key: str, state: T, expected_version: Optional[int] = None) -> int:
+        """
+        Store state and return its new version.
+
+        expected_version defaults to the version of the local copy (the one
+        this worker last read or wrote). Raises StateVersionConflict if the
+        shared tier has moved past it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if expected_version is None and entry is not None:
+                expected_version = entry[1]
+
+        if self.redis is None:
+            with self._lock:
+                version = (entry[1] if entry is not None else 0) + 1
+                self._store(key, state, version, time.time())
+            return version
+
+        payload = encode_payload(self.serialize(state))
+        try:
+            version = int(self._cas(
+                keys=[self._redis_key(key)],
+                args=["" if expected_version is None else str(expected_version), payload, int(self.ttl_seconds)]
+            ))
+        except Exception as e:
+            logger.warning(f"State store Redis write failed, keeping local copy: {e}")
+            with self._lock:
+                version = (expected_version or 0) + 1
+                self._store(key, state, version, time.time())
+            return version
+
+        if version < 0:
+            with self._lock:
+                self.conflicts += 1
+                self._entries.pop(key, None)
+            raise StateVersionConflict(key, expected_version)
+
+        with self._lock:
+            self._store(key, state, version, time.time())
+        return version
+
+    def version(self, key: str) -> Optional[int]:
+        """Version of the local copy, if any"""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def is_cached(self, key: str) -> bool:
+        """Whether a live copy is held locally"""
+        return key in self._entries
+
+    def keys(self) -> List[str]:
+        """Keys held locally"""
+        with self._lock:
+            return list(self._entries)
+
+    def delete(self, key: str):
+        """Remove a session from both tiers"""
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.redis is not None:
+            try:
+                self.redis.delete(self._redis_key(key))
+            except Exception as e:
+                logger.warning(f"State store Redis delete failed: {e}")
+
+    def _store(self, key: str, state: T, version: int, now: float):
+        self._entries[key] = (state, version, now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, (evicted, _, _) = self._entries.popitem(last=False)
+            self.evictions += 1
+            self._evicted(evicted_key, evicted)
+
+    def _evicted(self, key: str, state: T):
+        if self.on_evict is None:
+            return
+        try:
+            self.on_evict(key, state)
+        except Exception as e:
+            logger.warning(f"State store eviction hook failed for {self.namespace}:{key}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        return {
+            "namespace": self.namespace,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "conflicts": self.conflicts,
+            "redis_enabled": self.redis is not None,
+        }
+
+    # ------------------------------------------------------------------
+    # dict-style access (drop-in for the old in-memory dicts)
+    # ------------------------------------------------------------------
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __getitem__(self, key: str) -> T:
+        state = self.get(key)
+        if state is None:
+            raise KeyError(key)
+        return state
+
+    def __setitem__(self, key: str, state: T):
+        try:
+            self.put(key, state)
+        except StateVersionConflict:
+            # Plain assignment is last-writer-wins, like the dict it replaces
+            self.put(key, state, expected_version=None if self.redis is None else self._shared_version(key))
+
+    def __delitem__(self, key: str):
+        self.delete(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def _shared_version(self, key: str) -> Optional[int]:
+        version = self.redis.hget(self._redis_key(key), "v")
+        return int(version) if version is not None else None
+
+
+def _redis_from_env() -> Any:
+    url = os.getenv("STATE_STORE_REDIS_URL")
+    if not url:
+        return None
+    try:
+        import redis
+        # Binary client: payloads may be zlib-compressed
+        return redis.Redis.from_url(url, decode_responses=False, socket_timeout=1.0)
+    except Exception as e:
+        logger.warning(f"State store Redis tier disabled: {e}")
+        return None
+
+
+_shared_redis: Any = None
+_shared_redis_loaded = False
+_redis_lock = threading.Lock()
+
+
+def create_state_store(
+    namespace: str,
+    serialize: Callable[[T], Dict[str, Any]],
+    deserialize: Callable[[Dict[str, Any]], T],
+    on_evict: Optional[Callable[[str, T], None]] = None,
+) -> SessionStateStore[T]:
+    """
+    Build a store configured from the environment.
+
+    STATE_STORE_MAX_ENTRIES / STATE_STORE_TTL_SECONDS bound the local tier;
+    STATE_STORE_REDIS_URL enables the shared tier (one connection pool per process).
+    """
+    global _shared_redis, _shared_redis_loaded
+    with _redis_lock:
+        if not _shared_redis_loaded:
+            _shared_redis = _redis_from_env()
+            _shared_redis_loaded = True
+
+    return SessionStateStore(
+        namespace=namespace,
+        serialize=serialize,
+        deserialize=deserialize,
+        max_entries=int(os.getenv("STATE_STORE_MAX_ENTRIES", "1000")),
+        ttl_seconds=int(os.getenv("STATE_STORE_TTL_SECONDS", "3600")),
+        redis_client=_shared_redis,
+        on_evict=on_evict,
+    )
+
+
+__all__ = [
+    "SessionStateStore",
+    "StateVersionConflict",
+    "create_state_store",
+    "encode_payload",
+    "decode_payload",
+]
@@ -5,7 +5,7 @@ DSM-5 compliant diagnosis with MCP tools.
 Uses decision tree algorithm for efficiency.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set
 import logging
 
 from app.agents.base import BaseAgent, AgentOutput
@@ -13,7 +13,8 @@ from app.agents.core import (
     Symptom, Severity, ConversationState,
     get_state_manager, get_registry, register_tool
 )
-from app.core.llm_client import AgentLLMClient
+from app.core.llm_client import AgentLLMClient, get_shared_client
+from app.core.llm_scheduler import LLMPriority
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +59,23 @@ DSM5_DISORDERS = {
 }
 
 
+# Criteria sets per disorder, built once
+_CRITERIA_SETS = {
+    disorder_id: (frozenset(disorder["required_criteria"]), frozenset(disorder["supporting_criteria"]))
+    for disorder_id, disorder in DSM5_DISORDERS.items()
+}
+
+
+def collect_met_criteria(symptoms: List[Dict]) -> Set[str]:
+    """DSM criterion IDs present in a symptom list"""
+    met_criteria_ids = set()
+    for sym in symptoms:
+        if sym.get("dsm_criteria_id"):
+            met_criteria_ids.add(sym.get("dsm_criteria_id"))
+        met_criteria_ids.update(sym.get("dsm_criteria", []))
+    return met_criteria_ids
+
+
 # =============================================================================
 # MCP TOOLS
 # =============================================================================
@@ -110,27 +128,31 @@ def screen_disorder_categories(symptoms: List[Dict]) -> List[str]:
     },
     agent="diagnosis"
 )
-def evaluate_disorder_criteria(disorder_id: str, symptoms: List[Dict]) -> Dict:
+def evaluate_disorder_criteria(
+    disorder_id: str,
+    symptoms: List[Dict],
+    met_criteria_ids: Optional[Set[str]] = None,
+    avg_symptom_severity: Optional[float] = None
+) -> Dict:
     """
     Evaluate symptoms against DSM-5 criteria with weighted scoring.
     Core criteria = 3 points
     Supporting criteria = 1 point
+    
+    When evaluating several disorders, pass met_criteria_ids (see
+    collect_met_criteria) and avg_symptom_severity so the symptom list is
+    scanned once rather than per disorder.
     """
     disorder = DSM5_DISORDERS.get(disorder_id)
     if not disorder:
         return {"error": f"Unknown disorder: {disorder_id}"}
     
     # Collate present criteria
-    met_criteria_ids = set()
-    for sym in symptoms:
-        if sym.get("dsm_criteria_id"):
-            met_criteria_ids.add(sym.get("dsm_criteria_id"))
-        for crit in sym.get("dsm_criteria", []):
-            met_criteria_ids.add(crit)
+    if met_criteria_ids is None:
+        met_criteria_ids = collect_met_criteria(symptoms)
             
     # Calculate Scores
-    required_ids = set(disorder["required_criteria"])
-    supporting_ids = set(disorder["supporting_criteria"])
+    required_ids, supporting_ids = _CRITERIA_SETS[disorder_id]
     
     required_met = required_ids.intersection(met_criteria_ids)
     supporting_met = supporting_ids.intersection(met_criteria_ids)
@@ -170,9 +192,8 @@ def evaluate_disorder_criteria(disorder_id: str, symptoms: List[Dict]) -> Dict:
         confidence = min(0.7, confidence)
 
     # Severity Calculation
-    
-    # Severity Calculation
-    avg_symptom_severity = sum(s.get("severity", 0.5) for s in symptoms) / max(1, len(symptoms))
+    if avg_symptom_severity is None:
+        avg_symptom_severity = average_severity(symptoms)
     if avg_symptom_severity > 0.8:
         severity = "severe"
     elif avg_symptom_severity > 0.5:
@@ -198,6 +219,11 @@ def evaluate_disorder_criteria(disorder_id: str, symptoms: List[Dict]) -> Dict:
     }
 
 
+def average_severity(symptoms: List[Dict]) -> float:
+    """Mean symptom severity (0.5 when unrated)"""
+    return sum(s.get("severity", 0.5) for s in symptoms) / max(1, len(symptoms))
+
+
 @register_tool(
     name="generate_clinical_report",
     description="Generate clinical summary report",
@@ -214,7 +240,7 @@ def evaluate_disorder_criteria(disorder_id: str, symptoms: List[Dict]) -> Dict:
 async def generate_clinical_report(diagnoses: List[Dict], symptoms: List[Dict]) -> str:
     """Generate clinical summary using LLM"""
     try:
-        llm = AgentLLMClient(agent_name="Diagnosis")
+        llm = get_shared_client()
         
         diag_text = "\n".join([
             f"- {d.get('disorder_name', 'Unknown')}: {d.get('confidence', 0)*100:.0f}% confidence, {d.get('severity', 'moderate')} severity"
@@ -241,7 +267,7 @@ FORMAT:
 Professional, clinical tone. 2-3 paragraphs.
 """
         
-        return await llm.generate_async(prompt, max_tokens=600)
+        return await llm.generate_async(prompt, max_tokens=600, priority=LLMPriority.BACKGROUND)
         
     except Exception as e:
         logger.error(f"Report generation failed: {e}")
@@ -265,7 +291,7 @@ class DiagnosisAgentV2(BaseAgent):
     
     def __init__(self, llm_client=None, **kwargs):
         super().__init__(agent_name="DiagnosisAgentV2", **kwargs)
-        self.llm_client = llm_client or AgentLLMClient(agent_name="Diagnosis")
+        self.llm_client = llm_client or AgentLLMClient(agent_name="Diagnosis", priority=LLMPriority.BACKGROUND)
         self.state_manager = get_state_manager()
     
     async def process(self, state: Dict) -> AgentOutput:
@@ -308,10 +334,12 @@ class DiagnosisAgentV2(BaseAgent):
                     if disorder["category"] == cat:
                         candidates.append(disorder_id)
             
-            # STEP 3: Evaluate each candidate
+            # STEP 3: Evaluate each candidate (symptoms collated once for all of them)
+            met_criteria_ids = collect_met_criteria(symptoms)
+            avg_severity = average_severity(symptoms)
             evaluations = []
             for disorder_id in candidates[:4]:  # Limit to top 4
-                result = evaluate_disorder_criteria(disorder_id, symptoms)
+                result = evaluate_disorder_criteria(disorder_id, symptoms, met_criteria_ids, avg_severity)
                 if result.get("diagnosis_met") or result.get("confidence", 0) > 0.3:
                     evaluations.append(result)
             
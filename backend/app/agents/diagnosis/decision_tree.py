@@ -6,6 +6,8 @@ Maps symptoms to disorder categories and provides filtering logic.
 
 from typing import List, Dict, Set
 
+from app.agents.core.lexicon import Lexicon
+
 # Category → Disorder mapping
 CATEGORY_DISORDERS = {
     "mood_disorders": ["MDD", "BIPOLAR"],
@@ -81,6 +83,11 @@ SYMPTOM_CATEGORY_MAP = {
     "tired": "sleep_wake_disorders",
 }
 
+SYMPTOM_CATEGORY_LEXICON = Lexicon(
+    "decision_tree",
+    Lexicon.from_mapping({k: {"category": v} for k, v in SYMPTOM_CATEGORY_MAP.items()})
+)
+
 # Core symptoms required for each disorder (for fast rule-out)
 CORE_SYMPTOMS = {
     "MDD": {
@@ -130,13 +137,12 @@ def screen_categories_from_symptoms(symptoms: List[Dict]) -> List[str]:
     category_scores: Dict[str, float] = {}
     
     for symptom in symptoms:
-        name = symptom.get("name", "").lower()
+        name = symptom.get("name", "")
         severity = symptom.get("severity", 0.5)
         
-        # Check each keyword
-        for keyword, category in SYMPTOM_CATEGORY_MAP.items():
-            if keyword in name:
-                category_scores[category] = category_scores.get(category, 0) + severity
+        # One pass over the name; a keyword counts once per symptom
+        for hit in SYMPTOM_CATEGORY_LEXICON.scan(name).unique("symptom"):
+            category_scores[hit.category] = category_scores.get(hit.category, 0) + severity
     
     # Sort and return top 2
     sorted_categories = sorted(
@@ -35,8 +35,8 @@ class InterviewOrchestrator(BaseAgent):
     def _load_scid_bank(self):
         """Load SCID-SC item bank"""
         try:
-            from app.agents.interview.scid_bank import SCID_SC_Bank
-            self.scid_bank = SCID_SC_Bank()
+            from app.agents.interview.scid_bank import get_scid_bank
+            self.scid_bank = get_scid_bank()
             logger.info(f"Loaded SCID bank: {len(self.scid_bank.sc_items)} items, {len(self.scid_bank.modules)} modules")
         except Exception as e:
             logger.warning(f"Could not load SCID bank: {e}")
@@ -274,9 +274,10 @@ class InterviewOrchestrator(BaseAgent):
             item = self.scid_bank.sc_items[question_id]
             
             # Semantic Analysis via LLM
-            # (We use the therapist's LLM client if available, or create a new one)
-            from app.core.llm_client import AgentLLMClient
-            llm = self.llm_client or AgentLLMClient(agent_name="Orchestrator")
+            # (We use the therapist's LLM client if available, or the shared one)
+            from app.core.llm_client import get_shared_client
+            from app.core.llm_scheduler import LLMPriority
+            llm = self.llm_client or get_shared_client()
             
             prompt = f"""Analyze the patient's response to a clinical question.
 
@@ -291,7 +292,9 @@ Determine if the response is:
 Return ONLY one word: POSITIVE, NEGATIVE, or AMBIGUOUS."""
             
             try:
-                analysis = await llm.generate_async(prompt, max_tokens=10, temperature=0.0)
+                analysis = await llm.generate_async(
+                    prompt, max_tokens=10, temperature=0.0, priority=LLMPriority.REALTIME
+                )
                 analysis = analysis.strip().upper()
                 logger.debug(f"Semantic Analysis for {question_id}: {analysis} (Resp: {response[:20]}...)")
             except Exception as e:
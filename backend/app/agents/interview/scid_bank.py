@@ -6,8 +6,9 @@ Based on the Structured Clinical Interview for DSM-5 - Screening Version.
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +50,7 @@ class SCID_SC_Bank:
     def __init__(self):
         self.sc_items = self._initialize_sc_items()
         self.modules = self._initialize_modules()
+        self._build_indexes()
         if HAS_ML_LIBS and TfidfVectorizer:
             try:
                 self.vectorizer = TfidfVectorizer(stop_words='english', lowercase=True, ngram_range=(1, 2))
@@ -579,6 +581,17 @@ class SCID_SC_Bank:
         logger.info(f"Initialized {len(modules)} SCID-CV diagnostic modules")
         return modules
     
+    def _build_indexes(self):
+        """Index items by module and category once at load (the bank is read-only)"""
+        by_module: Dict[str, List[SCIDItem]] = {}
+        by_category: Dict[str, List[SCIDItem]] = {}
+        for item in self.sc_items.values():
+            for module_id in dict.fromkeys(item.linked_modules):
+                by_module.setdefault(module_id, []).append(item)
+            by_category.setdefault(item.category, []).append(item)
+        self._items_by_module: Dict[str, Tuple[SCIDItem, ...]] = {k: tuple(v) for k, v in by_module.items()}
+        self._items_by_category: Dict[str, Tuple[SCIDItem, ...]] = {k: tuple(v) for k, v in by_category.items()}
+    
     def _fit_vectorizer(self):
         """Fit TF-IDF vectorizer on all item texts"""
         if not self.vectorizer:
@@ -598,14 +611,11 @@ class SCID_SC_Bank:
     
     def get_items_by_category(self, category: str) -> List[SCIDItem]:
         """Get all items in a specific category"""
-        return [item for item in self.sc_items.values() if item.category == category]
+        return list(self._items_by_category.get(category, ()))
     
     def get_items_by_module(self, module_id: str) -> List[SCIDItem]:
         """Get all items linked to a specific module"""
-        return [
-            item for item in self.sc_items.values()
-            if module_id in item.linked_modules
-        ]
+        return list(self._items_by_module.get(module_id, ()))
     
     def get_all_item_ids(self) -> List[str]:
         """Get all item IDs"""
@@ -638,3 +648,16 @@ class SCID_SC_Bank:
             }
         }
 
+
+_bank: Optional[SCID_SC_Bank] = None
+_bank_lock = threading.Lock()
+
+
+def get_scid_bank() -> SCID_SC_Bank:
+    """Get the process-wide SCID-5-SC bank (built and indexed once)"""
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = SCID_SC_Bank()
+    return _bank
@@ -10,6 +10,9 @@ from enum import Enum
 from datetime import datetime
 import logging
 
+from app.agents.core.state_store import StateVersionConflict, create_state_store
+from app.agents.core.persistence import get_state_writer, load_state_snapshot
+
 logger = logging.getLogger(__name__)
 
 
@@ -70,6 +73,8 @@ class InterviewState:
             "skipped_items": self.skipped_items,
             "current_question_id": self.current_question_id,
             "priority_modules": self.priority_modules,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "last_activity": self.last_activity.isoformat() if self.last_activity else None,
         }
     
     @classmethod
@@ -90,6 +95,10 @@ class InterviewState:
         state.skipped_items = data.get("skipped_items", [])
         state.current_question_id = data.get("current_question_id")
         state.priority_modules = data.get("priority_modules", [])
+        if data.get("started_at"):
+            state.started_at = datetime.fromisoformat(data["started_at"])
+        if data.get("last_activity"):
+            state.last_activity = datetime.fromisoformat(data["last_activity"])
         return state
 
 
@@ -97,11 +106,17 @@ class InterviewStateManager:
     """Manages interview state persistence and retrieval"""
     
     def __init__(self):
-        self._states: Dict[str, InterviewState] = {}  # In-memory cache
+        # Bounded LRU/TTL cache, optionally shared across workers through Redis
+        self._states = create_state_store(
+            "interview",
+            serialize=InterviewState.to_dict,
+            deserialize=InterviewState.from_dict,
+        )
     
     def get_or_create(self, session_id: str, patient_id: str) -> InterviewState:
         """Get existing state or create new one"""
-        if session_id not in self._states:
+        state = self._states.get(session_id)
+        if state is None:
             # Try loading from DB first
             state = self._load_from_db(session_id)
             if not state:
@@ -112,51 +127,40 @@ class InterviewStateManager:
                 )
             self._states[session_id] = state
         
-        return self._states[session_id]
+        return state
     
-    def save(self, state: InterviewState):
-        """Save state to cache and DB"""
+    def save(self, state: InterviewState) -> bool:
+        """
+        Save state to cache and queue it for the DB.
+        
+        Called several times per interview step; the write-behind writer
+        coalesces them into a single DB write.
+        
+        Returns False (and keeps the newer copy) if another worker updated the
+        session since this worker read it.
+        """
         state.last_activity = datetime.utcnow()
-        self._states[state.session_id] = state
+        try:
+            self._states.put(state.session_id, state)
+        except StateVersionConflict:
+            logger.warning(f"Interview state for {state.session_id} was updated concurrently; keeping newer version")
+            return False
         self._save_to_db(state)
+        return True
     
     def _load_from_db(self, session_id: str) -> Optional[InterviewState]:
-        """Load state from database"""
+        """Load state from database (or a snapshot still queued for it)"""
         try:
-            from app.db.session import SessionLocal
-            from app.db.repositories_new import assessment_repo
-            
-            db = SessionLocal()
-            try:
-                session = assessment_repo.get(db, session_id)
-                if session and session.metadata:
-                    interview_data = session.metadata.get("interview_state")
-                    if interview_data:
-                        return InterviewState.from_dict(interview_data)
-            finally:
-                db.close()
+            interview_data = load_state_snapshot(session_id, "interview_state")
+            if interview_data:
+                return InterviewState.from_dict(interview_data)
         except Exception as e:
             logger.warning(f"Could not load interview state: {e}")
         return None
     
     def _save_to_db(self, state: InterviewState):
-        """Save state to database"""
-        try:
-            from app.db.session import SessionLocal
-            from app.db.repositories_new import assessment_repo
-            
-            db = SessionLocal()
-            try:
-                session = assessment_repo.get(db, state.session_id)
-                if session:
-                    metadata = session.metadata or {}
-                    metadata["interview_state"] = state.to_dict()
-                    session.metadata = metadata
-                    db.commit()
-            finally:
-                db.close()
-        except Exception as e:
-            logger.warning(f"Could not save interview state: {e}")
+        """Queue state for the write-behind DB writer"""
+        get_state_writer().schedule(state.session_id, "interview_state", state.to_dict())
 
 
 # Singleton instance
@@ -2,7 +2,7 @@
 Matcher Agent
 =============
 Matches diagnosed patients with appropriate mental health specialists.
-Uses database for specialists and persists matches.
+Ranks from the in-memory specialist feature cache and persists matches.
 """
 
 from typing import Dict, List, Optional
@@ -10,6 +10,9 @@ from dataclasses import dataclass
 from datetime import datetime
 
 from app.agents.base import BaseAgent, AgentOutput
+from app.agents.matcher.feature_cache import (
+    availability_score, experience_score, get_specialist_feature_cache
+)
 
 
 # Category mapping: Diagnosis category -> Specialist specializations
@@ -84,7 +87,6 @@ class MatcherAgent(BaseAgent):
         try:
             from app.db.session import SessionLocal
             from app.db.repositories_new import assessment_repo
-            from app.db.repositories_new.specialist import specialist_repo
             
             session_id = state.get("session_id")
             patient_id = state.get("patient_id")
@@ -116,10 +118,11 @@ class MatcherAgent(BaseAgent):
                 )
                 diagnosis_category = primary_diag.category or "other"
                 
-                # 2. Fetch approved specialists
-                specialists = specialist_repo.get_approved(db, limit=50)
+                # 2. Bring the approved specialists' features up to date
+                features = get_specialist_feature_cache()
+                features.refresh(db)
                 
-                if not specialists:
+                if not len(features):
                     return AgentOutput(
                         content={
                             "matches": [],
@@ -128,50 +131,26 @@ class MatcherAgent(BaseAgent):
                         metadata={"status": "no_specialists"}
                     )
                 
-                # 3. Score each specialist
-                scored = []
+                # 3. Top N over every approved specialist
                 target_specs = CATEGORY_TO_SPECIALIZATION.get(
                     diagnosis_category, []
                 )
+                top_matches = self._top_matches(features, target_specs, diagnosis_category)
                 
-                for spec in specialists:
-                    score, reasons = self._score_specialist(
-                        specialist=spec,
-                        target_specializations=target_specs,
-                        diagnosis_category=diagnosis_category
-                    )
-                    
-                    scored.append(SpecialistScore(
-                        specialist_id=str(spec.id),
-                        specialist_name=spec.full_name,
-                        score=round(score, 2),
-                        rank=0,  # Set after sorting
-                        reasons=reasons,
-                        specializations=spec.specializations or [],
-                        rating=float(spec.average_rating or 0),
-                        experience_years=spec.experience_years or 0,
-                        fee=spec.fee_per_session
-                    ))
-                
-                # 4. Sort and rank
-                scored.sort(key=lambda x: x.score, reverse=True)
-                top_matches = scored[:self.top_n]
-                
-                for i, match in enumerate(top_matches):
-                    match.rank = i + 1
-                
-                # 5. Persist matches to DB
-                for match in top_matches:
-                    assessment_repo.add_specialist_match(
-                        db=db,
-                        session_id=session_id,
-                        specialist_id=match.specialist_id,
-                        match_data={
+                # 4. Persist matches to DB in one batch
+                assessment_repo.add_specialist_matches(
+                    db=db,
+                    session_id=session_id,
+                    matches=[
+                        {
+                            "specialist_id": match.specialist_id,
                             "match_score": match.score,
                             "rank": match.rank,
                             "match_reasons": match.reasons
                         }
-                    )
+                        for match in top_matches
+                    ]
+                )
                 
                 self.log_info(
                     f"Matched {len(top_matches)} specialists for session {session_id}"
@@ -181,7 +160,7 @@ class MatcherAgent(BaseAgent):
                     content={
                         "matches": [m.to_dict() for m in top_matches],
                         "diagnosis_category": diagnosis_category,
-                        "total_evaluated": len(specialists)
+                        "total_evaluated": len(features)
                     },
                     metadata={
                         "match_count": len(top_matches),
@@ -199,6 +178,42 @@ class MatcherAgent(BaseAgent):
                 error=str(e)
             )
     
+    def _top_matches(
+        self,
+        features,
+        target_specializations: List[str],
+        diagnosis_category: str
+    ) -> List[SpecialistScore]:
+        """Rank the cached specialists; reasons are built for the top N only"""
+        category_scores = (1.0, 0.2) if target_specializations else (0.5, 0.5)
+        ranked = features.top_k(
+            self.top_n,
+            base_weights=(WEIGHT_RATING, WEIGHT_AVAILABILITY, WEIGHT_EXPERIENCE),
+            specializations=target_specializations,
+            match_bonus=category_scores[0] * WEIGHT_CATEGORY,
+            miss_bonus=category_scores[1] * WEIGHT_CATEGORY
+        )
+        
+        top_matches = []
+        for rank, (score, spec) in enumerate(ranked, start=1):
+            _, reasons = self._score_specialist(
+                specialist=spec,
+                target_specializations=target_specializations,
+                diagnosis_category=diagnosis_category
+            )
+            top_matches.append(SpecialistScore(
+                specialist_id=spec.id,
+                specialist_name=spec.full_name,
+                score=score,
+                rank=rank,
+                reasons=reasons,
+                specializations=spec.specializations,
+                rating=spec.average_rating,
+                experience_years=spec.experience_years,
+                fee=spec.fee_per_session
+            ))
+        return top_matches
+    
     def _score_specialist(
         self,
         specialist,
@@ -245,25 +260,15 @@ class MatcherAgent(BaseAgent):
             reasons.append(f"Well rated ({rating:.1f}/5)")
         
         # 3. Availability (20%)
-        schedule = specialist.weekly_schedule or {}
-        if schedule:
-            has_slots = any(
-                len(slots) > 0 
-                for slots in schedule.values() 
-                if isinstance(slots, list)
-            )
-            availability_score = 1.0 if has_slots else 0.3
-            if has_slots:
-                reasons.append("Has available slots")
-        else:
-            availability_score = 0.5  # Unknown availability
+        availability = availability_score(specialist.weekly_schedule)
+        if availability == 1.0:
+            reasons.append("Has available slots")
         
-        score += availability_score * WEIGHT_AVAILABILITY
+        score += availability * WEIGHT_AVAILABILITY
         
         # 4. Experience (15%)
         years = specialist.experience_years or 0
-        experience_score = min(1.0, years / 15.0)  # Max out at 15 years
-        score += experience_score * WEIGHT_EXPERIENCE
+        score += experience_score(years) * WEIGHT_EXPERIENCE
         
         if years >= 10:
             reasons.append(f"{years}+ years experience")
@@ -0,0 +1,284 @@
+"""
+Specialist Feature Cache
+========================
+Normalized match features for every approved specialist, kept in memory so
+the Matcher Agent ranks without loading specialists on each request.
+
+Set-valued features (specializations, languages, consultation modes) are
+bitsets over vocabularies that grow as new values appear; rating,
+availability and experience are scaled to 0-1, fees are banded and the city
+is the geo cell. Changed profiles are picked up incrementally from
+`specialists.updated_at`; a periodic full rebuild also drops deleted rows.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models_new.base import ApprovalStatus
+from app.models_new.specialist import Specialist
+
+# Upper bounds (PKR per session) of the fee bands; fees above the last bound
+# fall in the top band and unknown fees in band -1
+FEE_BANDS = (1000, 2500, 5000, 10000)
+
+# Delta refreshes re-read rows this far behind the watermark, so updates
+# committed by transactions that started before the last refresh are not missed
+SYNC_OVERLAP = timedelta(minutes=5)
+
+# Columns the features are built from; full ORM objects are never loaded
+FEATURE_COLUMNS = (
+    Specialist.id, Specialist.title, Specialist.first_name, Specialist.last_name,
+    Specialist.specializations, Specialist.languages, Specialist.consultation_modes,
+    Specialist.fee_per_session, Specialist.average_rating, Specialist.experience_years,
+    Specialist.city, Specialist.weekly_schedule, Specialist.approval_status, Specialist.updated_at,
+)
+
+
+def availability_score(schedule: Optional[Dict]) -> float:
+    """1.0 with open weekly slots, 0.3 with an empty schedule, 0.5 when unknown"""
+    if not schedule:
+        return 0.5
+    has_slots = any(len(slots) > 0 for slots in schedule.values() if isinstance(slots, list))
+    return 1.0 if has_slots else 0.3
+
+
+def experience_score(years: Optional[int]) -> float:
+    """Experience scaled to 0-1, maxing out at 15 years"""
+    return min(1.0, (years or 0) / 15.0)
+
+
+def fee_band(fee: Optional[float]) -> int:
+    """Index of the fee band, or -1 for an unknown fee"""
+    if fee is None:
+        return -1
+    return bisect_right(FEE_BANDS, float(fee))
+
+
+class SpecialistFeatures(NamedTuple):
+    """One specialist's cached profile fields and normalized features"""
+    id: str
+    full_name: str
+    specializations: List[str]
+    average_rating: float
+    experience_years: int
+    fee_per_session: Optional[float]
+    weekly_schedule: Dict
+    city: Optional[str]
+    specialty_bits: int
+    language_bits: int
+    mode_bits: int
+    fee_band: int
+    rating: float
+    availability: float
+    experience: float
+    geo_cell: str
+
+
+class Vocabulary:
+    """Grows a bit index per distinct lower-cased value"""
+
+    def __init__(self):
+        self.bits: Dict[str, int] = {}
+
+    def encode(self, values: Optional[Iterable[str]], grow: bool = True) -> int:
+        mask = 0
+        for value in values or ():
+            key = value.lower()
+            bit = self.bits.get(key)
+            if bit is None:
+                if not grow:
+                    continue
+                bit = self.bits[key] = len(self.bits)
+            mask |= 1 << bit
+        return mask
+
+
+class SpecialistFeatureCache:
+    """
+    Approved specialists' features with a weighted top-K over them.
+
+    Rows are ordered once per set of weights by their base score (rating,
+    availability, experience); a request only adds the specialization bonus,
+    so the top K are among the first K matching and first K other rows.
+    """
+
+    def __init__(self, refresh_seconds: float = 30.0, rebuild_seconds: float = 3600.0):
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.specialties = Vocabulary()
+        self.languages = Vocabulary()
+        self.modes = Vocabulary()
+        self._rows: Dict[str, SpecialistFeatures] = {}
+        # base weights -> rows sorted by base score, dropped whenever a row changes
+        self._orders: Dict[Tuple[float, float, float], List[Tuple[float, SpecialistFeatures]]] = {}
+        self._lock = threading.Lock()
+        self._watermark: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._rebuilt_at = 0.0
+        self.rebuilds = 0
+        self.refreshes = 0
+        self.updates = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def refresh(self, db: Session, force: bool = False) -> None:
+        """Pick up profile changes; at most once per refresh interval unless forced"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if not force and now - self._checked_at < self.refresh_seconds:
+                return
+            full = self._watermark is None or now - self._rebuilt_at >= self.rebuild_seconds
+            query = db.query(*FEATURE_COLUMNS)
+            if full:
+                query = query.filter(Specialist.approval_status == ApprovalStatus.APPROVED)
+            else:
+                # Changed rows of any status, so suspended specialists drop out
+                query = query.filter(Specialist.updated_at >= self._watermark - SYNC_OVERLAP)
+            self._apply(query.all(), full)
+            if full:
+                self._rebuilt_at = now
+            self._checked_at = now
+
+    def load(self, rows: Iterable[Any], full: bool = True) -> None:
+        """Apply already fetched specialist rows (anything with the feature columns)"""
+        with self._lock:
+            self._apply(rows, full)
+
+    def _apply(self, rows: Iterable[Any], full: bool) -> None:
+        updates = self.updates
+        if full:
+            self._rows = {}
+            self.rebuilds += 1
+        else:
+            self.refreshes += 1
+
+        for row in rows:
+            key = str(row.id)
+            if row.approval_status == ApprovalStatus.APPROVED:
+                self._rows[key] = self._features(row)
+                self.updates += 1
+            elif self._rows.pop(key, None) is not None:
+                self.updates += 1
+            if row.updated_at and (self._watermark is None or row.updated_at > self._watermark):
+                self._watermark = row.updated_at
+
+        if full or self.updates != updates:
+            self._orders = {}
+
+    def _features(self, row: Any) -> SpecialistFeatures:
+        rating = float(row.average_rating or 0)
+        fee = float(row.fee_per_session) if row.fee_per_session is not None else None
+        return SpecialistFeatures(
+            id=str(row.id),
+            full_name=" ".join(part for part in (row.title, row.first_name, row.last_name) if part),
+            specializations=list(row.specializations or []),
+            average_rating=rating,
+            experience_years=row.experience_years or 0,
+            fee_per_session=fee,
+            weekly_schedule=row.weekly_schedule or {},
+            city=row.city,
+            specialty_bits=self.specialties.encode(row.specializations),
+            language_bits=self.languages.encode(row.languages),
+            mode_bits=self.modes.encode(row.consultation_modes),
+            fee_band=fee_band(fee),
+            rating=rating / 5.0,
+            availability=availability_score(row.weekly_schedule),
+            experience=experience_score(row.experience_years),
+            geo_cell=(row.city or "").strip().lower(),
+        )
+
+    def invalidate(self, specialist_id: Optional[Any] = None) -> None:
+        """Drop a specialist (if given) and refresh on next use"""
+        with self._lock:
+            if specialist_id is not None and self._rows.pop(str(specialist_id), None) is not None:
+                self._orders = {}
+            self._checked_at = 0.0
+
+    def top_k(
+        self,
+        k: int,
+        base_weights: Tuple[float, float, float],
+        specializations: Optional[List[str]],
+        match_bonus: float,
+        miss_bonus: float,
+    ) -> List[Tuple[float, SpecialistFeatures]]:
+        """
+        Best K specialists by base score plus a specialization bonus.
+
+        Args:
+            base_weights: Weights of rating, availability and experience
+            specializations: Specialist specializations earning match_bonus;
+                every other specialist gets miss_bonus
+
+        Returns: (score rounded to 2 places, features) pairs, best first
+        """
+        order = self._order(base_weights)
+        target = self.specialties.encode(specializations, grow=False)
+        w_rating, w_availability, w_experience = base_weights
+
+        matched: List[Tuple[float, SpecialistFeatures]] = []
+        missed: List[Tuple[float, SpecialistFeatures]] = []
+        for _, row in order:
+            bucket = matched if row.specialty_bits & target else missed
+            if len(bucket) < k:
+                bonus = match_bonus if bucket is matched else miss_bonus
+                # Summed bonus first, as the agent's per-specialist score is
+                score = bonus + row.rating * w_rating + row.availability * w_availability + row.experience * w_experience
+                bucket.append((round(score, 2), row))
+            if len(missed) >= k and (len(matched) >= k or not target):
+                break
+
+        # Stable: equal scores keep base-score order
+        return sorted(matched + missed, key=lambda item: item[0], reverse=True)[:k]
+
+    def _order(self, base_weights: Tuple[float, float, float]) -> List[Tuple[float, SpecialistFeatures]]:
+        order = self._orders.get(base_weights)
+        if order is None:
+            w_rating, w_availability, w_experience = base_weights
+            order = sorted(
+                (
+                    (w_rating * row.rating + w_availability * row.availability + w_experience * row.experience, row)
+                    for row in self._rows.values()
+                ),
+                key=lambda item: (-item[0], item[1].id),
+            )
+            self._orders[base_weights] = order
+        return order
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            "specialists": len(self._rows),
+            "specialties": len(self.specialties.bits),
+            "languages": len(self.languages.bits),
+            "modes": len(self.modes.bits),
+            "rebuilds": self.rebuilds,
+            "refreshes": self.refreshes,
+            "updates": self.updates,
+        }
+
+
+_cache: Optional[SpecialistFeatureCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_specialist_feature_cache() -> SpecialistFeatureCache:
+    """Get the process-wide specialist feature cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SpecialistFeatureCache(
+                    refresh_seconds=float(os.getenv("SPECIALIST_FEATURE_REFRESH_SECONDS", "30")),
+                    rebuild_seconds=float(os.getenv("SPECIALIST_FEATURE_REBUILD_SECONDS", "3600")),
+                )
+    return _cache
@@ -5,15 +5,17 @@ Handles specialist filtering, scoring, and ranking based on patient preferences
 """
 
 from typing import List, Dict, Any, Optional, Tuple
-from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import and_, or_, func, desc, asc, String
+from sqlalchemy.orm import Query, Session, selectinload
+from sqlalchemy import and_, or_, func, desc, asc, case, false, literal, literal_column
 from datetime import datetime, timedelta, timezone
 import logging
+import re
 import uuid
 
 from app.models.specialist import (
     Specialists, SpecialistsAuthInfo, SpecialistSpecializations,
-    ApprovalStatusEnum, EmailVerificationStatusEnum, AvailabilityStatusEnum
+    ApprovalStatusEnum, EmailVerificationStatusEnum, AvailabilityStatusEnum,
+    SpecializationEnum, SpecialistTypeEnum, specialist_search_text, specialist_search_vector
 )
 from app.models.appointment import Appointment, AppointmentStatusEnum
 from .sma_schemas import (
@@ -23,6 +25,24 @@ from .sma_schemas import (
 
 logger = logging.getLogger(__name__)
 
+SPECIALIZATIONS = {e.value: e for e in SpecializationEnum}
+
+# Patient-facing names mapped onto stored specializations
+SPECIALIZATION_ALIASES = {
+    'anxiety': 'anxiety_disorders',
+}
+
+# Related specializations earning a partial match
+RELATED_SPECIALIZATIONS = {
+    'depression': ['anxiety_disorders', 'mdd', 'bipolar_disorder'],
+    'anxiety_disorders': ['depression', 'gad', 'ocd', 'ptsd'],
+    'ptsd': ['trauma_ptsd', 'anxiety_disorders'],
+    'ocd': ['anxiety_disorders'],
+    'bipolar_disorder': ['depression', 'mood_disorders'],
+    'eating_disorders': ['anxiety_disorders'],
+    'addiction': ['substance_use', 'alcohal_use'],
+}
+
 class SpecialistMatcher:
     """Core specialist matching and ranking engine"""
     
@@ -51,6 +71,9 @@ class SpecialistMatcher:
         """
         Search and rank specialists based on patient preferences
         
+        Scoring, ordering and pagination run in the database, so only the
+        requested page of specialists is loaded.
+        
         Returns:
             Dict with specialists, total count, and search metadata
         """
@@ -60,31 +83,24 @@ class SpecialistMatcher:
             
             # Apply hard filters to get candidate specialists
             candidates = self._apply_hard_filters(prefs)
-            logger.info(f"Hard filters returned {len(candidates)} candidates")
+            total_count = self._count(candidates)
+            logger.info(f"Hard filters matched {total_count} candidates")
             
-            if not candidates:
+            if not total_count:
                 logger.info("No candidates found with hard filters, trying relaxed filters")
                 # Try with relaxed filters
                 candidates = self._apply_relaxed_filters(prefs)
-                logger.info(f"Relaxed filters returned {len(candidates)} candidates")
-            
-            # Score and rank specialists
-            scored_specialists = self._score_specialists(candidates, prefs)
-            
-            # Apply sorting
-            sorted_specialists = self._apply_sorting(scored_specialists, request.sort_by)
+                total_count = self._count(candidates)
+                logger.info(f"Relaxed filters matched {total_count} candidates")
             
-            # Apply pagination
-            total_count = len(sorted_specialists)
-            start_idx = (request.page - 1) * request.size
-            end_idx = start_idx + request.size
-            paginated_specialists = sorted_specialists[start_idx:end_idx]
+            # Score, sort and paginate in SQL
+            page = self._rank_specialists(
+                candidates, prefs, request.sort_by,
+                offset=(request.page - 1) * request.size, limit=request.size
+            )
             
             # Convert to response format
-            specialists_data = []
-            for specialist, score_data in paginated_specialists:
-                specialist_data = self._convert_to_basic_info(specialist)
-                specialists_data.append(specialist_data)
+            specialists_data = [self._convert_to_basic_info(specialist) for specialist, _ in page]
             
             result = {
                 "specialists": specialists_data,
@@ -94,7 +110,7 @@ class SpecialistMatcher:
                 "total_pages": (total_count + request.size - 1) // request.size,
                 "search_criteria": {
                     "applied_filters": prefs.dict(),
-                    "total_candidates": len(candidates),
+                    "total_candidates": total_count,
                     "scoring_weights": self.weights
                 }
             }
@@ -117,17 +133,15 @@ class SpecialistMatcher:
             # Apply defaults
             prefs = self._apply_defaults(request)
             
-            # Get candidates
-            candidates = self._apply_hard_filters(prefs)
-            
-            if not candidates:
-                candidates = self._apply_relaxed_filters(prefs)
-            
-            # Score specialists
-            scored_specialists = self._score_specialists(candidates, prefs)
+            # Get the top N by score
+            top_specialists = self._rank_specialists(
+                self._apply_hard_filters(prefs), prefs, SortOption.BEST_MATCH, offset=0, limit=request.size
+            )
             
-            # Get top N
-            top_specialists = scored_specialists[:request.size]
+            if not top_specialists:
+                top_specialists = self._rank_specialists(
+                    self._apply_relaxed_filters(prefs), prefs, SortOption.BEST_MATCH, offset=0, limit=request.size
+                )
             
             # Build response with rationale
             specialists_data = []
@@ -136,18 +150,15 @@ class SpecialistMatcher:
                 "scoring_breakdown": []
             }
             
-            for specialist, score_data in top_specialists:
+            for specialist, total_score in top_specialists:
                 specialist_data = self._convert_to_basic_info(specialist)
                 specialists_data.append(specialist_data)
                 
-                # Add scoring breakdown
-                # The MatchingScoreBreakdown schema was removed, so this part needs to be adjusted
-                # or the schema needs to be re-added if it's still needed.
-                # For now, we'll just append a placeholder or remove if not used.
-                # Since the schema was removed, we'll just append a placeholder.
+                # Per-factor breakdown, computed only for the returned specialists
+                score_data = self._calculate_score(specialist, prefs)
                 rationale["scoring_breakdown"].append({
                     "specialist_id": specialist.id,
-                    "total_score": score_data['total_score'],
+                    "total_score": total_score,
                     "specialization_match": score_data['specialization_match'],
                     "language_overlap": score_data['language_overlap'],
                     "rating_score": score_data['rating_score'],
@@ -194,33 +205,19 @@ class SpecialistMatcher:
         
         return SpecialistSearchRequest(**prefs_dict)
     
-    def _apply_hard_filters(self, prefs: SpecialistSearchRequest) -> List[Specialists]:
-        """Apply hard filters to get candidate specialists"""
-        # Use selectinload to avoid JSON field issues in distinct
-        query = self.db.query(Specialists).options(
-            selectinload(Specialists.auth_info),
-            selectinload(Specialists.specializations)
-        ).join(
+    def _candidate_query(self) -> Query:
+        """Approved, verified and not deleted specialists"""
+        return self.db.query(Specialists).join(
             SpecialistsAuthInfo
         ).filter(
-            # Core verification filters
             Specialists.approval_status == ApprovalStatusEnum.APPROVED,
             SpecialistsAuthInfo.email_verification_status == EmailVerificationStatusEnum.VERIFIED,
             Specialists.is_deleted == False
         )
-        
-        # Availability status filter - temporarily commented out for testing
-        # query = query.filter(
-        #     Specialists.availability_status == AvailabilityStatusEnum.ACCEPTING_NEW_PATIENTS
-        # )
-        
-        # Consultation mode filter
-        if prefs.consultation_mode:
-            # For now, assume all specialists support online
-            # In a real implementation, you'd check consultation_modes array
-            if prefs.consultation_mode == ConsultationMode.IN_PERSON:
-                # For in-person, we might need additional checks
-                pass
+    
+    def _apply_hard_filters(self, prefs: SpecialistSearchRequest) -> Query:
+        """Build the candidate query for the patient's hard filters"""
+        query = self._candidate_query()
         
         # City filter for in-person consultations
         if (prefs.consultation_mode == ConsultationMode.IN_PERSON and 
@@ -239,159 +236,202 @@ class SpecialistMatcher:
         
         # Text search filter (query parameter)
         if prefs.query and prefs.query.strip():
-            search_term = f"%{prefs.query.strip()}%"
-            query = query.filter(
-                or_(
-                    Specialists.first_name.ilike(search_term),
-                    Specialists.last_name.ilike(search_term),
-                    func.concat(Specialists.first_name, ' ', Specialists.last_name).ilike(search_term),
-                    func.cast(Specialists.specialist_type, String).ilike(search_term),
-                    Specialists.city.ilike(search_term),
-                    Specialists.bio.ilike(search_term)
-                )
-            )
+            query = query.filter(self._text_match(prefs.query.strip()))
         
         # Specialist type filter
         if prefs.specialist_type:
             query = query.filter(Specialists.specialist_type == prefs.specialist_type)
         
-        # Language filter
-        if prefs.languages:
-            # For now, assume all specialists speak English/Urdu
-            # In a real implementation, you'd check languages_spoken array
-            pass
+        # Languages and availability are not filtered on yet; every specialist
+        # is assumed to speak English/Urdu and to have open slots
         
         # Specialization filter
         if prefs.specializations:
-            # Validate specialization values against enum
             valid_specializations = []
             for spec in prefs.specializations:
-                try:
-                    # Convert to proper enum value if needed
-                    if spec == "anxiety":
-                        spec = "anxiety_disorders"
-                    elif spec == "depression":
-                        spec = "depression"
-                    # Add more mappings as needed
-                    
-                    # Validate against enum
-                    from app.models.specialist import SpecializationEnum
-                    if spec in [e.value for e in SpecializationEnum]:
-                        valid_specializations.append(spec)
-                    else:
-                        logger.warning(f"Invalid specialization: {spec}")
-                except Exception as e:
-                    logger.warning(f"Error validating specialization {spec}: {e}")
+                spec = SPECIALIZATION_ALIASES.get(spec, spec)
+                if spec in SPECIALIZATIONS:
+                    valid_specializations.append(SPECIALIZATIONS[spec])
+                else:
+                    logger.warning(f"Invalid specialization: {spec}")
             
             if valid_specializations:
-                query = query.join(SpecialistSpecializations).filter(
+                query = query.filter(Specialists.specializations.any(
                     SpecialistSpecializations.specialization.in_(valid_specializations)
-                )
+                ))
         
-        # Availability filter (has at least one free slot in next 21 days)
-        if prefs.available_from or prefs.available_to:
-            # This would require joining with availability/slots table
-            # For now, we'll skip this filter
-            pass
-        
-        try:
-            # Use distinct on id to avoid JSON field comparison issues
-            specialists = query.distinct(Specialists.id).all()
-            logger.info(f"Found {len(specialists)} specialists after hard filters")
-            for spec in specialists:
-                logger.info(f"Specialist: {spec.id}, approval: {spec.approval_status}, verified: {spec.auth_info.email_verification_status if spec.auth_info else 'No auth info'}")
-            return specialists
-        except Exception as e:
-            logger.warning(f"Distinct on id failed, trying alternative approach: {str(e)}")
-            # Rollback any failed transaction
-            try:
-                self.db.rollback()
-            except:
-                pass
-            
-            # Fallback: use a subquery approach to avoid JSON field issues
-            try:
-                # Get distinct specialist IDs first
-                specialist_ids = self.db.query(Specialists.id).join(
-                    SpecialistsAuthInfo
-                ).filter(
-                    Specialists.approval_status == ApprovalStatusEnum.APPROVED,
-                    SpecialistsAuthInfo.email_verification_status == EmailVerificationStatusEnum.VERIFIED,
-                    Specialists.is_deleted == False
-                ).distinct().all()
-                
-                # Then get full specialist objects
-                specialist_ids_list = [sid[0] for sid in specialist_ids]
-                return self.db.query(Specialists).options(
-                    selectinload(Specialists.auth_info),
-                    selectinload(Specialists.specializations)
-                ).filter(Specialists.id.in_(specialist_ids_list)).all()
-            except Exception as e2:
-                logger.error(f"Alternative approach also failed: {str(e2)}")
-                # Last resort: return all without distinct
-                return query.all()
+        return query
     
-    def _apply_relaxed_filters(self, prefs: SpecialistSearchRequest) -> List[Specialists]:
-        """Apply relaxed filters when no matches found with strict filters"""
+    def _apply_relaxed_filters(self, prefs: SpecialistSearchRequest) -> Query:
+        """Relaxed candidate query used when the strict filters match nobody"""
         logger.info("Applying relaxed filters for specialist search")
         
-        # Use selectinload to avoid JSON field issues in distinct
-        query = self.db.query(Specialists).options(
+        # Keep only the verification filters; city, budget, text and
+        # specialization filters are dropped
+        return self._candidate_query()
+    
+    def _text_match(self, term: str):
+        """
+        Match the free-text query against name, city, bio and specialist type.
+        
+        On PostgreSQL every word must prefix-match the search tsvector, which
+        idx_specialists_search indexes; other databases fall back to LIKE.
+        """
+        words = re.findall(r"\w+", term.lower())
+        conditions = []
+        
+        if words:
+            columns = (Specialists.first_name, Specialists.last_name, Specialists.city, Specialists.bio)
+            if self.db.get_bind().dialect.name == "postgresql":
+                tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{word}:*" for word in words))
+                conditions.append(specialist_search_vector(*columns).op("@@")(tsquery))
+            else:
+                document = func.lower(specialist_search_text(*columns))
+                conditions.append(and_(*(document.contains(word, autoescape=True) for word in words)))
+        
+        specialist_types = [t for t in SpecialistTypeEnum if term.lower() in t.value]
+        if specialist_types:
+            conditions.append(Specialists.specialist_type.in_(specialist_types))
+        
+        return or_(*conditions) if conditions else false()
+    
+    def _count(self, query: Query) -> int:
+        """Count candidates without loading them"""
+        return query.with_entities(func.count(Specialists.id)).scalar() or 0
+    
+    def _rank_specialists(self, query: Query, prefs: SpecialistSearchRequest, sort_by: SortOption,
+                          offset: int, limit: int) -> List[Tuple[Specialists, float]]:
+        """Score, order and slice candidates in SQL; returns (specialist, total_score) pairs"""
+        score, specialization_scores = self._score_expression(prefs)
+        if specialization_scores is not None:
+            query = query.outerjoin(
+                specialization_scores, specialization_scores.c.specialist_id == Specialists.id
+            )
+        score = score.label("match_score")
+        
+        rows = query.add_columns(score).options(
             selectinload(Specialists.auth_info),
             selectinload(Specialists.specializations)
-        ).join(
-            SpecialistsAuthInfo
-        ).filter(
-            # Core verification filters (keep these)
-            Specialists.approval_status == ApprovalStatusEnum.APPROVED,
-            SpecialistsAuthInfo.email_verification_status == EmailVerificationStatusEnum.VERIFIED,
-            Specialists.is_deleted == False
-        )
-        
-        # Remove availability status filter
-        # Remove city filter
-        # Remove budget filter
-        # Keep only essential filters
+        ).order_by(
+            *self._sort_order(score, sort_by), Specialists.id
+        ).offset(offset).limit(limit).all()
         
-        try:
-            # Use distinct on id to avoid JSON field comparison issues
-            return query.distinct(Specialists.id).all()
-        except Exception as e:
-            logger.warning(f"Distinct on id failed, trying alternative approach: {str(e)}")
-            # Fallback: use a subquery approach to avoid JSON field issues
-            try:
-                # Get distinct specialist IDs first
-                specialist_ids = self.db.query(Specialists.id).join(
-                    SpecialistsAuthInfo
-                ).filter(
-                    Specialists.approval_status == ApprovalStatusEnum.APPROVED,
-                    SpecialistsAuthInfo.email_verification_status == EmailVerificationStatusEnum.VERIFIED,
-                    Specialists.is_deleted == False
-                ).distinct().all()
-                
-                # Then get full specialist objects
-                specialist_ids_list = [sid[0] for sid in specialist_ids]
-                return self.db.query(Specialists).options(
-                    selectinload(Specialists.auth_info),
-                    selectinload(Specialists.specializations)
-                ).filter(Specialists.id.in_(specialist_ids_list)).all()
-            except Exception as e2:
-                logger.error(f"Alternative approach also failed: {str(e2)}")
-                # Last resort: return all without distinct
-                return query.all()
+        return [(specialist, float(total_score)) for specialist, total_score in rows]
     
-    def _score_specialists(self, specialists: List[Specialists], prefs: SpecialistSearchRequest) -> List[Tuple[Specialists, Dict[str, Any]]]:
-        """Score specialists based on preferences"""
-        scored_specialists = []
+    def _sort_order(self, score, sort_by: SortOption) -> list:
+        """ORDER BY terms for a sort option; score breaks ties, as before"""
+        leading = {
+            SortOption.FEE_LOW: [func.coalesce(Specialists.consultation_fee, 0).asc()],
+            SortOption.RATING_HIGH: [func.coalesce(Specialists.average_rating, 0).desc()],
+            SortOption.EXPERIENCE_HIGH: [func.coalesce(Specialists.years_experience, 0).desc()],
+        }.get(sort_by, [])
+        return leading + [score.desc()]
+    
+    def _score_expression(self, prefs: SpecialistSearchRequest):
+        """
+        Weighted total score as a SQL expression, mirroring _calculate_score.
+        
+        Returns the expression and the specialization subquery it needs
+        outer-joined, or None when no specializations were requested.
+        """
+        rating = func.coalesce(Specialists.average_rating, 0)
+        years = func.coalesce(Specialists.years_experience, 0)
+        appointments = func.coalesce(Specialists.total_appointments, 0)
+        fee = Specialists.consultation_fee
+        
+        specialization_match, specialization_partial, specialization_scores = \
+            self._specialization_scores(prefs.specializations)
         
-        for specialist in specialists:
-            score_data = self._calculate_score(specialist, prefs)
-            scored_specialists.append((specialist, score_data))
+        if prefs.budget_max:
+            budget_max_float = float(prefs.budget_max)
+            budget_closeness = case(
+                (func.coalesce(fee, 0) == 0, 0.5),
+                (fee <= budget_max_float, 1.0 - fee / budget_max_float * 0.5),
+                else_=0.1
+            )
+        else:
+            budget_closeness = 1.0
         
-        # Sort by total score (descending)
-        scored_specialists.sort(key=lambda x: x[1]['total_score'], reverse=True)
+        if prefs.consultation_mode == ConsultationMode.ONLINE:
+            location_match = 1.0
+        elif not prefs.city:
+            location_match = 0.5
+        else:
+            location_match = case((func.lower(Specialists.city) == prefs.city.lower(), 1.0), else_=0.0)
         
-        return scored_specialists
+        if prefs.consultation_mode == ConsultationMode.IN_PERSON:
+            has_clinic = or_(
+                func.coalesce(Specialists.clinic_name, '') != '',
+                func.coalesce(Specialists.address, '') != ''
+            )
+            consultation_mode_match = case((has_clinic, 1.0), else_=0.3)
+        else:
+            consultation_mode_match = self._calculate_consultation_mode_match(None, prefs.consultation_mode)
+        
+        completion = (
+            0.85
+            + case((rating > 0, (rating - 3.0) * 0.03), else_=0.0)
+            + case((appointments >= 10, 0.1), else_=appointments / 100.0)
+        )
+        
+        factors = {
+            'specialization_match': specialization_match,
+            'specialization_partial': specialization_partial,
+            # Languages and availability don't vary by specialist yet
+            'language_overlap': self._calculate_language_overlap(None, prefs.languages),
+            'rating_score': case((rating == 0, 0.5), else_=rating / 5.0),
+            'experience_score': case((years >= 10, 1.0), else_=years / 10.0),
+            'budget_closeness': budget_closeness,
+            'location_match': location_match,
+            'availability_soonness': self._calculate_availability_soonness(None),
+            'consultation_mode_match': consultation_mode_match,
+            'response_time_score': case((rating >= 4.5, 0.9), (rating >= 4.0, 0.7), else_=0.4),
+            'completion_rate': case((appointments == 0, 0.5), (completion >= 1.0, 1.0), else_=completion)
+        }
+        
+        score = sum((self.weights[name] * factor for name, factor in factors.items()), literal(0.0))
+        return score, specialization_scores
+    
+    def _specialization_scores(self, required_specializations: Optional[List[str]]):
+        """
+        Specialization match and partial-match scores as SQL expressions.
+        
+        Each specialist's specializations are aggregated once per request
+        into one row of per-requested-specialization scores.
+        """
+        if not required_specializations:
+            return 1.0, 1.0, None
+        
+        specialization = SpecialistSpecializations.specialization
+        exact = [SPECIALIZATIONS[s] for s in required_specializations if s in SPECIALIZATIONS]
+        columns = []
+        if exact:
+            columns.append(func.max(case((specialization.in_(exact), 1.0), else_=0.0)).label("exact"))
+        
+        for i, req_spec in enumerate(required_specializations):
+            related = [SPECIALIZATIONS[s] for s in RELATED_SPECIALIZATIONS.get(req_spec, []) if s in SPECIALIZATIONS]
+            whens = []
+            if req_spec in SPECIALIZATIONS:
+                whens.append((specialization == SPECIALIZATIONS[req_spec], 1.0))
+            if related:
+                whens.append((specialization.in_(related), 0.7))
+            if whens:
+                columns.append(func.max(case(*whens, else_=0.0)).label(f"partial_{i}"))
+        
+        if not columns:
+            # Nothing requested can match a stored specialization
+            return 0.0, 0.0, None
+        
+        scores = self.db.query(
+            SpecialistSpecializations.specialist_id, *columns
+        ).group_by(SpecialistSpecializations.specialist_id).subquery()
+        
+        match = func.coalesce(scores.c.exact, 0.0) if exact else 0.0
+        partial = sum(
+            (func.coalesce(column, 0.0) for column in scores.c if column.name.startswith("partial_")),
+            literal(0.0)
+        ) / len(required_specializations)
+        return match, partial, scores
     
     def _calculate_score(self, specialist: Specialists, prefs: SpecialistSearchRequest) -> Dict[str, Any]:
         """Calculate comprehensive score for a specialist with enhanced factors"""
@@ -549,22 +589,13 @@ class SpecialistMatcher:
 
         # Check for related/partial matches (e.g., "depression" might match "anxiety_disorders")
         related_matches = 0
-        specialization_mapping = {
-            'depression': ['anxiety_disorders', 'mdd', 'bipolar_disorder'],
-            'anxiety_disorders': ['depression', 'gad', 'ocd', 'ptsd'],
-            'ptsd': ['trauma_ptsd', 'anxiety_disorders'],
-            'ocd': ['anxiety_disorders'],
-            'bipolar_disorder': ['depression', 'mood_disorders'],
-            'eating_disorders': ['anxiety_disorders'],
-            'addiction': ['substance_use', 'alcohal_use'],
-        }
 
         for req_spec in required_specializations:
             if req_spec in specialist_specs:
                 related_matches += 1  # Exact match
             else:
                 # Check for related specializations
-                related = specialization_mapping.get(req_spec, [])
+                related = RELATED_SPECIALIZATIONS.get(req_spec, [])
                 if any(rel in specialist_specs for rel in related):
                     related_matches += 0.7  # Partial match
 
@@ -672,22 +703,6 @@ class SpecialistMatcher:
 
         return factors
     
-    def _apply_sorting(self, scored_specialists: List[Tuple[Specialists, Dict[str, Any]]], sort_by: SortOption) -> List[Tuple[Specialists, Dict[str, Any]]]:
-        """Apply sorting to scored specialists"""
-        if sort_by == SortOption.BEST_MATCH:
-            # Already sorted by total score
-            return scored_specialists
-        elif sort_by == SortOption.FEE_LOW:
-            return sorted(scored_specialists, key=lambda x: float(x[0].consultation_fee or 0))
-        elif sort_by == SortOption.FEE_HIGH:
-            return sorted(scored_specialists, key=lambda x: float(x[0].consultation_fee or 0), reverse=True)
-        elif sort_by == SortOption.RATING_HIGH:
-            return sorted(scored_specialists, key=lambda x: float(x[0].average_rating or 0), reverse=True)
-        elif sort_by == SortOption.EXPERIENCE_HIGH:
-            return sorted(scored_specialists, key=lambda x: int(x[0].years_experience or 0), reverse=True)
-        else:
-            return scored_specialists
-    
     def _convert_to_basic_info(self, specialist: Specialists) -> Dict[str, Any]:
         """Convert specialist to basic info format"""
         return {
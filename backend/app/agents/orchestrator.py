@@ -4,7 +4,7 @@ Conversation Orchestrator
 Routes messages between agents following the architecture design.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 import asyncio
 import logging
 
@@ -69,15 +69,12 @@ class ConversationOrchestrator:
             "user_message": user_message
         }
         
-        # Run Therapist (SYNC) and SRA (ASYNC) in parallel
-        therapist_task = self.therapist.process(agent_input)
-        sra_task = self.sra.process(agent_input)
+        # Run Therapist (SYNC) and SRA (ASYNC) in parallel. SRA LLM calls go
+        # through the BACKGROUND scheduler lane, so they never delay the reply.
+        asyncio.create_task(self._run_sra_background(self.sra.process(agent_input)))
         
         # Therapist is prioritized - we need its response
-        therapist_result = await therapist_task
-        
-        # SRA runs in background - don't wait for it
-        asyncio.create_task(self._run_sra_background(sra_task))
+        therapist_result = await self.therapist.process(agent_input)
         
         # Update state after therapist
         state = self.state_manager.get(session_id)
@@ -105,6 +102,47 @@ class ConversationOrchestrator:
             "diagnosis": diagnosis_result.content if diagnosis_result else None
         }
     
+    async def process_message_stream(
+        self,
+        session_id: str,
+        patient_id: str,
+        user_message: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of process_message.
+        
+        Yields the therapist's token events followed by a "done" event with the
+        full reply. SRA extraction (and diagnosis, when due) start once the
+        reply is complete.
+        """
+        self.state_manager.get_or_create(session_id, patient_id)
+        
+        agent_input = {
+            "session_id": session_id,
+            "patient_id": patient_id,
+            "user_message": user_message
+        }
+        
+        async for event in self.therapist.process_stream(agent_input):
+            if event["type"] == "done":
+                state = self.state_manager.get(session_id)
+                event["metadata"]["diagnosis_ready"] = state.diagnosis_ready if state else False
+                yield event
+                
+                asyncio.create_task(self._run_sra_background(self.sra.process(agent_input)))
+                if state and state.should_trigger_diagnosis() and not state.diagnosis_ready:
+                    asyncio.create_task(self._run_diagnosis_background(agent_input))
+            else:
+                yield event
+    
+    async def _run_diagnosis_background(self, agent_input: Dict[str, Any]):
+        """Run diagnosis in background without blocking"""
+        try:
+            await self.diagnosis.process(agent_input)
+            logger.info(f"Diagnosis triggered for session {agent_input['session_id']}")
+        except Exception as e:
+            logger.error(f"Diagnosis failed: {e}")
+    
     async def _run_sra_background(self, sra_task):
         """Run SRA in background without blocking"""
         try:
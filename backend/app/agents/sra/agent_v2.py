@@ -15,7 +15,9 @@ from app.agents.core import (
     Symptom, ProcessedResponse, ConversationState, 
     get_state_manager, get_registry, register_tool
 )
-from app.core.llm_client import AgentLLMClient
+from app.agents.core.lexicon import Lexicon
+from app.core.llm_client import AgentLLMClient, get_shared_client
+from app.core.llm_scheduler import LLMPriority
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +72,13 @@ SEVERITY_WORDS = {
     0.2: ["rarely", "slightly", "a little", "mild"]
 }
 
+# Symptoms and severity words compiled into one matcher
+SYMPTOM_LEXICON = Lexicon(
+    "sra_v2",
+    Lexicon.from_mapping(DSM5_SYMPTOM_MAP)
+    + Lexicon.from_groups(SEVERITY_WORDS, kind="severity", as_weight=True, negatable=False)
+)
+
 
 # =============================================================================
 # MCP TOOLS
@@ -86,28 +95,20 @@ SEVERITY_WORDS = {
     agent="sra"
 )
 def extract_symptoms_fast(message: str) -> List[Dict]:
-    """Fast NER-style extraction using keyword matching"""
-    message_lower = message.lower()
-    found = []
-    
-    for keyword, mapping in DSM5_SYMPTOM_MAP.items():
-        if keyword in message_lower:
-            # Estimate severity
-            severity = 0.5
-            for sev_score, sev_words in SEVERITY_WORDS.items():
-                if any(sw in message_lower for sw in sev_words):
-                    severity = sev_score
-                    break
-            
-            found.append({
-                "name": keyword,
-                "category": mapping["category"],
-                "dsm_criteria": mapping["criteria"],
-                "severity": severity,
-                "confidence": 0.7
-            })
+    """Fast NER-style extraction using keyword matching (negated mentions are skipped)"""
+    scan = SYMPTOM_LEXICON.scan(message)
+    severity = scan.max_weight("severity", default=0.5)
     
-    return found
+    return [
+        {
+            "name": hit.term,
+            "category": hit.category,
+            "dsm_criteria": list(hit.criteria),
+            "severity": severity,
+            "confidence": 0.7
+        }
+        for hit in scan.unique("symptom")
+    ]
 
 
 @register_tool(
@@ -126,8 +127,7 @@ def extract_symptoms_fast(message: str) -> List[Dict]:
 async def extract_symptoms_llm(message: str, context: str = "") -> List[Dict]:
     """LLM-based deep extraction using robust JSON schema"""
     try:
-        from app.core.llm_client import AgentLLMClient
-        llm = AgentLLMClient(agent_name="SRA")
+        llm = get_shared_client()
         
         prompt = f"""Analyze the patient's message for mental health symptoms.
 
@@ -154,7 +154,9 @@ JSON SCHEMA:
 
 Response (JSON Array ONLY):"""
         
-        response = await llm.generate_async(prompt, temperature=0.0, max_tokens=500)
+        response = await llm.generate_async(
+            prompt, temperature=0.0, max_tokens=500, priority=LLMPriority.BACKGROUND
+        )
         
         # Robust JSON Parsing
         import json
@@ -212,7 +214,7 @@ class SRAAgentV2(BaseAgent):
     
     def __init__(self, llm_client=None, **kwargs):
         super().__init__(agent_name="SRAAgentV2", **kwargs)
-        self.llm_client = llm_client or AgentLLMClient(agent_name="SRA")
+        self.llm_client = llm_client or AgentLLMClient(agent_name="SRA", priority=LLMPriority.BACKGROUND)
         self.state_manager = get_state_manager()
     
     async def process(self, state: Dict) -> AgentOutput:
@@ -8,6 +8,8 @@ from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from enum import Enum
 
+from app.agents.core.lexicon import Lexicon, LexiconScan
+
 
 class DisorderCategory(Enum):
     """DSM-5 disorder categories"""
@@ -151,51 +153,54 @@ class DSM5SymptomDatabase:
         "recently": "weeks",
     }
     
+    @classmethod
+    def lexicon(cls) -> Lexicon:
+        """Symptoms, severity modifiers and durations as one shared lexicon"""
+        return _SYMPTOM_DB_LEXICON
+    
     @classmethod
     def match_symptoms(cls, text: str) -> List[Dict]:
         """
         Match symptoms in text against the database.
         
+        Negated mentions ("I'm not sad") are not reported.
+        
         Args:
             text: User input text
             
         Returns:
             List of matched symptom dictionaries
         """
-        text_lower = text.lower()
-        matches = []
+        scan = cls.lexicon().scan(text)
+        hits = scan.unique("symptom")
+        if not hits:
+            return []
         
-        for pattern, info in cls.SYMPTOM_PATTERNS.items():
-            if pattern in text_lower:
-                severity = cls._infer_severity(text_lower)
-                duration = cls._infer_duration(text_lower)
-                
-                matches.append({
-                    "name": pattern,
-                    "category": info["category"].value,
-                    "criteria": info["criteria"],
-                    "severity": severity,
-                    "duration": duration,
-                    "source_text": text[:100],
-                })
+        severity = cls._infer_severity(scan)
+        duration = cls._infer_duration(scan)
         
-        return matches
+        return [
+            {
+                "name": hit.term,
+                "category": hit.category,
+                "criteria": list(hit.criteria),
+                "severity": severity,
+                "duration": duration,
+                "source_text": text[:100],
+            }
+            for hit in hits
+        ]
     
     @classmethod
-    def _infer_severity(cls, text: str) -> float:
-        """Infer severity from text modifiers"""
-        for modifier, severity in cls.SEVERITY_MODIFIERS.items():
-            if modifier in text:
-                return severity
-        return 0.5  # Default moderate
+    def _infer_severity(cls, scan: LexiconScan) -> float:
+        """Infer severity from the strongest modifier (default moderate)"""
+        return scan.max_weight("severity", default=0.5)
     
     @classmethod
-    def _infer_duration(cls, text: str) -> Optional[str]:
-        """Infer duration from text"""
-        for pattern, duration in cls.DURATION_PATTERNS.items():
-            if pattern in text:
-                return duration
-        return None
+    def _infer_duration(cls, scan: LexiconScan) -> Optional[str]:
+        """Infer duration from the first duration phrase"""
+        hits = scan.of_kind("duration")
+        return hits[0].weight if hits else None
     
     @classmethod
     def get_disorder_criteria(cls, category: DisorderCategory) -> Dict:
@@ -237,4 +242,12 @@ class DSM5SymptomDatabase:
         return criteria_map.get(category, {})
 
 
+_SYMPTOM_DB_LEXICON = Lexicon(
+    "symptom_db",
+    Lexicon.from_mapping(DSM5SymptomDatabase.SYMPTOM_PATTERNS)
+    + Lexicon.from_weights(DSM5SymptomDatabase.SEVERITY_MODIFIERS, kind="severity")
+    + Lexicon.from_weights(DSM5SymptomDatabase.DURATION_PATTERNS, kind="duration")
+)
+
+
 __all__ = ["DSM5SymptomDatabase", "Symptom", "DisorderCategory"]
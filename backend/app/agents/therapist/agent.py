@@ -70,9 +70,12 @@ class TherapistAgent(BaseAgent):
             messages = state.get("messages", [])
             symptoms = state.get("symptoms", [])
             
+            # Callers may pass a bounded window plus the true message count
+            message_count = state.get("message_count", len(messages))
+            
             # Determine conversation phase
             phase = self.techniques.determine_phase(
-                message_count=len(messages),
+                message_count=message_count,
                 symptom_count=len(symptoms),
                 has_deep_exploration=self._has_deep_exploration(messages)
             )
@@ -99,7 +102,7 @@ class TherapistAgent(BaseAgent):
                 metadata={
                     "phase": phase.value,
                     "risk_level": risk_level.value,
-                    "message_count": len(messages) + 1,
+                    "message_count": message_count + 1,
                     "symptom_count": len(symptoms),
                 }
             )
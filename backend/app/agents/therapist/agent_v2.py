@@ -5,7 +5,7 @@ Natural, SCID-guided therapeutic conversations.
 Uses MCP tools for interview guidance.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator
 import asyncio
 import logging
 
@@ -14,11 +14,28 @@ from app.agents.core import (
     ConversationState, ConversationPhase, RiskLevel,
     Symptom, get_state_manager, get_registry, register_tool
 )
+from app.agents.core.lexicon import Lexicon
 from app.core.llm_client import AgentLLMClient
 
 logger = logging.getLogger(__name__)
 
 
+# =============================================================================
+# RISK LEXICON
+# =============================================================================
+
+RISK_KEYWORDS = {
+    RiskLevel.CRITICAL: ["suicide", "kill myself", "end my life", "want to die", "better off dead", "sleep forever", "never wake up", "gun", "weapon", "loading it", "hanging", "overdose"],
+    RiskLevel.HIGH: ["hurt myself", "self-harm", "cutting", "don't want to live", "no reason to live", "wish i was dead", "not want to live"],
+    RiskLevel.MODERATE: ["hopeless", "worthless", "can't go on", "give up", "nothing matters", "hate my life"]
+}
+
+_RISK_ORDER = [RiskLevel.CRITICAL, RiskLevel.HIGH, RiskLevel.MODERATE]
+
+# Negation is ignored for risk: "I'm not going to kill myself" still warrants a check-in
+RISK_LEXICON = Lexicon("therapist_risk", Lexicon.from_groups(RISK_KEYWORDS, kind="risk", negatable=False))
+
+
 # =============================================================================
 # MCP TOOLS
 # =============================================================================
@@ -65,16 +82,10 @@ async def get_guided_question(session_id: str, symptoms: List = None, phase: str
 )
 def detect_risk(message: str) -> Dict:
     """Detect risk indicators in message"""
-    risk_keywords = {
-        RiskLevel.CRITICAL: ["suicide", "kill myself", "end my life", "want to die", "better off dead", "sleep forever", "never wake up", "gun", "weapon", "loading it", "hanging", "overdose"],
-        RiskLevel.HIGH: ["hurt myself", "self-harm", "cutting", "don't want to live", "no reason to live", "wish i was dead", "not want to live"],
-        RiskLevel.MODERATE: ["hopeless", "worthless", "can't go on", "give up", "nothing matters", "hate my life"]
-    }
-    
-    message_lower = message.lower()
+    found = {hit.category for hit in RISK_LEXICON.scan(message).of_kind("risk")}
     
-    for level, keywords in risk_keywords.items():
-        if any(kw in message_lower for kw in keywords):
+    for level in _RISK_ORDER:
+        if level.value in found:
             return {"risk_level": level.value, "detected": True}
     
     return {"risk_level": RiskLevel.NONE.value, "detected": False}
@@ -153,6 +164,14 @@ Response: "It sounds exhausting to feel that drained every day. Has this tiredne
 
 Response:"""
 
+GREETING_PROMPT = """Generate a warm, welcoming greeting for a mental health conversation.
+Keep it to 2-3 sentences. Be warm and reassuring."""
+
+GREETING_FALLBACK = (
+    "Hello, and welcome. I'm here to listen and understand what you're going through. "
+    "Everything you share stays confidential. How are you feeling today?"
+)
+
 # Deterministic safety responses (No LLM generation for safety)
 SAFETY_RESPONSES = {
     RiskLevel.CRITICAL: (
@@ -180,6 +199,7 @@ class TherapistAgentV2(BaseAgent):
     - Deterministic Safety Override
     - 4-phase conversation flow
     - Integration with state manager
+    - Token streaming (process_stream)
     """
     
     def __init__(self, **kwargs):
@@ -191,9 +211,13 @@ class TherapistAgentV2(BaseAgent):
         self.state_manager = get_state_manager()
         self.tool_registry = get_registry()
     
-    async def process(self, state: Dict) -> AgentOutput:
-        """Process user message and generate therapeutic response"""
+    async def _prepare_turn(self, state: Dict) -> Dict[str, Any]:
+        """
+        Run everything that precedes generation for a turn.
         
+        Returns a plan with either a deterministic "response" (safety override)
+        or a generation "prompt" with its "fallback" reply, plus turn metadata.
+        """
         session_id = state.get("session_id")
         patient_id = state.get("patient_id", "")
         user_message = state.get("user_message", "")
@@ -204,101 +228,151 @@ class TherapistAgentV2(BaseAgent):
         # Add user message to history
         conv_state.add_message("user", user_message)
         
-        try:
-            # 1. Check for risk (Deterministic Priority)
-            risk_result = detect_risk(user_message)
-            if risk_result["detected"]:
-                level = RiskLevel(risk_result["risk_level"])
-                conv_state.risk_level = level
-                
-                # Deterministic Safety Override for High/Critical
-                if level in [RiskLevel.CRITICAL, RiskLevel.HIGH]:
-                    response = SAFETY_RESPONSES.get(level, SAFETY_RESPONSES[RiskLevel.HIGH])
-                    conv_state.add_message("assistant", response)
-                    self.state_manager.save(conv_state)
-                    return AgentOutput(
-                        content=response,
-                        metadata={"phase": "safety", "risk_level": level.value}
-                    )
+        # 1. Check for risk (Deterministic Priority)
+        risk_result = detect_risk(user_message)
+        if risk_result["detected"]:
+            level = RiskLevel(risk_result["risk_level"])
+            conv_state.risk_level = level
             
-            # 2. Determine phase
-            phase = determine_phase(
-                message_count=len(conv_state.messages),
-                symptom_count=len(conv_state.symptoms)
+            # Deterministic Safety Override for High/Critical
+            if level in [RiskLevel.CRITICAL, RiskLevel.HIGH]:
+                return {
+                    "conv_state": conv_state,
+                    "response": SAFETY_RESPONSES.get(level, SAFETY_RESPONSES[RiskLevel.HIGH]),
+                    "metadata": {"phase": "safety", "risk_level": level.value}
+                }
+        
+        # 2. Determine phase
+        phase = determine_phase(
+            message_count=len(conv_state.messages),
+            symptom_count=len(conv_state.symptoms)
+        )
+        conv_state.phase = ConversationPhase(phase)
+        
+        # 3. Get guided question if available
+        guided_question = None
+        try:
+            guided_result = await get_guided_question(
+                session_id=session_id,
+                symptoms=[s.name for s in conv_state.symptoms],
+                phase=phase
             )
-            conv_state.phase = ConversationPhase(phase)
-            
-            # 3. Get guided question if available
-            guided_question = None
-            try:
-                # Need to run in executor or await if async compatible (orchestrator is async)
-                # But here we call the tool wrapper which returns a dict
-                guided_result = await get_guided_question(
-                    session_id=session_id,
-                    symptoms=[s.name for s in conv_state.symptoms],
-                    phase=phase
-                )
-                if guided_result.get("action") == "ask_question":
-                    guided_question = guided_result.get("question_text")
-            except Exception as e:
-                logger.debug(f"No guided question: {e}")
-            
-            # 4. Generate response
-            if len(conv_state.messages) <= 2:
-                response = await self._generate_greeting()
-            elif guided_question:
-                response = await self._generate_guided_response(user_message, guided_question)
-            else:
-                response = await self._generate_response(user_message, conv_state)
+            if guided_result.get("action") == "ask_question":
+                guided_question = guided_result.get("question_text")
+        except Exception as e:
+            logger.debug(f"No guided question: {e}")
+        
+        # 4. Select generation prompt
+        if len(conv_state.messages) <= 2:
+            prompt, fallback = GREETING_PROMPT, GREETING_FALLBACK
+        elif guided_question:
+            prompt = GUIDED_QUESTION_PROMPT.format(
+                user_message=user_message,
+                guided_question=guided_question
+            )
+            fallback = f"I understand. {guided_question}"
+        else:
+            prompt, fallback = self._response_prompt(user_message, conv_state), self._get_fallback_response()
+        
+        return {
+            "conv_state": conv_state,
+            "prompt": prompt,
+            "fallback": fallback,
+            "metadata": {"phase": phase}
+        }
+    
+    def _finish_turn(self, conv_state: ConversationState, response: str, metadata: Dict) -> Dict:
+        """Record the assistant reply and build turn metadata"""
+        conv_state.add_message("assistant", response)
+        self.state_manager.save(conv_state)
+        if metadata.get("phase") == "safety":
+            return metadata
+        return {
+            **metadata,
+            "symptom_count": len(conv_state.symptoms),
+            "risk_level": conv_state.risk_level.value,
+            "message_count": len(conv_state.messages)
+        }
+    
+    async def process(self, state: Dict) -> AgentOutput:
+        """Process user message and generate therapeutic response"""
+        
+        conv_state = None
+        try:
+            plan = await self._prepare_turn(state)
+            conv_state = plan["conv_state"]
             
-            # 5. Update state
-            conv_state.add_message("assistant", response)
-            self.state_manager.save(conv_state)
+            response = plan.get("response")
+            if response is None:
+                try:
+                    response = await self.llm_client.generate_async(plan["prompt"])
+                except Exception:
+                    response = plan["fallback"]
             
             return AgentOutput(
                 content=response,
-                metadata={
-                    "phase": phase,
-                    "symptom_count": len(conv_state.symptoms),
-                    "risk_level": conv_state.risk_level.value,
-                    "message_count": len(conv_state.messages)
-                }
+                metadata=self._finish_turn(conv_state, response, plan["metadata"])
             )
             
         except Exception as e:
             logger.error(f"Therapist error: {e}", exc_info=True)
             fallback = self._get_fallback_response()
-            conv_state.add_message("assistant", fallback)
-            self.state_manager.save(conv_state)
+            if conv_state is not None:
+                conv_state.add_message("assistant", fallback)
+                self.state_manager.save(conv_state)
             return AgentOutput(content=fallback, error=str(e))
     
-    async def _generate_greeting(self) -> str:
-        """Generate warm greeting"""
-        try:
-            prompt = """Generate a warm, welcoming greeting for a mental health conversation.
-Keep it to 2-3 sentences. Be warm and reassuring."""
-            return await self.llm_client.generate_async(prompt)
-        except Exception:
-            return (
-                "Hello, and welcome. I'm here to listen and understand what you're going through. "
-                "Everything you share stays confidential. How are you feeling today?"
-            )
-    
-    async def _generate_guided_response(self, user_message: str, guided_question: str) -> str:
-        """Generate response incorporating guided question naturally"""
-        prompt = GUIDED_QUESTION_PROMPT.format(
-            user_message=user_message,
-            guided_question=guided_question
-        )
+    async def process_stream(self, state: Dict) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process user message and stream the therapeutic response.
+        
+        Yields {"type": "token", "content": str} events as text is generated,
+        then a single {"type": "done", "content": full_text, "metadata": {...}}.
+        The state update happens once, when the reply is complete.
+        """
+        conv_state = None
+        parts: List[str] = []
+        error = None
+        metadata: Dict[str, Any] = {}
         try:
-            return await self.llm_client.generate_async(prompt)
-        except Exception:
-            # Fallback: simple bridge
-            return f"I understand. {guided_question}"
+            plan = await self._prepare_turn(state)
+            conv_state = plan["conv_state"]
+            metadata = plan["metadata"]
+            
+            if plan.get("response") is not None:
+                parts.append(plan["response"])
+                yield {"type": "token", "content": plan["response"]}
+            else:
+                try:
+                    async for delta in self.llm_client.stream_async(plan["prompt"]):
+                        parts.append(delta)
+                        yield {"type": "token", "content": delta}
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Therapist stream interrupted: {e}")
+                    if not parts:
+                        parts.append(plan["fallback"])
+                        yield {"type": "token", "content": plan["fallback"]}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Therapist error: {e}", exc_info=True)
+            error = str(e)
+            if not parts:
+                parts.append(self._get_fallback_response())
+                yield {"type": "token", "content": parts[0]}
+        
+        response = "".join(parts)
+        if conv_state is not None:
+            metadata = self._finish_turn(conv_state, response, metadata)
+        if error:
+            metadata = {**metadata, "error": error}
+        yield {"type": "done", "content": response, "metadata": metadata}
     
-    async def _generate_response(self, user_message: str, conv_state: ConversationState) -> str:
-        """Generate context-aware response"""
-        prompt = f"""Based on the patient's response, generate a follow-up.
+    def _response_prompt(self, user_message: str, conv_state: ConversationState) -> str:
+        """Build context-aware follow-up prompt"""
+        return f"""Based on the patient's response, generate a follow-up.
 
 Patient said: {user_message}
 
@@ -308,11 +382,6 @@ Context:
 - Symptoms: {len(conv_state.symptoms)}
 
 Response (2-4 sentences, warm and empathetic):"""
-        
-        try:
-            return await self.llm_client.generate_async(prompt)
-        except Exception:
-            return self._get_fallback_response()
     
     def _get_fallback_response(self) -> str:
         """Fallback when LLM fails"""
@@ -7,6 +7,8 @@ Active listening, validation, and other therapeutic communication techniques.
 from typing import List, Optional
 from enum import Enum
 
+from app.agents.core.lexicon import Lexicon
+
 
 class ConversationPhase(Enum):
     """Phases of therapeutic conversation"""
@@ -143,38 +145,32 @@ class TherapeuticTechniques:
         Detect risk level based on keywords in text.
         This is a simple heuristic - real implementation should be more sophisticated.
         """
-        text_lower = text.lower()
-        
-        critical_keywords = [
-            "kill myself", "end my life", "suicide", "want to die",
-            "no reason to live", "better off dead"
-        ]
+        found = {hit.category for hit in _RISK_LEXICON.scan(text).of_kind("risk")}
         
-        high_keywords = [
-            "hurt myself", "self-harm", "cutting", "don't want to be here",
-            "give up", "can't go on"
-        ]
-        
-        moderate_keywords = [
-            "hopeless", "worthless", "burden", "no point",
-            "exhausted", "can't cope"
-        ]
-        
-        for keyword in critical_keywords:
-            if keyword in text_lower:
-                return RiskLevel.CRITICAL
-        
-        for keyword in high_keywords:
-            if keyword in text_lower:
-                return RiskLevel.HIGH
-        
-        for keyword in moderate_keywords:
-            if keyword in text_lower:
-                return RiskLevel.MODERATE
+        for level in (RiskLevel.CRITICAL, RiskLevel.HIGH, RiskLevel.MODERATE):
+            if level.value in found:
+                return level
         
         return RiskLevel.NONE
 
 
+# Risk keywords by level; negation is ignored so a denial still gets a check-in
+_RISK_LEXICON = Lexicon("therapist_techniques_risk", Lexicon.from_groups({
+    RiskLevel.CRITICAL: [
+        "kill myself", "end my life", "suicide", "want to die",
+        "no reason to live", "better off dead"
+    ],
+    RiskLevel.HIGH: [
+        "hurt myself", "self-harm", "cutting", "don't want to be here",
+        "give up", "can't go on"
+    ],
+    RiskLevel.MODERATE: [
+        "hopeless", "worthless", "burden", "no point",
+        "exhausted", "can't cope"
+    ],
+}, kind="risk", negatable=False))
+
+
 __all__ = [
     "ConversationPhase",
     "EmotionalTone", 
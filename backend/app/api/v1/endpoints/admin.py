@@ -28,6 +28,7 @@ from app.models.specialist import (
 )
 from app.models.admin import Admin, AdminRoleEnum, AdminStatusEnum
 from app.models.forum import ForumReport, ForumQuestion, ForumAnswer
+from app.services.slot_materializer import get_slot_materializer
 from app.core.logging_config import get_logger
 
 # Initialize router
@@ -553,6 +554,7 @@ async def approve_specialist(
 
         db.commit()
         db.refresh(specialist)
+        get_slot_materializer().request(specialist.id)
 
         return {
             "message": "Specialist approved successfully",
@@ -705,6 +707,7 @@ async def unsuspend_specialist(
         specialist.updated_at = datetime.now()
         
         db.commit()
+        get_slot_materializer().request(specialist.id)
 
         return {"message": "Specialist unsuspended successfully"}
 
@@ -35,6 +35,8 @@ from app.models.appointment import (
 )
 from app.models.specialist import Specialists, ApprovalStatusEnum, SpecialistReview, ReviewStatusEnum
 from app.models.patient import Patient
+from app.services.booking_service import booking_service
+from app.services.slot_materializer import day_range, get_slot_materializer
 
 # ============================================================================
 # ENUMS AND CONSTANTS
@@ -474,104 +476,61 @@ def generate_slots_for_single_date(
     
     return generated_slots
 
-def generate_slots_from_template(
+def query_available_slots(
     specialist_id: str,
-    appointment_type: str,
+    appointment_type_enum: AppointmentTypeEnum,
     start_date: date,
     end_date: date,
     db: Session
 ) -> List[GeneratedTimeSlot]:
-    """Generate time slots from specialist availability template"""
-    slots = []
-    current_date = start_date
+    """
+    Bookable slots from start_date through end_date (PKT days).
+
+    Slots are materialized ahead of time by the slot materializer, so this is
+    normally a single range scan on slot_date. The range is clamped to the
+    materialized window (endpoints reject ranges past it). A specialist with
+    nothing materialized yet, e.g. one approved since the last sweep, has
+    their window written before the slots are read.
+    """
+    materializer = get_slot_materializer()
     today = datetime.now(PKT).date()
-    
-    # Validate dates - don't generate slots for past dates
-    if end_date < today:
-        return slots  # Return empty if all dates are in the past
-    
-    if start_date < today:
-        current_date = today  # Start from today if start_date is in the past
-    
-    while current_date <= end_date:
-        weekday = current_date.strftime("%A").lower()
-        weekday_enum = get_weekday_enum(weekday)
-        
-        # Convert string to enum
-        # For GeneratedTimeSlot, use ONLINE; for Appointment, use VIRTUAL
-        appointment_type_enum = AppointmentTypeEnum.ONLINE if appointment_type == "online" else AppointmentTypeEnum.IN_PERSON
-        
-        # Get availability template for this weekday and appointment type
-        template = db.query(SpecialistAvailabilityTemplate).filter(
-            SpecialistAvailabilityTemplate.specialist_id == specialist_id,
-            SpecialistAvailabilityTemplate.day_of_week == weekday_enum,
-            SpecialistAvailabilityTemplate.appointment_type == appointment_type_enum,
-            SpecialistAvailabilityTemplate.is_active == True
+    last_day = materializer.last_day(today)
+    if start_date > last_day:
+        return []
+    end_date = min(end_date, last_day)
+
+    range_start, range_end = day_range(start_date, end_date)
+    slot_query = db.query(GeneratedTimeSlot).filter(
+        GeneratedTimeSlot.specialist_id == specialist_id,
+        GeneratedTimeSlot.appointment_type == appointment_type_enum,
+        GeneratedTimeSlot.slot_date >= range_start,
+        GeneratedTimeSlot.slot_date < range_end,
+        GeneratedTimeSlot.status == SlotStatusEnum.AVAILABLE,
+        GeneratedTimeSlot.can_be_booked == True
+    ).order_by(asc(GeneratedTimeSlot.slot_date))
+    slots = slot_query.all()
+
+    if not slots:
+        window_start, window_end = day_range(today, last_day)
+        materialized = db.query(GeneratedTimeSlot.id).filter(
+            GeneratedTimeSlot.specialist_id == specialist_id,
+            GeneratedTimeSlot.slot_date >= window_start,
+            GeneratedTimeSlot.slot_date < window_end
         ).first()
-        
-        if template:
-            try:
-                # Parse start and end times with error handling
-                start_time_parts = template.start_time.split(':')
-                end_time_parts = template.end_time.split(':')
-                
-                if len(start_time_parts) != 2 or len(end_time_parts) != 2:
-                    logger.warning(f"Invalid time format in template for specialist {specialist_id}, day {weekday}")
-                    current_date += timedelta(days=1)
-                    continue
-                
-                start_hour, start_minute = map(int, start_time_parts)
-                end_hour, end_minute = map(int, end_time_parts)
-                
-                # Validate time values
-                if not (0 <= start_hour < 24 and 0 <= start_minute < 60):
-                    logger.warning(f"Invalid start time {template.start_time} for specialist {specialist_id}")
-                    current_date += timedelta(days=1)
-                    continue
-                    
-                if not (0 <= end_hour < 24 and 0 <= end_minute < 60):
-                    logger.warning(f"Invalid end time {template.end_time} for specialist {specialist_id}")
-                    current_date += timedelta(days=1)
-                    continue
-                
-                # Create timezone-aware datetime objects
-                start_datetime = datetime.combine(current_date, time(start_hour, start_minute), tzinfo=PKT)
-                end_datetime = datetime.combine(current_date, time(end_hour, end_minute), tzinfo=PKT)
-                
-                # Validate that end time is after start time
-                if end_datetime <= start_datetime:
-                    logger.warning(f"End time {template.end_time} is not after start time {template.start_time} for specialist {specialist_id}")
-                    current_date += timedelta(days=1)
-                    continue
-                
-                # Generate slots
-                current_time = start_datetime
-                while current_time + timedelta(minutes=template.slot_length_minutes) <= end_datetime:
-                    slot_end = current_time + timedelta(minutes=template.slot_length_minutes)
-                    
-                    # Only create slots for future times
-                    if current_time > datetime.now(PKT):
-                        slot = GeneratedTimeSlot(
-                            specialist_id=specialist_id,
-                            slot_date=current_time,
-                            appointment_type=appointment_type_enum,
-                            duration_minutes=template.slot_length_minutes,
-                            status=SlotStatusEnum.AVAILABLE
-                        )
-                        slots.append(slot)
-                    
-                    current_time = slot_end + timedelta(minutes=template.break_between_slots_minutes)
-                    
-            except (ValueError, AttributeError) as e:
-                logger.error(f"Error parsing template times for specialist {specialist_id}, day {weekday}: {str(e)}")
-                # Continue to next date instead of failing completely
-                current_date += timedelta(days=1)
-                continue
-        
-        current_date += timedelta(days=1)
-    
+        if materialized is None and materializer.materialize(db, [specialist_id]):
+            slots = slot_query.all()
     return slots
 
+
+def check_slot_window(end_date: date) -> None:
+    """Reject dates past the materialized slot window"""
+    last_day = get_slot_materializer().last_day(datetime.now(PKT).date())
+    if end_date > last_day:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot get slots after {last_day.isoformat()}"
+        )
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
@@ -619,33 +578,9 @@ async def get_available_slots(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot get slots for past dates"
             )
+        check_slot_window(date)
         
-        # Check if slots exist for this date
-        existing_slots = db.query(GeneratedTimeSlot).filter(
-            GeneratedTimeSlot.specialist_id == specialist_id,
-            GeneratedTimeSlot.appointment_type == appointment_type_enum,
-            func.date(GeneratedTimeSlot.slot_date) == date,
-            GeneratedTimeSlot.status == SlotStatusEnum.AVAILABLE
-        ).all()
-        
-        # If no slots exist, generate them
-        if not existing_slots:
-            slots = generate_slots_from_template(
-                specialist_id, appointment_type, date, date, db
-            )
-            
-            # Save generated slots
-            for slot in slots:
-                db.add(slot)
-            db.commit()
-            
-            # Refresh the query
-            existing_slots = db.query(GeneratedTimeSlot).filter(
-                GeneratedTimeSlot.specialist_id == specialist_id,
-                GeneratedTimeSlot.appointment_type == appointment_type_enum,
-                func.date(GeneratedTimeSlot.slot_date) == date,
-                GeneratedTimeSlot.status == SlotStatusEnum.AVAILABLE
-            ).all()
+        existing_slots = query_available_slots(specialist_id, appointment_type_enum, date, date, db)
         
         # Convert to response format
         response_slots = []
@@ -920,8 +855,7 @@ async def get_specialist_slots(
         # For GeneratedTimeSlot, use ONLINE
         appointment_type_enum = AppointmentTypeEnum.ONLINE if appointment_type == "online" else AppointmentTypeEnum.IN_PERSON
         
-        # Generate slots for the date range
-        # Parse dates and ensure timezone-aware
+        # Parse dates
         start_dt = datetime.strptime(start_date, "%Y-%m-%d").date()
         end_dt = datetime.strptime(end_date, "%Y-%m-%d").date()
         
@@ -934,63 +868,9 @@ async def get_specialist_slots(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="End date must be after start date"
             )
+        check_slot_window(end_dt)
         
-        # Optimize: Query all existing slots for the entire date range at once
-        # This reduces database queries from N (one per date) to 1
-        existing_slots = db.query(GeneratedTimeSlot).filter(
-            GeneratedTimeSlot.specialist_id == specialist_id,
-            GeneratedTimeSlot.appointment_type == appointment_type_enum,
-            func.date(GeneratedTimeSlot.slot_date) >= start_dt,
-            func.date(GeneratedTimeSlot.slot_date) <= end_dt,
-            GeneratedTimeSlot.status == SlotStatusEnum.AVAILABLE
-        ).all()
-        
-        # Group existing slots by date
-        slots_by_date = {}
-        for slot in existing_slots:
-            slot_date = slot.slot_date.date() if isinstance(slot.slot_date, datetime) else slot.slot_date
-            if slot_date not in slots_by_date:
-                slots_by_date[slot_date] = []
-            slots_by_date[slot_date].append(slot)
-        
-        # Determine which dates need slot generation
-        dates_to_generate = []
-        current_date = start_dt
-        while current_date <= end_dt:
-            if current_date not in slots_by_date:
-                dates_to_generate.append(current_date)
-            current_date += timedelta(days=1)
-        
-        # Generate slots for all missing dates using the helper function
-        if dates_to_generate:
-            all_generated_slots = []
-            for date_to_gen in dates_to_generate:
-                # Use the helper function to generate slots for each date
-                generated = generate_slots_for_single_date(
-                    specialist_id=specialist_id,
-                    target_date=date_to_gen,
-                    appointment_type_enum=appointment_type_enum,
-                    db=db
-                )
-                all_generated_slots.extend(generated)
-            
-            # Commit all generated slots at once
-            if all_generated_slots:
-                try:
-                    db.commit()
-                    logger.info(f"Generated {len(all_generated_slots)} slots for {len(dates_to_generate)} dates")
-                except Exception as e:
-                    db.rollback()
-                    logger.error(f"Error committing generated slots: {str(e)}")
-            
-            # Refresh query to get all slots including newly generated ones
-            existing_slots = db.query(GeneratedTimeSlot).filter(
-                GeneratedTimeSlot.specialist_id == specialist_id,
-                GeneratedTimeSlot.appointment_type == appointment_type_enum,
-                func.date(GeneratedTimeSlot.slot_date) >= start_dt,
-                func.date(GeneratedTimeSlot.slot_date) <= end_dt,
-                GeneratedTimeSlot.status == SlotStatusEnum.AVAILABLE
-            ).all()
+        existing_slots = query_available_slots(specialist_id, appointment_type_enum, start_dt, end_dt, db)
         
         # Convert all slots to response format
         response_slots = []
@@ -1057,8 +937,7 @@ async def get_slots_for_date(
     db: Session = Depends(get_db)
 ):
     """
-    Get available slots for a specific date (on-demand generation).
-    Generates slots immediately if they don't exist.
+    Get available slots for a specific date.
     Only allows dates within the next 7 days.
     """
     try:
@@ -1099,45 +978,13 @@ async def get_slots_for_date(
                 detail="Cannot get slots for past dates"
             )
         
-        # Validate date is within 7 days
-        max_date = today + timedelta(days=7)
-        if target_date > max_date:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot get slots more than 7 days in advance"
-            )
+        # Validate date is within the materialized slot window (a week ahead by default)
+        check_slot_window(target_date)
         
         # Convert appointment type
         appointment_type_enum = AppointmentTypeEnum.ONLINE if appointment_type == "online" else AppointmentTypeEnum.IN_PERSON
         
-        # Generate slots for the date if they don't exist
-        generated_slots = generate_slots_for_single_date(
-            specialist_id=specialist_id,
-            target_date=target_date,
-            appointment_type_enum=appointment_type_enum,
-            db=db
-        )
-        
-        # Commit generated slots if any
-        if generated_slots:
-            try:
-                db.commit()
-            except Exception as e:
-                db.rollback()
-                logger.error(f"Error committing generated slots: {str(e)}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to save generated slots"
-                )
-        
-        # Query all available slots for this date
-        slots = db.query(GeneratedTimeSlot).filter(
-            GeneratedTimeSlot.specialist_id == specialist_id,
-            GeneratedTimeSlot.appointment_type == appointment_type_enum,
-            func.date(GeneratedTimeSlot.slot_date) == target_date,
-            GeneratedTimeSlot.status == SlotStatusEnum.AVAILABLE,
-            GeneratedTimeSlot.can_be_booked == True
-        ).order_by(asc(GeneratedTimeSlot.slot_date)).all()
+        slots = query_available_slots(specialist_id, appointment_type_enum, target_date, target_date, db)
         
         # Convert to response format
         response_slots = []
@@ -1533,6 +1380,7 @@ async def cancel_appointment(
             slot.appointment_id = None
         
         db.commit()
+        booking_service.invalidate_availability(appointment.specialist_id)
         
         return {
             "success": True,
@@ -1637,6 +1485,10 @@ async def reschedule_appointment(
         
         # Commit the new slot booking and appointment update
         db.commit()
+        # Both the released and the booked slot change what is available
+        booking_service.invalidate_availability(appointment.specialist_id)
+        if new_slot.specialist_id != appointment.specialist_id:
+            booking_service.invalidate_availability(new_slot.specialist_id)
         
         return {
             "success": True,
@@ -1855,6 +1707,7 @@ async def set_specialist_availability(
                 db.add(template)
         
         db.commit()
+        get_slot_materializer().request(user_id)
         
         return {
             "success": True,
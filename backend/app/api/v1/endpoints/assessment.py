@@ -4,9 +4,13 @@ Assessment API (Refactored)
 Streamlined assessment workflow using Therapist Agent and Repositories.
 """
 
+import json
+import asyncio
 import logging
-from typing import Any, List
+from datetime import datetime, timezone
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_patient
@@ -24,11 +28,16 @@ from app.agents.sra.agent import SymptomRecognitionAgent
 from app.agents.therapist.agent import TherapistAgent
 from app.agents.diagnosis.agent import DiagnosisAgent
 from app.agents.matcher.agent import MatcherAgent
+from app.agents.orchestrator import get_orchestrator
 
 # Initialize Router
 router = APIRouter(prefix="/assessment", tags=["Assessment"])
 logger = logging.getLogger(__name__)
 
+# Conversation window given to the therapist per turn (bounded, so turn cost
+# does not grow with conversation length)
+CHAT_CONTEXT_MESSAGES = 20
+
 # Initialize Agents
 try:
     therapist_agent = TherapistAgent()
@@ -133,16 +142,15 @@ def start_session(
     db.refresh(session)
     
     # 2. Get Agent Greeting (Mocking async call or running sync)
-    import asyncio
+    from app.core.llm_transport import run_sync
     try:
-        greeting = asyncio.run(therapist_agent._generate_greeting())
+        greeting = run_sync(therapist_agent._generate_greeting())
     except Exception as e:
         logger.error(f"Failed to generate greeting: {e}")
         greeting = "Hello. I'm here to help you understand what you're going through. How can I help you today?"
         
-    # 3. Store Greeting
-    assessment_repo.add_message(
-        db, 
+    # 3. Store Greeting (journaled; written off the request path)
+    assessment_repo.append_message(
         session_id=session.id, 
         role="assistant", 
         content=greeting
@@ -156,46 +164,112 @@ def start_session(
     )
 
 
-@router.post("/chat", response_model=AssessmentChatResponse)
-async def chat(
-    request: AssessmentChatRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    current_patient: Patient = Depends(get_current_patient)
-) -> Any:
-    """
-    Send a message to the therapist agent.
-    """
-    session_id = request.session_id
-    
-    # 1. Validate Session
+def _resolve_chat_session(db: Session, session_id: Optional[str], current_patient: Patient) -> AssessmentSession:
+    """Validate the requested session (or create one) and return its row"""
     if not session_id:
-        # Auto-create if not provided? For now enforce start or provide ID
-        # Let's auto-create for better UX if missing
         session = AssessmentSession(
             patient_id=current_patient.id,
-            status=SessionStatus.ACTIVE
+            status=SessionStatus.ACTIVE,
+            message_count=0,
+            symptom_count=0
         )
         db.add(session)
         db.commit()
         db.refresh(session)
-        session_id = str(session.id)
-    else:
-        session = assessment_repo.get(db, id=session_id)
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        if str(session.patient_id) != str(current_patient.id):
-             raise HTTPException(status_code=403, detail="Not authorized for this session")
+        return session
+    
+    # Buffered messages of the previous turn must be counted
+    assessment_repo.flush_messages(session_id)
+    session = assessment_repo.get(db, id=session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if str(session.patient_id) != str(current_patient.id):
+        raise HTTPException(status_code=403, detail="Not authorized for this session")
+    return session
+
 
-    # 2. Store User Message
-    assessment_repo.add_message(
-        db,
+def _record_turn(session_id: str, user_content: str, assistant_content: Optional[str],
+                 metadata: Optional[dict], user_sent_at: datetime):
+    """Hand a chat turn to the message journal (batched with other sessions' turns)"""
+    assessment_repo.journal_turn(
         session_id=session_id,
-        role="user",
-        content=request.message
+        user_content=user_content,
+        assistant_content=assistant_content,
+        assistant_metadata=metadata,
+        user_sent_at=user_sent_at
     )
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: AssessmentChatRequest,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+) -> StreamingResponse:
+    """
+    Send a message to the therapist agent and stream the reply (Server-Sent Events).
     
-    # 3. Trigger SRA in Background
+    Each event is a JSON `data:` line: {"type": "token", "content": ...} while the
+    reply is generated, then {"type": "done", "session_id": ..., "content": full_reply,
+    "metadata": {...}} once it has been persisted.
+    """
+    session_id = str(_resolve_chat_session(db, request.session_id, current_patient).id)
+    user_sent_at = datetime.now(timezone.utc)
+    
+    patient_id = str(current_patient.id)
+    orchestrator = get_orchestrator()
+    
+    async def event_stream():
+        recorded = False
+        try:
+            async for event in orchestrator.process_message_stream(session_id, patient_id, request.message):
+                if event["type"] == "done":
+                    # User message and reply are journaled; counters follow with the batch
+                    _record_turn(session_id, request.message, event["content"], event["metadata"], user_sent_at)
+                    recorded = True
+                    event = {**event, "session_id": session_id}
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.error(f"Streaming chat failed: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'detail': 'Failed to generate response'})}\n\n"
+        finally:
+            if not recorded:
+                # Keep the patient's message even if no reply was produced
+                try:
+                    _record_turn(session_id, request.message, None, None, user_sent_at)
+                except Exception as e:
+                    logger.error(f"Failed to store user message: {e}")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/chat", response_model=AssessmentChatResponse)
+async def chat(
+    request: AssessmentChatRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+) -> Any:
+    """
+    Send a message to the therapist agent.
+    
+    DB cost per turn is constant: one session read, one bounded window of
+    recent messages and a (usually cached) symptom summary. Both messages
+    and the counters are written by the message journal, batched with
+    other sessions' turns.
+    """
+    # 1. Validate Session (auto-created if not provided)
+    session = _resolve_chat_session(db, request.session_id, current_patient)
+    session_id = str(session.id)
+    message_count = session.message_count or 0
+    symptom_count = session.symptom_count or 0
+    user_sent_at = datetime.now(timezone.utc)
+    
+    # 2. Trigger SRA in Background
     async def run_sra(s_id, msg):
         try:
             await sra_agent.process({
@@ -207,29 +281,29 @@ async def chat(
 
     background_tasks.add_task(run_sra, session_id, request.message)
 
-    # 4. Build Agent State
-    # Fetch history
-    history = assessment_repo.get_conversation_history(db, session_id)
+    # 3. Build Agent State from a bounded window (plus the new message)
+    history = assessment_repo.get_recent_messages(db, session_id, limit=CHAT_CONTEXT_MESSAGES)
     messages_dicts = [
         {"role": msg.role, "content": msg.content} 
         for msg in history
     ]
+    messages_dicts.append({"role": "user", "content": request.message})
     
-    # Fetch Symptoms from DB for context
-    symptoms_objs = assessment_repo.get_symptoms(db, session_id)
-    symptoms = [
-        {"name": s.symptom_name, "severity": float(s.severity), "category": s.category} 
-        for s in symptoms_objs
-    ]
+    # Symptom context (cached until the session's symptom count changes)
+    symptoms = assessment_repo.get_symptom_summary(db, session_id, symptom_count=symptom_count)
+    
+    # Release the request's connection before the (slow) agent call
+    db.close()
     
     agent_state = {
         "messages": messages_dicts,
+        "message_count": message_count + 1,
         "user_message": request.message,
         "symptoms": symptoms,
         "session_id": session_id
     }
     
-    # 5. Run Agent
+    # 4. Run Agent
     try:
         agent_output = await therapist_agent.process(agent_state)
         response_text = agent_output.content
@@ -239,14 +313,8 @@ async def chat(
         response_text = "I apologize, but I'm having trouble processing that right now. Could you rephrase?"
         metadata = {"error": str(e)}
 
-    # 6. Store Assistant Response
-    assessment_repo.add_message(
-        db,
-        session_id=session_id,
-        role="assistant",
-        content=response_text,
-        metadata=metadata
-    )
+    # 5. Journal the whole turn
+    _record_turn(session_id, request.message, response_text, metadata, user_sent_at)
     
     return AssessmentChatResponse(
         session_id=session_id,
@@ -10,15 +10,18 @@ Version: 2.0.0 - Unified specialist management system
 
 import os
 import re
+import json
 import uuid
+import base64
 import logging
 from datetime import datetime, date, timezone, timedelta
+from decimal import Decimal
 from typing import Optional, List, Dict, Any
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, and_, or_, select, tuple_
 from pydantic import BaseModel, Field, field_validator
 
 from app.db.session import get_db
@@ -76,7 +79,7 @@ from app.models.specialist import (
 from app.models.patient import Patient
 from app.models.admin import Admin
 from app.models.specialist import SpecialistReview, ReviewStatusEnum
-from app.models.appointment import Appointment, AppointmentStatusEnum
+from app.models.appointment import Appointment, AppointmentStatusEnum, GeneratedTimeSlot, SlotStatusEnum
 from app.models.forum import ForumAnswer, AnswerStatus
     
 # Import utilities
@@ -2391,10 +2394,27 @@ async def get_availability_summary(
 # SEARCH ENDPOINTS FOR PATIENTS
 # ============================================================================
 
+def _encode_search_cursor(rating: Any, specialist_id: Any) -> str:
+    """Opaque keyset cursor for the position after a search result"""
+    raw = json.dumps([str(rating), str(specialist_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_search_cursor(cursor: str):
+    """(rating, specialist id) of a search cursor; raises ValueError when malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rating, specialist_id = json.loads(raw)
+        return Decimal(rating), uuid.UUID(specialist_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
 @router.get("/search")
 async def search_specialists(
     page: int = 1,
     size: int = 50,
+    cursor: Optional[str] = None,
     city: Optional[str] = None,
     specialization: Optional[str] = None,
     has_appointments: Optional[bool] = None,
@@ -2405,7 +2425,15 @@ async def search_specialists(
     language: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Search specialists for patients with filtering options"""
+    """
+    Search specialists for patients with filtering options.
+
+    Results are ranked by rating, then id, and paged with a keyset cursor:
+    pass pagination.next_cursor back as cursor for the following page. A page
+    costs the same fixed set of statements however deep it is (count, page,
+    and one batched load each for specializations and availability slots).
+    page is still accepted for clients that page by number.
+    """
     try:
         # Build query for approved specialists only
         query = db.query(Specialists).filter(
@@ -2432,30 +2460,47 @@ async def search_specialists(
         
         # Handle specialization filter
         if specialization:
-            specialization_query = db.query(SpecialistSpecializations).filter(
+            query = query.filter(Specialists.specializations.any(
                 SpecialistSpecializations.specialization == specialization
-            ).subquery()
-            query = query.join(specialization_query, Specialists.id == specialization_query.c.specialist_id)
+            ))
         
         # Calculate total count
         total_count = query.count()
         
-        # Apply pagination
-        offset = (page - 1) * size
-        specialists = query.offset(offset).limit(size).all()
+        # Earliest bookable materialized slot, correlated per row of the page
+        next_available = select(func.min(GeneratedTimeSlot.slot_date)).where(
+            GeneratedTimeSlot.specialist_id == Specialists.id,
+            GeneratedTimeSlot.status == SlotStatusEnum.AVAILABLE,
+            GeneratedTimeSlot.can_be_booked == True,
+            GeneratedTimeSlot.slot_date > datetime.now(timezone.utc)
+        ).correlate(Specialists).scalar_subquery()
+        
+        page_query = query.add_columns(next_available.label("next_available_slot")).options(
+            selectinload(Specialists.specializations),
+            selectinload(Specialists.availability_slots)
+        ).order_by(Specialists.average_rating.desc(), Specialists.id.desc())
+        
+        # Apply pagination: keyset after the cursor, or by page number
+        if cursor:
+            try:
+                after_rating, after_id = _decode_search_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            page_query = page_query.filter(
+                tuple_(Specialists.average_rating, Specialists.id) < tuple_(after_rating, after_id)
+            )
+        elif page > 1:
+            page_query = page_query.offset((page - 1) * size)
+        
+        rows = page_query.limit(size + 1).all()
+        has_next = len(rows) > size
+        rows = rows[:size]
         
         # Build response data
         specialist_data = []
-        for specialist in specialists:
-            # Get specializations
-            specializations = db.query(SpecialistSpecializations).filter(
-                SpecialistSpecializations.specialist_id == specialist.id
-            ).all()
-            
-            # Get availability slots
-            availability_slots = db.query(SpecialistAvailability).filter(
-                SpecialistAvailability.specialist_id == specialist.id
-            ).all()
+        for specialist, next_available_slot in rows:
+            specializations = specialist.specializations
+            availability_slots = specialist.availability_slots
             
             specialist_info = {
                 "id": str(specialist.id),
@@ -2492,11 +2537,17 @@ async def search_specialists(
                     for slot in availability_slots
                 ],
                 "has_appointments_available": len(availability_slots) > 0,
+                "next_available_slot": next_available_slot.isoformat() if next_available_slot else None,
                 "created_at": specialist.created_at.isoformat(),
                 "updated_at": specialist.updated_at.isoformat()
             }
             specialist_data.append(specialist_info)
         
+        next_cursor = None
+        if has_next and rows:
+            last = rows[-1][0]
+            next_cursor = _encode_search_cursor(last.average_rating, last.id)
+        
         return {
             "specialists": specialist_data,
             "pagination": {
@@ -2504,11 +2555,14 @@ async def search_specialists(
                 "size": size,
                 "total_count": total_count,
                 "total_pages": (total_count + size - 1) // size,
-                "has_next": page * size < total_count,
-                "has_previous": page > 1
+                "has_next": has_next,
+                "has_previous": bool(cursor) or page > 1,
+                "next_cursor": next_cursor
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error searching specialists: {str(e)}")
         raise HTTPException(
@@ -4,6 +4,14 @@ MindMate Core Module
 Core infrastructure including LLM client, state management, and workflow.
 """
 
-from app.core.llm_client import LLMClient, AgentLLMClient
+from app.core.llm_client import LLMClient, AgentLLMClient, get_shared_client
+from app.core.llm_provider import LLMProvider, get_provider, register_provider
 
-__all__ = ["LLMClient", "AgentLLMClient"]
+__all__ = [
+    "LLMClient",
+    "AgentLLMClient",
+    "get_shared_client",
+    "LLMProvider",
+    "get_provider",
+    "register_provider",
+]
@@ -0,0 +1,215 @@
+"""
+LLM Response Cache
+==================
+Process-wide cache for deterministic LLM completions, shared by every LLM
+wrapper in the backend.
+
+Only temperature-0 calls are cached: anything sampled is expected to vary
+between calls and must never be replayed. Keys hash the full request (model,
+every message, and every generation parameter), so two prompts that share a
+long prefix can never collide.
+
+The in-process tier is an O(1) LRU bounded by both entry count and payload
+bytes. An optional Redis tier (LLM_CACHE_REDIS_URL) lets workers share hits on
+repeated classification prompts; Redis failures degrade to local-only caching.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Thread-safe LRU cache with TTL, entry and byte bounds, and an optional Redis tier.
+
+    Entries live in an OrderedDict ordered from least to most recently used,
+    so lookups, promotions and evictions are all O(1).
+    """
+
+    # How long to stop talking to Redis after an error
+    REDIS_BACKOFF_SECONDS = 30.0
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 8 * 1024 * 1024,
+        ttl_seconds: int = 1800,
+        redis_client: Any = None,
+        redis_prefix: str = "llm:cache:",
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis_client
+        self.redis_prefix = redis_prefix
+
+        # key -> (value, expires_at, size_bytes)
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._redis_disabled_until = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.evictions = 0
+
+    @staticmethod
+    def is_cacheable(temperature: Optional[float]) -> bool:
+        """Only deterministic (temperature 0) completions may be replayed"""
+        return temperature is not None and float(temperature) == 0.0
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], **params) -> str:
+        """Hash the complete request: model, every message and all generation parameters"""
+        canonical = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached completion, checking the local tier and then Redis"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+
+        value = self._redis_get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.redis_hits += 1
+            self._store(key, value, now)
+        return value
+
+    def set(self, key: str, value: str):
+        """Cache a completion locally and, if configured, in Redis"""
+        if not value:
+            return
+        with self._lock:
+            self._store(key, value, time.time())
+        self._redis_set(key, value)
+
+    def clear(self):
+        """Drop every local entry (the Redis tier expires on its own)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        # An empty cache is still enabled; callers test "if self.cache:"
+        return True
+
+    def _store(self, key: str, value: str, now: float):
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, now + self.ttl_seconds, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.time() >= self._redis_disabled_until
+
+    def _redis_failed(self, error: Exception):
+        logger.warning(f"LLM cache Redis tier unavailable, using local cache only: {error}")
+        self._redis_disabled_until = time.time() + self.REDIS_BACKOFF_SECONDS
+
+    def _redis_get(self, key: str) -> Optional[str]:
+        if not self._redis_available():
+            return None
+        try:
+            value = self.redis.get(self.redis_prefix + key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    def _redis_set(self, key: str, value: str):
+        if not self._redis_available():
+            return
+        try:
+            self.redis.setex(self.redis_prefix + key, int(self.ttl_seconds), value)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "redis_hits": self.redis_hits,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "redis_enabled": self.redis is not None,
+        }
+
+
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def _redis_from_env() -> Any:
+    url = os.getenv("LLM_CACHE_REDIS_URL")
+    if not url:
+        return None
+    try:
+        import redis
+        return redis.Redis.from_url(url, decode_responses=True, socket_timeout=0.5)
+    except Exception as e:
+        logger.warning(f"LLM cache Redis tier disabled: {e}")
+        return None
+
+
+def get_response_cache() -> LLMResponseCache:
+    """Get the process-wide LLM response cache"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = LLMResponseCache(
+                    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+                    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(8 * 1024 * 1024))),
+                    ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", "1800")),
+                    redis_client=_redis_from_env(),
+                )
+    return _response_cache
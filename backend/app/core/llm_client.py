@@ -1,18 +1,20 @@
-import requests
 import os
 import json
 import time
 import asyncio
-from typing import List, Dict, Optional, Union, Any, Callable
+from typing import List, Dict, Optional, Union, Any, Callable, AsyncIterator
 from dataclasses import dataclass
 import logging
 import hashlib
 from functools import wraps
 import threading
-from collections import deque
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+from app.core.llm_provider import LLMProvider, get_provider
+from app.core.llm_cache import get_response_cache
+from app.core.llm_scheduler import get_scheduler, LLMPriority, LLMRequestShedError
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,7 +29,11 @@ class Message:
     content: str
 
 class CircuitBreaker:
-    """Circuit breaker pattern implementation"""
+    """Circuit breaker pattern implementation
+    
+    The lock only guards state transitions; it is never held while the
+    protected call runs, so concurrent LLM calls are not serialized.
+    """
     
     def __init__(self, failure_threshold: int = 5, recovery_timeout: int = 60):
         self.failure_threshold = failure_threshold
@@ -37,8 +43,7 @@ class CircuitBreaker:
         self.state = 'CLOSED'  # CLOSED, OPEN, HALF_OPEN
         self._lock = threading.Lock()
     
-    def call(self, func: Callable, *args, **kwargs):
-        """Execute function with circuit breaker protection"""
+    def _before_call(self):
         with self._lock:
             if self.state == 'OPEN':
                 if self.last_failure_time and \
@@ -47,142 +52,149 @@ class CircuitBreaker:
                     logger.info("Circuit breaker moving to HALF_OPEN state")
                 else:
                     raise Exception("Circuit breaker is OPEN - service unavailable")
-            
-            try:
-                result = func(*args, **kwargs)
-                if self.state == 'HALF_OPEN':
-                    self.state = 'CLOSED'
-                    self.failure_count = 0
-                    logger.info("Circuit breaker reset to CLOSED state")
-                return result
-                
-            except Exception as e:
-                self.failure_count += 1
-                self.last_failure_time = datetime.now()
-                
-                if self.failure_count >= self.failure_threshold:
-                    self.state = 'OPEN'
-                    logger.error(f"Circuit breaker opened after {self.failure_count} failures")
-                
-                raise e
-
-class RequestQueue:
-    """Thread-safe request queue with rate limiting"""
-    
-    def __init__(self, max_requests_per_minute: int = 8, max_concurrent: int = 2):
-        self.max_requests_per_minute = max_requests_per_minute
-        self.max_concurrent = max_concurrent
-        self.request_times = deque()
-        self.active_requests = 0
-        self._lock = threading.Lock()
     
-    def can_make_request(self) -> bool:
-        """Check if we can make a request without hitting rate limits"""
-        now = datetime.now()
-        
-        # Clean old requests
-        while self.request_times and (now - self.request_times[0]) > timedelta(minutes=1):
-            self.request_times.popleft()
-        
-        return (len(self.request_times) < self.max_requests_per_minute and 
-                self.active_requests < self.max_concurrent)
+    def _on_success(self):
+        with self._lock:
+            if self.state == 'HALF_OPEN':
+                self.state = 'CLOSED'
+                self.failure_count = 0
+                logger.info("Circuit breaker reset to CLOSED state")
     
-    def wait_for_slot(self, timeout: int = 120):
-        """Wait for an available request slot"""
-        start_time = time.time()
-        
-        while not self.can_make_request():
-            if time.time() - start_time > timeout:
-                raise TimeoutError("Timeout waiting for request slot")
+    def _on_failure(self):
+        with self._lock:
+            self.failure_count += 1
+            self.last_failure_time = datetime.now()
             
-            sleep_time = max(1.0, 60.0 / self.max_requests_per_minute)
-            time.sleep(sleep_time)
+            if self.failure_count >= self.failure_threshold:
+                self.state = 'OPEN'
+                logger.error(f"Circuit breaker opened after {self.failure_count} failures")
     
-    def acquire_slot(self):
-        """Acquire a request slot"""
-        with self._lock:
-            self.wait_for_slot()
-            self.request_times.append(datetime.now())
-            self.active_requests += 1
+    def call(self, func: Callable, *args, **kwargs):
+        """Execute function with circuit breaker protection"""
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self._on_failure()
+            raise
+        self._on_success()
+        return result
     
-    def release_slot(self):
-        """Release a request slot"""
-        with self._lock:
-            self.active_requests = max(0, self.active_requests - 1)
+    async def call_async(self, func: Callable, *args, **kwargs):
+        """Await a coroutine function with circuit breaker protection"""
+        self._before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._on_failure()
+            raise
+        self._on_success()
+        return result
 
-class ResponseCache:
-    """Simple in-memory cache for responses"""
+class ModelCatalog:
+    """
+    Provider model list, fetched once per endpoint and refreshed in the background.
     
-    def __init__(self, max_size: int = 100, ttl_seconds: int = 3600):
-        self.max_size = max_size
+    Only the very first lookup blocks (with the original retry policy); after that
+    callers always get the cached list and a stale list triggers a daemon refresh.
+    """
+    
+    def __init__(self, provider: LLMProvider, ttl_seconds: int = 3600):
+        self.provider = provider
         self.ttl_seconds = ttl_seconds
-        self.cache = {}
+        self.models: Optional[List[str]] = None
+        self.fetched_at = 0.0
         self._lock = threading.Lock()
+        self._refreshing = False
     
-    def _generate_key(self, prompt: str, model: str = None, **kwargs) -> str:
-        """Generate cache key with timestamp to prevent stale caching"""
-        timestamp = int(time.time() / 60)  # Change key every minute
-        cache_data = {
-            'prompt': prompt[:500],  # Only use first 500 chars
-            'model': model or 'default',
-            'timestamp': timestamp,
-            'kwargs': {k: v for k, v in kwargs.items() if k in ['temperature', 'max_tokens']}
-        }
-        return hashlib.md5(json.dumps(cache_data, sort_keys=True).encode()).hexdigest()
-        
-    def get(self, key: str) -> Optional[str]:
-        """Get cached response if valid"""
-        with self._lock:
-            if key in self.cache:
-                response, timestamp = self.cache[key]
-                if time.time() - timestamp < self.ttl_seconds:
-                    return response
+    def _fetch(self) -> List[str]:
+        return self.provider.list_models()
+    
+    def _load_with_retry(self, max_retries: int = 3) -> List[str]:
+        for attempt in range(max_retries):
+            try:
+                return self._fetch()
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    wait_time = (attempt + 1) * 5
+                    logger.warning(f"Connection attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
+                    time.sleep(wait_time)
                 else:
-                    del self.cache[key]
-        return None
+                    logger.error(f"Failed to connect to LLM provider after {max_retries} attempts: {e}")
+                    raise
     
-    def set(self, key: str, response: str):
-        """Cache response"""
+    def _background_refresh(self):
+        try:
+            models = self._fetch()
+            with self._lock:
+                self.models = models
+                self.fetched_at = time.time()
+            logger.debug(f"Model catalog refreshed ({len(models)} models)")
+        except Exception as e:
+            logger.warning(f"Background model catalog refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+    
+    def get_models(self) -> List[str]:
+        """Get the cached model list, loading it on first use"""
         with self._lock:
-            if len(self.cache) >= self.max_size:
-                # Remove oldest entry
-                oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k][1])
-                del self.cache[oldest_key]
+            if self.models is None:
+                self.models = self._load_with_retry()
+                self.fetched_at = time.time()
+                return self.models
             
-            self.cache[key] = (response, time.time())
+            if time.time() - self.fetched_at > self.ttl_seconds and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._background_refresh, daemon=True).start()
+            return self.models
+
+
+_model_catalogs: Dict[int, ModelCatalog] = {}
+_catalog_lock = threading.Lock()
+
+
+def get_model_catalog(provider: LLMProvider) -> ModelCatalog:
+    """Get the process-wide model catalog for a provider"""
+    with _catalog_lock:
+        key = id(provider)
+        if key not in _model_catalogs:
+            _model_catalogs[key] = ModelCatalog(provider)
+        return _model_catalogs[key]
+
 
 class LLMClient:
     """
     Enhanced LLM client with circuit breaker, rate limiting, caching, and robust error handling.
     """
     
-    def __init__(self, model: str = None, enable_cache: bool = True):
+    def __init__(self, model: str = None, enable_cache: bool = True, provider: Optional[LLMProvider] = None):
         """
         Initialize the enhanced LLM client.
         
         Args:
             model: The model to use (if None, will use GROQ_MODEL from .env or default)
             enable_cache: Whether to enable response caching
+            provider: Backend to use (defaults to the process-wide LLM_PROVIDER backend)
         """
-        self.api_key = os.getenv("GROQ_API_KEY")
-        if not self.api_key:
-            raise ValueError("GROQ_API_KEY environment variable is required")
+        # Backend (HTTP provider, offline stub, ...) shared by every client in the process
+        self.provider = provider or get_provider()
+        
+        # Set by get_shared_client; a shared client's model is fixed
+        self.shared = False
         
         # Get model from environment variable or use provided model or default
         if model is None:
             self.model = os.getenv("GROQ_MODEL")
         else:
             self.model = model
-        self.base_url = "https://api.groq.com/openai/v1"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
         
         # Initialize components
         self.circuit_breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=120)
-        self.request_queue = RequestQueue(max_requests_per_minute=6, max_concurrent=1)  # Very conservative
-        self.cache = ResponseCache(max_size=50, ttl_seconds=1800) if enable_cache else None
+        self.scheduler = get_scheduler()  # Process-wide rate/concurrency budget
+        self.cache = get_response_cache() if enable_cache else None
         
         # Model configuration
         self.max_context_length = self._get_model_context_limit()
@@ -212,49 +224,36 @@ class LLMClient:
         """Estimate token count (rough approximation: 1 token ≈ 4 characters)"""
         return max(1, len(text) // 4)
     
+    def _estimate_request_tokens(self, messages: List[Dict], max_tokens: int) -> int:
+        """Estimate the token budget a request will consume (prompt + completion)"""
+        return sum(self._estimate_tokens(msg['content']) for msg in messages) + max_tokens
+    
     def _verify_connection(self) -> bool:
-        """Verify API connection with retry logic"""
-        max_retries = 3
+        """Resolve the configured model against the (shared, cached) provider model list"""
+        available_models = get_model_catalog(self.provider).get_models()
         
-        for attempt in range(max_retries):
-            try:
-                response = requests.get(f"{self.base_url}/models", headers=self.headers, timeout=10)
-                response.raise_for_status()
-                
-                models = response.json()
-                available_models = [model['id'] for model in models.get('data', [])]
-                
-                if self.model not in available_models:
-                    logger.warning(f"Model {self.model} not found in available models.")
-                    logger.info(f"Available models: {available_models}")
-                    
-                    # Try to find a suitable alternative
-                    qwen_alternatives = [m for m in available_models if 'qwen' in m.lower()]
-                    llama_alternatives = [m for m in available_models if 'llama' in m.lower()]
-                    
-                    if qwen_alternatives:
-                        self.model = qwen_alternatives[0]
-                        logger.info(f"Switched to Qwen alternative: {self.model}")
-                    elif llama_alternatives:
-                        self.model = llama_alternatives[0]
-                        logger.info(f"Switched to Llama alternative: {self.model}")
-                    elif available_models:
-                        self.model = available_models[0]
-                        logger.info(f"Switched to first available model: {self.model}")
-                    else:
-                        raise ValueError("No models available from API")
-                
-                logger.info(f"Connected to Groq API successfully. Using model: {self.model}")
-                return True
-                
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 5
-                    logger.warning(f"Connection attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"Failed to connect to Groq API after {max_retries} attempts: {e}")
-                    raise
+        if self.model not in available_models:
+            logger.warning(f"Model {self.model} not found in available models.")
+            logger.info(f"Available models: {available_models}")
+            
+            # Try to find a suitable alternative
+            qwen_alternatives = [m for m in available_models if 'qwen' in m.lower()]
+            llama_alternatives = [m for m in available_models if 'llama' in m.lower()]
+            
+            if qwen_alternatives:
+                self.model = qwen_alternatives[0]
+                logger.info(f"Switched to Qwen alternative: {self.model}")
+            elif llama_alternatives:
+                self.model = llama_alternatives[0]
+                logger.info(f"Switched to Llama alternative: {self.model}")
+            elif available_models:
+                self.model = available_models[0]
+                logger.info(f"Switched to first available model: {self.model}")
+            else:
+                raise ValueError("No models available from API")
+        
+        logger.info(f"Connected to LLM provider ({self.provider.name}). Using model: {self.model}")
+        return True
     
     def _truncate_payload(self, messages: List[Dict], max_tokens: int) -> List[Dict]:
         """Intelligently truncate payload to fit within limits"""
@@ -300,6 +299,26 @@ class LLMClient:
         logger.info(f"Truncated to {len(truncated)} messages")
         return truncated
     
+    def _cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        top_p: float,
+        extra: Dict[str, Any]
+    ) -> Optional[str]:
+        """Cache key for a deterministic request, or None if the call must not be cached"""
+        if not self.cache or not self.cache.is_cacheable(temperature):
+            return None
+        return self.cache.make_key(
+            self.model,
+            messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            **extra
+        )
+    
     def _make_request_with_protection(
         self,
         messages: List[Dict[str, str]],
@@ -307,6 +326,7 @@ class LLMClient:
         temperature: float = 0.7,
         top_p: float = 0.9,
         timeout: int = 120,
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
         **kwargs
     ) -> str:
         """Make protected API request with all safety measures"""
@@ -314,26 +334,60 @@ class LLMClient:
         # Truncate payload if necessary
         messages = self._truncate_payload(messages, max_tokens)
         
-        # Check cache first
-        cache_key = None
-        if self.cache:
-            messages_str = json.dumps(messages)
-            cache_key = self.cache._generate_key(
-                messages_str,
-                model=self.model,
-                temperature=temperature, 
-                max_tokens=max_tokens
-            )
+        # Check cache first (deterministic calls only)
+        cache_key = self._cache_key(messages, max_tokens, temperature, top_p, kwargs)
+        if cache_key:
             cached_response = self.cache.get(cache_key)
             if cached_response:
                 logger.info("Returning cached response")
                 return cached_response
         
-        # Acquire request slot
-        self.request_queue.acquire_slot()
+        result = self.complete(
+            messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            timeout=timeout,
+            priority=priority,
+            **kwargs
+        )
+        
+        # Extract response
+        if 'choices' not in result or not result['choices']:
+            raise ValueError("No response choices returned from API")
+        
+        response_text = result['choices'][0]['message']['content']
+        
+        # Cache successful response
+        if cache_key:
+            self.cache.set(cache_key, response_text)
+        
+        return response_text
+    
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: int = 120,
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Run one completion under the shared budget and circuit breaker.
+        
+        Returns the raw provider response (choices, usage, ...). No retries,
+        truncation or caching happen here; wrappers that need the full body
+        (e.g. for token usage) build on this instead of calling a backend directly.
+        """
+        # Acquire request slot (prompt estimate + completion budget)
+        slot = self.scheduler.acquire(
+            tokens=self._estimate_request_tokens(messages, max_tokens),
+            priority=priority
+        )
         
         try:
-            # Prepare payload
             payload = {
                 "model": self.model,
                 "messages": messages,
@@ -344,33 +398,12 @@ class LLMClient:
                 **kwargs
             }
             
-            # Make request through circuit breaker
-            def api_call():
-                response = requests.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=self.headers,
-                    json=payload,
-                    timeout=timeout
-                )
-                response.raise_for_status()
-                return response.json()
-            
-            result = self.circuit_breaker.call(api_call)
-            
-            # Extract response
-            if 'choices' not in result or not result['choices']:
-                raise ValueError("No response choices returned from API")
-            
-            response_text = result['choices'][0]['message']['content']
-            
-            # Cache successful response
-            if self.cache and cache_key:
-                self.cache.set(cache_key, response_text)
-            
-            return response_text
+            result = self.circuit_breaker.call(self.provider.complete, payload, timeout)
+            slot.record_usage(result.get('usage', {}).get('total_tokens'))
+            return result
             
         finally:
-            self.request_queue.release_slot()
+            self.scheduler.release(slot)
     
     def generate(
         self, 
@@ -400,26 +433,12 @@ class LLMClient:
                     **kwargs
                 )
                 
+            except LLMRequestShedError:
+                raise
             except Exception as e:
                 last_exception = e
-                error_str = str(e).lower()
-                
-                if "429" in str(e) or "rate limit" in error_str:
-                    wait_time = (attempt + 1) * 30 + 60  # Longer waits for rate limits
-                    logger.warning(f"Rate limit hit, waiting {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(wait_time)
-                elif "413" in str(e) or "payload too large" in error_str:
-                    # Reduce max_tokens and try again
-                    max_tokens = max(200, max_tokens // 2)
-                    logger.warning(f"Payload too large, reducing max_tokens to {max_tokens}")
-                    continue
-                elif "timeout" in error_str:
-                    wait_time = (attempt + 1) * 10
-                    logger.warning(f"Timeout error, waiting {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(wait_time)
-                else:
-                    wait_time = (attempt + 1) * 5
-                    logger.warning(f"API error, retrying in {wait_time}s: {str(e)[:100]}")
+                wait_time, max_tokens = self._retry_plan(e, attempt, max_tokens)
+                if wait_time:
                     time.sleep(wait_time)
         
         # Return fallback response instead of raising
@@ -453,6 +472,262 @@ class LLMClient:
             logger.error(f"Chat generation failed: {e}")
             return f"Error: Chat generation failed due to API limitations."
     
+    def _retry_plan(self, error: Exception, attempt: int, max_tokens: int):
+        """
+        Decide how to retry after a failed request.
+
+        Returns:
+            Tuple of (wait_seconds, max_tokens) for the next attempt
+        """
+        error_str = str(error).lower()
+
+        if "429" in str(error) or "rate limit" in error_str:
+            wait_time = (attempt + 1) * 30 + 60  # Longer waits for rate limits
+            logger.warning(f"Rate limit hit, waiting {wait_time}s (attempt {attempt + 1})")
+            return wait_time, max_tokens
+        if "413" in str(error) or "payload too large" in error_str:
+            # Reduce max_tokens and try again
+            max_tokens = max(200, max_tokens // 2)
+            logger.warning(f"Payload too large, reducing max_tokens to {max_tokens}")
+            return 0, max_tokens
+        if "timeout" in error_str or isinstance(error, asyncio.TimeoutError):
+            wait_time = (attempt + 1) * 10
+            logger.warning(f"Timeout error, waiting {wait_time}s (attempt {attempt + 1})")
+            return wait_time, max_tokens
+        wait_time = (attempt + 1) * 5
+        logger.warning(f"API error, retrying in {wait_time}s: {str(error)[:100]}")
+        return wait_time, max_tokens
+
+    async def _make_request_async(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: int = 120,
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
+        **kwargs
+    ) -> str:
+        """Async counterpart of _make_request_with_protection"""
+        messages = self._truncate_payload(messages, max_tokens)
+
+        # Check cache first (deterministic calls only)
+        cache_key = self._cache_key(messages, max_tokens, temperature, top_p, kwargs)
+        if cache_key:
+            cached_response = self.cache.get(cache_key)
+            if cached_response:
+                logger.info("Returning cached response")
+                return cached_response
+
+        result = await self.complete_async(
+            messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            timeout=timeout,
+            priority=priority,
+            **kwargs
+        )
+
+        if 'choices' not in result or not result['choices']:
+            raise ValueError("No response choices returned from API")
+
+        response_text = result['choices'][0]['message']['content']
+
+        if cache_key:
+            self.cache.set(cache_key, response_text)
+
+        return response_text
+
+    async def complete_async(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: int = 120,
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Async counterpart of complete()"""
+        slot = await self.scheduler.acquire_async(
+            tokens=self._estimate_request_tokens(messages, max_tokens),
+            priority=priority
+        )
+
+        try:
+            payload = {
+                "model": self.model,
+                "messages": messages,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "top_p": top_p,
+                "stream": False,
+                **kwargs
+            }
+
+            result = await self.circuit_breaker.call_async(self.provider.complete_async, payload, timeout)
+            slot.record_usage(result.get('usage', {}).get('total_tokens'))
+            return result
+
+        finally:
+            self.scheduler.release(slot)
+
+    async def generate_async(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        max_retries: int = 3,
+        **kwargs
+    ) -> str:
+        """Generate response without blocking the event loop (native asyncio path)"""
+        messages = []
+
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+
+        messages.append({"role": "user", "content": prompt})
+
+        last_exception = None
+
+        for attempt in range(max_retries):
+            try:
+                return await self._make_request_async(
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **kwargs
+                )
+            except (asyncio.CancelledError, LLMRequestShedError):
+                raise
+            except Exception as e:
+                last_exception = e
+                wait_time, max_tokens = self._retry_plan(e, attempt, max_tokens)
+                if wait_time and attempt < max_retries - 1:
+                    await asyncio.sleep(wait_time)
+
+        logger.error(f"Failed to generate response after {max_retries} attempts: {last_exception}")
+        return f"Error: Unable to generate response due to API limitations. Last error: {str(last_exception)[:100]}"
+
+    async def chat_async(
+        self,
+        messages: List[Union[Message, Dict[str, str]]],
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> str:
+        """Async chat with conversation history"""
+        formatted_messages = [
+            {"role": msg.role, "content": msg.content} if isinstance(msg, Message) else msg
+            for msg in messages
+        ]
+
+        try:
+            return await self._make_request_async(
+                messages=formatted_messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **kwargs
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Chat generation failed: {e}")
+            return f"Error: Chat generation failed due to API limitations."
+
+    async def _stream_request_async(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: int = 120,
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream completion deltas from the provider"""
+        messages = self._truncate_payload(messages, max_tokens)
+
+        # Check cache first (deterministic calls only)
+        cache_key = self._cache_key(messages, max_tokens, temperature, top_p, kwargs)
+        if cache_key:
+            cached_response = self.cache.get(cache_key)
+            if cached_response:
+                logger.info("Returning cached response")
+                yield cached_response
+                return
+
+        slot = await self.scheduler.acquire_async(
+            tokens=self._estimate_request_tokens(messages, max_tokens),
+            priority=priority
+        )
+
+        try:
+            payload = {
+                "model": self.model,
+                "messages": messages,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "top_p": top_p,
+                "stream": True,
+                **kwargs
+            }
+
+            self.circuit_breaker._before_call()
+            parts: List[str] = []
+            try:
+                async for event in self.provider.stream_async(payload, timeout=timeout):
+                    if event.get('usage'):
+                        slot.record_usage(event['usage'].get('total_tokens'))
+                    for choice in event.get('choices') or []:
+                        delta = (choice.get('delta') or {}).get('content')
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+            except (asyncio.CancelledError, GeneratorExit):
+                raise
+            except Exception:
+                self.circuit_breaker._on_failure()
+                raise
+            self.circuit_breaker._on_success()
+
+            if cache_key and parts:
+                self.cache.set(cache_key, "".join(parts))
+
+        finally:
+            self.scheduler.release(slot)
+
+    async def stream_async(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 800,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response token-by-token.
+
+        Unlike generate_async there is no retry: once text has reached the
+        caller a retry would duplicate it, so errors propagate to the consumer.
+        """
+        messages = []
+
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+
+        messages.append({"role": "user", "content": prompt})
+
+        async for delta in self._stream_request_async(
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        ):
+            yield delta
+
     def generate_multiple(
         self,
         prompts: List[str],
@@ -487,23 +762,23 @@ class LLMClient:
         
         return responses
     
-    async def generate_async(self, *args, **kwargs) -> str:
-        """Async wrapper for generate"""
-        return await asyncio.to_thread(self.generate, *args, **kwargs)
-    
     def get_available_models(self) -> List[str]:
         """Get list of available models with caching"""
         try:
-            response = requests.get(f"{self.base_url}/models", headers=self.headers, timeout=10)
-            response.raise_for_status()
-            models = response.json()
-            return [model['id'] for model in models.get('data', [])]
+            return get_model_catalog(self.provider).get_models()
         except Exception as e:
             logger.error(f"Failed to fetch models: {e}")
             return ["mixtral-8x7b-32768", "llama2-70b-4096"]  # Fallback list
     
     def set_model(self, model: str) -> bool:
-        """Change the model with validation"""
+        """Change the model with validation (not allowed on a shared client)"""
+        if self.shared:
+            logger.error(
+                f"Cannot change the model of the shared {self.model} client; "
+                f"use get_shared_client(model={model!r}) instead"
+            )
+            return False
+        
         available_models = self.get_available_models()
         
         if model in available_models:
@@ -523,21 +798,79 @@ class LLMClient:
             "max_context_length": self.max_context_length,
             "circuit_breaker_state": self.circuit_breaker.state,
             "failure_count": self.circuit_breaker.failure_count,
-            "active_requests": self.request_queue.active_requests,
-            "cache_size": len(self.cache.cache) if self.cache else 0
+            "active_requests": self.scheduler.in_flight,
+            "scheduler": self.scheduler.get_stats(),
+            "cache": self.cache.get_stats() if self.cache else None,
+            "provider": self.provider.get_stats()
         }
 
 
-class AgentLLMClient(LLMClient):
+# Shared, warmed clients keyed by (model, enable_cache)
+_shared_clients: Dict[tuple, LLMClient] = {}
+_registry_lock = threading.Lock()
+# Per-key construction locks, so building one client never blocks lookups of another
+_build_locks: Dict[tuple, threading.Lock] = {}
+
+
+def get_shared_client(
+    model: str = None,
+    enable_cache: bool = True,
+    provider: Optional[LLMProvider] = None
+) -> LLMClient:
+    """
+    Get the process-wide LLMClient for a model/config.
+    
+    The first call per key constructs (and verifies) the client; every later call
+    is a dict lookup, so agents and tools can ask for a client per request.
+    Shared clients reject set_model; ask for the model you need instead.
+    provider defaults to the LLM_PROVIDER backend.
+    """
+    provider = provider or get_provider()
+    key = (model or os.getenv("GROQ_MODEL"), enable_cache, provider)
+    client = _shared_clients.get(key)
+    if client is not None:
+        return client
+    
+    with _registry_lock:
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+    
+    # Construction verifies the connection, so it runs outside the registry lock
+    with build_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = LLMClient(model=model, enable_cache=enable_cache, provider=provider)
+            client.shared = True
+            with _registry_lock:
+                _shared_clients[key] = client
+        return client
+
+
+class AgentLLMClient:
     """
     Agent-specific LLM client with enhanced conversation management generate_with_history
+    
+    Holds only per-agent state (name, system prompt, conversation history); all
+    transport concerns are delegated to a shared LLMClient from the registry, so
+    constructing one is free.
     """ 
     
-    def __init__(self, agent_name: str, system_prompt: str = None, **kwargs):
-        """Initialize agent-specific client"""
-        super().__init__(**kwargs)
+    def __init__(
+        self,
+        agent_name: str,
+        system_prompt: str = None,
+        client: Optional[LLMClient] = None,
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
+        **kwargs
+    ):
+        """Initialize agent-specific client
+        
+        Args:
+            priority: Default scheduler lane for this agent's calls
+        """
+        self.client = client or get_shared_client(**kwargs)
         self.agent_name = agent_name
         self.system_prompt = system_prompt
+        self.priority = priority
         self.conversation_history: List[Message] = []
         self.max_history_tokens = 4000  # Limit conversation history size
         self._history_lock = threading.Lock()
@@ -545,6 +878,44 @@ class AgentLLMClient(LLMClient):
         if system_prompt:
             self.conversation_history.append(Message("system", system_prompt))
     
+    def __getattr__(self, name: str):
+        # Transport methods (generate, generate_async, chat, get_stats, ...) live on the shared client
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+    
+    def set_model(self, model: str) -> bool:
+        """Switch this agent to the shared client for another model; other agents are unaffected"""
+        if model not in self.client.get_available_models():
+            logger.error(f"Model {model} not available for agent {self.agent_name}")
+            return False
+        
+        enable_cache = self.client.cache is not None
+        self.client = get_shared_client(model=model, enable_cache=enable_cache, provider=self.client.provider)
+        logger.info(f"Agent {self.agent_name} now uses model {self.client.model}")
+        return True
+    
+    def generate(self, prompt: str, **kwargs) -> str:
+        kwargs.setdefault("priority", self.priority)
+        return self.client.generate(prompt, **kwargs)
+    
+    async def generate_async(self, prompt: str, **kwargs) -> str:
+        kwargs.setdefault("priority", self.priority)
+        return await self.client.generate_async(prompt, **kwargs)
+    
+    def chat(self, messages: List[Union[Message, Dict[str, str]]], **kwargs) -> str:
+        kwargs.setdefault("priority", self.priority)
+        return self.client.chat(messages, **kwargs)
+    
+    async def chat_async(self, messages: List[Union[Message, Dict[str, str]]], **kwargs) -> str:
+        kwargs.setdefault("priority", self.priority)
+        return await self.client.chat_async(messages, **kwargs)
+    
+    async def stream_async(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        kwargs.setdefault("priority", self.priority)
+        async for delta in self.client.stream_async(prompt, **kwargs):
+            yield delta
+    
     def add_message(self, role: str, content: str) -> None:
         """Add message with history management"""
         with self._history_lock:
@@ -0,0 +1,304 @@
+"""
+LLM Providers
+=============
+Pluggable backends behind every LLM client in the backend.
+
+A provider only moves OpenAI-style chat-completion payloads to a model and
+back. Rate limiting, circuit breaking and caching live in LLMClient, so every
+wrapper built on it shares one global budget whatever backend is selected.
+
+Backends are chosen with LLM_PROVIDER:
+- "groq" (default) / "openai": any OpenAI-compatible HTTP endpoint
+- "stub": deterministic offline replies, for tests and load runs without network
+
+The stub can also be served over HTTP so out-of-process clients can use it:
+
+    python -m app.core.llm_provider --port 8089
+    GROQ_BASE_URL=http://127.0.0.1:8089 LLM_PROVIDER=openai ...
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from app.core.llm_transport import get_transport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.groq.com/openai/v1"
+
+
+class LLMProvider(ABC):
+    """Base class for chat-completion backends"""
+
+    name = "base"
+
+    @abstractmethod
+    def complete(self, payload: Dict[str, Any], timeout: float = 120) -> Dict[str, Any]:
+        """Run a non-streaming completion and return the decoded response body"""
+        pass
+
+    @abstractmethod
+    async def complete_async(self, payload: Dict[str, Any], timeout: float = 120) -> Dict[str, Any]:
+        """Async counterpart of complete()"""
+        pass
+
+    @abstractmethod
+    def stream_async(self, payload: Dict[str, Any], timeout: float = 120) -> AsyncIterator[Dict[str, Any]]:
+        """Yield streamed completion chunks (OpenAI "chat.completion.chunk" events)"""
+        pass
+
+    @abstractmethod
+    def list_models(self) -> List[str]:
+        """Return the model ids this backend can serve"""
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get provider statistics"""
+        return {"provider": self.name}
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    HTTP backend for Groq and other OpenAI-compatible APIs.
+
+    Sync calls go through a pooled requests.Session; async calls and streams
+    go through the shared aiohttp transport for the endpoint.
+    """
+
+    name = "openai"
+
+    def __init__(self, base_url: str, api_key: str):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        self.transport = get_transport(self.base_url, api_key)
+        self._http = requests.Session()
+        self._http.headers.update(self.headers)
+
+    def complete(self, payload: Dict[str, Any], timeout: float = 120) -> Dict[str, Any]:
+        response = self._http.post(f"{self.base_url}/chat/completions", json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    async def complete_async(self, payload: Dict[str, Any], timeout: float = 120) -> Dict[str, Any]:
+        return await self.transport.post_json("/chat/completions", payload, timeout=timeout)
+
+    def stream_async(self, payload: Dict[str, Any], timeout: float = 120) -> AsyncIterator[Dict[str, Any]]:
+        return self.transport.stream_events("/chat/completions", payload, timeout=timeout)
+
+    def list_models(self) -> List[str]:
+        response = self._http.get(f"{self.base_url}/models", timeout=10)
+        response.raise_for_status()
+        return [model['id'] for model in response.json().get('data', [])]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"provider": self.name, "transport": self.transport.get_stats()}
+
+
+class StubProvider(LLMProvider):
+    """
+    Deterministic offline backend.
+
+    The reply depends only on the request messages, so the same prompt always
+    gets the same answer across runs and workers. A few prompt shapes the
+    agents rely on get plausible answers: JSON requests get "{}", and
+    POSITIVE/NEGATIVE or YES/NO classifications get one of the two labels.
+    """
+
+    name = "stub"
+
+    _LABEL_PAIRS = [("POSITIVE", "NEGATIVE"), ("YES", "NO")]
+
+    def __init__(self, models: Optional[List[str]] = None, latency_seconds: float = 0.0):
+        self.models = models or ["stub-model"]
+        self.latency_seconds = latency_seconds
+        self.total_requests = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        return max(1, len(text) // 4)
+
+    def reply_for(self, messages: List[Dict[str, str]]) -> str:
+        """Deterministic reply for a message list"""
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+        for first, second in self._LABEL_PAIRS:
+            if re.search(rf"\b{first}\b", prompt) and re.search(rf"\b{second}\b", prompt):
+                return first if int(digest[:8], 16) % 2 == 0 else second
+        if "json" in prompt.lower():
+            return "{}"
+
+        last_user = next(
+            (str(m.get("content", "")) for m in reversed(messages) if m.get("role") == "user"),
+            ""
+        )
+        snippet = " ".join(last_user.split())[:80]
+        return f"[stub:{digest[:8]}] I hear you. You said: {snippet}"
+
+    def _response(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.total_requests += 1
+        messages = payload.get("messages", [])
+        content = self.reply_for(messages)
+        prompt_tokens = sum(self._estimate_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = self._estimate_tokens(content)
+        return {
+            "id": f"stub-{hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]}",
+            "object": "chat.completion",
+            "model": payload.get("model") or self.models[0],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def complete(self, payload: Dict[str, Any], timeout: float = 120) -> Dict[str, Any]:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return self._response(payload)
+
+    async def complete_async(self, payload: Dict[str, Any], timeout: float = 120) -> Dict[str, Any]:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self._response(payload)
+
+    async def stream_async(self, payload: Dict[str, Any], timeout: float = 120) -> AsyncIterator[Dict[str, Any]]:
+        result = await self.complete_async(payload, timeout)
+        for token in re.findall(r"\S+\s*", result["choices"][0]["message"]["content"]):
+            yield {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": token}}]}
+        yield {"object": "chat.completion.chunk", "choices": [], "usage": result["usage"]}
+
+    def list_models(self) -> List[str]:
+        return list(self.models)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"provider": self.name, "total_requests": self.total_requests}
+
+
+def _openai_from_env() -> LLMProvider:
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY environment variable is required")
+    return OpenAICompatibleProvider(os.getenv("GROQ_BASE_URL", DEFAULT_BASE_URL), api_key)
+
+
+def _stub_from_env() -> LLMProvider:
+    models = [os.getenv("GROQ_MODEL") or "stub-model"]
+    return StubProvider(models=models, latency_seconds=float(os.getenv("LLM_STUB_LATENCY_MS", "0")) / 1000)
+
+
+_provider_factories: Dict[str, Callable[[], LLMProvider]] = {
+    "groq": _openai_from_env,
+    "openai": _openai_from_env,
+    "stub": _stub_from_env,
+}
+_providers: Dict[str, LLMProvider] = {}
+_provider_lock = threading.Lock()
+
+
+def register_provider(name: str, factory: Callable[[], LLMProvider]):
+    """Register (or replace) a backend factory selectable through LLM_PROVIDER"""
+    with _provider_lock:
+        _provider_factories[name] = factory
+        _providers.pop(name, None)
+
+
+def get_provider(name: Optional[str] = None) -> LLMProvider:
+    """Get the process-wide provider instance (LLM_PROVIDER, default "groq")"""
+    name = (name or os.getenv("LLM_PROVIDER") or "groq").lower()
+    provider = _providers.get(name)
+    if provider is not None:
+        return provider
+
+    with _provider_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            if name not in _provider_factories:
+                raise ValueError(f"Unknown LLM provider '{name}'. Available: {sorted(_provider_factories)}")
+            provider = _provider_factories[name]()
+            _providers[name] = provider
+            logger.info(f"LLM provider initialized: {name}")
+        return provider
+
+
+_endpoint_providers: Dict[Tuple[str, str], OpenAICompatibleProvider] = {}
+
+
+def get_endpoint_provider(base_url: str, api_key: str) -> OpenAICompatibleProvider:
+    """Process-wide provider for an explicit OpenAI-compatible endpoint (not LLM_PROVIDER)"""
+    key = (base_url.rstrip("/"), api_key)
+    provider = _endpoint_providers.get(key)
+    if provider is None:
+        with _provider_lock:
+            provider = _endpoint_providers.get(key)
+            if provider is None:
+                provider = _endpoint_providers[key] = OpenAICompatibleProvider(*key)
+    return provider
+
+
+def create_stub_app(provider: Optional[StubProvider] = None):
+    """aiohttp application serving the stub backend over the OpenAI wire format"""
+    from aiohttp import web
+
+    stub = provider or StubProvider()
+
+    async def models(request):
+        return web.json_response({"object": "list", "data": [{"id": m, "object": "model"} for m in stub.list_models()]})
+
+    async def chat_completions(request):
+        payload = await request.json()
+        if not payload.get("stream"):
+            return web.json_response(await stub.complete_async(payload))
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        async for event in stub.stream_async(payload):
+            await response.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    app = web.Application()
+    app.router.add_get("/models", models)
+    app.router.add_post("/chat/completions", chat_completions)
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+    from aiohttp import web
+
+    parser = argparse.ArgumentParser(description="Serve the deterministic stub LLM backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    web.run_app(
+        create_stub_app(StubProvider(
+            models=[os.getenv("GROQ_MODEL") or "stub-model"],
+            latency_seconds=args.latency_ms / 1000
+        )),
+        host=args.host,
+        port=args.port
+    )
@@ -0,0 +1,411 @@
+"""
+LLM Scheduler
+=============
+Process-wide admission control for LLM calls.
+
+Combines a request token bucket (requests/min), a model token bucket
+(tokens/min) and an in-flight concurrency gate. Waiters queue in priority
+lanes (FIFO within a lane) and sleep without holding any lock, so releasing a slot never waits behind a
+blocked caller. Works from both threads and coroutines.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from enum import IntEnum
+from contextlib import contextmanager, asynccontextmanager
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate_per_minute`"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now). Caller holds the lock."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate_per_second
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class LLMPriority(IntEnum):
+    """Dispatch classes, lower value is served first"""
+    INTERACTIVE = 0  # Therapist replies the patient is waiting for
+    REALTIME = 1     # Safety checks and screening classification
+    BACKGROUND = 2   # Symptom extraction, diagnosis, reporting
+
+
+class LLMRequestShedError(Exception):
+    """Raised when a deferrable request is dropped because its lane is full"""
+
+
+class _Waiter:
+    """A queued caller; woken either by a slot release or by its own timer"""
+
+    def __init__(
+        self,
+        tokens: int,
+        priority: LLMPriority,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ):
+        self.tokens = tokens
+        self.priority = priority
+        self.loop = loop
+        self.enqueued_at = time.monotonic()
+        self._event = threading.Event() if loop is None else None
+        self._future: Optional[asyncio.Future] = None
+
+    def notify(self):
+        if self.loop is None:
+            self._event.set()
+        elif self._future is not None:
+            try:
+                self.loop.call_soon_threadsafe(self._wake_future, self._future)
+            except RuntimeError:
+                # Event loop already closed; the waiter is gone
+                pass
+
+    @staticmethod
+    def _wake_future(future: asyncio.Future):
+        if not future.done():
+            future.set_result(None)
+
+    def wait(self, timeout: Optional[float]):
+        self._event.wait(timeout)
+        self._event.clear()
+
+    def prepare_async(self):
+        self._future = self.loop.create_future()
+
+    async def wait_async(self, timeout: Optional[float]):
+        try:
+            await asyncio.wait_for(self._future, timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+class SchedulerSlot:
+    """An admitted LLM call; report actual usage to refund over-estimated tokens"""
+
+    def __init__(self, tokens: int, priority: LLMPriority, wait_seconds: float):
+        self.tokens = tokens
+        self.priority = priority
+        self.wait_seconds = wait_seconds
+        self.actual_tokens: Optional[int] = None
+
+    def record_usage(self, total_tokens: Optional[int]):
+        if total_tokens is not None:
+            self.actual_tokens = int(total_tokens)
+
+
+class LLMScheduler:
+    """
+    Token-bucket rate limiter plus concurrency gate for LLM calls.
+
+    Callers are queued in priority lanes (see LLMPriority); within a lane
+    they are served FIFO. Background calls cannot use the last slots and the
+    last slice of each bucket, so they are delayed first when the provider
+    limit is near, and are shed outright once their lane is full.
+
+    Usage:
+        with scheduler.slot(tokens=estimate, priority=LLMPriority.BACKGROUND) as slot:
+            ...
+        async with scheduler.slot_async(tokens=estimate) as slot:
+            ...
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 30,
+        tokens_per_minute: int = 20000,
+        max_concurrent: int = 8,
+        max_wait_seconds: float = 120,
+        background_reserve: float = 0.25,
+        max_background_queue: int = 50,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrent = max_concurrent
+        self.max_wait_seconds = max_wait_seconds
+        self.background_reserve = background_reserve
+        self.max_background_queue = max_background_queue
+
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+        self._lanes: Dict[LLMPriority, Deque[_Waiter]] = {p: deque() for p in LLMPriority}
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self._lane_stats: Dict[LLMPriority, Dict[str, float]] = {
+            p: {"admitted": 0, "timeouts": 0, "shed": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for p in LLMPriority
+        }
+
+    # ------------------------------------------------------------------
+    # Admission (all helpers below are called with self._lock held)
+    # ------------------------------------------------------------------
+
+    def _head(self) -> Optional[_Waiter]:
+        for priority in LLMPriority:
+            if self._lanes[priority]:
+                return self._lanes[priority][0]
+        return None
+
+    def _notify_head(self):
+        head = self._head()
+        if head is not None:
+            head.notify()
+
+    def _time_until_admissible(self, tokens: int, priority: LLMPriority) -> Optional[float]:
+        """0 if admissible now, seconds to wait for the buckets, or None if blocked on concurrency"""
+        if priority == LLMPriority.BACKGROUND:
+            # Keep headroom for user-facing lanes
+            reserved_slots = int(self.max_concurrent * self.background_reserve)
+            concurrency_limit = max(1, self.max_concurrent - reserved_slots)
+            request_need = 1 + self._request_bucket.capacity * self.background_reserve
+            token_need = tokens + self._token_bucket.capacity * self.background_reserve
+        else:
+            concurrency_limit = self.max_concurrent
+            request_need, token_need = 1, tokens
+
+        if self.in_flight >= concurrency_limit:
+            return None
+        now = time.monotonic()
+        return max(
+            self._request_bucket.time_until(request_need, now),
+            self._token_bucket.time_until(token_need, now),
+        )
+
+    def _admit(self, waiter: _Waiter) -> SchedulerSlot:
+        self._request_bucket.take(1)
+        self._token_bucket.take(waiter.tokens)
+        self.in_flight += 1
+
+        waited = time.monotonic() - waiter.enqueued_at
+        stats = self._lane_stats[waiter.priority]
+        stats["admitted"] += 1
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+        return SchedulerSlot(waiter.tokens, waiter.priority, waited)
+
+    def _enqueue(self, waiter: _Waiter):
+        lane = self._lanes[waiter.priority]
+        if waiter.priority == LLMPriority.BACKGROUND and len(lane) >= self.max_background_queue:
+            self._lane_stats[waiter.priority]["shed"] += 1
+            raise LLMRequestShedError(
+                f"LLM scheduler shed {waiter.priority.name.lower()} request (queue full: {len(lane)})"
+            )
+        lane.append(waiter)
+
+    def _try_head(self, waiter: _Waiter):
+        """Admit `waiter` if it is at the head of the queue and capacity allows"""
+        if self._head() is not waiter:
+            return None, None
+        wait = self._time_until_admissible(waiter.tokens, waiter.priority)
+        if wait == 0:
+            self._lanes[waiter.priority].popleft()
+            slot = self._admit(waiter)
+            # The next caller may be admissible too
+            self._notify_head()
+            return slot, None
+        return None, wait
+
+    def _abandon(self, waiter: _Waiter):
+        was_head = self._head() is waiter
+        try:
+            self._lanes[waiter.priority].remove(waiter)
+        except ValueError:
+            return
+        if was_head:
+            self._notify_head()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def acquire(
+        self,
+        tokens: int = 0,
+        timeout: Optional[float] = None,
+        priority: LLMPriority = LLMPriority.INTERACTIVE
+    ) -> SchedulerSlot:
+        """Block the calling thread until the call is admitted"""
+        timeout = self.max_wait_seconds if timeout is None else timeout
+        waiter = _Waiter(tokens, LLMPriority(priority))
+        deadline = waiter.enqueued_at + timeout
+
+        with self._lock:
+            self._enqueue(waiter)
+
+        try:
+            while True:
+                with self._lock:
+                    slot, wait = self._try_head(waiter)
+                if slot:
+                    return slot
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timeout waiting for LLM request slot")
+                waiter.wait(remaining if wait is None else min(wait, remaining))
+        except BaseException as e:
+            with self._lock:
+                if isinstance(e, TimeoutError):
+                    self._lane_stats[waiter.priority]["timeouts"] += 1
+                self._abandon(waiter)
+            raise
+
+    async def acquire_async(
+        self,
+        tokens: int = 0,
+        timeout: Optional[float] = None,
+        priority: LLMPriority = LLMPriority.INTERACTIVE
+    ) -> SchedulerSlot:
+        """Wait (without blocking the event loop) until the call is admitted"""
+        timeout = self.max_wait_seconds if timeout is None else timeout
+        waiter = _Waiter(tokens, LLMPriority(priority), loop=asyncio.get_running_loop())
+        deadline = waiter.enqueued_at + timeout
+
+        with self._lock:
+            self._enqueue(waiter)
+
+        try:
+            while True:
+                with self._lock:
+                    slot, wait = self._try_head(waiter)
+                    if not slot:
+                        waiter.prepare_async()
+                if slot:
+                    return slot
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timeout waiting for LLM request slot")
+                await waiter.wait_async(remaining if wait is None else min(wait, remaining))
+        except BaseException as e:
+            with self._lock:
+                if isinstance(e, TimeoutError):
+                    self._lane_stats[waiter.priority]["timeouts"] += 1
+                self._abandon(waiter)
+            raise
+
+    def release(self, slot: SchedulerSlot):
+        """Release an in-flight slot and refund over-estimated tokens"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if slot.actual_tokens is not None and slot.actual_tokens < slot.tokens:
+                self._token_bucket.give_back(slot.tokens - slot.actual_tokens)
+            self._notify_head()
+
+    @contextmanager
+    def slot(
+        self,
+        tokens: int = 0,
+        timeout: Optional[float] = None,
+        priority: LLMPriority = LLMPriority.INTERACTIVE
+    ):
+        slot = self.acquire(tokens, timeout, priority)
+        try:
+            yield slot
+        finally:
+            self.release(slot)
+
+    @asynccontextmanager
+    async def slot_async(
+        self,
+        tokens: int = 0,
+        timeout: Optional[float] = None,
+        priority: LLMPriority = LLMPriority.INTERACTIVE
+    ):
+        slot = await self.acquire_async(tokens, timeout, priority)
+        try:
+            yield slot
+        finally:
+            self.release(slot)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics (queue depth, in-flight, wait times), overall and per lane"""
+        with self._lock:
+            now = time.monotonic()
+            self._request_bucket._refill(now)
+            self._token_bucket._refill(now)
+
+            lanes = {}
+            for priority in LLMPriority:
+                lane = self._lanes[priority]
+                stats = self._lane_stats[priority]
+                lanes[priority.name.lower()] = {
+                    "queue_depth": len(lane),
+                    "oldest_wait_seconds": round(now - lane[0].enqueued_at, 3) if lane else 0.0,
+                    "admitted": int(stats["admitted"]),
+                    "timeouts": int(stats["timeouts"]),
+                    "shed": int(stats["shed"]),
+                    "avg_wait_seconds": round(stats["total_wait"] / stats["admitted"], 3) if stats["admitted"] else 0.0,
+                    "max_wait_seconds": round(stats["max_wait"], 3),
+                }
+
+            total_admitted = sum(lane["admitted"] for lane in lanes.values())
+            total_wait = sum(stats["total_wait"] for stats in self._lane_stats.values())
+            return {
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "max_concurrent": self.max_concurrent,
+                "in_flight": self.in_flight,
+                "queue_depth": sum(lane["queue_depth"] for lane in lanes.values()),
+                "oldest_wait_seconds": max(lane["oldest_wait_seconds"] for lane in lanes.values()),
+                "total_admitted": total_admitted,
+                "total_timeouts": sum(lane["timeouts"] for lane in lanes.values()),
+                "total_shed": sum(lane["shed"] for lane in lanes.values()),
+                "avg_wait_seconds": round(total_wait / total_admitted, 3) if total_admitted else 0.0,
+                "max_wait_seconds": max(lane["max_wait_seconds"] for lane in lanes.values()),
+                "request_tokens_available": round(self._request_bucket.tokens, 2),
+                "model_tokens_available": round(self._token_bucket.tokens, 2),
+                "lanes": lanes,
+            }
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Get the process-wide LLM scheduler (limits configured from the environment)"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler(
+                    requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", "30")),
+                    tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", "20000")),
+                    max_concurrent=int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+                    max_wait_seconds=float(os.getenv("LLM_MAX_QUEUE_WAIT", "120")),
+                    background_reserve=float(os.getenv("LLM_BACKGROUND_RESERVE", "0.25")),
+                    max_background_queue=int(os.getenv("LLM_MAX_BACKGROUND_QUEUE", "50")),
+                )
+                logger.info(
+                    f"LLM scheduler: {_scheduler.requests_per_minute} req/min, "
+                    f"{_scheduler.tokens_per_minute} tokens/min, {_scheduler.max_concurrent} in flight"
+                )
+    return _scheduler
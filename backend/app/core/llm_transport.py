@@ -0,0 +1,272 @@
+"""
+Async LLM Transport
+===================
+Shared keep-alive HTTP connection pool for OpenAI-compatible chat endpoints.
+
+One transport exists per (base_url, api_key) pair, so every agent in the
+process reuses the same TLS connections instead of opening a new one for each
+completion. aiohttp sessions are bound to an event loop, so the transport keeps
+one session and concurrency semaphore per running loop (the server loop, the
+moderator's sync loop, ...). Code that drives the transport from a short-lived
+loop should use run_sync(), which closes that loop's sessions before it exits.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Awaitable, Dict, NamedTuple, Tuple, TypeVar
+from weakref import WeakKeyDictionary
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _LoopPool(NamedTuple):
+    """Connection pool and slot semaphore owned by one event loop"""
+    session: aiohttp.ClientSession
+    semaphore: asyncio.Semaphore
+
+
+class AsyncLLMTransport:
+    """
+    aiohttp-based transport with bounded concurrency and per-request deadlines.
+
+    The deadline covers both the wait for a free connection slot and the HTTP
+    exchange itself. Cancelling the awaiting task closes the underlying socket,
+    so an abandoned chat turn does not keep a provider connection busy.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        max_concurrent: int = 32,
+        connect_timeout: float = 10.0,
+        keepalive_timeout: float = 60.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.headers = dict(headers)
+        self.max_concurrent = max_concurrent
+        self.connect_timeout = connect_timeout
+        self.keepalive_timeout = keepalive_timeout
+
+        self._pools: "WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopPool]" = WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.total_requests = 0
+
+    def _pool(self) -> _LoopPool:
+        """The running loop's session and semaphore, created on first use"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.get(loop)
+            if pool is not None and not pool.session.closed:
+                return pool
+            # Loops closed without close() can no longer close their sessions
+            stale = [(other, self._pools.pop(other)) for other in list(self._pools) if other.is_closed()]
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrent,
+                limit_per_host=self.max_concurrent,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            pool = _LoopPool(
+                aiohttp.ClientSession(
+                    headers=self.headers,
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(sock_connect=self.connect_timeout),
+                ),
+                asyncio.Semaphore(self.max_concurrent),
+            )
+            self._pools[loop] = pool
+        for _, stale_pool in stale:
+            self._abandon(stale_pool)
+        return pool
+
+    @staticmethod
+    def _abandon(pool: _LoopPool):
+        """Release a session whose loop is closed (its sockets cannot be closed gracefully)"""
+        if pool.session.closed:
+            return
+        logger.warning("Dropping an LLM transport session whose event loop closed without closing it")
+        connector = pool.session.connector
+        pool.session.detach()
+        if connector is not None:
+            try:
+                connector._close()
+            except Exception as e:
+                logger.debug(f"Could not close connector of a closed loop: {e}")
+
+    async def _request(self, method: str, path: str, timeout: float, **kwargs) -> Dict[str, Any]:
+        pool = self._pool()
+        async with pool.semaphore:
+            self.in_flight += 1
+            self.total_requests += 1
+            try:
+                async with pool.session.request(
+                    method,
+                    f"{self.base_url}{path}",
+                    timeout=aiohttp.ClientTimeout(total=timeout, sock_connect=self.connect_timeout),
+                    **kwargs
+                ) as response:
+                    response.raise_for_status()
+                    return await response.json()
+            finally:
+                self.in_flight -= 1
+
+    async def request_json(
+        self,
+        method: str,
+        path: str,
+        timeout: float = 120,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Perform a JSON request against the provider.
+
+        Args:
+            method: HTTP method
+            path: Path relative to base_url (e.g. "/chat/completions")
+            timeout: Deadline in seconds, including time spent queued for a slot
+
+        Raises:
+            asyncio.TimeoutError: If the deadline expires
+            aiohttp.ClientResponseError: On non-2xx responses (message contains the status code)
+        """
+        return await asyncio.wait_for(self._request(method, path, timeout, **kwargs), timeout=timeout)
+
+    async def post_json(self, path: str, payload: Dict[str, Any], timeout: float = 120) -> Dict[str, Any]:
+        """POST a JSON payload and return the decoded response"""
+        return await self.request_json("POST", path, timeout=timeout, json=payload)
+
+    async def get_json(self, path: str, timeout: float = 10) -> Dict[str, Any]:
+        """GET a JSON resource"""
+        return await self.request_json("GET", path, timeout=timeout)
+
+    async def stream_events(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        timeout: float = 120
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        POST a payload and yield decoded server-sent events as they arrive.
+
+        The connection slot is held until the stream is exhausted or the
+        consumer stops iterating (closing the generator closes the socket).
+        """
+        pool = self._pool()
+        async with pool.semaphore:
+            self.in_flight += 1
+            self.total_requests += 1
+            try:
+                async with pool.session.post(
+                    f"{self.base_url}{path}",
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=timeout, sock_connect=self.connect_timeout),
+                ) as response:
+                    response.raise_for_status()
+                    async for raw_line in response.content:
+                        line = raw_line.decode("utf-8").strip()
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            return
+                        try:
+                            yield json.loads(data)
+                        except json.JSONDecodeError:
+                            logger.debug(f"Skipping malformed stream event: {data[:80]}")
+            finally:
+                self.in_flight -= 1
+
+    async def close_loop(self):
+        """Close the running loop's pooled connections"""
+        with self._lock:
+            pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None and not pool.session.closed:
+            await pool.session.close()
+
+    async def close(self):
+        """Close pooled connections on every loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pools = list(self._pools.items())
+            self._pools = WeakKeyDictionary()
+        for owner, pool in pools:
+            if pool.session.closed:
+                continue
+            if owner is loop:
+                await pool.session.close()
+            elif owner.is_closed() or not owner.is_running():
+                self._abandon(pool)
+            else:
+                # Another thread's loop owns this session; close it there
+                future = asyncio.run_coroutine_threadsafe(pool.session.close(), owner)
+                try:
+                    await asyncio.wait_for(asyncio.wrap_future(future), timeout=5)
+                except Exception as e:
+                    logger.warning(f"Could not close LLM transport session on another loop: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get transport statistics"""
+        with self._lock:
+            open_sessions = sum(1 for pool in self._pools.values() if not pool.session.closed)
+        return {
+            "base_url": self.base_url,
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "total_requests": self.total_requests,
+            "session_open": open_sessions > 0,
+            "open_sessions": open_sessions,
+        }
+
+
+# Shared transports keyed by (base_url, api_key)
+_transports: Dict[Tuple[str, str], AsyncLLMTransport] = {}
+
+
+def get_transport(base_url: str, api_key: str) -> AsyncLLMTransport:
+    """Get (or create) the process-wide transport for a provider endpoint"""
+    key = (base_url.rstrip("/"), api_key)
+    transport = _transports.get(key)
+    if transport is None:
+        transport = AsyncLLMTransport(
+            base_url=base_url,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            max_concurrent=int(os.getenv("LLM_MAX_CONCURRENCY", "32")),
+            keepalive_timeout=float(os.getenv("LLM_KEEPALIVE_TIMEOUT", "60")),
+        )
+        _transports[key] = transport
+    return transport
+
+
+async def close_all_transports():
+    """Close every shared transport (call on application shutdown)"""
+    for transport in list(_transports.values()):
+        await transport.close()
+    logger.info("LLM transports closed")
+
+
+async def close_loop_transports():
+    """Close every shared transport's connections on the running loop"""
+    for transport in list(_transports.values()):
+        await transport.close_loop()
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """asyncio.run() for code using the shared transports; closes the loop's sessions before it exits"""
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await close_loop_transports()
+    return asyncio.run(runner())
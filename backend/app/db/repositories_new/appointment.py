@@ -4,8 +4,8 @@ Appointment Repository
 Data access for Appointments.
 """
 
-from typing import Optional, List, Dict
-from datetime import date, time
+from typing import Optional, List, Dict, Tuple
+from datetime import date, datetime, time, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_, desc
 
@@ -61,6 +61,35 @@ class AppointmentRepository(BaseRepository[Appointment, dict, dict]):
         ).count()
         return count == 0
 
+    def get_booked_intervals(
+        self,
+        db: Session,
+        specialist_id: str,
+        start_date: date,
+        end_date: date
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        (start, end) of every CONFIRMED appointment from start_date through
+        end_date, in one query. The counterpart of check_availability for a
+        whole range.
+        """
+        rows = db.query(
+            Appointment.scheduled_date,
+            Appointment.scheduled_time,
+            Appointment.duration_minutes
+        ).filter(
+            Appointment.specialist_id == specialist_id,
+            Appointment.scheduled_date >= start_date,
+            Appointment.scheduled_date <= end_date,
+            Appointment.status == AppointmentStatus.CONFIRMED
+        ).all()
+
+        intervals = []
+        for scheduled_date, scheduled_time, duration_minutes in rows:
+            start = datetime.combine(scheduled_date, scheduled_time)
+            intervals.append((start, start + timedelta(minutes=duration_minutes or 50)))
+        return intervals
+
     def update_status(
         self, 
         db: Session, 
@@ -4,10 +4,15 @@ Assessment Repository
 Data access for multi-agent assessment workflow.
 """
 
-from typing import Optional, List, Any
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, List, Any, Dict
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, insert
 
+from app.agents.core.message_journal import SessionCounter, create_message_journal
 from app.db.repositories_new.base import BaseRepository
 from app.models_new.assessment import (
     AssessmentSession, ConversationMessage, ExtractedSymptom, Diagnosis, SessionStatus
@@ -19,6 +24,19 @@ class AssessmentRepository(BaseRepository[AssessmentSession, dict, dict]):
     Repository for Assessment Sessions and related data.
     """
     
+    # Symptom summaries are cached per session and keyed by the session's
+    # symptom_count, so a new symptom invalidates them immediately; the TTL
+    # bounds staleness for in-place severity updates from other workers.
+    SYMPTOM_SUMMARY_TTL = 60
+    SYMPTOM_SUMMARY_MAX_SESSIONS = 2048
+    
+    def __init__(self, model):
+        super().__init__(model)
+        self._symptom_summaries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._summary_lock = threading.Lock()
+        # Buffered chat messages; message_count/last_active_at are bumped per batch
+        self.messages = create_message_journal(ConversationMessage, counter=SessionCounter(AssessmentSession))
+    
     def get_active_session(self, db: Session, patient_id: str) -> Optional[AssessmentSession]:
         """Get current active session for patient"""
         return db.query(AssessmentSession).filter(
@@ -58,10 +76,108 @@ class AssessmentRepository(BaseRepository[AssessmentSession, dict, dict]):
             
         return msg
 
+    def append_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        metadata: dict = None,
+        created_at: Optional[datetime] = None,
+        end_turn: Optional[bool] = None
+    ):
+        """
+        Buffer a message for the next journal batch (no DB round trip).
+        
+        The counters are bumped when the batch is written. A turn ends with
+        the assistant's reply unless end_turn says otherwise.
+        """
+        row = {"role": role, "content": content, "msg_metadata": metadata or {}}
+        if created_at is not None:
+            row["created_at"] = created_at
+        self.messages.append(session_id, row, end_turn=(role == "assistant") if end_turn is None else end_turn)
+    
+    def journal_turn(
+        self,
+        session_id: str,
+        user_content: str,
+        assistant_content: Optional[str] = None,
+        assistant_metadata: dict = None,
+        user_sent_at: Optional[datetime] = None
+    ):
+        """Buffer a whole chat turn; it is written with other sessions' turns in the next batch"""
+        now = datetime.now(timezone.utc)
+        self.append_message(
+            session_id, "user", user_content,
+            created_at=user_sent_at or now,
+            end_turn=assistant_content is None
+        )
+        if assistant_content is not None:
+            self.append_message(
+                session_id, "assistant", assistant_content, assistant_metadata,
+                created_at=max(now, user_sent_at or now)
+            )
+    
+    def flush_messages(self, session_id: Optional[str] = None) -> int:
+        """Write buffered messages (one session, or all) before reading them back"""
+        try:
+            return self.messages.flush(session_id)
+        except ValueError:
+            return 0  # not a session UUID, so nothing can be buffered for it
+    
+    def get_recent_messages(
+        self, db: Session, session_id: str, limit: int = 20
+    ) -> List[ConversationMessage]:
+        """Get the most recent `limit` messages, oldest first"""
+        self.flush_messages(session_id)
+        recent = db.query(ConversationMessage).filter(
+            ConversationMessage.session_id == session_id
+        ).order_by(desc(ConversationMessage.created_at)).limit(limit).all()
+        recent.reverse()
+        return recent
+    
+    def get_symptom_summary(
+        self, db: Session, session_id: str, symptom_count: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Compact symptom list (name, severity, category) for prompt context.
+        
+        Pass the session's symptom_count (already loaded with the session row)
+        to skip the query entirely while the cached summary is current.
+        """
+        key = str(session_id)
+        now = time.time()
+        with self._summary_lock:
+            cached = self._symptom_summaries.get(key)
+            if cached and cached[0] == symptom_count and cached[1] > now:
+                self._symptom_summaries.move_to_end(key)
+                return cached[2]
+        
+        summary = [
+            {"name": name, "severity": float(severity or 0), "category": category}
+            for name, severity, category in db.query(
+                ExtractedSymptom.symptom_name,
+                ExtractedSymptom.severity,
+                ExtractedSymptom.category
+            ).filter(ExtractedSymptom.session_id == session_id).all()
+        ]
+        
+        with self._summary_lock:
+            self._symptom_summaries[key] = (symptom_count, now + self.SYMPTOM_SUMMARY_TTL, summary)
+            self._symptom_summaries.move_to_end(key)
+            while len(self._symptom_summaries) > self.SYMPTOM_SUMMARY_MAX_SESSIONS:
+                self._symptom_summaries.popitem(last=False)
+        return summary
+    
+    def invalidate_symptom_summary(self, session_id: str):
+        """Drop the cached symptom summary for a session"""
+        with self._summary_lock:
+            self._symptom_summaries.pop(str(session_id), None)
+    
     def get_conversation_history(
         self, db: Session, session_id: str
     ) -> List[ConversationMessage]:
         """Get full conversation history"""
+        self.flush_messages(session_id)
         return db.query(ConversationMessage).filter(
             ConversationMessage.session_id == session_id
         ).order_by(ConversationMessage.created_at).all()
@@ -74,6 +190,7 @@ class AssessmentRepository(BaseRepository[AssessmentSession, dict, dict]):
         db.add(symptom)
         db.commit()
         db.refresh(symptom)
+        self.invalidate_symptom_summary(session_id)
         
         # Update symptom count
         session = self.get(db, session_id)
@@ -132,6 +249,7 @@ class AssessmentRepository(BaseRepository[AssessmentSession, dict, dict]):
             db.add(existing)
             db.commit()
             db.refresh(existing)
+            self.invalidate_symptom_summary(session_id)
             return existing
         else:
             # Create new
@@ -181,6 +299,42 @@ class AssessmentRepository(BaseRepository[AssessmentSession, dict, dict]):
         db.refresh(match)
         return match
 
+    def add_specialist_matches(self, db: Session, session_id: str, matches: List[dict]) -> int:
+        """
+        Store a session's ranked matches in one transaction: existing matches
+        are updated in place and the rest go in one bulk insert.
+        """
+        from app.models_new.specialist import SpecialistMatch
+
+        if not matches:
+            return 0
+
+        pending = {str(m["specialist_id"]): m for m in matches}
+        existing = db.query(SpecialistMatch).filter(
+            SpecialistMatch.session_id == session_id,
+            SpecialistMatch.specialist_id.in_(list(pending))
+        ).all()
+
+        for match in existing:
+            match_data = pending.pop(str(match.specialist_id))
+            match.match_score = match_data.get("match_score", match.match_score)
+            match.rank = match_data.get("rank", match.rank)
+            match.match_reasons = match_data.get("match_reasons", match.match_reasons)
+
+        if pending:
+            db.execute(insert(SpecialistMatch), [
+                {
+                    "session_id": session_id,
+                    "specialist_id": specialist_id,
+                    "match_score": match_data.get("match_score", 0),
+                    "rank": match_data.get("rank", 0),
+                    "match_reasons": match_data.get("match_reasons", [])
+                }
+                for specialist_id, match_data in pending.items()
+            ])
+        db.commit()
+        return len(matches)
+
     def get_matches(self, db: Session, session_id: str):
         """Get all specialist matches for a session"""
         from app.models_new.specialist import SpecialistMatch
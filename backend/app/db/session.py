@@ -258,6 +258,8 @@ def initialize_database() -> None:
         # Ensure schema is up-to-date for recent appointment and mood fields
         _ensure_appointment_columns()
         _ensure_mood_assessment_columns()
+        _ensure_generated_slot_index()
+        _ensure_specialist_search_index()
         
         # Test Redis connection (optional)
         redis_available = check_redis_health()
@@ -405,6 +407,59 @@ def _ensure_mood_assessment_columns() -> None:
     except Exception as e:
         logger.warning(f"Failed to ensure mood assessment columns: {e}")
 
+def _ensure_generated_slot_index() -> None:
+    """Ensure the unique slot index the slot materializer upserts against exists.
+
+    Duplicate unbooked slots left by the old on-demand generator are removed
+    first, keeping the booked or oldest row of each specialist/type/time
+    (by created_at, ties broken on id; UUIDs alone do not sort by age).
+    """
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(
+                """
+                DELETE FROM generated_time_slots g
+                USING generated_time_slots k
+                WHERE g.specialist_id = k.specialist_id
+                  AND g.appointment_type = k.appointment_type
+                  AND g.slot_date = k.slot_date
+                  AND g.id <> k.id
+                  AND g.appointment_id IS NULL
+                  AND g.status = 'AVAILABLE'
+                  AND (
+                      k.appointment_id IS NOT NULL
+                      OR k.status <> 'AVAILABLE'
+                      OR (COALESCE(k.created_at, '-infinity'::timestamptz), k.id)
+                         < (COALESCE(g.created_at, '-infinity'::timestamptz), g.id)
+                  );
+                """
+            ))
+            conn.execute(text(
+                """
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_slot_specialist_type_date
+                ON generated_time_slots (specialist_id, appointment_type, slot_date);
+                """
+            ))
+
+        logger.info("Ensured generated slot unique index exists")
+    except Exception as e:
+        logger.warning(f"Failed to ensure generated slot index: {e}")
+
+def _ensure_specialist_search_index() -> None:
+    """Ensure the GIN index over the specialist search tsvector exists."""
+    from sqlalchemy.schema import CreateIndex
+    from app.models.specialist import Specialists
+
+    try:
+        index = next(i for i in Specialists.__table__.indexes if i.name == "idx_specialists_search")
+        with engine.begin() as conn:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+        logger.info("Ensured specialist search index exists")
+    except Exception as e:
+        logger.warning(f"Failed to ensure specialist search index: {e}")
+
+
 def reset_database() -> None:
     """
     Reset database by dropping and recreating all tables.
@@ -1,5 +1,6 @@
 # app/main.py
 """MindMate Backend API - Simplified & Clean"""
+import asyncio
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -243,10 +244,37 @@ async def startup():
     logger.info(f"💾 Redis: {'✅ Connected' if redis_status else '⚠️  Optional'}")
     logger.info(f"🐛 Debug Mode: {'ON' if settings.DEBUG else 'OFF'}")
     logger.info("=" * 60)
+    
+    # Warm the shared LLM client (model catalog lookup) off the event loop;
+    # keep a reference so the task is not garbage-collected before it runs
+    app.state.llm_warmup = asyncio.create_task(_warm_llm_client())
+
+    # Keep the rolling window of bookable slots materialized in the background
+    from app.services.slot_materializer import get_slot_materializer
+    get_slot_materializer().start()
+
+
+async def _warm_llm_client():
+    """Construct the shared LLM client in a worker thread"""
+    try:
+        from app.core.llm_client import get_shared_client
+        await asyncio.to_thread(get_shared_client)
+        logger.info("🤖 Shared LLM client ready")
+    except Exception as e:
+        logger.warning(f"⚠️  LLM client warm-up skipped: {e}")
 
 @app.on_event("shutdown")
 async def shutdown():
     """Application shutdown"""
+    from app.core.llm_transport import close_all_transports
+    from app.agents.core.persistence import get_state_writer
+    from app.agents.core.message_journal import close_all_journals
+    from app.services.slot_materializer import get_slot_materializer
+    await close_all_transports()
+    await asyncio.to_thread(get_slot_materializer().close)
+    # Flush queued conversation/interview state and buffered messages before the process exits
+    await asyncio.to_thread(get_state_writer().close)
+    await asyncio.to_thread(close_all_journals)
     logger.info(f"👋 Shutting down {settings.APP_NAME}")
 
 # ============================================================================
@@ -284,6 +284,7 @@ class GeneratedTimeSlot(Base, BaseModel):
         Index('idx_slot_specialist_date', 'specialist_id', 'slot_date'),
         Index('idx_slot_status', 'status'),
         Index('idx_slot_appointment_type', 'appointment_type'),
+        Index('uq_slot_specialist_type_date', 'specialist_id', 'appointment_type', 'slot_date', unique=True),
     )
 
 
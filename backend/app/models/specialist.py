@@ -9,7 +9,7 @@ from typing import List, Optional
 from sqlalchemy import (
     Column, String, Date, DateTime, Boolean, Enum, JSON, Text, Integer,
     Numeric, ForeignKey, UniqueConstraint, CheckConstraint, Index,
-    func, text
+    func, text, literal_column
 )
 from sqlalchemy.orm import validates, relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -148,6 +148,28 @@ class TherapyMethodEnum(str, enum.Enum):
     SOLUTION_FOCUSED = "solution_focused"
     NARRATIVE_THERAPY = "narrative_therapy"
 
+# ============================================================================
+# SEARCH DOCUMENT
+# ============================================================================
+
+def specialist_search_text(first_name, last_name, city, bio):
+    """Name, city and bio joined into the text specialist search matches on"""
+    parts = [func.coalesce(column, literal_column("''", String)) for column in (first_name, last_name, city, bio)]
+    document = parts[0]
+    for part in parts[1:]:
+        document = document + literal_column("' '", String) + part
+    return document
+
+
+def specialist_search_vector(first_name, last_name, city, bio):
+    """
+    tsvector behind idx_specialists_search. The 'simple' config keeps names
+    unstemmed; queries must build the same expression to use the index.
+    """
+    return func.to_tsvector(
+        literal_column("'simple'"), specialist_search_text(first_name, last_name, city, bio)
+    )
+
 # ============================================================================
 # CORE SPECIALIST TABLE
 # ============================================================================
@@ -296,6 +318,11 @@ class Specialists(Base, SQLBaseModel):
         Index('idx_specialists_name', 'first_name', 'last_name'),
         Index('idx_specialists_status', 'approval_status', 'availability_status'),
         Index('idx_specialists_rating', 'average_rating', 'total_reviews'),
+        Index(
+            'idx_specialists_search',
+            specialist_search_vector(first_name, last_name, city, bio),
+            postgresql_using='gin',
+        ).ddl_if(dialect='postgresql'),
         {'extend_existing': True}
     )
     
@@ -2,9 +2,19 @@
 Booking Service
 ===============
 Business logic for appointment booking and slot management.
+
+Availability is computed set-wise: the specialist's confirmed appointments
+for the whole range come back in one query and are subtracted from the slot
+grid in memory. Results are cached per specialist and date range for a short
+TTL and dropped whenever one of the specialist's bookings changes; the
+booking path re-checks the database, so a stale entry can never double-book.
 """
 
-from typing import List, Dict, Optional
+import os
+import time as clock
+import threading
+from collections import OrderedDict
+from typing import Any, List, Dict, Optional, Tuple
 from datetime import datetime, date, time, timedelta
 import random
 
@@ -15,52 +25,136 @@ from app.db.repositories_new.appointment import appointment_repo
 from app.db.repositories_new.specialist import specialist_repo
 from app.models_new.appointment import Appointment, AppointmentStatus
 
+# Slot grid: hourly slots from 9 AM to 5 PM on weekdays
+SLOT_HOURS = range(9, 17)
+SLOT_MINUTES = 60
+
+
+class AvailabilityCache:
+    """
+    Computed availability per specialist and date range.
+
+    Entries are grouped by specialist, so invalidating one drops all of their
+    ranges in O(1); specialists are evicted least recently used.
+    """
+
+    def __init__(self, max_specialists: int = 1024, ttl_seconds: float = 60.0):
+        self.max_specialists = max_specialists
+        self.ttl_seconds = ttl_seconds
+        # specialist_id -> {(start_date, days): (slots, expires_at)}
+        self._entries: "OrderedDict[str, Dict[Tuple[date, int], Tuple[List[Dict], float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, specialist_id: Any, start_date: date, days: int) -> Optional[List[Dict]]:
+        """Cached slots for a range, or None"""
+        key = str(specialist_id)
+        with self._lock:
+            entry = self._entries.get(key, {}).get((start_date, days))
+            if entry is None or entry[1] <= clock.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+
+    def set(self, specialist_id: Any, start_date: date, days: int, slots: List[Dict]):
+        """Cache the slots computed for a range"""
+        key = str(specialist_id)
+        with self._lock:
+            ranges = self._entries.setdefault(key, {})
+            ranges[(start_date, days)] = (list(slots), clock.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_specialists:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, specialist_id: Any):
+        """Drop every cached range of a specialist"""
+        with self._lock:
+            if self._entries.pop(str(specialist_id), None) is not None:
+                self.invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            "specialists": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+def subtract_booked(
+    start_date: date,
+    days: int,
+    booked: List[Tuple[datetime, datetime]]
+) -> List[Dict]:
+    """Grid slots over the days from start_date that overlap no booked interval"""
+    booked_by_day: Dict[date, List[Tuple[datetime, datetime]]] = {}
+    for start, end in booked:
+        booked_by_day.setdefault(start.date(), []).append((start, end))
+
+    slots = []
+    for i in range(days):
+        current_date = start_date + timedelta(days=i)
+        
+        # Skip weekends (0=Mon, 6=Sun)
+        if current_date.weekday() >= 5:
+            continue
+        
+        day_booked = booked_by_day.get(current_date, ())
+        for hour in SLOT_HOURS:
+            slot_start = datetime.combine(current_date, time(hour, 0))
+            slot_end = slot_start + timedelta(minutes=SLOT_MINUTES)
+            if any(start < slot_end and end > slot_start for start, end in day_booked):
+                continue
+            slots.append({
+                "date": current_date.isoformat(),
+                "time": slot_start.strftime("%H:%M"),
+                "available": True
+            })
+    return slots
+
 
 class BookingService:
     """
     Service for managing bookings and slots.
     """
+
+    def __init__(self, availability_cache: Optional[AvailabilityCache] = None):
+        self.availability_cache = availability_cache or AvailabilityCache(
+            ttl_seconds=float(os.getenv("BOOKING_AVAILABILITY_TTL_SECONDS", "60"))
+        )
     
     def get_available_slots(
         self, db: Session, specialist_id: str, days: int = 7
     ) -> List[Dict]:
         """
-        Get available slots for the next N days.
-        Currently mocks availability (9 AM - 5 PM weekdays).
+        Get available slots for the next N days, starting tomorrow.
+        Availability is the 9 AM - 5 PM weekday grid minus confirmed appointments.
         """
+        start_date = date.today() + timedelta(days=1)
+        cached = self.availability_cache.get(specialist_id, start_date, days)
+        if cached is not None:
+            return cached
+
         specialist = specialist_repo.get(db, specialist_id)
         if not specialist:
             raise HTTPException(status_code=404, detail="Specialist not found")
         
-        slots = []
-        today = date.today()
-        
-        # Determine start date (tomorrow)
-        start_date = today + timedelta(days=1)
-        
-        for i in range(days):
-            current_date = start_date + timedelta(days=i)
-            
-            # Skip weekends (0=Mon, 6=Sun)
-            if current_date.weekday() >= 5:
-                continue
-            
-            # Generate slots from 9 AM to 5 PM
-            for hour in range(9, 17):
-                slot_time = time(hour, 0)
-                
-                # Check real availability against DB
-                if appointment_repo.check_availability(
-                    db, specialist_id, current_date, slot_time
-                ):
-                    slots.append({
-                        "date": current_date.isoformat(),
-                        "time": slot_time.strftime("%H:%M"),
-                        "available": True
-                    })
-        
+        booked = appointment_repo.get_booked_intervals(
+            db, specialist_id, start_date, start_date + timedelta(days=days - 1)
+        )
+        slots = subtract_booked(start_date, days, booked)
+        self.availability_cache.set(specialist_id, start_date, days, slots)
         return slots
 
+    def invalidate_availability(self, specialist_id: Any):
+        """Drop cached availability after a specialist's bookings change (book, cancel, reschedule)"""
+        self.availability_cache.invalidate(specialist_id)
+
     def create_booking(
         self, 
         db: Session, 
@@ -93,7 +187,9 @@ class BookingService:
             "meeting_link": f"https://meet.mindmate.ai/{specialist_id}-{patient_id}" # Mock link
         }
         
-        return appointment_repo.create(db, obj_in=appointment_data)
+        appointment = appointment_repo.create(db, obj_in=appointment_data)
+        self.invalidate_availability(specialist_id)
+        return appointment
 
     def confirm_booking(
         self, db: Session, specialist_id: str, appointment_id: str
@@ -106,7 +202,9 @@ class BookingService:
         if appointment.specialist_id != specialist_id:
             raise HTTPException(status_code=403, detail="Not authorized")
             
-        return appointment_repo.update_status(db, appointment_id, AppointmentStatus.CONFIRMED)
+        appointment = appointment_repo.update_status(db, appointment_id, AppointmentStatus.CONFIRMED)
+        self.invalidate_availability(specialist_id)
+        return appointment
 
     def reject_booking(
         self, db: Session, specialist_id: str, appointment_id: str
@@ -119,7 +217,9 @@ class BookingService:
         if appointment.specialist_id != specialist_id:
             raise HTTPException(status_code=403, detail="Not authorized")
             
-        return appointment_repo.update_status(db, appointment_id, AppointmentStatus.CANCELLED)
+        appointment = appointment_repo.update_status(db, appointment_id, AppointmentStatus.CANCELLED)
+        self.invalidate_availability(specialist_id)
+        return appointment
 
 
 booking_service = BookingService()
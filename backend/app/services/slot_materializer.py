@@ -0,0 +1,430 @@
+"""
+Slot Materializer
+=================
+Keeps GeneratedTimeSlot rows materialized for a rolling window of days, so the
+slot endpoints are pure range reads on slot_date.
+
+A specialist's weekly rules come from their availability templates; a weekday
+without a template falls back to availability_schedule and then to the
+09:00-17:00 hourly default, the same resolution the on-demand generator used.
+Missing slots are written with one multi-row INSERT ... ON CONFLICT DO NOTHING
+per batch of specialists, so overlapping runs (several workers, or a refresh
+racing the sweep) never duplicate a slot. A background thread sweeps every
+approved specialist on an interval and serves refreshes queued when a
+specialist's availability changes.
+"""
+
+import os
+import uuid
+import logging
+import threading
+from datetime import datetime, date, time, timedelta, timezone
+from time import monotonic
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models.appointment import (
+    AppointmentTypeEnum, DayOfWeekEnum, GeneratedTimeSlot,
+    SlotStatusEnum, SpecialistAvailabilityTemplate
+)
+from app.models.specialist import Specialists, ApprovalStatusEnum
+
+logger = logging.getLogger(__name__)
+
+# Pakistan Standard Time (PKT) - UTC+5, as in the appointments API
+SLOT_TIMEZONE = timezone(timedelta(hours=5))
+
+# Slot types and their availability_schedule keys
+SLOT_TYPES = {
+    AppointmentTypeEnum.ONLINE: "online",
+    AppointmentTypeEnum.IN_PERSON: "in_person",
+}
+
+# Indexed by date.weekday()
+WEEKDAYS = (
+    DayOfWeekEnum.MONDAY, DayOfWeekEnum.TUESDAY, DayOfWeekEnum.WEDNESDAY,
+    DayOfWeekEnum.THURSDAY, DayOfWeekEnum.FRIDAY, DayOfWeekEnum.SATURDAY,
+    DayOfWeekEnum.SUNDAY,
+)
+
+DEFAULT_START_TIME = "09:00"
+DEFAULT_END_TIME = "17:00"
+DEFAULT_SLOT_MINUTES = 60
+
+SlotKey = Tuple[AppointmentTypeEnum, DayOfWeekEnum]
+
+
+def _parse_hhmm(value: Any) -> time:
+    hour, minute = (int(part) for part in str(value).split(":"))
+    return time(hour, minute)
+
+
+class SlotRule(NamedTuple):
+    """One weekday's bookable window for an appointment type"""
+    start: time
+    end: time
+    slot_minutes: int
+    break_minutes: int = 0
+
+    @classmethod
+    def parse(cls, start: Any, end: Any, slot_minutes: Any, break_minutes: Any = 0) -> Optional["SlotRule"]:
+        """Rule from HH:MM strings; None when the window is malformed or empty"""
+        try:
+            rule = cls(_parse_hhmm(start), _parse_hhmm(end), int(slot_minutes), int(break_minutes or 0))
+        except (TypeError, ValueError):
+            return None
+        if rule.end <= rule.start or rule.slot_minutes <= 0 or rule.break_minutes < 0:
+            return None
+        return rule
+
+    def starts(self, day: date) -> Iterator[datetime]:
+        """Slot start times on a date, in SLOT_TIMEZONE"""
+        current = datetime.combine(day, self.start, tzinfo=SLOT_TIMEZONE)
+        end = datetime.combine(day, self.end, tzinfo=SLOT_TIMEZONE)
+        length = timedelta(minutes=self.slot_minutes)
+        step = length + timedelta(minutes=self.break_minutes)
+        while current + length <= end:
+            yield current
+            current += step
+
+
+def schedule_rule(
+    availability_schedule: Any,
+    appointment_type: AppointmentTypeEnum,
+    weekday: DayOfWeekEnum
+) -> Optional[SlotRule]:
+    """
+    Rule for a weekday that has no template.
+
+    Reads the specialist's availability_schedule (nested per appointment type,
+    or the older flat format shared by both); days it doesn't mention get the
+    default hours. None when the day is marked unavailable.
+    """
+    day = None
+    if isinstance(availability_schedule, dict):
+        type_key = SLOT_TYPES[appointment_type]
+        if type_key in availability_schedule:
+            type_schedule = availability_schedule[type_key]
+            day = type_schedule.get(weekday.value) if isinstance(type_schedule, dict) else None
+        else:
+            day = availability_schedule.get(weekday.value)
+
+    if not isinstance(day, dict):
+        return SlotRule.parse(DEFAULT_START_TIME, DEFAULT_END_TIME, DEFAULT_SLOT_MINUTES)
+    if not day.get("is_available", False):
+        return None
+    return SlotRule.parse(
+        day.get("start_time") or DEFAULT_START_TIME,
+        day.get("end_time") or DEFAULT_END_TIME,
+        day.get("slot_duration_minutes") or DEFAULT_SLOT_MINUTES,
+    )
+
+
+def resolve_rules(
+    templates: Iterable[SpecialistAvailabilityTemplate],
+    availability_schedule: Any = None
+) -> Dict[SlotKey, Optional[SlotRule]]:
+    """Weekly rules for every slot type and weekday; a template wins, and an inactive one means no slots"""
+    rules: Dict[SlotKey, Optional[SlotRule]] = {}
+    for template in templates:
+        if template.appointment_type not in SLOT_TYPES:
+            continue
+        rules[(template.appointment_type, template.day_of_week)] = SlotRule.parse(
+            template.start_time, template.end_time,
+            template.slot_length_minutes, template.break_between_slots_minutes
+        ) if template.is_active else None
+
+    for appointment_type in SLOT_TYPES:
+        for weekday in WEEKDAYS:
+            if (appointment_type, weekday) not in rules:
+                rules[(appointment_type, weekday)] = schedule_rule(availability_schedule, appointment_type, weekday)
+    return rules
+
+
+def slot_starts(
+    rules: Dict[SlotKey, Optional[SlotRule]],
+    start_day: date,
+    days: int,
+    now: datetime
+) -> Iterator[Tuple[AppointmentTypeEnum, datetime, int]]:
+    """(type, start, minutes) of every slot after now in the days from start_day"""
+    for offset in range(days):
+        day = start_day + timedelta(days=offset)
+        weekday = WEEKDAYS[day.weekday()]
+        for appointment_type in SLOT_TYPES:
+            rule = rules.get((appointment_type, weekday))
+            if rule is None:
+                continue
+            for start in rule.starts(day):
+                if start > now:
+                    yield appointment_type, start, rule.slot_minutes
+
+
+def day_range(start_day: date, end_day: date) -> Tuple[datetime, datetime]:
+    """[start, end) instants covering whole SLOT_TIMEZONE days, for range queries on slot_date"""
+    return (
+        datetime.combine(start_day, time.min, tzinfo=SLOT_TIMEZONE),
+        datetime.combine(end_day + timedelta(days=1), time.min, tzinfo=SLOT_TIMEZONE),
+    )
+
+
+def upsert_slots_statement(rows: List[Dict[str, Any]]):
+    """Multi-row INSERT of slot rows that skips slots already materialized"""
+    return pg_insert(GeneratedTimeSlot).values(rows).on_conflict_do_nothing()
+
+
+class SlotMaterializer:
+    """
+    Background writer of the rolling slot window.
+
+    window_days counts today, so the default of 8 covers today through a week
+    ahead, the furthest date the booking endpoints accept. Sweeps only add
+    slots; a queued refresh also removes unbooked future slots that the
+    specialist's current rules no longer produce.
+    """
+
+    def __init__(
+        self,
+        window_days: int = 8,
+        interval_seconds: float = 900.0,
+        batch_size: int = 100,
+        session_factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.window_days = window_days
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._session_factory = session_factory
+
+        self._queued: Dict[uuid.UUID, None] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._next_sweep = 0.0
+
+        self.sweeps = 0
+        self.refreshes = 0
+        self.slots_written = 0
+        self.slots_pruned = 0
+        self.failures = 0
+        self.last_sweep_at: Optional[datetime] = None
+
+    def last_day(self, today: date) -> date:
+        """Last day of the window starting today; later days have no slots yet"""
+        return today + timedelta(days=self.window_days - 1)
+
+    def start(self):
+        """Start the background thread; the first sweep runs immediately"""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._closed = False
+            self._next_sweep = 0.0
+            self._thread = threading.Thread(target=self._run, name="slot-materializer", daemon=True)
+            self._thread.start()
+
+    def request(self, specialist_id: Any):
+        """Queue a refresh of one specialist's window (after their availability changes)"""
+        key = specialist_id if isinstance(specialist_id, uuid.UUID) else uuid.UUID(str(specialist_id))
+        with self._cond:
+            self._queued[key] = None
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and not self._queued and monotonic() < self._next_sweep:
+                    self._cond.wait(self._next_sweep - monotonic())
+                if self._closed:
+                    return
+                queued = list(self._queued)
+                self._queued = {}
+                sweep = monotonic() >= self._next_sweep
+                if sweep:
+                    self._next_sweep = monotonic() + self.interval_seconds
+
+            try:
+                if queued:
+                    self.refresh(queued)
+                if sweep:
+                    self.sweep()
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Slot materializer run failed: {e}")
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.db.session import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """Fill the window for every approved specialist, batch by batch; returns slots written"""
+        written = 0
+        last_id = None
+        while True:
+            db = self._session()
+            try:
+                query = db.query(Specialists.id).filter(
+                    Specialists.approval_status == ApprovalStatusEnum.APPROVED,
+                    Specialists.is_deleted == False
+                )
+                if last_id is not None:
+                    query = query.filter(Specialists.id > last_id)
+                ids = [row.id for row in query.order_by(Specialists.id).limit(self.batch_size).all()]
+                if not ids:
+                    break
+                written += self.materialize(db, ids, now=now)
+                last_id = ids[-1]
+            finally:
+                db.close()
+
+        self.sweeps += 1
+        self.last_sweep_at = datetime.now(timezone.utc)
+        logger.info(f"Slot sweep wrote {written} slots ({self.window_days}-day window)")
+        return written
+
+    def refresh(self, specialist_ids: List[Any], now: Optional[datetime] = None) -> int:
+        """Rebuild the window for specific specialists, pruning stale unbooked slots"""
+        db = self._session()
+        try:
+            written = self.materialize(db, specialist_ids, prune=True, now=now)
+        finally:
+            db.close()
+        self.refreshes += 1
+        return written
+
+    def materialize(
+        self,
+        db: Any,
+        specialist_ids: List[Any],
+        prune: bool = False,
+        now: Optional[datetime] = None
+    ) -> int:
+        """Write the specialists' missing slots in one INSERT and commit; returns slots written"""
+        now = (now or datetime.now(SLOT_TIMEZONE)).astimezone(SLOT_TIMEZONE)
+        today = now.date()
+        window_start, window_end = day_range(today, self.last_day(today))
+
+        specialists = db.query(Specialists.id, Specialists.availability_schedule).filter(
+            Specialists.id.in_(specialist_ids),
+            Specialists.approval_status == ApprovalStatusEnum.APPROVED,
+            Specialists.is_deleted == False
+        ).all()
+        if not specialists:
+            return 0
+        ids = [specialist.id for specialist in specialists]
+
+        templates: Dict[uuid.UUID, List[SpecialistAvailabilityTemplate]] = {}
+        for template in db.query(SpecialistAvailabilityTemplate).filter(
+            SpecialistAvailabilityTemplate.specialist_id.in_(ids)
+        ).all():
+            templates.setdefault(template.specialist_id, []).append(template)
+
+        wanted = {}
+        for specialist in specialists:
+            rules = resolve_rules(templates.get(specialist.id, ()), specialist.availability_schedule)
+            for appointment_type, start, minutes in slot_starts(rules, today, self.window_days, now):
+                wanted[(specialist.id, appointment_type, start)] = minutes
+
+        # Skipping what already exists keeps steady-state sweeps to a read; the
+        # conflict clause covers the rows a concurrent writer adds meanwhile
+        existing = set(
+            tuple(row) for row in db.query(
+                GeneratedTimeSlot.specialist_id,
+                GeneratedTimeSlot.appointment_type,
+                GeneratedTimeSlot.slot_date
+            ).filter(
+                GeneratedTimeSlot.specialist_id.in_(ids),
+                GeneratedTimeSlot.slot_date >= window_start,
+                GeneratedTimeSlot.slot_date < window_end
+            ).all()
+        )
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "specialist_id": specialist_id,
+                "appointment_type": appointment_type,
+                "slot_date": start,
+                "duration_minutes": minutes,
+                "status": SlotStatusEnum.AVAILABLE,
+                "can_be_booked": True,
+            }
+            for (specialist_id, appointment_type, start), minutes in wanted.items()
+            if (specialist_id, appointment_type, start) not in existing
+        ]
+
+        try:
+            written = db.execute(upsert_slots_statement(rows)).rowcount if rows else 0
+            pruned = 0
+            if prune:
+                stale = delete(GeneratedTimeSlot).where(
+                    GeneratedTimeSlot.specialist_id.in_(ids),
+                    GeneratedTimeSlot.slot_date > now,
+                    GeneratedTimeSlot.slot_date < window_end,
+                    GeneratedTimeSlot.status == SlotStatusEnum.AVAILABLE,
+                    GeneratedTimeSlot.appointment_id.is_(None)
+                )
+                if wanted:
+                    stale = stale.where(~tuple_(
+                        GeneratedTimeSlot.specialist_id,
+                        GeneratedTimeSlot.appointment_type,
+                        GeneratedTimeSlot.slot_date
+                    ).in_(list(wanted)))
+                pruned = db.execute(stale).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        self.slots_written += written
+        self.slots_pruned += pruned
+        if written or pruned:
+            logger.info(f"Materialized {written} slots, pruned {pruned}, for {len(ids)} specialists")
+        return written
+
+    def close(self):
+        """Stop the background thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get materializer statistics"""
+        return {
+            "window_days": self.window_days,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "queued": len(self._queued),
+            "sweeps": self.sweeps,
+            "refreshes": self.refreshes,
+            "slots_written": self.slots_written,
+            "slots_pruned": self.slots_pruned,
+            "failures": self.failures,
+            "last_sweep_at": self.last_sweep_at.isoformat() if self.last_sweep_at else None,
+        }
+
+
+_materializer: Optional[SlotMaterializer] = None
+_materializer_lock = threading.Lock()
+
+
+def get_slot_materializer() -> SlotMaterializer:
+    """
+    Get the process-wide slot materializer.
+
+    SLOT_WINDOW_DAYS (default 8) sets the window and
+    SLOT_MATERIALIZER_INTERVAL_SECONDS (default 900) the sweep interval.
+    """
+    global _materializer
+    if _materializer is None:
+        with _materializer_lock:
+            if _materializer is None:
+                _materializer = SlotMaterializer(
+                    window_days=int(os.getenv("SLOT_WINDOW_DAYS", "8")),
+                    interval_seconds=float(os.getenv("SLOT_MATERIALIZER_INTERVAL_SECONDS", "900")),
+                )
+    return _materializer
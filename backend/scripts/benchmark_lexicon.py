@@ -0,0 +1,154 @@
+"""
+Microbenchmark: compiled lexicon matcher vs. the old substring scans.
+
+Runs every keyword extractor over a set of patient messages and reports the
+per-message cost of the previous `kw in message.lower()` loops next to the
+shared compiled lexicon, both per extractor (scan not memoized) and for a
+whole turn, where all extractors read one scan of the message.
+
+    cd backend && python scripts/benchmark_lexicon.py [iterations]
+"""
+
+import sys
+import os
+import time
+from typing import Callable, Dict, List
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.agents.core.lexicon import get_lexicon_engine
+from app.agents.sra.agent_v2 import DSM5_SYMPTOM_MAP, SEVERITY_WORDS, extract_symptoms_fast
+from app.agents.sra.symptom_db import DSM5SymptomDatabase
+from app.agents.therapist.agent_v2 import RISK_KEYWORDS, detect_risk
+from app.agents.assessment.assessment_v2.core.sra_service import SYMPTOM_KEYWORDS, _SRA_LEXICON
+
+MESSAGES = [
+    "I am sad",
+    "I've been feeling really down lately and I can't sleep most nights, I'm tired all the time.",
+    "Honestly I'm not sad, just worried about work and a bit on edge before meetings.",
+    "I keep having flashbacks and nightmares since the accident, it's unbearable.",
+    "Sometimes I drink alcohol to calm down, and my appetite has been off for weeks.",
+    "I was downloading some files and then went for a walk, nothing much happened today.",
+    "I feel hopeless and worthless, like nothing matters anymore and I want to give up.",
+    "My concentration is terrible, I get distracted constantly and feel restless and nervous. " * 3,
+]
+
+
+# ---------------------------------------------------------
+# Previous implementations (substring scans)
+# ---------------------------------------------------------
+
+def old_extract_symptoms_fast(message: str) -> List[Dict]:
+    message_lower = message.lower()
+    found = []
+    for keyword, mapping in DSM5_SYMPTOM_MAP.items():
+        if keyword in message_lower:
+            severity = 0.5
+            for sev_score, sev_words in SEVERITY_WORDS.items():
+                if any(sw in message_lower for sw in sev_words):
+                    severity = sev_score
+                    break
+            found.append({"name": keyword, "category": mapping["category"], "severity": severity})
+    return found
+
+
+def old_detect_risk(message: str) -> str:
+    message_lower = message.lower()
+    for level, keywords in RISK_KEYWORDS.items():
+        if any(kw in message_lower for kw in keywords):
+            return level.value
+    return "none"
+
+
+def old_match_symptoms(text: str) -> List[Dict]:
+    db = DSM5SymptomDatabase
+    text_lower = text.lower()
+    matches = []
+    for pattern, info in db.SYMPTOM_PATTERNS.items():
+        if pattern in text_lower:
+            severity = next((s for m, s in db.SEVERITY_MODIFIERS.items() if m in text_lower), 0.5)
+            duration = next((d for p, d in db.DURATION_PATTERNS.items() if p in text_lower), None)
+            matches.append({"name": pattern, "severity": severity, "duration": duration})
+    return matches
+
+
+def old_sra_rule_based(text: str) -> List[str]:
+    text_lower = text.lower()
+    categories = []
+    for category, keywords in SYMPTOM_KEYWORDS.items():
+        if any(kw in text_lower for kw in keywords):
+            categories.append(category)
+    return categories
+
+
+def new_sra_rule_based(text: str) -> List[str]:
+    return list({hit.category: None for hit in _SRA_LEXICON.scan(text).of_kind("symptom")})
+
+
+# ---------------------------------------------------------
+# Runner
+# ---------------------------------------------------------
+
+ENGINE = get_lexicon_engine()
+
+
+def per_message_us(fn: Callable, iterations: int, cold: bool = True) -> float:
+    """Average cost per message; `cold` drops memoized scans before every call"""
+    clear = ENGINE._cache.clear
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message in MESSAGES:
+            if cold:
+                clear()
+            fn(message)
+    elapsed = time.perf_counter() - start
+    if cold:
+        # Subtract the cost of clearing itself
+        t0 = time.perf_counter()
+        for _ in range(iterations * len(MESSAGES)):
+            clear()
+        elapsed -= time.perf_counter() - t0
+    return elapsed / (iterations * len(MESSAGES)) * 1e6
+
+
+def run(iterations: int = 2000):
+    cases = [
+        ("extract_symptoms_fast", old_extract_symptoms_fast, extract_symptoms_fast),
+        ("detect_risk", old_detect_risk, detect_risk),
+        ("DSM5SymptomDatabase.match_symptoms", old_match_symptoms, DSM5SymptomDatabase.match_symptoms),
+        ("SRAService rule-based", old_sra_rule_based, new_sra_rule_based),
+    ]
+    stats = ENGINE.get_stats()
+
+    print(f"{len(MESSAGES)} messages x {iterations} iterations, "
+          f"{stats['terms']} terms in {stats['lexicons']} lexicons (microseconds per message)\n")
+    print(f"{'extractor (cold scan each call)':<38}{'substring':>12}{'lexicon':>12}{'speedup':>10}")
+    for name, old, new in cases:
+        old_us = per_message_us(old, iterations, cold=False)
+        new_us = per_message_us(new, iterations)
+        print(f"{name:<38}{old_us:>12.1f}{new_us:>12.1f}{old_us / new_us:>9.1f}x")
+
+    # A chat turn runs every extractor over the same message: one shared scan
+    def old_turn(message):
+        for _, old, _ in cases:
+            old(message)
+
+    def new_turn(message):
+        for _, _, new in cases:
+            new(message)
+
+    old_us = per_message_us(old_turn, iterations, cold=False)
+    new_us = per_message_us(new_turn, iterations)
+    print(f"{'all extractors, one turn':<38}{old_us:>12.1f}{new_us:>12.1f}{old_us / new_us:>9.1f}x")
+
+    print("\nBoundary/negation differences (old -> new):")
+    for message in MESSAGES:
+        old_names = sorted(s["name"] for s in old_extract_symptoms_fast(message))
+        new_names = sorted(s["name"] for s in extract_symptoms_fast(message))
+        if old_names != new_names:
+            print(f"  {message[:60]!r}: {old_names} -> {new_names}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
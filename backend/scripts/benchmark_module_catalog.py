@@ -0,0 +1,89 @@
+"""
+Benchmark: SCID module loading, factories vs. the shared module catalog.
+
+Each scenario runs in a fresh interpreter and reports wall time and the RSS
+growth of the step itself (after the common imports are in place):
+
+- factories:      import every SCID module and run its factory (previous
+                  AssessmentModerator start-up)
+- catalog, cold:  build and write the catalog (first process after a change)
+- catalog, warm:  map an existing catalog and materialize the three basic
+                  modules a new assessment starts with
+- catalog, all:   map an existing catalog and materialize every module
+
+    cd backend && python scripts/benchmark_module_catalog.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIO = r"""
+import json, sys, time
+sys.path.insert(0, {backend!r})
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+from app.agents.assessment.assessment_v2 import base_types
+from app.agents.assessment.assessment_v2.core.module_catalog import ModuleCatalog
+
+rss0, t0 = rss_kb(), time.perf_counter()
+scenario = {scenario!r}
+if scenario == "factories":
+    from app.agents.assessment.assessment_v2.modules import MODULE_REGISTRY
+    modules = [factory() for factory in MODULE_REGISTRY.values()]
+else:
+    catalog = ModuleCatalog(path={path!r})
+    if scenario == "cold":
+        catalog.build()
+        modules = catalog.module_ids()
+    elif scenario == "warm":
+        modules = [catalog.get(m) for m in ("DEMOGRAPHICS", "CONCERN", "RISK_ASSESSMENT")]
+    else:
+        modules = [catalog.get(m) for m in catalog.module_ids()]
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"ms": elapsed * 1000, "rss_kb": rss_kb() - rss0, "modules": len(modules),
+                   "scid_imported": "app.agents.assessment.assessment_v2.modules" in sys.modules}}))
+"""
+
+
+def run_scenario(scenario: str, path: str) -> dict:
+    code = SCENARIO.format(backend=BACKEND_DIR, scenario=scenario, path=path)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=BACKEND_DIR, env=os.environ.copy())
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(repeats: int = 3):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scid_catalog.bin")
+        scenarios = [
+            ("factories", "factories"),
+            ("catalog, cold (build)", "cold"),
+            ("catalog, warm (3 modules)", "warm"),
+            ("catalog, warm (all modules)", "all"),
+        ]
+
+        print(f"{'scenario':<30}{'ms':>10}{'RSS KiB':>10}{'modules':>9}{'SCID lib imported':>19}")
+        for label, scenario in scenarios:
+            results = []
+            for _ in range(repeats):
+                if scenario == "cold" and os.path.exists(path):
+                    os.remove(path)
+                results.append(run_scenario(scenario, path))
+            best = min(results, key=lambda r: r["ms"])
+            print(f"{label:<30}{best['ms']:>10.1f}{best['rss_kb']:>10}{best['modules']:>9}"
+                  f"{str(best['scid_imported']):>19}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
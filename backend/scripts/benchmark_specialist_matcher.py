@@ -0,0 +1,110 @@
+"""
+Benchmark: Matcher Agent ranking, per-request scoring vs. the feature cache.
+
+Builds 10k synthetic approved specialists and reports, per match request,
+the previous path (score every specialist object and sort) next to a top-K
+over the specialist feature cache, plus the one-off cost of building the
+cache and of a delta refresh. Persistence is counted in statements: the
+previous path committed once per recommended specialist.
+
+    cd backend && python scripts/benchmark_specialist_matcher.py [specialists] [requests]
+"""
+
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.agents.matcher.agent import CATEGORY_TO_SPECIALIZATION, MatcherAgent
+from app.agents.matcher.feature_cache import SpecialistFeatureCache
+from app.models_new.base import ApprovalStatus
+
+SPECIALIZATIONS = sorted({s for specs in CATEGORY_TO_SPECIALIZATION.values() for s in specs} | {"grief", "adhd"})
+CITIES = ["Lahore", "Karachi", "Islamabad", "Peshawar", "Quetta", "Multan", None]
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def synthetic_specialists(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        first_name, last_name = f"Name{i}", rng.choice(["Khan", "Ahmed", "Malik", "Hussain"])
+        rows.append(SimpleNamespace(
+            id=uuid.UUID(int=i + 1), title=rng.choice([None, "Dr."]),
+            first_name=first_name, last_name=last_name, full_name=f"{first_name} {last_name}",
+            specializations=rng.sample(SPECIALIZATIONS, rng.randint(1, 4)),
+            languages=rng.sample(["english", "urdu", "punjabi", "sindhi", "pashto"], rng.randint(1, 3)),
+            consultation_modes=rng.choice([["virtual"], ["virtual", "in_person"], ["in_person"]]),
+            fee_per_session=rng.choice([None, 1500, 2500, 4000, 8000, 15000]),
+            average_rating=round(rng.uniform(2.5, 5.0), 1), experience_years=rng.randint(0, 30),
+            city=rng.choice(CITIES),
+            weekly_schedule=rng.choice([{}, {"monday": []}, {"monday": [{"start": "09:00", "end": "13:00"}]}]),
+            approval_status=ApprovalStatus.APPROVED, updated_at=EPOCH + timedelta(seconds=i),
+        ))
+    return rows
+
+
+def old_rank(agent: MatcherAgent, specialists, targets, category):
+    """Previous process(): score every loaded specialist, sort, take top N"""
+    scored = []
+    for spec in specialists:
+        score, reasons = agent._score_specialist(spec, targets, category)
+        scored.append((round(score, 2), str(spec.id), reasons))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored[:agent.top_n]
+
+
+def ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(count: int = 10000, requests: int = 50):
+    agent = MatcherAgent(llm_client=MagicMock())
+    specialists = synthetic_specialists(count)
+    categories = [c for c in CATEGORY_TO_SPECIALIZATION]
+
+    cache = SpecialistFeatureCache()
+    build_ms = ms(lambda: cache.load(specialists), 3)
+    # The first request after a change sorts rows by base score once
+    sort_ms = ms(lambda: (cache._orders.clear(), agent._top_matches(cache, [], "other")), 3)
+
+    changed = [
+        SimpleNamespace(**{**vars(row), "average_rating": 5.0, "updated_at": EPOCH + timedelta(days=1)})
+        for row in specialists[:100]
+    ]
+    scratch = SpecialistFeatureCache()
+    scratch.load(specialists)
+    delta_ms = ms(lambda: scratch.load(changed, full=False), 3)
+
+    print(f"{count} specialists, {requests} requests per category (milliseconds per request)\n")
+    print(f"{'category':<12}{'score all':>12}{'top-K':>10}{'speedup':>10}  same scores")
+    for category in categories:
+        targets = CATEGORY_TO_SPECIALIZATION[category]
+        old_ms = ms(lambda: old_rank(agent, specialists, targets, category), max(1, requests // 10))
+        new_ms = ms(lambda: agent._top_matches(cache, targets, category), requests)
+        same = [s for s, _, _ in old_rank(agent, specialists, targets, category)] == \
+            [m.score for m in agent._top_matches(cache, targets, category)]
+        print(f"{category:<12}{old_ms:>12.2f}{new_ms:>10.3f}{old_ms / new_ms:>9.0f}x  {same}")
+
+    stats = cache.get_stats()
+    print(f"\nfeature cache: full build {build_ms:.1f} ms, re-sort after a change {sort_ms:.1f} ms, "
+          f"delta of {len(changed)} rows {delta_ms:.2f} ms,\n  "
+          f"{stats['specialties']} specialties / {stats['languages']} languages / {stats['modes']} modes")
+    print(f"persistence per request: {agent.top_n} commits before, 1 bulk insert + 1 commit now")
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    )
@@ -0,0 +1,106 @@
+"""
+Tests for the local answer classifier in front of the LLM response parser
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.assessment.assessment_v2.base_types import SCIDQuestion, ResponseType, ProcessedResponse
+from app.agents.assessment.assessment_v2.core.answer_classifier import AnswerClassifier
+from app.agents.assessment.assessment_v2.core.response_processor import GlobalResponseProcessor
+
+
+def _yes_no(options=None):
+    return SCIDQuestion(
+        id="MDD_01", sequence_number=1, simple_text="Have you felt down?",
+        dsm_criterion_id="MDD_A1", response_type=ResponseType.YES_NO,
+        options=options or [],
+    )
+
+
+def _mcq():
+    return SCIDQuestion(
+        id="GAD_02", sequence_number=2, simple_text="How often?",
+        response_type=ResponseType.MULTIPLE_CHOICE,
+        options=["Not at all", "Several days", "More than half the days", "Nearly every day"],
+    )
+
+
+class TestAnswerClassifier:
+    """Which answers resolve locally and which escalate"""
+
+    def test_exact_yes_no(self):
+        classifier = AnswerClassifier()
+        assert classifier.classify("Yes.", _yes_no()) == ("yes", 0.95, "exact")
+        assert classifier.classify("nope", _yes_no())[0] == "no"
+        assert classifier.classify("2", _yes_no(["Yes", "No"]))[0] == "no"
+
+    def test_exact_mcq_label_and_number(self):
+        classifier = AnswerClassifier()
+        assert classifier.classify("several DAYS", _mcq())[0] == "Several days"
+        assert classifier.classify("option 4", _mcq())[0] == "Nearly every day"
+        assert classifier.classify("7", _mcq()) is None
+
+    def test_prefix(self):
+        classifier = AnswerClassifier()
+        assert classifier.classify("No, I haven't", _yes_no()) == ("no", 0.85, "prefix")
+        assert classifier.classify("yes I have", _yes_no())[0] == "yes"
+        assert classifier.classify("More than half the days, mostly", _mcq())[0] == "More than half the days"
+
+    def test_ambiguous_answers_escalate(self):
+        classifier = AnswerClassifier()
+        question = _yes_no(["Yes", "No", "Not sure"])
+        for answer in ("Not sure", "yes but only once", "right now I feel awful",
+                       "I feel fine", "yes, " + "word " * 10):
+            assert classifier.classify(answer, question) is None, answer
+        text_question = SCIDQuestion(id="X", sequence_number=1, simple_text="Describe")
+        assert classifier.classify("yes", text_question) is None
+
+    def test_stats(self):
+        classifier = AnswerClassifier()
+        for tier in ("exact", "exact", "prefix", "llm"):
+            classifier.record(tier)
+        stats = classifier.get_stats()
+        assert stats["total"] == 4
+        assert stats["hit_rates"]["exact"] == 0.5
+        assert stats["local_rate"] == 0.75
+
+
+class TestResponseProcessorFastPath:
+    """GlobalResponseProcessor only calls the LLM for escalated answers"""
+
+    def _processor(self):
+        llm_parser = MagicMock()
+        llm_parser.parse_response.return_value = ProcessedResponse(
+            selected_option="yes", confidence=0.9, raw_response="I guess it has been hard lately"
+        )
+        processor = GlobalResponseProcessor(
+            llm_parser=llm_parser, sra_service=MagicMock(), classifier=AnswerClassifier()
+        )
+        return processor, llm_parser
+
+    def test_structured_answer_skips_llm(self):
+        processor, llm_parser = self._processor()
+        processed = processor.process_response("yes", _yes_no(), [], session_id="s1")
+        assert processed.selected_option == "yes"
+        assert processed.dsm_criteria_mapping == {"MDD_A1": True}
+        assert processed.free_text_analysis["resolved_by"] == "exact"
+        llm_parser.parse_response.assert_not_called()
+        processor.sra_service.process_response.assert_called_once()
+
+    def test_free_text_escalates(self):
+        processor, llm_parser = self._processor()
+        processed = processor.process_response("I guess it has been hard lately", _yes_no(), [])
+        assert processed.selected_option == "yes"
+        llm_parser.parse_response.assert_called_once()
+        assert processor.get_stats()["counts"]["llm"] == 1
+
+    def test_fast_path_can_be_disabled(self):
+        processor, llm_parser = self._processor()
+        processor.enable_fast_path = False
+        processor.process_response("yes", _yes_no(), [])
+        llm_parser.parse_response.assert_called_once()
@@ -0,0 +1,65 @@
+"""
+Tests for the chat-turn helpers of the assessment repository
+"""
+
+import sys
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.db.repositories_new.assessment import AssessmentRepository
+from app.models_new.assessment import AssessmentSession
+
+
+class _FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *args):
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+
+class _CountingDB:
+    """Minimal Session stand-in that counts queries"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def query(self, *entities):
+        self.queries += 1
+        return _FakeQuery(self.rows)
+
+
+class TestSymptomSummaryCache:
+    """The per-turn symptom context should not hit the DB every turn"""
+
+    def test_cached_while_symptom_count_unchanged(self):
+        repo = AssessmentRepository(AssessmentSession)
+        db = _CountingDB([("insomnia", 0.8, "sleep")])
+
+        first = repo.get_symptom_summary(db, "s1", symptom_count=1)
+        second = repo.get_symptom_summary(db, "s1", symptom_count=1)
+        assert first == second == [{"name": "insomnia", "severity": 0.8, "category": "sleep"}]
+        assert db.queries == 1
+
+    def test_new_symptom_refreshes(self):
+        repo = AssessmentRepository(AssessmentSession)
+        db = _CountingDB([("insomnia", 0.8, "sleep")])
+        repo.get_symptom_summary(db, "s1", symptom_count=1)
+
+        db.rows.append(("fatigue", 0.5, "energy"))
+        assert len(repo.get_symptom_summary(db, "s1", symptom_count=2)) == 2
+        assert db.queries == 2
+
+    def test_invalidate(self):
+        repo = AssessmentRepository(AssessmentSession)
+        db = _CountingDB([])
+        repo.get_symptom_summary(db, "s1", symptom_count=0)
+        repo.invalidate_symptom_summary("s1")
+        repo.get_symptom_summary(db, "s1", symptom_count=0)
+        assert db.queries == 2
@@ -0,0 +1,151 @@
+"""
+Tests for the async assessment moderator, module adapter and response processor paths
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.assessment.assessment_v2.adapters.base_module_adapter import SCIDModuleAdapter
+from app.agents.assessment.assessment_v2.base_module import BaseAssessmentModule
+from app.agents.assessment.assessment_v2.config import get_starting_module
+from app.agents.assessment.assessment_v2.base_types import (
+    SCIDModule, SCIDQuestion, ResponseType, ProcessedResponse,
+)
+from app.agents.assessment.assessment_v2.core.answer_classifier import AnswerClassifier
+from app.agents.assessment.assessment_v2.core.response_processor import GlobalResponseProcessor
+from app.agents.assessment.assessment_v2.moderator import AssessmentModerator
+from app.agents.assessment.assessment_v2.types import ModuleResponse
+
+QUESTION = SCIDQuestion(id="Q1", sequence_number=1, simple_text="Have you felt down?",
+                        response_type=ResponseType.YES_NO)
+
+
+class SlowParser:
+    """LLM parser whose async path waits like a network call"""
+
+    async def parse_response_async(self, user_response, **kwargs):
+        await asyncio.sleep(0.2)
+        return ProcessedResponse(selected_option="yes", confidence=0.9, raw_response=user_response)
+
+
+class SlowSRA:
+    """SRA service whose symptom extraction waits like a network call"""
+
+    def __init__(self):
+        self.recorded = []
+
+    async def extract_symptoms_async(self, user_response, question, conversation_history):
+        await asyncio.sleep(0.2)
+        return [{"name": "low mood", "category": "mood"}], "llm"
+
+    def record_symptoms(self, session_id, question, processed_response, symptoms, method):
+        self.recorded.append((session_id, processed_response.selected_option, method))
+        return {"symptoms_extracted": len(symptoms)}
+
+
+class BlockingModule(BaseAssessmentModule):
+    """Sync-only module that blocks like an LLM round trip"""
+
+    @property
+    def module_name(self) -> str:
+        return "blocking"
+
+    def start_session(self, user_id, session_id, **kwargs):
+        return ModuleResponse(message="first question")
+
+    def process_message(self, message, session_id, **kwargs):
+        time.sleep(0.2)
+        return ModuleResponse(message=f"echo {message}")
+
+    def is_complete(self, session_id):
+        return False
+
+
+def _moderator():
+    with patch("app.agents.assessment.assessment_v2.moderator.ModeratorDatabase", side_effect=RuntimeError):
+        moderator = AssessmentModerator()
+    for name in list(moderator.modules):
+        del moderator.modules[name]
+    moderator.modules[get_starting_module()] = BlockingModule()
+    return moderator
+
+
+class TestAsyncResponseProcessor:
+    """The parse and SRA extraction LLM calls overlap"""
+
+    def test_parse_and_symptom_extraction_overlap(self):
+        sra = SlowSRA()
+        processor = GlobalResponseProcessor(llm_parser=SlowParser(), sra_service=sra,
+                                            classifier=AnswerClassifier())
+        start = time.perf_counter()
+        processed = asyncio.run(processor.process_response_async(
+            "I have been feeling low most days", QUESTION, [], session_id="s1"
+        ))
+        elapsed = time.perf_counter() - start
+
+        assert processed.selected_option == "yes"
+        assert sra.recorded == [("s1", "yes", "llm")]
+        assert elapsed < 0.35
+
+    def test_fast_path_still_records_symptoms(self):
+        sra = SlowSRA()
+        parser = MagicMock()
+        processor = GlobalResponseProcessor(llm_parser=parser, sra_service=sra,
+                                            classifier=AnswerClassifier())
+        processed = asyncio.run(processor.process_response_async("no", QUESTION, [], session_id="s1"))
+        assert processed.selected_option == "no"
+        assert sra.recorded == [("s1", "no", "llm")]
+        parser.parse_response.assert_not_called()
+
+
+class TestAsyncAdapter:
+    """SCID adapters await the processor instead of blocking"""
+
+    def test_process_message_async_advances(self):
+        module = SCIDModule(id="TEST", name="Test", description="", questions=[
+            QUESTION,
+            SCIDQuestion(id="Q2", sequence_number=2, simple_text="Q2?", response_type=ResponseType.YES_NO),
+        ])
+        with patch("app.agents.assessment.assessment_v2.adapters.base_module_adapter.GlobalResponseProcessor"):
+            adapter = SCIDModuleAdapter(module)
+        sra = SlowSRA()
+        adapter.response_processor = GlobalResponseProcessor(llm_parser=SlowParser(), sra_service=sra,
+                                                             classifier=AnswerClassifier())
+        adapter.start_session("u1", "s1")
+
+        response = asyncio.run(adapter.process_message_async("I have been feeling low", "s1"))
+        assert response.metadata["question_id"] == "Q2"
+        assert sra.recorded == [("s1", "yes", "llm")]
+
+
+class TestAsyncModerator:
+    """Blocking modules run off the event loop; the sync API wraps the async one"""
+
+    def test_concurrent_sessions_do_not_block_each_other(self):
+        moderator = _moderator()
+
+        async def run():
+            for i in range(5):
+                await moderator.start_assessment_async("u", f"s{i}")
+            start = time.perf_counter()
+            replies = await asyncio.gather(*(
+                moderator.process_message_async("u", f"s{i}", f"hi {i}") for i in range(5)
+            ))
+            return replies, time.perf_counter() - start
+
+        replies, elapsed = asyncio.run(run())
+        assert replies == [f"echo hi {i}" for i in range(5)]
+        assert elapsed < 0.6
+
+    def test_sync_wrappers(self):
+        moderator = _moderator()
+        assert moderator.start_assessment("u", "s1") == "first question"
+        assert moderator.process_message("u", "s1", "hello") == "echo hello"
+        assert moderator.get_current_module("s1") == get_starting_module()
+        assert moderator.deploy_module(get_starting_module(), "s1", "u") is True
@@ -0,0 +1,126 @@
+"""
+Tests for the incremental DSM criteria evaluator and early stop
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.assessment.assessment_v2.adapters.base_module_adapter import SCIDModuleAdapter
+from app.agents.assessment.assessment_v2.base_types import (
+    SCIDModule, SCIDQuestion, ResponseType, ProcessedResponse,
+)
+from app.agents.assessment.assessment_v2.core.answer_classifier import AnswerClassifier
+from app.agents.assessment.assessment_v2.core.dsm_criteria_engine import (
+    CriteriaEvaluator, DSMCriteriaEngine, get_disorder_rules,
+)
+from app.agents.assessment.assessment_v2.core.question_router import QuestionRouter
+from app.agents.assessment.assessment_v2.core.response_processor import GlobalResponseProcessor
+
+MDD_SYMPTOMS = ["MDD_B1", "MDD_B2", "MDD_B3", "MDD_B4", "MDD_C1", "MDD_C2", "MDD_C3"]
+
+
+class TestDisorderRules:
+    """Rules compiled from dsm_criteria.json"""
+
+    def test_mdd_needs_five_including_a_core_symptom(self):
+        rule = get_disorder_rules()["MDD"]
+        assert not rule.evaluate({cid: True for cid in MDD_SYMPTOMS[:5]}).satisfied
+        assert rule.evaluate({"MDD_A1": True, **{cid: True for cid in MDD_SYMPTOMS[:4]}}).satisfied
+
+        bounds = rule.evaluate({"MDD_A1": False, "MDD_A2": False})
+        assert bounds.decided and not bounds.reachable
+
+    def test_mdd_overlapping_clauses_share_needed_criteria(self):
+        rule = get_disorder_rules()["MDD"]
+        # The core-symptom clause overlaps the five-of-nine clause: five answers can cover both
+        assert rule.evaluate({}).needed == 5
+        assert rule.evaluate({cid: True for cid in MDD_SYMPTOMS[:4]}).needed == 1
+
+    def test_ptsd_clusters(self):
+        rule = get_disorder_rules()["PTSD"]
+        status = {"PTSD_A": True, "PTSD_B1": True, "PTSD_C1": True, "PTSD_D1": True, "PTSD_E1": True, "PTSD_E2": True}
+        bounds = rule.evaluate(status)
+        assert not bounds.satisfied and bounds.needed == 1
+
+        assert rule.evaluate({**status, "PTSD_D2": True}).satisfied
+        assert not rule.evaluate({"PTSD_C1": False, "PTSD_C2": False}).reachable
+
+    def test_adhd_either_presentation(self):
+        rule = get_disorder_rules()["ADHD"]
+        assert rule.evaluate({f"ADHD_HI{i}": True for i in range(1, 7)}).satisfied
+        inattentive_ruled_out = {f"ADHD_IN{i}": False for i in range(1, 5)}
+        assert rule.evaluate(inattentive_ruled_out).reachable
+
+
+class TestCriteriaEvaluator:
+    """Bitsets are updated per changed criterion"""
+
+    def test_incremental_matches_full_evaluation(self):
+        evaluator = CriteriaEvaluator()
+        status = {}
+        answers = [("MDD_A1", True), ("MDD_B1", True), ("GAD_A", True), ("MDD_B1", False), ("MDD_B2", True)]
+        for cid, value in answers:
+            status[cid] = value
+            evaluator.update({cid: value})
+            for disorder_id in ("MDD", "GAD"):
+                assert evaluator.bounds(disorder_id) == get_disorder_rules()[disorder_id].evaluate(status)
+
+    def test_update_touches_only_owning_disorder(self):
+        evaluator = CriteriaEvaluator()
+        assert evaluator.update({"MDD_A1": True}) == ["MDD"]
+        assert evaluator.update({"UNKNOWN_X": True}) == []
+        assert set(evaluator.bits) == {"MDD"}
+
+    def test_engine_stops_when_unreachable(self):
+        engine = DSMCriteriaEngine()
+        mdd = {"disorder_id": "MDD", "criteria_type": "symptom_count", "minimum_criteria_count": 5}
+        status = engine.update_criteria_status(
+            "Q1", ProcessedResponse(dsm_criteria_mapping={"MDD_A1": False, "MDD_A2": False}), "MDD", mdd
+        )
+        can_stop, reason = engine.can_stop_early(status, mdd, "MDD")
+        assert can_stop and "no longer" in reason
+        assert engine.check_diagnosis_possible(dict(status), mdd)[0] is False
+
+
+def _panic_adapter():
+    questions = [
+        SCIDQuestion(id="PAN_1", sequence_number=1, simple_text="Attacks?", response_type=ResponseType.YES_NO,
+                     dsm_criterion_id="PAN_A", dsm_criteria_required=True),
+        SCIDQuestion(id="PAN_2", sequence_number=2, simple_text="Worry?", response_type=ResponseType.YES_NO,
+                     dsm_criterion_id="PAN_B", dsm_criteria_required=True),
+        SCIDQuestion(id="PAN_3", sequence_number=3, simple_text="Triggers?", response_type=ResponseType.YES_NO),
+    ]
+    module = SCIDModule(id="PANIC", name="Panic", description="", questions=questions,
+                        dsm_criteria={"disorder_id": "PANIC"}, min_questions=3)
+    with patch("app.agents.assessment.assessment_v2.adapters.base_module_adapter.GlobalResponseProcessor"):
+        adapter = SCIDModuleAdapter(module)
+    adapter.response_processor = GlobalResponseProcessor(
+        llm_parser=MagicMock(), sra_service=MagicMock(), classifier=AnswerClassifier()
+    )
+    adapter.question_router = QuestionRouter()
+    return adapter
+
+
+class TestEarlyStop:
+    """Modules end once their disorder's outcome is decided"""
+
+    def test_required_criterion_ruled_out(self):
+        adapter = _panic_adapter()
+        adapter.start_session("u1", "s1")
+        response = adapter.process_message("no", "s1")
+
+        assert response.is_complete
+        assert response.metadata["completion_type"] == "early_stop"
+        assert adapter.get_results("s1")["early_stop_reason"] == "criteria_not_reachable"
+
+    def test_undecided_continues(self):
+        adapter = _panic_adapter()
+        adapter.start_session("u1", "s1")
+        response = adapter.process_message("yes", "s1")
+
+        assert not response.is_complete
+        assert adapter._sessions["s1"]["dsm_criteria_bits"]["PANIC"][0] != 0
@@ -0,0 +1,141 @@
+"""
+Tests for the shared compiled lexicon matcher
+"""
+
+import sys
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.core.lexicon import Lexicon, LexiconEngine
+
+
+def _lexicon(name="test", engine=None, **groups):
+    engine = engine or LexiconEngine()
+    return Lexicon(name, Lexicon.from_groups(groups, kind="symptom"), engine=engine)
+
+
+class TestLexiconMatching:
+    """Boundaries, inflections and negation"""
+
+    def test_word_boundaries(self):
+        lexicon = _lexicon(mood=["down", "sad"])
+        assert [h.term for h in lexicon.scan("I feel down today").hits] == ["down"]
+        assert not lexicon.scan("downloading my files, crusade").hits
+
+    def test_inflections_and_case(self):
+        lexicon = _lexicon(trauma=["flashback", "nightmare"])
+        hits = lexicon.scan("FLASHBACKS and Nightmares").hits
+        assert [h.term for h in hits] == ["flashback", "nightmare"]
+        assert hits[0].start == 0 and hits[0].end == len("FLASHBACKS")
+
+    def test_multiword_terms_and_curly_apostrophes(self):
+        lexicon = _lexicon(sleep=["can't sleep"], anxiety=["on  edge"])
+        assert [h.category for h in lexicon.scan("I can’t   sleep and I'm on edge").hits] == ["sleep", "anxiety"]
+
+    def test_negation(self):
+        lexicon = _lexicon(mood=["sad", "hopeless"])
+        scan = lexicon.scan("I'm not really sad. But hopeless, yes")
+        assert [(h.term, h.negated) for h in scan.hits] == [("sad", True), ("hopeless", False)]
+        assert [h.term for h in scan.of_kind("symptom")] == ["hopeless"]
+
+    def test_derived_forms(self):
+        lexicon = _lexicon(mood=["hopeless", "guilt"], energy=["tired"], sleep=["sleep"], anxiety=["fear"])
+        terms = [h.term for h in lexicon.scan("Hopelessness, tiredness, sleepless nights and guilty").hits]
+        assert terms == ["hopeless", "tired", "sleep", "guilt"]
+        # "-less" inverts a symptom, so only domain terms take it
+        assert not lexicon.scan("I feel fearless").hits
+
+    def test_negation_is_limited_to_its_clause(self):
+        lexicon = _lexicon(anxiety=["worried"], mood=["sad"])
+        assert not lexicon.scan("I was never this worried").hits[0].negated
+        assert not lexicon.scan("I'm not sure but I feel sad").hits[0].negated
+        assert lexicon.scan("I'm not at all worried").hits[0].negated
+        assert lexicon.scan("I don't feel sad").hits[0].negated
+
+    def test_domain_terms_are_never_negated(self):
+        lexicon = _lexicon(sleep=["sleep"], appetite=["appetite"])
+        assert not any(h.negated for h in lexicon.scan("I don't sleep and have no appetite").hits)
+
+    def test_severity_modifiers_in_the_same_pass(self):
+        engine = LexiconEngine()
+        lexicon = Lexicon(
+            "test",
+            Lexicon.from_mapping({"tired": {"category": "energy", "criteria": ["A6"]}})
+            + Lexicon.from_weights({"a little": 0.2, "extremely": 0.9}, kind="severity"),
+            engine=engine,
+        )
+        scan = lexicon.scan("A little tired, no, extremely tired")
+        assert scan.max_weight("severity") == 0.9
+        assert [h.criteria for h in scan.unique("symptom")] == [("A6",)]
+
+
+class TestSharedEngine:
+    """One pass serves every registered lexicon"""
+
+    def test_lexicons_share_one_memoized_scan(self):
+        engine = LexiconEngine()
+        risk = _lexicon("risk", engine, critical=["kill myself"])
+        mood = _lexicon("mood", engine, mood=["hopeless"])
+        text = "I feel hopeless and want to kill myself"
+
+        assert [h.term for h in risk.scan(text).hits] == ["kill myself"]
+        assert [h.term for h in mood.scan(text).hits] == ["hopeless"]
+        assert engine.get_stats()["scans"] == 1
+        assert engine.get_stats()["cache_hits"] == 1
+
+    def test_longer_term_in_another_lexicon_does_not_shadow(self):
+        engine = LexiconEngine()
+        short = _lexicon("short", engine, anxiety=["panic", "edge"])
+        _lexicon("long", engine, panic=["panic attack", "on edge"])
+
+        assert [h.term for h in short.scan("panic attacks leave me on edge").hits] == ["panic", "edge"]
+
+    def test_reregistering_recompiles(self):
+        engine = LexiconEngine()
+        _lexicon("mood", engine, mood=["sad"])
+        assert engine.scan("so sad", "mood").hits
+        _lexicon("mood", engine, mood=["blue"])
+        assert not engine.scan("so sad", "mood").hits
+        assert engine.scan("so blue", "mood").hits
+
+
+class TestExtractors:
+    """Extractors query the shared lexicon"""
+
+    def test_fast_extraction_skips_negated_and_partial_words(self):
+        from app.agents.sra.agent_v2 import extract_symptoms_fast
+
+        names = [s["name"] for s in extract_symptoms_fast("I am NOT sad, just downloading files while tired")]
+        assert names == ["tired"]
+
+    def test_risk_detection_keeps_negated_mentions(self):
+        from app.agents.therapist.agent_v2 import detect_risk
+
+        assert detect_risk("It has begun")["risk_level"] == "none"
+        assert detect_risk("I'm not going to kill myself")["risk_level"] == "critical"
+
+    def test_risk_detection_matches_derived_forms(self):
+        from app.agents.therapist.agent_v2 import detect_risk
+
+        assert detect_risk("I overdosed last year")["risk_level"] == "critical"
+        assert detect_risk("The hopelessness is back")["risk_level"] == "moderate"
+        assert detect_risk("Pure worthlessness")["risk_level"] == "moderate"
+
+    def test_sra_extractors_match_derived_forms(self):
+        from app.agents.assessment.assessment_v2.core.sra_service import _SRA_LEXICON
+        from app.agents.sra.agent_v2 import extract_symptoms_fast
+
+        text = "The tiredness is constant, I have been sleepless and I feel guilty"
+        assert [s["name"] for s in extract_symptoms_fast(text)] == ["tired", "sleep", "guilt"]
+        assert {h.term for h in _SRA_LEXICON.scan(text).of_kind("symptom")} >= {"tired", "guilty"}
+        assert [s["name"] for s in extract_symptoms_fast("I was never this worried")] == ["worried"]
+
+    def test_symptom_database_attributes(self):
+        from app.agents.sra.symptom_db import DSM5SymptomDatabase
+
+        [match] = DSM5SymptomDatabase.match_symptoms("Unbearable flashbacks for months")
+        assert match["name"] == "flashback"
+        assert match["severity"] == 0.95
+        assert match["duration"] == "months"
@@ -0,0 +1,99 @@
+"""
+Tests for the shared LLM response cache
+"""
+
+import sys
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.core.llm_cache import LLMResponseCache
+
+
+class _FakeRedis:
+    def __init__(self, fail: bool = False):
+        self.store = {}
+        self.fail = fail
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.store[key] = value
+
+
+class TestLLMResponseCache:
+    """Test cases for keying, LRU eviction and the Redis tier"""
+
+    MESSAGES = [{"role": "user", "content": "Answer POSITIVE or NEGATIVE"}]
+
+    def test_only_temperature_zero_is_cacheable(self):
+        assert LLMResponseCache.is_cacheable(0)
+        assert LLMResponseCache.is_cacheable(0.0)
+        assert not LLMResponseCache.is_cacheable(0.1)
+        assert not LLMResponseCache.is_cacheable(None)
+
+    def test_key_covers_full_content(self):
+        prefix = "x" * 600
+        a = LLMResponseCache.make_key("m", [{"role": "user", "content": prefix + "a"}], temperature=0)
+        b = LLMResponseCache.make_key("m", [{"role": "user", "content": prefix + "b"}], temperature=0)
+        assert a != b
+        assert a == LLMResponseCache.make_key("m", [{"role": "user", "content": prefix + "a"}], temperature=0)
+        assert a != LLMResponseCache.make_key("other", [{"role": "user", "content": prefix + "a"}], temperature=0)
+        assert a != LLMResponseCache.make_key("m", [{"role": "user", "content": prefix + "a"}], temperature=0, max_tokens=5)
+
+    def test_empty_cache_is_truthy(self):
+        cache = LLMResponseCache()
+        assert len(cache) == 0
+        assert cache
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = LLMResponseCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        assert cache.get("a") == "1"
+        cache.set("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_byte_bound(self):
+        cache = LLMResponseCache(max_entries=100, max_bytes=50)
+        cache.set("a", "x" * 20)
+        cache.set("b", "y" * 20)
+        cache.set("c", "z" * 20)
+        stats = cache.get_stats()
+        assert stats["bytes"] <= 50
+        assert cache.get("a") is None
+        # Entries larger than the whole budget are never stored
+        cache.set("huge", "q" * 100)
+        assert cache.get("huge") is None
+
+    def test_ttl_expiry(self):
+        cache = LLMResponseCache(ttl_seconds=-1)
+        cache.set("a", "1")
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_redis_tier_shares_hits(self):
+        redis = _FakeRedis()
+        key = LLMResponseCache.make_key("m", self.MESSAGES, temperature=0)
+        LLMResponseCache(redis_client=redis).set(key, "POSITIVE")
+
+        other_worker = LLMResponseCache(redis_client=redis)
+        assert other_worker.get(key) == "POSITIVE"
+        assert other_worker.get_stats()["redis_hits"] == 1
+        # Promoted into the local tier
+        assert len(other_worker) == 1
+
+    def test_redis_failure_degrades_to_local(self):
+        cache = LLMResponseCache(redis_client=_FakeRedis(fail=True))
+        cache.set("a", "1")
+        assert cache.get("a") == "1"
+        assert cache.get("missing") is None
@@ -0,0 +1,72 @@
+"""
+Tests for the shared async LLM transport: one session per event loop
+"""
+
+import asyncio
+import sys
+import threading
+import warnings
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.core.llm_transport import AsyncLLMTransport, run_sync
+import app.core.llm_transport as llm_transport
+
+
+def _transport(monkeypatch) -> AsyncLLMTransport:
+    transport = AsyncLLMTransport("http://127.0.0.1:1", headers={})
+    monkeypatch.setattr(llm_transport, "_transports", {("test", "key"): transport})
+    return transport
+
+
+async def _pool_of(transport):
+    return transport._pool()
+
+
+class TestPerLoopSessions:
+    """Each loop gets its own session and semaphore"""
+
+    def test_same_loop_reuses_its_pool(self, monkeypatch):
+        transport = _transport(monkeypatch)
+
+        async def twice():
+            return transport._pool(), transport._pool()
+
+        first, second = run_sync(twice())
+        assert first is second
+        assert first.session.closed  # run_sync closed it before the loop went away
+
+    def test_short_lived_loops_close_their_sessions(self, monkeypatch):
+        transport = _transport(monkeypatch)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            pools = [run_sync(_pool_of(transport)) for _ in range(3)]
+        assert len({id(pool.session) for pool in pools}) == 3
+        assert all(pool.session.closed for pool in pools)
+        assert not [w for w in caught if "Unclosed" in str(w.message)]
+        assert transport.get_stats()["open_sessions"] == 0
+
+    def test_concurrent_loops_do_not_share_a_session(self, monkeypatch):
+        transport = _transport(monkeypatch)
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            other = asyncio.run_coroutine_threadsafe(_pool_of(transport), other_loop).result(5)
+
+            async def main():
+                mine = transport._pool()
+                assert mine.session is not other.session
+                assert mine.semaphore is not other.semaphore
+                assert transport.get_stats()["open_sessions"] == 2
+                await transport.close()
+                return mine
+
+            mine = asyncio.run(main())
+            assert mine.session.closed and other.session.closed
+        finally:
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join(5)
+            other_loop.close()
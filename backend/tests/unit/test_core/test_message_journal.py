@@ -0,0 +1,158 @@
+"""
+Tests for the buffered message journal: batching, flush triggers, retries
+and the single-transaction write
+"""
+
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.core.message_journal import MessageJournal, SessionCounter
+from app.models_new.assessment import AssessmentSession, ConversationMessage
+
+S1 = uuid.uuid4()
+S2 = uuid.uuid4()
+
+
+class _RecordingJournal(MessageJournal):
+    """Journal that records batches instead of writing them"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("delay_seconds", 60)
+        super().__init__(ConversationMessage, **kwargs)
+        self.written = []
+        self.fail = 0
+        self.bad = set()
+        self.wrote = threading.Event()
+
+    def _write_batch(self, batch):
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("db down")
+        if self.bad & set(batch):
+            raise RuntimeError("foreign key violation")
+        self.written.append({key: [row["content"] for row in rows] for key, rows in batch.items()})
+        self.wrote.set()
+        return sum(len(rows) for rows in batch.values())
+
+
+class _RecordingDB:
+    """Session stand-in that records statements and commits"""
+
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, statement, params=None):
+        self.calls.append((statement.__visit_name__, len(params)))
+
+    def commit(self):
+        self.calls.append(("commit", 0))
+
+    def rollback(self):
+        self.calls.append(("rollback", 0))
+
+    def close(self):
+        pass
+
+
+class TestMessageJournal:
+    """Appends coalesce into batched writes"""
+
+    def test_appends_coalesce_into_one_batch(self):
+        journal = _RecordingJournal()
+        for content in ("a", "b"):
+            journal.append(S1, {"content": content})
+        journal.append(str(S2), {"content": "c"})
+
+        assert journal.written == []
+        assert journal.flush() == 3
+        assert journal.written == [{S1: ["a", "b"], S2: ["c"]}]
+        assert journal.pending(S1) == []
+        journal.close()
+
+    def test_end_of_turn_flushes_early(self):
+        journal = _RecordingJournal()
+        journal.append(S1, {"content": "question"})
+        journal.append(S1, {"content": "answer"}, end_turn=True)
+
+        assert journal.wrote.wait(5)
+        assert journal.written == [{S1: ["question", "answer"]}]
+        journal.close()
+
+    def test_max_batch_flushes_early(self):
+        journal = _RecordingJournal(max_batch=3)
+        for i in range(3):
+            journal.append(S1, {"content": str(i)})
+
+        assert journal.wrote.wait(5)
+        assert journal.get_stats()["rows_written"] == 3
+        journal.close()
+
+    def test_flush_one_session(self):
+        journal = _RecordingJournal()
+        journal.append(S1, {"content": "a"})
+        journal.append(S2, {"content": "b"})
+
+        assert journal.flush(S1) == 1
+        assert [row["content"] for row in journal.pending(S2)] == ["b"]
+        journal.close()
+        assert journal.written == [{S1: ["a"]}, {S2: ["b"]}]
+
+    def test_failed_batch_is_requeued_in_order(self):
+        journal = _RecordingJournal(max_attempts=2)
+        journal.append(S1, {"content": "a"})
+        journal.fail = 1
+        assert journal.flush() == 0
+        journal.append(S1, {"content": "b"})
+
+        assert [row["content"] for row in journal.pending(S1)] == ["a", "b"]
+        journal.fail = 1
+        journal.flush()
+        # Rows share their session's attempt count, so the second failure drops both
+        assert journal.get_stats()["dropped"] == 2
+        journal.close()
+
+    def test_bad_session_does_not_hold_back_the_batch(self):
+        journal = _RecordingJournal(max_attempts=2)
+        journal.append(S1, {"content": "a"})
+        journal.append(S2, {"content": "b"})
+        journal.bad = {S2}
+
+        assert journal.flush() == 1
+        assert journal.written == [{S1: ["a"]}]
+        assert [row["content"] for row in journal.pending(S2)] == ["b"]
+
+        journal.append(S1, {"content": "c"})
+        assert journal.flush() == 1
+        # Only the failing session used up its attempts
+        assert journal.get_stats()["dropped"] == 1
+        assert journal.written[-1] == {S1: ["c"]}
+        journal.close()
+
+    def test_close_retries_until_nothing_is_pending(self):
+        journal = _RecordingJournal(max_attempts=3)
+        journal.append(S1, {"content": "a"})
+        journal.fail = 2
+        journal.close()
+
+        assert journal.written == [{S1: ["a"]}]
+        assert journal.get_stats()["buffered"] == 0
+
+    def test_write_is_one_insert_one_update_one_commit(self):
+        db = _RecordingDB()
+        journal = MessageJournal(
+            ConversationMessage,
+            counter=SessionCounter(AssessmentSession),
+            delay_seconds=60,
+            session_factory=lambda: db,
+        )
+        journal.append(S1, {"role": "user", "content": "a"})
+        journal.append(S1, {"role": "assistant", "content": "b"})
+        journal.append(S2, {"role": "user", "content": "c"})
+        journal.close()
+
+        assert db.calls == [("insert", 3), ("update", 2), ("commit", 0)]
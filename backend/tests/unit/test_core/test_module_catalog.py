@@ -0,0 +1,127 @@
+"""
+Tests for the shared SCID module catalog and lazy module registration
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.assessment.assessment_v2.core.module_catalog import LazyModules, ModuleCatalog
+from app.agents.assessment.assessment_v2.modules.mood_disorders.mdd import create_mdd_module
+
+MDD_FACTORY = "app.agents.assessment.assessment_v2.modules.mood_disorders.mdd.create_mdd_module"
+
+
+KEY = b"k" * 32
+
+
+def _catalog(path, version="v1", key=KEY, **kwargs):
+    return ModuleCatalog(path=path, version=version, key=key, **kwargs)
+
+
+class TestModuleCatalog:
+    """Build once, then map and unpickle per module"""
+
+    def test_cold_miss_builds_only_the_requested_module(self, tmp_path):
+        path = tmp_path / "catalog.bin"
+        first = _catalog(path, publish=False)
+        assert first.resolve(MDD_FACTORY) == "MDD"
+        assert first.get("MDD") is not None
+        assert first.builds == 0 and first.materialized == 1
+        assert not path.exists()
+
+    def test_build_then_reuse_file(self, tmp_path):
+        path = tmp_path / "catalog.bin"
+        first = _catalog(path)
+        assert first.get("MDD") is not None
+        assert first.wait_published(timeout=60)
+        assert first.builds == 1 and path.exists()
+        assert path.stat().st_mode & 0o777 == 0o600
+
+        second = _catalog(path)
+        assert second.resolve(MDD_FACTORY) == "MDD"
+        assert second.builds == 0
+        assert second.get_stats()["mapped"]
+        assert second.get_stats()["materialized"] == 0
+
+        module = second.get("MDD")
+        expected = create_mdd_module()
+        assert [q.id for q in module.questions] == [q.id for q in expected.questions]
+        assert module.get_question_by_id(expected.questions[0].id) is module.questions[0]
+        assert second.get("MDD") is module
+        assert second.get("UNKNOWN") is None
+
+    def test_version_change_rebuilds(self, tmp_path):
+        path = tmp_path / "catalog.bin"
+        _catalog(path).build()
+        rebuilt = _catalog(path, version="v2", publish=False)
+        assert not rebuilt.get_stats()["mapped"]
+        assert "GAD" in rebuilt.module_ids()
+        rebuilt.build()
+        assert rebuilt.builds == 1 and rebuilt.get_stats()["mapped"]
+
+    def test_file_signed_with_another_key_is_not_unpickled(self, tmp_path):
+        path = tmp_path / "catalog.bin"
+        _catalog(path, key=b"x" * 32).build()
+        catalog = _catalog(path, publish=False)
+        assert not catalog.get_stats()["mapped"]
+        assert catalog.get("MDD") is not None
+
+    def test_tampered_module_is_rejected(self, tmp_path):
+        path = tmp_path / "catalog.bin"
+        _catalog(path).build()
+        data = bytearray(path.read_bytes())
+        data[-8] ^= 0xFF
+        path.write_bytes(bytes(data))
+        catalog = _catalog(path)
+        tampered = catalog.module_ids()[-1]
+        with pytest.raises(ValueError):
+            catalog.get(tampered)
+
+    def test_shared_directory_is_not_trusted(self, tmp_path):
+        path = tmp_path / "catalog.bin"
+        _catalog(path).build()
+        tmp_path.chmod(0o777)
+        try:
+            catalog = _catalog(path, publish=False)
+            catalog.module_ids()
+            assert not catalog.get_stats()["mapped"]
+        finally:
+            tmp_path.chmod(0o700)
+
+    def test_unwritable_path_keeps_catalog_in_memory(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        catalog = _catalog(blocker / "catalog.bin")
+        catalog.build()
+        assert catalog.get("PTSD") is not None
+        assert not catalog.get_stats()["mapped"]
+        assert catalog.get_stats()["modules"] > 1
+
+
+class TestLazyModules:
+    """Modules are created on first access only"""
+
+    def test_lazy_loading(self):
+        calls = []
+        modules = LazyModules()
+        modules.register("A", lambda: calls.append("A") or "module-a")
+        modules.register("B", lambda: calls.append("B") or "module-b")
+
+        assert len(modules) == 2 and list(modules) == ["A", "B"]
+        assert calls == []
+        assert modules["A"] == "module-a" and modules["A"] == "module-a"
+        assert calls == ["A"]
+        assert modules.is_loaded("A") and not modules.is_loaded("B")
+
+    def test_failed_loader_looks_absent(self):
+        modules = LazyModules()
+        modules.register("BROKEN", lambda: None)
+        assert "BROKEN" not in modules
+        assert len(modules) == 0
+        with pytest.raises(KeyError):
+            modules["BROKEN"]
@@ -0,0 +1,65 @@
+"""
+Tests for the load-time question and SC item indexes
+"""
+
+import sys
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.assessment.assessment_v2.modules.basic_info.risk_assessment import create_risk_assessment_module
+from app.agents.assessment.assessment_v2.modules.mood_disorders.mdd import create_mdd_module
+from app.agents.interview.scid_bank import SCID_SC_Bank, get_scid_bank
+
+
+class TestSCIDModuleIndex:
+    """Indexed lookups agree with scanning module.questions"""
+
+    def test_lookups_match_linear_scan(self):
+        for module in (create_mdd_module(), create_risk_assessment_module()):
+            for question in module.questions:
+                assert module.get_question_by_id(question.id) is question
+                expected = [f for fid in question.follow_up_questions
+                            for f in module.questions if f.id == fid]
+                assert module.get_follow_up_questions(question.id) == expected
+            assert module.get_question_by_id("missing") is None
+            assert module.get_required_questions() == [q for q in module.questions if q.required]
+            assert module.get_required_question_ids() == {q.id for q in module.questions if q.required}
+            for priority in (1, 2, 3, 4):
+                assert module.get_questions_by_priority(priority) == [
+                    q for q in module.questions if q.priority == priority
+                ]
+
+    def test_precomputed_orders(self):
+        module = create_mdd_module()
+        key = lambda q: (q.priority, q.sequence_number)
+        assert list(module.get_routing_order(required=True)) == sorted(
+            (q for q in module.questions if q.required), key=key)
+        assert list(module.get_routing_order(required=False)) == sorted(
+            (q for q in module.questions if not q.required), key=key)
+        assert list(module.get_sequential_order()) == sorted(module.questions, key=lambda q: q.sequence_number)
+
+    def test_returned_lists_do_not_alias_index(self):
+        module = create_mdd_module()
+        module.get_required_questions().clear()
+        assert module.get_required_questions()
+
+
+class TestSCBankIndex:
+    """Indexed SC bank lookups agree with scanning all items"""
+
+    def test_items_by_module_and_category(self):
+        bank = SCID_SC_Bank()
+        for module_id in bank.modules:
+            assert bank.get_items_by_module(module_id) == [
+                item for item in bank.sc_items.values() if module_id in item.linked_modules
+            ]
+        for category in {item.category for item in bank.sc_items.values()}:
+            assert bank.get_items_by_category(category) == [
+                item for item in bank.sc_items.values() if item.category == category
+            ]
+        assert bank.get_items_by_module("NOPE") == []
+
+    def test_shared_bank(self):
+        assert get_scid_bank() is get_scid_bank()
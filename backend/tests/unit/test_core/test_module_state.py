@@ -0,0 +1,148 @@
+"""
+Tests for the evicting, checkpointed module session store
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.core.persistence import StateWriteBehind
+from app.agents.assessment.assessment_v2.core.symptom_database import Symptom
+from app.agents.assessment.assessment_v2.types import ModuleStatus
+from app.agents.assessment.assessment_v2.agents.da.da_module import DiagnosticAnalysisModule
+from app.agents.assessment.assessment_v2.agents.tpa.tpa_module import TreatmentPlanningModule
+from app.agents.assessment.assessment_v2.core.module_state import (
+    ModuleSessionStore, decode_state, encode_state,
+)
+
+
+class _RecordingWriter(StateWriteBehind):
+    """Write-behind queue that keeps snapshots pending instead of touching the DB"""
+
+    def _write_batch(self, batch):
+        return 0
+
+
+def _writer():
+    return patch("app.agents.core.persistence._state_writer", _RecordingWriter(delay_seconds=60))
+
+
+class TestStateEncoding:
+    """Module state survives the JSON snapshot"""
+
+    def test_round_trip(self):
+        state = {
+            "started_at": datetime(2024, 5, 1, 12, 30),
+            "answered": {"Q1", "Q2"},
+            "conversation_history": [{"role": "user", "content": "hi", "at": datetime(2024, 5, 1)}],
+            "scores": (1, 2),
+        }
+        decoded = decode_state(encode_state(state))
+        assert decoded["started_at"] == state["started_at"]
+        assert decoded["answered"] == state["answered"]
+        assert decoded["conversation_history"] == state["conversation_history"]
+        assert decoded["scores"] == [1, 2]
+
+    def test_objects_keep_their_types(self):
+        symptom = Symptom(name="insomnia", severity="severe", first_mentioned=datetime(2024, 5, 1))
+        decoded = decode_state(encode_state({"symptoms": [symptom], "status": ModuleStatus.COMPLETED}))
+        assert decoded["symptoms"] == [symptom]
+        assert decoded["symptoms"][0].first_mentioned == datetime(2024, 5, 1)
+        assert decoded["status"] is ModuleStatus.COMPLETED
+
+    def test_classes_outside_the_app_stay_dicts(self):
+        encoded = encode_state({"obj": ModuleStatus.COMPLETED})
+        encoded["obj"]["$enum"] = "os.system"
+        assert decode_state(encoded) == {"obj": "completed"}
+
+    def test_only_allowlisted_classes_are_restored(self):
+        encoded = encode_state({"obj": Symptom(name="insomnia")})
+        encoded["obj"]["$obj"] = "app.agents.core.llm_cache.LLMResponseCache"
+        assert isinstance(decode_state(encoded)["obj"], dict)
+
+    def test_user_dicts_shaped_like_tags_stay_dicts(self):
+        state = {
+            "extracted": {"$obj": "app.agents.core.llm_cache.LLMResponseCache", "$v": {}},
+            "labels": {"$set": ["a"]},
+            "when": {"$dt": "2024-05-01T00:00:00"},
+            "nested": [{"$dict": {"$enum": "x", "$v": 1}}],
+        }
+        assert decode_state(encode_state(state)) == state
+
+
+class TestModuleSessionStore:
+    """LRU eviction, incremental checkpoints and resume"""
+
+    def test_evicted_session_is_restored(self):
+        with _writer() as writer, patch.dict("os.environ", {"STATE_STORE_MAX_ENTRIES": "2"}):
+            store = ModuleSessionStore("test_module")
+            for i in range(3):
+                store[f"s{i}"] = {"step": i, "started_at": datetime(2024, 1, 1)}
+            assert not store.is_cached("s0")
+            assert writer.pending("s0", "module:test_module")["step"] == 0
+
+            assert store["s0"] == {"step": 0, "started_at": datetime(2024, 1, 1)}
+            assert store.get_stats()["restores"] == 1
+            writer.close()
+
+    def test_unchanged_state_is_not_rescheduled(self):
+        with _writer() as writer:
+            store = ModuleSessionStore("test_module")
+            store["s1"] = {"responses": []}
+            assert store.checkpoint("s1")
+            assert store.checkpoint("s1")
+            store["s1"]["responses"].append("yes")
+            assert store.checkpoint("s1")
+
+            assert writer.get_stats()["scheduled"] == 2
+            assert store.get_stats()["unchanged_checkpoints"] == 1
+            assert writer.pending("s1", "module:test_module") == {"responses": ["yes"]}
+            assert not store.checkpoint("missing")
+            writer.close()
+
+    def test_da_and_tpa_checkpoint_and_resume(self):
+        with _writer() as writer:
+            for module in (DiagnosticAnalysisModule(), TreatmentPlanningModule()):
+                assert isinstance(module._sessions, ModuleSessionStore)
+                module._sessions["s1"] = {"status": "completed", "completed_at": datetime(2024, 1, 1)}
+                assert module.checkpoint_state("s1")
+
+                module._sessions._store.delete("s1")
+                assert module.resume_from_checkpoint("s1")
+                assert module._sessions["s1"]["completed_at"] == datetime(2024, 1, 1)
+            writer.close()
+
+    def test_resumed_da_and_tpa_results_read_restored_objects(self):
+        symptom = Symptom(name="low mood", severity="moderate")
+        with _writer() as writer:
+            da, tpa = DiagnosticAnalysisModule(), TreatmentPlanningModule()
+            da._sessions["s1"] = {
+                "status": "completed",
+                "completed_at": datetime(2024, 1, 1),
+                "primary_diagnosis": {"name": "MDD", "severity": "moderate"},
+                "symptom_data": {"symptoms": [symptom], "summary": {"total": 1}},
+                "all_module_results": {"MDD": {"symptoms": ["low mood"]}},
+            }
+            tpa._sessions["s1"] = {
+                "status": "completed",
+                "completed_at": datetime(2024, 1, 1),
+                "treatment_plan": {"primary_treatment": "CBT"},
+                "symptom_data": {"symptoms": [symptom]},
+            }
+            for module in (da, tpa):
+                assert module.checkpoint_state("s1")
+                module._sessions._store.delete("s1")
+                assert module.resume_from_checkpoint("s1")
+
+            results = da.get_results("s1")
+            assert results["severity"] == "moderate"
+            assert results["symptom_summary"] == {"total": 1}
+            assert results["modules_analyzed"] == ["MDD"]
+            assert da._extract_symptoms_from_sra(da._sessions["s1"]["symptom_data"]) == [symptom]
+            assert tpa.get_results("s1")["uses_sra_data"]
+            assert tpa.is_complete("s1")
+            writer.close()
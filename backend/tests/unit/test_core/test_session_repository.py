@@ -0,0 +1,157 @@
+"""
+Tests for the moderator session repository: one-query loads, cached session
+keys and SELECT-free writes
+"""
+
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.assessment.assessment_v2.base_module import BaseAssessmentModule
+from app.agents.assessment.assessment_v2.config import get_starting_module
+from app.agents.assessment.assessment_v2.database import ModeratorDatabase
+from app.agents.assessment.assessment_v2.moderator import AssessmentModerator
+from app.agents.assessment.assessment_v2.session_repository import ModeratorSessionRepository
+from app.agents.assessment.assessment_v2.types import ModuleResponse
+
+ROW_ID = uuid.uuid4()
+PATIENT_ID = uuid.uuid4()
+
+
+class _Query:
+    def __init__(self, db, entities):
+        self.db = db
+        self.entities = entities
+
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        self.db.round_trips.append(("select", len(self.entities)))
+        return self.db.row
+
+    def update(self, values, synchronize_session=None):
+        self.db.round_trips.append(("update", len(values)))
+        return 1 if self.db.row is not None else 0
+
+
+class _RecordingDB:
+    """Session stand-in that records each statement sent to the database"""
+
+    def __init__(self, row=None):
+        self.row = row
+        self.round_trips = []
+        self.added = []
+
+    def query(self, *entities):
+        return _Query(self, entities)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def flush(self):
+        pass
+
+    def commit(self):
+        if self.added:
+            self.round_trips.extend(("insert", type(obj).__name__) for obj in self.added)
+            self.added = []
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class EchoModule(BaseAssessmentModule):
+    @property
+    def module_name(self) -> str:
+        return "echo"
+
+    def start_session(self, user_id, session_id, **kwargs):
+        return ModuleResponse(message="first question")
+
+    def process_message(self, message, session_id, **kwargs):
+        return ModuleResponse(message=f"echo {message}")
+
+    def is_complete(self, session_id):
+        return False
+
+
+def _session_row():
+    return SimpleNamespace(
+        id=ROW_ID, session_id="s1", patient_id=PATIENT_ID, user_id="u1",
+        current_module="mdd", module_history=["demographics"],
+        started_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 1), completed_at=None,
+        is_complete=False, session_metadata={"patient_id": str(PATIENT_ID)},
+        module_states={"mdd": {"step": 3}}, module_results={"demographics": {"age": 30}},
+    )
+
+
+def _database(db):
+    database = ModeratorDatabase()
+    database._repository = ModeratorSessionRepository()
+    # No background flushes: the tests inspect what is still buffered
+    database._repository.messages._ensure_thread = lambda: None
+    database._repository.messages._write_batch = lambda batch: sum(len(rows) for rows in batch.values())
+    database._get_db_session = lambda: db
+    return database
+
+
+class TestModeratorSessionRepository:
+    """Session graph in one round trip; writes skip the lookup SELECT"""
+
+    def test_get_session_is_one_query(self):
+        db = _RecordingDB(_session_row())
+        state = _database(db).get_session("s1")
+
+        assert db.round_trips == [("select", 13)]
+        assert state.module_states == {"mdd": {"step": 3}}
+        assert state.module_results == {"demographics": {"age": 30}}
+        assert state.metadata == {"patient_id": str(PATIENT_ID)}
+
+    def test_session_keys_are_cached(self):
+        db = _RecordingDB(_session_row())
+        database = _database(db)
+        for role in ("user", "assistant", "user"):
+            assert database.store_conversation_message("s1", None, role, "hi", module_name="mdd")
+
+        # One key lookup; the messages wait in the journal for a batched INSERT
+        assert db.round_trips == [("select", 2)]
+        assert database._repository.get_stats()["key_hits"] == 2
+        assert [row["role"] for row in database._repository.messages.pending(ROW_ID)] == ["user", "assistant", "user"]
+
+    def test_evicted_session_messages_are_flushed(self):
+        db = _RecordingDB(_session_row())
+        database = _database(db)
+        repository = database._repository
+        repository.key_cache_size = 1
+        assert database.store_conversation_message("s1", None, "user", "hi")
+
+        repository.remember("s2", uuid.uuid4(), PATIENT_ID)
+        assert repository.messages.pending(ROW_ID) == []
+        assert repository.messages.get_stats()["rows_written"] == 1
+
+    def test_missing_session_is_reported(self):
+        database = _database(_RecordingDB(None))
+        assert database.store_conversation_message("nope", None, "user", "hi") is False
+
+    def test_moderator_turn_is_one_update(self):
+        with patch("app.agents.assessment.assessment_v2.moderator.ModeratorDatabase", side_effect=RuntimeError):
+            moderator = AssessmentModerator()
+        for name in list(moderator.modules):
+            del moderator.modules[name]
+        moderator.modules[get_starting_module()] = EchoModule()
+        moderator.start_assessment("u1", "s1")
+
+        db = _RecordingDB(_session_row())
+        moderator.db = _database(db)
+        assert moderator.process_message("u1", "s1", "hello") == "echo hello"
+        assert db.round_trips == [("update", 6)]
@@ -0,0 +1,132 @@
+"""
+Tests for speculative next-question routing in the SCID module adapter
+"""
+
+import sys
+from pathlib import Path
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.assessment.assessment_v2.adapters import base_module_adapter
+from app.agents.assessment.assessment_v2.adapters.base_module_adapter import SCIDModuleAdapter
+from app.agents.assessment.assessment_v2.base_types import (
+    SCIDModule, SCIDQuestion, ResponseType, ProcessedResponse,
+)
+from app.agents.assessment.assessment_v2.core.answer_classifier import AnswerClassifier
+from app.agents.assessment.assessment_v2.core.question_router import QuestionRouter
+from app.agents.assessment.assessment_v2.core.response_processor import GlobalResponseProcessor
+
+
+def _module():
+    def question(qid, seq, **kwargs):
+        return SCIDQuestion(id=qid, sequence_number=seq, simple_text=f"{qid}?",
+                            response_type=ResponseType.YES_NO, **kwargs)
+    return SCIDModule(
+        id="TEST", name="Test", description="",
+        questions=[
+            question("Q1", 1, dsm_criterion_id="T_A1", follow_up_questions=["Q1A"]),
+            question("Q1A", 2, required=False),
+            question("Q2", 3),
+            question("Q3", 4),
+        ],
+        min_questions=3,
+    )
+
+
+def _adapter(llm_option="yes"):
+    # Keep the default processor from building a live LLM parser
+    with patch("app.agents.assessment.assessment_v2.adapters.base_module_adapter.GlobalResponseProcessor"):
+        adapter = SCIDModuleAdapter(_module())
+    llm_parser = MagicMock()
+    llm_parser.parse_response.side_effect = lambda user_response, **kwargs: ProcessedResponse(
+        selected_option=llm_option, confidence=0.9, raw_response=user_response
+    )
+    adapter.response_processor = GlobalResponseProcessor(
+        llm_parser=llm_parser, sra_service=MagicMock(), classifier=AnswerClassifier()
+    )
+    router = QuestionRouter()
+    router.get_next_question = MagicMock(wraps=router.get_next_question)
+    adapter.question_router = router
+    return adapter
+
+
+def _settle(adapter, session_id):
+    adapter._speculations[session_id][1][2].result(timeout=5)
+
+
+class TestSpeculativeRouting:
+    """Branches are precomputed per option and committed only on a key match"""
+
+    def test_branches_follow_options(self):
+        adapter = _adapter()
+        adapter.start_session("u1", "s1")
+        _settle(adapter, "s1")
+
+        response = adapter.process_message("yes", "s1")
+        assert response.metadata["question_id"] == "Q1A"
+        # Only the speculated yes/no/sometimes branches ran, nothing inline
+        assert adapter.question_router.get_next_question.call_count == 3
+
+    def test_no_branch_skips_follow_up(self):
+        adapter = _adapter()
+        adapter.start_session("u1", "s1")
+        _settle(adapter, "s1")
+        assert adapter.process_message("no", "s1").metadata["question_id"] == "Q2"
+
+    def test_unmatched_key_routes_inline(self):
+        adapter = _adapter(llm_option="yes")
+        adapter.start_session("u1", "s1")
+        _settle(adapter, "s1")
+        calls = adapter.question_router.get_next_question.call_count
+
+        # Free text parsed by the LLM has a different routing key than a bare "yes"
+        response = adapter.process_message("It has been really hard lately", "s1")
+        assert response.metadata["question_id"] == "Q1A"
+        assert adapter.question_router.get_next_question.call_count == calls + 1
+
+    def test_speculation_matches_inline_routing(self):
+        router = QuestionRouter()
+        module = _module()
+        processor = GlobalResponseProcessor(llm_parser=MagicMock(), sra_service=MagicMock(),
+                                            classifier=AnswerClassifier())
+        candidates = processor.candidate_responses(module.questions[0])
+        branches = router.speculate_next_questions(
+            current_question=module.questions[0], candidates=candidates, module=module,
+            answered_questions=set(), dsm_criteria_status={}, conversation_history=[],
+            session_responses={},
+        )
+        for candidate in candidates:
+            inline = router.get_next_question(
+                current_question=module.questions[0], processed_response=candidate, module=module,
+                answered_questions={"Q1"}, dsm_criteria_status=dict(candidate.dsm_criteria_mapping),
+                conversation_history=[], session_responses={},
+            )
+            assert branches[router.routing_key(candidate)].id == inline.id
+
+
+class TestSpeculationBounds:
+    """Unclaimed speculations are evicted instead of accumulating per adapter"""
+
+    def test_least_recently_used_is_evicted(self, monkeypatch):
+        monkeypatch.setattr(base_module_adapter, "MAX_SPECULATIONS", 2)
+        adapter = _adapter()
+        futures = [Future() for _ in range(3)]
+        for i, future in enumerate(futures):
+            adapter._hold_speculation(f"s{i}", ("Q1", 0, future))
+
+        assert list(adapter._speculations) == ["s1", "s2"]
+        assert futures[0].cancelled()
+        assert not futures[2].cancelled()
+
+    def test_expired_speculation_is_not_claimed(self, monkeypatch):
+        monkeypatch.setattr(base_module_adapter, "SPECULATION_TTL_SECONDS", 0)
+        adapter = _adapter()
+        future = Future()
+        adapter._hold_speculation("s1", ("Q1", 0, future))
+
+        assert adapter._pop_speculation("s1") is None
+        assert future.cancelled()
+        assert not adapter._speculations
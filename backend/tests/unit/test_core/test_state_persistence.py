@@ -0,0 +1,80 @@
+"""
+Tests for write-behind persistence of agent state
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.core.persistence import StateWriteBehind
+
+
+class _RecordingWriter(StateWriteBehind):
+    """Write-behind queue that records batches instead of touching the DB"""
+
+    def __init__(self, fail_times: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.batches_seen = []
+        self.fail_times = fail_times
+
+    def _write_batch(self, batch):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("db down")
+        self.batches_seen.append({key: snapshot for key, (snapshot, _, _) in batch.items()})
+        return len({session_id for session_id, _ in batch})
+
+
+class TestStateWriteBehind:
+    """Test cases for coalescing, batching and shutdown flush"""
+
+    def test_repeated_saves_coalesce_into_one_write(self):
+        writer = _RecordingWriter(delay_seconds=60)
+        for step in range(5):
+            writer.schedule("s1", "interview_state", {"step": step})
+        writer.schedule("s1", "conversation_state", {"turn": 1})
+
+        assert writer.flush() == 1
+        assert writer.batches_seen == [{
+            ("s1", "interview_state"): {"step": 4},
+            ("s1", "conversation_state"): {"turn": 1},
+        }]
+        assert writer.get_stats()["coalesced"] == 4
+        writer.close()
+
+    def test_background_flush_after_window(self):
+        writer = _RecordingWriter(delay_seconds=0.05)
+        writer.schedule("s1", "conversation_state", {"turn": 1})
+        writer.schedule("s2", "conversation_state", {"turn": 1})
+        deadline = time.time() + 2
+        while not writer.batches_seen and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(writer.batches_seen) == 1
+        assert len(writer.batches_seen[0]) == 2
+        writer.close()
+
+    def test_close_flushes_pending(self):
+        writer = _RecordingWriter(delay_seconds=60)
+        writer.schedule("s1", "conversation_state", {"turn": 3})
+        writer.close()
+        assert writer.batches_seen == [{("s1", "conversation_state"): {"turn": 3}}]
+
+    def test_snapshot_is_detached_and_readable_while_pending(self):
+        writer = _RecordingWriter(delay_seconds=60)
+        live = {"messages": ["hi"]}
+        writer.schedule("s1", "conversation_state", live)
+        live["messages"].append("later mutation")
+        assert writer.pending("s1", "conversation_state") == {"messages": ["hi"]}
+        writer.close()
+
+    def test_failed_batch_is_retried(self):
+        writer = _RecordingWriter(fail_times=1, delay_seconds=60)
+        writer.schedule("s1", "conversation_state", {"turn": 1})
+        assert writer.flush() == 0
+        assert writer.pending("s1", "conversation_state") == {"turn": 1}
+        assert writer.flush() == 1
+        assert writer.get_stats()["failures"] == 1
+        writer.close()
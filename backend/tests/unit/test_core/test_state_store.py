@@ -0,0 +1,132 @@
+"""
+Tests for the bounded, versioned session state store
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.core.state import StateManager
+from app.agents.core.state_store import (
+    SessionStateStore,
+    StateVersionConflict,
+    decode_payload,
+    encode_payload,
+)
+from app.agents.core.types import ConversationState, Symptom
+
+
+class _FakeRedis:
+    """Just enough of redis-py for the store: hashes plus the CAS script"""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hmget(self, key, *fields):
+        data = self.hashes.get(key, {})
+        return [data.get(f) for f in fields]
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+    def register_script(self, script):
+        def cas(keys, args):
+            expected, payload, _ttl = args
+            current = self.hashes.get(keys[0], {}).get("v")
+            if expected != "" and current is not None and current != expected.encode():
+                return -1
+            version = int(current or 0) + 1
+            self.hashes[keys[0]] = {"v": str(version).encode(), "d": payload}
+            return version
+        return cas
+
+
+def _dict_store(redis=None, max_entries=10, ttl_seconds=3600):
+    return SessionStateStore(
+        "test",
+        serialize=lambda state: state,
+        deserialize=lambda data: data,
+        max_entries=max_entries,
+        ttl_seconds=ttl_seconds,
+        redis_client=redis,
+    )
+
+
+class TestSessionStateStore:
+    """Test cases for eviction, shared tier and optimistic versioning"""
+
+    def test_lru_bound(self):
+        store = _dict_store(max_entries=2)
+        store["a"] = {"n": 1}
+        store["b"] = {"n": 2}
+        assert store.get("a") == {"n": 1}
+        store["c"] = {"n": 3}
+        assert len(store) == 2
+        assert store.get("b") is None
+        assert store.get_stats()["evictions"] == 1
+
+    def test_idle_ttl(self):
+        store = _dict_store(ttl_seconds=-1)
+        store["a"] = {"n": 1}
+        assert store.get("a") is None
+
+    def test_versions_increase(self):
+        store = _dict_store()
+        assert store.put("a", {"n": 1}) == 1
+        assert store.put("a", {"n": 2}) == 2
+        assert store.version("a") == 2
+
+    def test_payload_roundtrip_compresses_large_state(self):
+        small = {"x": "y"}
+        large = {"messages": ["hello there"] * 500}
+        assert encode_payload(small)[:1] == b"j"
+        assert encode_payload(large)[:1] == b"z"
+        assert decode_payload(encode_payload(large)) == large
+
+    def test_other_worker_sees_shared_state(self):
+        redis = _FakeRedis()
+        worker_a, worker_b = _dict_store(redis), _dict_store(redis)
+        worker_a.put("s1", {"turn": 1})
+        assert worker_b.get("s1") == {"turn": 1}
+
+        # B advances the session; A's stale local copy is revalidated on read
+        worker_b.put("s1", {"turn": 2})
+        assert worker_a.get("s1") == {"turn": 2}
+
+    def test_concurrent_write_conflicts(self):
+        redis = _FakeRedis()
+        worker_a, worker_b = _dict_store(redis), _dict_store(redis)
+        worker_a.put("s1", {"turn": 1})
+        worker_b.get("s1")
+
+        worker_b.put("s1", {"turn": 2, "by": "b"})
+        with pytest.raises(StateVersionConflict):
+            worker_a.put("s1", {"turn": 2, "by": "a"})
+        assert worker_a.get("s1") == {"turn": 2, "by": "b"}
+        assert worker_a.get_stats()["conflicts"] == 1
+
+
+class TestStateManagerSerialization:
+    """The shared tier must carry the whole conversation, not the DB summary"""
+
+    def test_full_roundtrip(self):
+        manager = StateManager()
+        state = ConversationState(session_id="s1", patient_id="p1")
+        for i in range(30):
+            state.add_message("user", f"message {i}")
+        state.add_symptom(Symptom(name="insomnia", severity=0.8, frequency="daily"))
+        state.screening_scores = {"MDD": 0.7}
+
+        data = manager._state_to_dict(state, message_limit=None)
+        restored = manager._dict_to_state(decode_payload(encode_payload(data)))
+        assert len(restored.messages) == 30
+        assert restored.symptoms[0].frequency == "daily"
+        assert restored.screening_scores == {"MDD": 0.7}
+        assert len(manager._state_to_dict(state)["messages"]) == 20
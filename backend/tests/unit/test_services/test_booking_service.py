@@ -0,0 +1,133 @@
+"""
+Tests for set-based availability in the booking service and its cache
+"""
+
+import asyncio
+import sys
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.services import booking_service as module
+from app.services.booking_service import AvailabilityCache, BookingService, subtract_booked
+
+MONDAY = date(2025, 1, 6)
+
+
+class _AppointmentRepo:
+    """Appointment repository stand-in counting range queries"""
+
+    def __init__(self, booked=()):
+        self.booked = list(booked)
+        self.range_queries = 0
+
+    def get_booked_intervals(self, db, specialist_id, start_date, end_date):
+        self.range_queries += 1
+        return [(start, end) for start, end in self.booked if start_date <= start.date() <= end_date]
+
+    def check_availability(self, *args):
+        raise AssertionError("availability must not be checked per slot")
+
+    def update_status(self, db, appointment_id, status):
+        return SimpleNamespace(id=appointment_id, status=status)
+
+    def get(self, db, appointment_id):
+        return SimpleNamespace(id=appointment_id, specialist_id="sp1")
+
+
+class TestSubtractBooked:
+    """Booked intervals are removed from the weekday grid"""
+
+    def test_overlapping_slots_are_removed(self):
+        start = datetime.combine(MONDAY, time(10, 30))
+        slots = subtract_booked(MONDAY, 1, [(start, start + timedelta(minutes=50))])
+
+        times = [slot["time"] for slot in slots]
+        assert "10:00" not in times and "11:00" not in times
+        assert len(times) == 6
+
+    def test_weekends_are_skipped(self):
+        saturday = MONDAY + timedelta(days=5)
+        assert subtract_booked(saturday, 2, []) == []
+
+
+class TestGetAvailableSlots:
+    """One range query per miss, cached until the specialist's bookings change"""
+
+    def _service(self, repo):
+        service = BookingService(AvailabilityCache(ttl_seconds=60))
+        patches = [
+            patch.object(module, "appointment_repo", repo),
+            patch.object(module.specialist_repo, "get", return_value=SimpleNamespace(id="sp1")),
+        ]
+        for p in patches:
+            p.start()
+        return service, patches
+
+    def test_one_query_for_two_weeks(self):
+        tomorrow = date.today() + timedelta(days=1)
+        booked_at = datetime.combine(tomorrow, time(9))
+        repo = _AppointmentRepo([(booked_at, booked_at + timedelta(minutes=50))])
+        service, patches = self._service(repo)
+        try:
+            slots = service.get_available_slots(None, "sp1", days=14)
+            assert repo.range_queries == 1
+            assert {"date": tomorrow.isoformat(), "time": "09:00", "available": True} not in slots
+
+            assert service.get_available_slots(None, "sp1", days=14) == slots
+            assert repo.range_queries == 1
+        finally:
+            for p in patches:
+                p.stop()
+
+    def test_status_change_invalidates(self):
+        repo = _AppointmentRepo()
+        service, patches = self._service(repo)
+        try:
+            service.get_available_slots(None, "sp1")
+            service.reject_booking(None, "sp1", "a1")
+            service.get_available_slots(None, "sp1")
+            assert repo.range_queries == 2
+            assert service.availability_cache.get_stats()["invalidations"] == 1
+        finally:
+            for p in patches:
+                p.stop()
+
+
+class TestAppointmentChangesInvalidate:
+    """Cancelling or rescheduling through the appointments API drops cached availability"""
+
+    def _db(self, *results):
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.side_effect = list(results)
+        return db
+
+    def test_cancel_invalidates_specialist(self):
+        from app.api.v1.endpoints import appointments
+        from app.models.appointment import AppointmentStatusEnum
+
+        appointment = SimpleNamespace(specialist_id="sp1", patient_id="p1", status=AppointmentStatusEnum.CONFIRMED)
+        slot = SimpleNamespace(status=None, appointment_id="a1")
+        with patch.object(appointments.booking_service, "invalidate_availability") as invalidate:
+            asyncio.run(appointments.cancel_appointment(
+                "a1", {}, {"user_id": "p1", "user_type": "patient"}, self._db(appointment, slot)
+            ))
+        invalidate.assert_called_once_with("sp1")
+
+    def test_reschedule_invalidates_old_and_new_specialist(self):
+        from app.api.v1.endpoints import appointments
+        from app.models.appointment import AppointmentStatusEnum
+
+        appointment = SimpleNamespace(specialist_id="sp1", patient_id="p1", status=AppointmentStatusEnum.CONFIRMED)
+        new_slot = SimpleNamespace(specialist_id="sp2", slot_date=datetime(2025, 1, 6, 10), duration_minutes=60)
+        old_slot = SimpleNamespace(status=None, appointment_id="a1")
+        db = self._db(appointment, new_slot, old_slot)
+        with patch.object(appointments.booking_service, "invalidate_availability") as invalidate:
+            asyncio.run(appointments.reschedule_appointment(
+                "a1", {"new_slot_id": "slot2"}, {"user_id": "p1", "user_type": "patient"}, db
+            ))
+        assert [c.args[0] for c in invalidate.call_args_list] == ["sp1", "sp2"]
@@ -0,0 +1,201 @@
+"""
+Tests for the slot materializer: rule resolution, slot times, the
+idempotent bulk write and window-bounded slot reads
+"""
+
+import sys
+import uuid
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.appointment import AppointmentTypeEnum, DayOfWeekEnum, GeneratedTimeSlot
+from app.services.slot_materializer import (
+    SLOT_TIMEZONE, SlotMaterializer, SlotRule, day_range, resolve_rules, slot_starts,
+)
+
+ONLINE = AppointmentTypeEnum.ONLINE
+IN_PERSON = AppointmentTypeEnum.IN_PERSON
+MONDAY = date(2025, 1, 6)
+SPECIALIST = uuid.uuid4()
+
+
+def _template(day, start="10:00", end="12:00", minutes=30, gap=0, active=True, kind=ONLINE):
+    return SimpleNamespace(
+        specialist_id=SPECIALIST, appointment_type=kind, day_of_week=day,
+        start_time=start, end_time=end, slot_length_minutes=minutes,
+        break_between_slots_minutes=gap, is_active=active,
+    )
+
+
+class _Query:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *args):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class _RecordingDB:
+    """Session stand-in serving canned rows and recording executed statements"""
+
+    def __init__(self, specialists, templates=(), existing=()):
+        self.specialists = specialists
+        self.templates = list(templates)
+        self.existing = list(existing)
+        self.statements = []
+        self.commits = 0
+
+    def query(self, *entities):
+        first = entities[0]
+        if first is GeneratedTimeSlot.specialist_id:
+            return _Query(self.existing)
+        if len(entities) == 1:
+            return _Query(self.templates)
+        return _Query(self.specialists)
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(rowcount=len(getattr(statement, "_multi_values", [[]])[0]))
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class TestRules:
+    """Templates, availability_schedule and defaults"""
+
+    def test_template_wins_and_inactive_means_closed(self):
+        rules = resolve_rules([
+            _template(DayOfWeekEnum.MONDAY),
+            _template(DayOfWeekEnum.TUESDAY, active=False),
+        ])
+        assert rules[(ONLINE, DayOfWeekEnum.MONDAY)] == SlotRule(time(10), time(12), 30)
+        assert rules[(ONLINE, DayOfWeekEnum.TUESDAY)] is None
+        # No template and no schedule: default hours
+        assert rules[(IN_PERSON, DayOfWeekEnum.MONDAY)] == SlotRule(time(9), time(17), 60)
+
+    def test_schedule_fallback(self):
+        schedule = {
+            "online": {"monday": {"is_available": True, "start_time": "14:00", "end_time": "16:00",
+                                  "slot_duration_minutes": 45}},
+            "in_person": {"monday": {"is_available": False}},
+        }
+        rules = resolve_rules([], schedule)
+        assert rules[(ONLINE, DayOfWeekEnum.MONDAY)] == SlotRule(time(14), time(16), 45)
+        assert rules[(IN_PERSON, DayOfWeekEnum.MONDAY)] is None
+
+    def test_malformed_window_is_skipped(self):
+        assert SlotRule.parse("12:00", "10:00", 30) is None
+        assert SlotRule.parse("noon", "14:00", 30) is None
+
+    def test_slot_times_honour_breaks_and_now(self):
+        rules = {(ONLINE, DayOfWeekEnum.MONDAY): SlotRule(time(10), time(12), 30, 15)}
+        now = datetime.combine(MONDAY, time(10, 30), tzinfo=SLOT_TIMEZONE)
+        starts = [start.time() for _, start, _ in slot_starts(rules, MONDAY, 7, now)]
+        # 10:00 has passed; starts step by the slot length plus the 15-minute break
+        assert starts == [time(10, 45), time(11, 30)]
+
+    def test_day_range_is_half_open(self):
+        start, end = day_range(MONDAY, MONDAY)
+        assert end - start == timedelta(days=1)
+        assert start.utcoffset() == timedelta(hours=5)
+
+
+class TestMaterialize:
+    """One INSERT of the missing slots, conflict-safe"""
+
+    def test_writes_only_missing_slots_in_one_statement(self):
+        now = datetime.combine(MONDAY, time(8), tzinfo=SLOT_TIMEZONE)
+        closed = [_template(day, active=False, kind=kind) for day in DayOfWeekEnum for kind in (ONLINE, IN_PERSON)]
+        closed[0] = _template(DayOfWeekEnum.MONDAY)
+        booked = (SPECIALIST, ONLINE, datetime.combine(MONDAY, time(10), tzinfo=SLOT_TIMEZONE))
+        db = _RecordingDB([SimpleNamespace(id=SPECIALIST, availability_schedule=None)], closed, [booked])
+
+        written = SlotMaterializer(window_days=8, session_factory=lambda: db).materialize(db, [SPECIALIST], now=now)
+
+        # Two Mondays of four 30-minute slots, minus the one already there
+        assert written == 7
+        assert len(db.statements) == 1 and db.commits == 1
+        sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT DO NOTHING" in sql
+
+    def test_refresh_prunes_stale_slots(self):
+        db = _RecordingDB([SimpleNamespace(id=SPECIALIST, availability_schedule=None)])
+        SlotMaterializer(window_days=1).materialize(db, [SPECIALIST], prune=True)
+
+        assert [statement.__visit_name__ for statement in db.statements][-1] == "delete"
+
+    def test_unapproved_specialist_is_skipped(self):
+        db = _RecordingDB([])
+        assert SlotMaterializer().materialize(db, [SPECIALIST]) == 0
+        assert db.statements == [] and db.commits == 0
+
+    def test_requests_coalesce(self):
+        materializer = SlotMaterializer()
+        materializer.request(SPECIALIST)
+        materializer.request(str(SPECIALIST))
+        assert materializer.get_stats()["queued"] == 1
+
+
+class TestSlotQueries:
+    """Slot reads stay inside the materialized window"""
+
+    def _materializer(self, written=0):
+        materializer = SlotMaterializer(window_days=8)
+        materializer.materialize = MagicMock(return_value=written)
+        return patch("app.api.v1.endpoints.appointments.get_slot_materializer", return_value=materializer)
+
+    def test_range_past_the_window_is_rejected(self):
+        from fastapi import HTTPException
+
+        from app.api.v1.endpoints.appointments import PKT, check_slot_window, query_available_slots
+
+        today = datetime.now(PKT).date()
+        db = MagicMock()
+        with self._materializer() as get_materializer:
+            check_slot_window(today + timedelta(days=7))
+            with pytest.raises(HTTPException) as error:
+                check_slot_window(today + timedelta(days=8))
+            assert error.value.status_code == 400
+
+            assert query_available_slots(str(SPECIALIST), ONLINE, today + timedelta(days=8), today + timedelta(days=30), db) == []
+            assert not db.query.called
+            assert not get_materializer.return_value.materialize.called
+
+    def test_cold_specialist_is_materialized_before_reading(self):
+        from app.api.v1.endpoints.appointments import PKT, query_available_slots
+
+        today = datetime.now(PKT).date()
+        slot = SimpleNamespace(id=uuid.uuid4())
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.all.side_effect = [[], [slot]]
+        db.query.return_value.filter.return_value.first.return_value = None
+        with self._materializer(written=16) as get_materializer:
+            assert query_available_slots(str(SPECIALIST), ONLINE, today, today + timedelta(days=30), db) == [slot]
+            get_materializer.return_value.materialize.assert_called_once_with(db, [str(SPECIALIST)])
+
+    def test_specialist_without_open_slots_is_not_rematerialized(self):
+        from app.api.v1.endpoints.appointments import PKT, query_available_slots
+
+        today = datetime.now(PKT).date()
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.all.return_value = []
+        db.query.return_value.filter.return_value.first.return_value = SimpleNamespace(id=uuid.uuid4())
+        with self._materializer() as get_materializer:
+            assert query_available_slots(str(SPECIALIST), ONLINE, today, today, db) == []
+            assert not get_materializer.return_value.materialize.called
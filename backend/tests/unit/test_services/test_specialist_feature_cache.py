@@ -0,0 +1,148 @@
+"""
+Tests for the specialist feature cache, cached top-K matching and batched
+match persistence
+"""
+
+import asyncio
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from app.agents.matcher import agent as agent_module
+from app.agents.matcher.agent import CATEGORY_TO_SPECIALIZATION, MatcherAgent
+from app.agents.matcher.feature_cache import SpecialistFeatureCache, fee_band
+from app.db.repositories_new.assessment import assessment_repo
+from app.models_new.base import ApprovalStatus
+
+SPECIALIZATIONS = ["depression", "mood_disorders", "anxiety", "stress", "trauma_ptsd", "ocd", "addiction"]
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _row(i, rng, **overrides):
+    row = dict(
+        id=uuid.UUID(int=i + 1), title="Dr." if i % 4 == 0 else None, first_name=f"Name{i}", last_name="Test",
+        specializations=rng.sample(SPECIALIZATIONS, rng.randint(0, 3)),
+        languages=rng.sample(["english", "urdu", "punjabi"], rng.randint(1, 2)),
+        consultation_modes=["virtual"] if i % 2 else ["virtual", "in_person"],
+        fee_per_session=rng.choice([None, 1500, 3000, 12000]),
+        average_rating=round(rng.uniform(0, 5), 1), experience_years=rng.choice([None, 2, 8, 20]),
+        city=rng.choice([None, "Lahore", " karachi "]),
+        weekly_schedule=rng.choice([None, {}, {"monday": []}, {"monday": [{"start": "09:00", "end": "13:00"}]}]),
+        approval_status=ApprovalStatus.APPROVED, updated_at=EPOCH + timedelta(minutes=i),
+    )
+    row.update(overrides)
+    return SimpleNamespace(**row)
+
+
+def _cache(count=300, seed=7):
+    rng = random.Random(seed)
+    cache = SpecialistFeatureCache()
+    cache.load([_row(i, rng) for i in range(count)])
+    return cache
+
+
+class TestFeatures:
+    """Profiles become normalized feature rows"""
+
+    def test_feature_vector(self):
+        cache = SpecialistFeatureCache()
+        cache.load([_row(0, random.Random(1), specializations=["Depression", "OCD"], languages=["english"],
+                         fee_per_session=3000, average_rating=4.5, experience_years=30, city=" Lahore ")])
+        row = next(iter(cache._rows.values()))
+
+        assert row.full_name == "Dr. Name0 Test"
+        assert row.specialty_bits == cache.specialties.encode(["depression", "ocd"])
+        assert row.language_bits == cache.languages.encode(["ENGLISH"])
+        assert (row.fee_band, row.rating, row.experience, row.geo_cell) == (2, 0.9, 1.0, "lahore")
+        assert fee_band(None) == -1 and fee_band(20000) == 4
+
+    def test_delta_updates_and_drops(self):
+        cache = _cache(count=10)
+        first = str(uuid.UUID(int=1))
+        cache.load([
+            _row(0, random.Random(2), average_rating=0.0, updated_at=EPOCH + timedelta(days=1)),
+            _row(1, random.Random(2), approval_status=ApprovalStatus.SUSPENDED),
+        ], full=False)
+
+        assert len(cache) == 9
+        assert cache._rows[first].rating == 0.0
+        assert cache._watermark == EPOCH + timedelta(days=1)
+        assert cache.get_stats()["rebuilds"] == 1 and cache.get_stats()["refreshes"] == 1
+
+    def test_refresh_is_throttled(self):
+        cache = SpecialistFeatureCache(refresh_seconds=60)
+        db = MagicMock()
+        db.query.return_value.filter.return_value.all.return_value = []
+        cache.refresh(db)
+        cache.refresh(db)
+        assert db.query.call_count == 1
+        cache.invalidate()
+        cache.refresh(db)
+        assert db.query.call_count == 2
+
+
+class TestTopK:
+    """Cached top-K ranks exactly as scoring every specialist would"""
+
+    def test_matches_brute_force(self):
+        cache = _cache()
+        agent = MatcherAgent(llm_client=MagicMock())
+        for category in ("depressive", "ocd", "substance", "other"):
+            targets = CATEGORY_TO_SPECIALIZATION[category]
+            top = agent._top_matches(cache, targets, category)
+
+            brute = sorted(
+                (round(agent._score_specialist(row, targets, category)[0], 2) for row in cache._rows.values()),
+                reverse=True,
+            )
+            assert [m.score for m in top] == brute[:agent.top_n]
+            assert [m.rank for m in top] == [1, 2, 3, 4, 5]
+            if category == "ocd":
+                assert any(r.startswith("Specializes in") for m in top for r in m.reasons)
+
+
+class TestProcess:
+    """A match request reads the cache and writes its matches in one batch"""
+
+    def test_one_batch_per_request(self):
+        cache = _cache(count=50)
+        diagnosis = SimpleNamespace(is_primary=True, category="anxiety")
+        repo = MagicMock()
+        repo.get_diagnoses.return_value = [diagnosis]
+
+        with patch("app.db.session.SessionLocal", return_value=MagicMock()), \
+                patch("app.db.repositories_new.assessment_repo", repo), \
+                patch.object(agent_module, "get_specialist_feature_cache", return_value=cache), \
+                patch.object(cache, "refresh") as refresh:
+            output = asyncio.run(MatcherAgent(llm_client=MagicMock()).process({"session_id": "s1", "patient_id": "p1"}))
+
+        refresh.assert_called_once()
+        assert output.content["total_evaluated"] == 50
+        repo.add_specialist_matches.assert_called_once()
+        matches = repo.add_specialist_matches.call_args.kwargs["matches"]
+        assert [m["rank"] for m in matches] == [1, 2, 3, 4, 5]
+        assert [m["specialist_id"] for m in matches] == [m["specialist_id"] for m in output.content["matches"]]
+
+    def test_repository_updates_existing_and_bulk_inserts_rest(self):
+        existing = SimpleNamespace(specialist_id=uuid.UUID(int=1), match_score=0.1, rank=9, match_reasons=[])
+        db = MagicMock()
+        db.query.return_value.filter.return_value.all.return_value = [existing]
+        matches = [
+            {"specialist_id": str(uuid.UUID(int=i)), "match_score": 0.9 - i / 10, "rank": i, "match_reasons": []}
+            for i in (1, 2, 3)
+        ]
+
+        assert assessment_repo.add_specialist_matches(db, str(uuid.uuid4()), matches) == 3
+
+        assert (existing.rank, existing.match_score) == (1, 0.8)
+        db.execute.assert_called_once()
+        statement, rows = db.execute.call_args.args
+        assert statement.is_insert and [r["rank"] for r in rows] == [2, 3]
+        db.commit.assert_called_once()
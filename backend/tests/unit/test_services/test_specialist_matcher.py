@@ -0,0 +1,137 @@
+"""
+Tests for the specialist matcher: SQL-side scoring and top-K pagination
+"""
+
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.agents.matcher.sma_schemas import ConsultationMode, SortOption, SpecialistSearchRequest
+from app.agents.matcher.specialits_matcher import SpecialistMatcher
+from app.models.base import Base
+from app.models.specialist import (
+    ApprovalStatusEnum, EmailVerificationStatusEnum, SpecialistsAuthInfo, Specialists,
+    SpecialistSpecializations, SpecializationEnum, SpecialistTypeEnum,
+)
+
+SPECIALIZATIONS = list(SpecializationEnum)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Specialists.__table__, SpecialistsAuthInfo.__table__, SpecialistSpecializations.__table__,
+    ])
+    session = sessionmaker(bind=engine)()
+    for i in range(12):
+        specialist = Specialists(
+            first_name=f"Name{i}", last_name="Khan" if i % 3 else "Ahmed", email=f"s{i}@example.com",
+            specialist_type=SpecialistTypeEnum.PSYCHOLOGIST if i % 2 else SpecialistTypeEnum.COUNSELOR,
+            approval_status=ApprovalStatusEnum.APPROVED if i < 10 else ApprovalStatusEnum.PENDING,
+            average_rating=Decimal(i % 6) if i % 4 else Decimal("0.00"),
+            years_experience=i * 2, total_appointments=i * 3,
+            consultation_fee=Decimal(1000 + 500 * i) if i % 5 else None,
+            city="Lahore" if i % 2 else "Karachi", clinic_name="Clinic" if i % 3 == 0 else None,
+            bio="Helps adults with panic attacks" if i == 4 else None,
+        )
+        specialist.auth_info = SpecialistsAuthInfo(email_verification_status=EmailVerificationStatusEnum.VERIFIED)
+        specialist.specializations = [
+            SpecialistSpecializations(specialization=SPECIALIZATIONS[(i + k) % len(SPECIALIZATIONS)])
+            for k in range(i % 3)
+        ]
+        session.add(specialist)
+    session.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    session.statements = statements
+    yield session
+    session.close()
+
+
+def _request(**kwargs):
+    return SpecialistSearchRequest(**kwargs)
+
+
+class TestScoring:
+    """The SQL score ranks exactly as the Python factors do"""
+
+    @pytest.mark.parametrize("prefs", [
+        {},
+        {"specializations": ["depression", "anxiety", "ocd"]},
+        {"consultation_mode": ConsultationMode.IN_PERSON, "city": "lahore", "budget_max": 4000},
+        {"consultation_mode": ConsultationMode.HYBRID, "languages": ["Urdu"], "budget_max": 2500},
+    ])
+    def test_sql_score_matches_python(self, db, prefs):
+        matcher = SpecialistMatcher(db)
+        request = matcher._apply_defaults(_request(size=100, **prefs))
+        ranked = matcher._rank_specialists(
+            matcher._candidate_query(), request, SortOption.BEST_MATCH, offset=0, limit=100
+        )
+
+        assert len(ranked) == 10
+        for specialist, total_score in ranked:
+            expected = matcher._calculate_score(specialist, request)["total_score"]
+            assert total_score == pytest.approx(expected)
+        scores = [score for _, score in ranked]
+        assert scores == sorted(scores, reverse=True)
+
+
+class TestSearch:
+    """Filters and pagination run in the database"""
+
+    def test_only_the_page_is_loaded(self, db):
+        matcher = SpecialistMatcher(db)
+        db.statements.clear()
+        result = matcher.search_specialists(_request(page=2, size=3, sort_by=SortOption.FEE_LOW))
+
+        assert result["total_count"] == 10 and result["total_pages"] == 4
+        assert len(result["specialists"]) == 3
+        # count, page, auth info, specializations
+        assert len(db.statements) == 4
+        assert "LIMIT" in db.statements[1] and "OFFSET" in db.statements[1]
+
+        every = matcher.search_specialists(_request(size=10, sort_by=SortOption.FEE_LOW))["specialists"]
+        assert [s["id"] for s in every[3:6]] == [s["id"] for s in result["specialists"]]
+        fees = [s["consultation_fee"] or 0 for s in every]
+        assert fees == sorted(fees)
+
+    def test_text_query_matches_words_and_type(self, db):
+        matcher = SpecialistMatcher(db)
+        by_bio = matcher.search_specialists(_request(query="panic ATTACK"))
+        assert [s["first_name"] for s in by_bio["specialists"]] == ["Name4"]
+
+        by_name = matcher.search_specialists(_request(query="ahmed name3"))
+        assert [s["first_name"] for s in by_name["specialists"]] == ["Name3"]
+
+        by_type = matcher.search_specialists(_request(query="counsel", size=100))
+        assert {s["specialist_type"] for s in by_type["specialists"]} == {"counselor"}
+
+    def test_no_match_falls_back_to_relaxed(self, db):
+        result = SpecialistMatcher(db).search_specialists(_request(query="zzz"))
+        assert result["total_count"] == 10
+
+    def test_top_specialists_explain_the_page(self, db):
+        result = SpecialistMatcher(db).get_top_specialists(_request(size=3, budget_max=5000))
+        breakdown = result["rationale"]["scoring_breakdown"]
+        assert len(result["specialists"]) == len(breakdown) == 3
+        assert breakdown[0]["total_score"] >= breakdown[-1]["total_score"]
+
+    def test_postgres_text_match_uses_the_indexed_vector(self, db):
+        matcher = SpecialistMatcher(db)
+        db.get_bind = lambda: type("Bind", (), {"dialect": postgresql.dialect()})()
+        sql = str(matcher._text_match("Dr. Khan").compile(dialect=postgresql.dialect()))
+
+        index = next(i for i in Specialists.__table__.indexes if i.name == "idx_specialists_search")
+        indexed = str(index.expressions[0].compile(dialect=postgresql.dialect()))
+        assert indexed.replace("specialists.", "") in sql.replace("specialists.", "")
+        assert "@@ to_tsquery('simple'" in sql
@@ -0,0 +1,88 @@
+"""
+Tests for specialist search: batched related loads and keyset pagination
+"""
+
+import asyncio
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.endpoints.specialists import search_specialists
+from app.models.appointment import GeneratedTimeSlot
+from app.models.base import Base
+from app.models.specialist import (
+    ApprovalStatusEnum, AvailabilityStatusEnum, SpecialistAvailability,
+    Specialists, SpecialistSpecializations, SpecializationEnum, TimeSlotEnum,
+)
+
+SPECIALISTS = 7
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Specialists.__table__, SpecialistSpecializations.__table__,
+        SpecialistAvailability.__table__, GeneratedTimeSlot.__table__,
+    ])
+    session = sessionmaker(bind=engine)()
+    for i in range(SPECIALISTS):
+        specialist = Specialists(
+            first_name=f"S{i}", last_name="Test", email=f"s{i}@example.com",
+            approval_status=ApprovalStatusEnum.APPROVED,
+            availability_status=AvailabilityStatusEnum.ACCEPTING_NEW_PATIENTS,
+            # Ties on rating must still page without gaps or repeats
+            average_rating=Decimal("4.50") if i % 2 else Decimal("3.00"),
+        )
+        specialist.specializations = [SpecialistSpecializations(specialization=list(SpecializationEnum)[0])]
+        specialist.availability_slots = [
+            SpecialistAvailability(time_slot=slot) for slot in list(TimeSlotEnum)[:2]
+        ]
+        session.add(specialist)
+    session.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    session.statements = statements
+    yield session
+    session.close()
+
+
+def _search(db, **kwargs):
+    db.expunge_all()
+    db.statements.clear()
+    result = asyncio.run(search_specialists(db=db, **kwargs))
+    return result, len(db.statements)
+
+
+class TestSpecialistSearch:
+    """Fixed statements per page; cursor pages are stable"""
+
+    def test_statements_do_not_grow_with_page_size(self, db):
+        _, small = _search(db, size=2)
+        _, large = _search(db, size=SPECIALISTS)
+        # count, page, specializations, availability slots
+        assert small == large == 4
+
+    def test_cursor_walks_every_specialist_once(self, db):
+        seen = []
+        result, statements = _search(db, size=3)
+        while True:
+            seen.extend(s["id"] for s in result["specialists"])
+            assert statements == 4
+            assert all(len(s["availability_slots"]) == 2 for s in result["specialists"])
+            cursor = result["pagination"]["next_cursor"]
+            if cursor is None:
+                break
+            result, statements = _search(db, size=3, cursor=cursor)
+
+        assert len(seen) == len(set(seen)) == SPECIALISTS
+        ratings = [s["average_rating"] for s in _search(db, size=SPECIALISTS)[0]["specialists"]]
+        assert ratings == sorted(ratings, reverse=True)